@@ -0,0 +1,115 @@
+"""
+Pemilihan resolusi inferensi adaptif berdasarkan beban service
+
+Saat antrian request menumpuk atau latency naik, resolusi diturunkan
+mengikuti tangga ukuran (mis. 640 -> 512 -> 416 -> 320) supaya request
+tetap cepat selesai dengan akurasi sedikit lebih rendah.
+"""
+
+import threading
+import time
+from collections import deque
+from statistics import median
+
+
+class AdaptiveResolution:
+    """
+    Tracker beban (request in-flight + latency terakhir) dan pemilih resolusi
+
+    Latency disimpan dalam satuan "setara resolusi dasar": biaya inferensi
+    kira-kira sebanding dengan jumlah piksel, jadi latency pada ukuran s
+    dinormalisasi dengan faktor (base / s)^2. Dengan begitu estimasi beban
+    tidak ikut turun hanya karena resolusi sudah diturunkan.
+    """
+
+    def __init__(self, base_size=640, ladder=(640, 512, 416, 320), queue_step=2,
+                 latency_target_ms=1500, window=20, enabled=True):
+        ladder = sorted(set(ladder), reverse=True)
+        self.ladder = [s for s in ladder if s <= base_size] or [base_size]
+        self.base_size = self.ladder[0]
+        self.queue_step = max(1, int(queue_step))
+        self.latency_target_ms = latency_target_ms
+        self.enabled = enabled
+
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._latencies = deque(maxlen=window)
+        self._raw_latencies = deque(maxlen=window)
+        self._size_counts = {s: 0 for s in self.ladder}
+
+    def begin(self):
+        """Tandai request mulai diproses. Returns: (start_time, queue_depth)"""
+        with self._lock:
+            self._in_flight += 1
+            depth = self._in_flight
+        return time.perf_counter(), depth
+
+    def end(self, start, size=None):
+        """Tandai request selesai dan catat latency-nya (jika size diketahui)"""
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        with self._lock:
+            self._in_flight = max(0, self._in_flight - 1)
+            if size:
+                self._latencies.append(elapsed_ms * (self.base_size / size) ** 2)
+                self._raw_latencies.append(elapsed_ms)
+        return elapsed_ms
+
+    def mean_latency_ms(self):
+        """Rata-rata latency inferensi terakhir (ms, tanpa normalisasi)"""
+        with self._lock:
+            if not self._raw_latencies:
+                return None
+            return sum(self._raw_latencies) / len(self._raw_latencies)
+
+    def choose(self, queue_depth=None):
+        """
+        Pilih resolusi untuk request saat ini
+
+        Args:
+            queue_depth: Jumlah request in-flight (termasuk request ini)
+
+        Returns:
+            int: Ukuran input model
+        """
+        size = self._pick(queue_depth)
+        with self._lock:
+            self._size_counts[size] += 1
+        return size
+
+    def preview(self):
+        """Ukuran yang akan dipilih untuk request baru saat ini (tidak dicatat di statistik)"""
+        with self._lock:
+            depth = self._in_flight + 1
+        return self._pick(depth)
+
+    def _pick(self, queue_depth=None):
+        if not self.enabled:
+            return self.base_size
+
+        with self._lock:
+            depth = self._in_flight if queue_depth is None else queue_depth
+            latencies = list(self._latencies)
+
+        # Turun satu level untuk setiap `queue_step` request yang menunggu
+        idx = max(0, depth - 1) // self.queue_step
+
+        # Turun lagi selama estimasi latency pada ukuran ini melebihi target
+        if latencies:
+            base_latency = median(latencies)
+            while (idx < len(self.ladder) - 1 and
+                   base_latency * (self.ladder[idx] / self.base_size) ** 2 > self.latency_target_ms):
+                idx += 1
+
+        return self.ladder[min(idx, len(self.ladder) - 1)]
+
+    def stats(self):
+        """Snapshot status untuk endpoint /health"""
+        with self._lock:
+            latencies = list(self._latencies)
+            return {
+                'enabled': self.enabled,
+                'in_flight': self._in_flight,
+                'ladder': self.ladder,
+                'latency_p50_ms_at_base': round(median(latencies), 1) if latencies else None,
+                'size_counts': dict(self._size_counts)
+            }
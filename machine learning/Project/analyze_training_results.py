@@ -1,44 +1,167 @@
 """
 Script untuk menganalisis dan memvisualisasikan hasil training model YOLO
 Menampilkan grafik metrik training dan persentase peningkatan performa
+
+- Beberapa run bisa dibandingkan di sumbu yang sama
+- Run yang di-restart/resume dipecah menjadi segmen (epoch mundur = segmen baru);
+  kurva akhir memakai restart terakhir dari epoch 0, baris epoch yang
+  di-resume menimpa baris lama
+- Mode watch: results.csv di-tail selama training, hanya grafik yang datanya
+  berubah yang digambar ulang, di worker process dengan backend headless
+
+Contoh:
+    python analyze_training_results.py
+    python analyze_training_results.py --runs runs/train/jamur_detector runs/train/jamur_dedup
+    python analyze_training_results.py --watch --interval 30
 """
 
+import argparse
+import hashlib
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import matplotlib
+matplotlib.use('Agg')  # Hanya menyimpan file (juga aman di worker tanpa display)
+
 import pandas as pd
 import matplotlib.pyplot as plt
 import numpy as np
-from pathlib import Path
 import seaborn as sns
 
 # Set style untuk grafik yang lebih menarik
 sns.set_style("whitegrid")
 plt.rcParams['figure.figsize'] = (15, 10)
 
+DEFAULT_RUN = "runs/train/jamur_detector"
+OUTPUT_DIR = "output/training_analysis"
+RUN_COLORS = ['#2E86AB', '#A23B72', '#F18F01', '#059142', '#E63946', '#6A4C93']
+
+PERF_METRICS = [
+    ('Precision', 'metrics/precision'),
+    ('Recall', 'metrics/recall'),
+    ('mAP@0.5', 'metrics/mAP_0.5'),
+    ('mAP@0.5:0.95', 'metrics/mAP_0.5:0.95')
+]
+LOSS_METRICS = [
+    ('Box Loss (train)', 'train/box_loss'),
+    ('Object Loss (train)', 'train/obj_loss'),
+    ('Class Loss (train)', 'train/cls_loss')
+]
+
+# ============================================================
+# LOAD & SEGMENT
+# ============================================================
+
+def split_segments(df):
+    """
+    Tandai segmen: setiap kali epoch tidak naik dari baris sebelumnya,
+    training di-restart atau di-resume dari checkpoint lama
+
+    Returns:
+        df dengan kolom 'segment'
+    """
+    epochs = df['epoch'].to_numpy()
+    restart = np.r_[False, epochs[1:] <= epochs[:-1]]
+    return df.assign(segment=np.cumsum(restart))
+
+def effective_run(df):
+    """
+    Kurva training yang berlaku: mulai dari restart terakhir di epoch 0,
+    baris dari segmen resume yang lebih baru menimpa epoch yang sama
+    """
+    if df.empty:
+        return df
+    starts = df.groupby('segment')['epoch'].first()
+    fresh = starts[starts == starts.min()].index
+    df = df[df['segment'] >= fresh.max()]
+    df = df.drop_duplicates('epoch', keep='last').sort_values('epoch')
+    return df.reset_index(drop=True)
+
 def load_training_results(results_path):
-    """Memuat data hasil training dari CSV"""
+    """Memuat data hasil training dari CSV (run terakhir, restart dipisah per segmen)"""
     df = pd.read_csv(results_path)
     # Membersihkan nama kolom dari spasi
     df.columns = df.columns.str.strip()
-    # Menghapus baris duplikat (karena ada reset di CSV)
     df = df[df['epoch'].notna()]
-    # Mengambil data dari run terakhir
-    last_epoch = df['epoch'].max()
-    df = df[df['epoch'] <= last_epoch].reset_index(drop=True)
-    return df
+    return effective_run(split_segments(df))
+
+class ResultsTail:
+    """
+    Baca results.csv secara incremental (hanya baris baru sejak pembacaan terakhir)
+
+    File yang mengecil/diganti (run baru dengan nama sama) dibaca ulang dari awal.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.offset = 0
+        self.header = None
+        self.rows = []
+        self._inode = None
+
+    def poll(self):
+        """Returns: True jika ada baris baru"""
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return False
+        if st.st_size < self.offset or (self._inode is not None and st.st_ino != self._inode):
+            self.offset, self.header, self.rows = 0, None, []
+        self._inode = st.st_ino
+        if st.st_size == self.offset:
+            return False
+
+        with open(self.path, 'rb') as f:
+            f.seek(self.offset)
+            chunk = f.read()
+        end = chunk.rfind(b'\n') + 1  # baris terakhir mungkin belum selesai ditulis
+        if end == 0:
+            return False
+        self.offset += end
+
+        added = False
+        for line in chunk[:end].decode('utf-8', errors='replace').splitlines():
+            values = [v.strip() for v in line.split(',')]
+            if self.header is None:
+                self.header = values
+                continue
+            if len(values) != len(self.header):
+                continue
+            try:
+                self.rows.append([float(v) for v in values])
+                added = True
+            except ValueError:
+                continue
+        return added
+
+    def dataframe(self):
+        if self.header is None:
+            return pd.DataFrame()
+        df = pd.DataFrame(self.rows, columns=self.header)
+        return effective_run(split_segments(df)) if not df.empty else df
+
+def resolve_results_path(run):
+    """Folder run atau path results.csv"""
+    path = Path(run)
+    return path if path.suffix == '.csv' else path / "results.csv"
+
+def run_label(run):
+    path = Path(run)
+    return path.parent.name if path.suffix == '.csv' else path.name
+
+# ============================================================
+# STATISTIK
+# ============================================================
 
 def calculate_improvements(df):
     """Menghitung persentase peningkatan dari epoch awal ke akhir"""
     first_epoch = df.iloc[0]
     last_epoch = df.iloc[-1]
-    
+
     improvements = {}
-    metrics = [
-        'metrics/precision', 
-        'metrics/recall', 
-        'metrics/mAP_0.5', 
-        'metrics/mAP_0.5:0.95'
-    ]
-    
-    for metric in metrics:
+    for _, metric in PERF_METRICS:
         initial = first_epoch[metric]
         final = last_epoch[metric]
         if initial > 0:
@@ -50,40 +173,41 @@ def calculate_improvements(df):
             'final': final,
             'improvement_pct': improvement
         }
-    
+
     # Loss metrics (penurunan adalah peningkatan)
-    loss_metrics = ['train/box_loss', 'train/obj_loss', 'train/cls_loss']
-    for metric in loss_metrics:
+    for _, metric in LOSS_METRICS:
         initial = first_epoch[metric]
         final = last_epoch[metric]
-        reduction = ((initial - final) / initial) * 100
+        reduction = ((initial - final) / initial) * 100 if initial else 0.0
         improvements[metric] = {
             'initial': initial,
             'final': final,
             'reduction_pct': reduction
         }
-    
+
     return improvements
 
-def print_summary(df, improvements):
+def best_epoch(df, key, lowest=False):
+    """Epoch (bukan index baris) dengan nilai terbaik"""
+    idx = df[key].idxmin() if lowest else df[key].idxmax()
+    return int(df.loc[idx, 'epoch'])
+
+def print_summary(df, improvements, label=None):
     """Mencetak ringkasan hasil training"""
+    title = f" RINGKASAN HASIL TRAINING MODEL YOLO{f' ({label})' if label else ''} "
     print("\n" + "="*70)
-    print(" RINGKASAN HASIL TRAINING MODEL YOLO ".center(70, "="))
+    print(title.center(70, "="))
     print("="*70 + "\n")
-    
+
     print(f"Total Epochs: {int(df['epoch'].max()) + 1}")
-    print(f"Best Epoch: {df['metrics/mAP_0.5'].idxmax()}")
+    print(f"Best Epoch: {best_epoch(df, 'metrics/mAP_0.5')}")
+    segments = df['segment'].nunique() if 'segment' in df else 1
+    if segments > 1:
+        print(f"Segmen (resume): {segments}")
     print(f"\n{'METRIK PERFORMA':-^70}")
-    
+
     # Performance Metrics
-    perf_metrics = [
-        ('Precision', 'metrics/precision'),
-        ('Recall', 'metrics/recall'),
-        ('mAP@0.5', 'metrics/mAP_0.5'),
-        ('mAP@0.5:0.95', 'metrics/mAP_0.5:0.95')
-    ]
-    
-    for name, key in perf_metrics:
+    for name, key in PERF_METRICS:
         data = improvements[key]
         print(f"\n{name}:")
         print(f"  Awal      : {data['initial']:.4f}")
@@ -92,145 +216,170 @@ def print_summary(df, improvements):
             print(f"  Peningkatan: {data['improvement_pct']:+.2f}%")
         else:
             print(f"  Peningkatan: Sangat Signifikan (dari ~0)")
-        print(f"  Terbaik   : {df[key].max():.4f} (Epoch {df[key].idxmax()})")
-    
+        print(f"  Terbaik   : {df[key].max():.4f} (Epoch {best_epoch(df, key)})")
+
     print(f"\n{'LOSS METRICS':-^70}")
-    
+
     # Loss Metrics
-    loss_metrics = [
-        ('Box Loss (train)', 'train/box_loss'),
-        ('Object Loss (train)', 'train/obj_loss'),
-        ('Class Loss (train)', 'train/cls_loss')
-    ]
-    
-    for name, key in loss_metrics:
+    for name, key in LOSS_METRICS:
         data = improvements[key]
         print(f"\n{name}:")
         print(f"  Awal     : {data['initial']:.4f}")
         print(f"  Akhir    : {data['final']:.4f}")
         print(f"  Penurunan: {data['reduction_pct']:.2f}%")
-        print(f"  Terendah : {df[key].min():.4f} (Epoch {df[key].idxmin()})")
-    
+        print(f"  Terendah : {df[key].min():.4f} (Epoch {best_epoch(df, key, lowest=True)})")
+
     print("\n" + "="*70 + "\n")
 
-def plot_training_metrics(df, output_dir):
-    """Membuat grafik visualisasi training metrics"""
-    
-    # 1. Performance Metrics
+def write_statistics(df, improvements, stats_file):
+    """Simpan ringkasan statistik ke file teks"""
+    with open(stats_file, 'w', encoding='utf-8') as f:
+        f.write("="*70 + "\n")
+        f.write(" RINGKASAN HASIL TRAINING MODEL YOLO ".center(70, "=") + "\n")
+        f.write("="*70 + "\n\n")
+        f.write(f"Total Epochs: {int(df['epoch'].max()) + 1}\n")
+        f.write(f"Best Epoch (mAP@0.5): {best_epoch(df, 'metrics/mAP_0.5')}\n\n")
+
+        f.write("METRIK PERFORMA:\n")
+        f.write("-" * 70 + "\n")
+        for metric_name, metric_key in PERF_METRICS:
+            data = improvements[metric_key]
+            f.write(f"\n{metric_name}:\n")
+            f.write(f"  Awal      : {data['initial']:.6f}\n")
+            f.write(f"  Akhir     : {data['final']:.6f}\n")
+            f.write(f"  Terbaik   : {df[metric_key].max():.6f} (Epoch {best_epoch(df, metric_key)})\n")
+            if data['improvement_pct'] != float('inf'):
+                f.write(f"  Peningkatan: {data['improvement_pct']:+.2f}%\n")
+
+# ============================================================
+# GRAFIK (satu fungsi per file; runs = dict label -> DataFrame)
+# ============================================================
+
+def _color(i, runs, default):
+    return default if len(runs) == 1 else RUN_COLORS[i % len(RUN_COLORS)]
+
+def _mark_segments(ax, df, color):
+    """Garis vertikal di epoch tempat training di-resume"""
+    if 'segment' not in df:
+        return
+    changes = df['epoch'][df['segment'].diff().fillna(0) != 0]
+    for epoch in changes:
+        ax.axvline(epoch, color=color, linestyle=':', alpha=0.5)
+
+def plot_performance(runs, path, dpi):
     fig, axes = plt.subplots(2, 2, figsize=(16, 12))
     fig.suptitle('Metrik Performa Model YOLO', fontsize=16, fontweight='bold')
-    
-    metrics = [
-        ('metrics/precision', 'Precision', axes[0, 0]),
-        ('metrics/recall', 'Recall', axes[0, 1]),
-        ('metrics/mAP_0.5', 'mAP @ IoU=0.5', axes[1, 0]),
-        ('metrics/mAP_0.5:0.95', 'mAP @ IoU=0.5:0.95', axes[1, 1])
-    ]
-    
-    for metric, title, ax in metrics:
-        ax.plot(df['epoch'], df[metric], linewidth=2, marker='o', 
-                markersize=3, label=title, color='#2E86AB')
+
+    titles = ['Precision', 'Recall', 'mAP @ IoU=0.5', 'mAP @ IoU=0.5:0.95']
+    for (_, metric), title, ax in zip(PERF_METRICS, titles, axes.flat):
+        for i, (label, df) in enumerate(runs.items()):
+            color = _color(i, runs, '#2E86AB')
+            name = title if len(runs) == 1 else label
+            ax.plot(df['epoch'], df[metric], linewidth=2, marker='o',
+                    markersize=3, label=name, color=color)
+
+            # Highlight best value
+            best_idx = df[metric].idxmax()
+            best_val = df[metric].max()
+            ax.plot(df.loc[best_idx, 'epoch'], best_val, '*', color='r' if len(runs) == 1 else color,
+                    markersize=15, label=f'Best: {best_val:.4f}')
+            _mark_segments(ax, df, color)
         ax.set_xlabel('Epoch', fontsize=11)
         ax.set_ylabel(title, fontsize=11)
         ax.set_title(f'{title} per Epoch', fontsize=12, fontweight='bold')
         ax.grid(True, alpha=0.3)
-        
-        # Highlight best value
-        best_idx = df[metric].idxmax()
-        best_val = df[metric].max()
-        ax.plot(df.loc[best_idx, 'epoch'], best_val, 'r*', 
-                markersize=15, label=f'Best: {best_val:.4f}')
         ax.legend(fontsize=10)
-    
+
     plt.tight_layout()
-    plt.savefig(output_dir / 'performance_metrics.png', dpi=300, bbox_inches='tight')
-    print(f"✓ Grafik performa disimpan: {output_dir / 'performance_metrics.png'}")
-    
-    # 2. Loss Metrics
+    plt.savefig(path, dpi=dpi, bbox_inches='tight')
+    plt.close(fig)
+
+def plot_losses(runs, path, dpi):
     fig, axes = plt.subplots(2, 2, figsize=(16, 12))
     fig.suptitle('Loss Metrics Training dan Validasi', fontsize=16, fontweight='bold')
-    
+
     loss_pairs = [
         (('train/box_loss', 'val/box_loss'), 'Box Loss', axes[0, 0]),
         (('train/obj_loss', 'val/obj_loss'), 'Object Loss', axes[0, 1]),
         (('train/cls_loss', 'val/cls_loss'), 'Class Loss', axes[1, 0])
     ]
-    
+
     colors = ['#A23B72', '#F18F01']
     for (train_metric, val_metric), title, ax in loss_pairs:
-        ax.plot(df['epoch'], df[train_metric], linewidth=2, marker='o', 
-                markersize=3, label='Training', color=colors[0])
-        ax.plot(df['epoch'], df[val_metric], linewidth=2, marker='s', 
-                markersize=3, label='Validation', color=colors[1])
+        for i, (label, df) in enumerate(runs.items()):
+            if len(runs) == 1:
+                train_color, val_color, prefix = colors[0], colors[1], ''
+            else:
+                train_color = val_color = RUN_COLORS[i % len(RUN_COLORS)]
+                prefix = f'{label} '
+            ax.plot(df['epoch'], df[train_metric], linewidth=2, marker='o',
+                    markersize=3, label=f'{prefix}Training', color=train_color)
+            ax.plot(df['epoch'], df[val_metric], linewidth=2, marker='s', linestyle='--' if prefix else '-',
+                    markersize=3, label=f'{prefix}Validation', color=val_color)
         ax.set_xlabel('Epoch', fontsize=11)
         ax.set_ylabel('Loss', fontsize=11)
         ax.set_title(title, fontsize=12, fontweight='bold')
         ax.legend(fontsize=10)
         ax.grid(True, alpha=0.3)
-    
+
     # Learning Rate
     ax = axes[1, 1]
-    ax.plot(df['epoch'], df['x/lr0'], linewidth=2, label='lr0', color='#059142')
+    for i, (label, df) in enumerate(runs.items()):
+        ax.plot(df['epoch'], df['x/lr0'], linewidth=2, label='lr0' if len(runs) == 1 else label,
+                color=_color(i, runs, '#059142'))
     ax.set_xlabel('Epoch', fontsize=11)
     ax.set_ylabel('Learning Rate', fontsize=11)
     ax.set_title('Learning Rate Schedule', fontsize=12, fontweight='bold')
     ax.legend(fontsize=10)
     ax.grid(True, alpha=0.3)
     ax.set_yscale('log')
-    
+
     plt.tight_layout()
-    plt.savefig(output_dir / 'loss_metrics.png', dpi=300, bbox_inches='tight')
-    print(f"✓ Grafik loss disimpan: {output_dir / 'loss_metrics.png'}")
-    
-    # 3. Combined Performance Overview
+    plt.savefig(path, dpi=dpi, bbox_inches='tight')
+    plt.close(fig)
+
+def plot_combined(runs, path, dpi):
     fig, ax = plt.subplots(figsize=(14, 8))
-    
-    ax.plot(df['epoch'], df['metrics/precision'], linewidth=2.5, 
-            marker='o', markersize=4, label='Precision', color='#2E86AB')
-    ax.plot(df['epoch'], df['metrics/recall'], linewidth=2.5, 
-            marker='s', markersize=4, label='Recall', color='#A23B72')
-    ax.plot(df['epoch'], df['metrics/mAP_0.5'], linewidth=2.5, 
-            marker='^', markersize=4, label='mAP@0.5', color='#F18F01')
-    ax.plot(df['epoch'], df['metrics/mAP_0.5:0.95'], linewidth=2.5, 
-            marker='d', markersize=4, label='mAP@0.5:0.95', color='#059142')
-    
+
+    styles = [('o', '#2E86AB', '-'), ('s', '#A23B72', '--'), ('^', '#F18F01', '-.'), ('d', '#059142', ':')]
+    for i, (label, df) in enumerate(runs.items()):
+        for (name, key), (marker, color, linestyle) in zip(PERF_METRICS, styles):
+            if len(runs) == 1:
+                ax.plot(df['epoch'], df[key], linewidth=2.5,
+                        marker=marker, markersize=4, label=name, color=color)
+            else:
+                # Warna = run, gaya garis = metrik
+                ax.plot(df['epoch'], df[key], linewidth=2, linestyle=linestyle,
+                        color=RUN_COLORS[i % len(RUN_COLORS)], label=f'{label} {name}')
+
     ax.set_xlabel('Epoch', fontsize=13)
     ax.set_ylabel('Score', fontsize=13)
     ax.set_title('Perbandingan Semua Metrik Performa', fontsize=14, fontweight='bold')
-    ax.legend(fontsize=11, loc='best')
+    ax.legend(fontsize=11 if len(runs) == 1 else 8, loc='best')
     ax.grid(True, alpha=0.3)
-    
+
     plt.tight_layout()
-    plt.savefig(output_dir / 'combined_metrics.png', dpi=300, bbox_inches='tight')
-    print(f"✓ Grafik gabungan disimpan: {output_dir / 'combined_metrics.png'}")
-    
-    # 4. Bar Chart Perbandingan Awal vs Akhir
+    plt.savefig(path, dpi=dpi, bbox_inches='tight')
+    plt.close(fig)
+
+def plot_comparison_bar(runs, path, dpi):
     fig, ax = plt.subplots(figsize=(12, 7))
-    
-    metrics_names = ['Precision', 'Recall', 'mAP@0.5', 'mAP@0.5:0.95']
-    metrics_keys = ['metrics/precision', 'metrics/recall', 
-                    'metrics/mAP_0.5', 'metrics/mAP_0.5:0.95']
-    
-    initial_values = [df[key].iloc[0] for key in metrics_keys]
-    final_values = [df[key].iloc[-1] for key in metrics_keys]
-    
+
+    metrics_names = [name for name, _ in PERF_METRICS]
+    metrics_keys = [key for _, key in PERF_METRICS]
     x = np.arange(len(metrics_names))
-    width = 0.35
-    
-    bars1 = ax.bar(x - width/2, initial_values, width, label='Epoch 0', 
-                   color='#E63946', alpha=0.8)
-    bars2 = ax.bar(x + width/2, final_values, width, label=f'Epoch {int(df["epoch"].max())}', 
-                   color='#06D6A0', alpha=0.8)
-    
-    ax.set_xlabel('Metrik', fontsize=12)
-    ax.set_ylabel('Nilai', fontsize=12)
-    ax.set_title('Perbandingan Performa: Awal vs Akhir Training', 
-                fontsize=14, fontweight='bold')
-    ax.set_xticks(x)
-    ax.set_xticklabels(metrics_names)
-    ax.legend(fontsize=11)
-    ax.grid(True, alpha=0.3, axis='y')
-    
+
+    if len(runs) == 1:
+        df = next(iter(runs.values()))
+        groups = [('Epoch 0', [df[key].iloc[0] for key in metrics_keys], '#E63946'),
+                  (f'Epoch {int(df["epoch"].max())}', [df[key].iloc[-1] for key in metrics_keys], '#06D6A0')]
+        title = 'Perbandingan Performa: Awal vs Akhir Training'
+    else:
+        groups = [(label, [df[key].max() for key in metrics_keys], RUN_COLORS[i % len(RUN_COLORS)])
+                  for i, (label, df) in enumerate(runs.items())]
+        title = 'Perbandingan Performa Terbaik antar Run'
+    width = 0.7 / len(groups)
+
     # Tambahkan nilai di atas bar
     def autolabel(bars):
         for bar in bars:
@@ -241,69 +390,181 @@ def plot_training_metrics(df, output_dir):
                        textcoords="offset points",
                        ha='center', va='bottom',
                        fontsize=9)
-    
-    autolabel(bars1)
-    autolabel(bars2)
-    
+
+    for i, (label, values, color) in enumerate(groups):
+        offset = (i - (len(groups) - 1) / 2) * width
+        autolabel(ax.bar(x + offset, values, width, label=label, color=color, alpha=0.8))
+
+    ax.set_xlabel('Metrik', fontsize=12)
+    ax.set_ylabel('Nilai', fontsize=12)
+    ax.set_title(title, fontsize=14, fontweight='bold')
+    ax.set_xticks(x)
+    ax.set_xticklabels(metrics_names)
+    ax.legend(fontsize=11)
+    ax.grid(True, alpha=0.3, axis='y')
+
     plt.tight_layout()
-    plt.savefig(output_dir / 'comparison_bar_chart.png', dpi=300, bbox_inches='tight')
-    print(f"✓ Grafik perbandingan disimpan: {output_dir / 'comparison_bar_chart.png'}")
+    plt.savefig(path, dpi=dpi, bbox_inches='tight')
+    plt.close(fig)
+
+# Nama file -> (fungsi render, kolom yang dipakai, deskripsi)
+FIGURES = {
+    'performance_metrics.png': (plot_performance, [k for _, k in PERF_METRICS],
+                                'Grafik metrik performa'),
+    'loss_metrics.png': (plot_losses, ['train/box_loss', 'val/box_loss', 'train/obj_loss', 'val/obj_loss',
+                                       'train/cls_loss', 'val/cls_loss', 'x/lr0'],
+                         'Grafik loss training & validasi'),
+    'combined_metrics.png': (plot_combined, [k for _, k in PERF_METRICS],
+                             'Grafik gabungan semua metrik'),
+    'comparison_bar_chart.png': (plot_comparison_bar, [k for _, k in PERF_METRICS],
+                                 'Perbandingan awal vs akhir'),
+}
+
+def figure_digest(name, runs, dpi):
+    """Hash data yang dipakai satu grafik (untuk melewati render yang tidak berubah)"""
+    columns = ['epoch', 'segment'] + FIGURES[name][1]
+    digest = hashlib.blake2b(f"{name}:{dpi}".encode(), digest_size=16)
+    for label, df in runs.items():
+        digest.update(label.encode())
+        digest.update(np.ascontiguousarray(df.reindex(columns=columns).to_numpy(dtype=np.float64)).tobytes())
+    return digest.hexdigest()
+
+def render_figure(name, runs, output_dir, dpi):
+    """Dijalankan di worker process (backend Agg)"""
+    path = Path(output_dir) / name
+    tmp = path.with_name(f".{path.stem}.tmp{path.suffix}")
+    FIGURES[name][0](runs, tmp, dpi)
+    os.replace(tmp, path)  # viewer tidak pernah melihat file setengah jadi
+    return name
+
+class FigureRenderer:
+    """Render grafik yang datanya berubah, paralel di process pool"""
+
+    def __init__(self, output_dir, dpi=300, workers=None):
+        self.output_dir = Path(output_dir)
+        self.dpi = dpi
+        self.pool = ProcessPoolExecutor(max_workers=workers or min(len(FIGURES), os.cpu_count() or 1))
+        self.digests = {}
+
+    def render(self, runs):
+        """
+        Returns:
+            List nama file yang digambar ulang
+        """
+        runs = {label: df for label, df in runs.items() if not df.empty}
+        if not runs:
+            return []
+        changed = []
+        for name in FIGURES:
+            digest = figure_digest(name, runs, self.dpi)
+            if self.digests.get(name) != digest:
+                changed.append((name, digest))
+        futures = [(name, digest, self.pool.submit(render_figure, name, runs, self.output_dir, self.dpi))
+                   for name, digest in changed]
+        done = []
+        for name, digest, future in futures:
+            try:
+                future.result()
+            except Exception as e:
+                print(f"⚠️  Gagal render {name}: {e}")
+                continue
+            self.digests[name] = digest
+            done.append(name)
+        return done
+
+    def close(self):
+        self.pool.shutdown()
+
+# ============================================================
+# MAIN
+# ============================================================
+
+def analyze_once(results_paths, output_dir, dpi, workers):
+    runs = {}
+    for label, path in results_paths.items():
+        if not path.exists():
+            print(f"⚠️  {path} tidak ditemukan, dilewati")
+            continue
+        runs[label] = load_training_results(path)
+    if not runs:
+        print("❌ Tidak ada results.csv yang bisa dibaca")
+        return
 
-def main():
-    # Path ke file hasil training
-    results_path = Path("runs/train/jamur_detector/results.csv")
-    output_dir = Path("output/training_analysis")
-    
-    # Buat direktori output jika belum ada
-    output_dir.mkdir(parents=True, exist_ok=True)
-    
-    print("\n🔍 Memuat data hasil training...")
-    df = load_training_results(results_path)
-    
     print("📊 Menghitung peningkatan metrik...")
-    improvements = calculate_improvements(df)
-    
-    print_summary(df, improvements)
-    
+    for label, df in runs.items():
+        improvements = calculate_improvements(df)
+        print_summary(df, improvements, label if len(runs) > 1 else None)
+        stats_name = 'training_statistics.txt' if len(runs) == 1 else f'training_statistics_{label}.txt'
+        write_statistics(df, improvements, output_dir / stats_name)
+        print(f"✓ Statistik disimpan: {output_dir / stats_name}")
+
     print("\n📈 Membuat visualisasi grafik...")
-    plot_training_metrics(df, output_dir)
-    
-    # Simpan data statistik ke file
-    stats_file = output_dir / 'training_statistics.txt'
-    with open(stats_file, 'w', encoding='utf-8') as f:
-        f.write("="*70 + "\n")
-        f.write(" RINGKASAN HASIL TRAINING MODEL YOLO ".center(70, "=") + "\n")
-        f.write("="*70 + "\n\n")
-        f.write(f"Total Epochs: {int(df['epoch'].max()) + 1}\n")
-        f.write(f"Best Epoch (mAP@0.5): {df['metrics/mAP_0.5'].idxmax()}\n\n")
-        
-        f.write("METRIK PERFORMA:\n")
-        f.write("-" * 70 + "\n")
-        for metric_name, metric_key in [('Precision', 'metrics/precision'),
-                                         ('Recall', 'metrics/recall'),
-                                         ('mAP@0.5', 'metrics/mAP_0.5'),
-                                         ('mAP@0.5:0.95', 'metrics/mAP_0.5:0.95')]:
-            data = improvements[metric_key]
-            f.write(f"\n{metric_name}:\n")
-            f.write(f"  Awal      : {data['initial']:.6f}\n")
-            f.write(f"  Akhir     : {data['final']:.6f}\n")
-            f.write(f"  Terbaik   : {df[metric_key].max():.6f} (Epoch {df[metric_key].idxmax()})\n")
-            if data['improvement_pct'] != float('inf'):
-                f.write(f"  Peningkatan: {data['improvement_pct']:+.2f}%\n")
-    
-    print(f"✓ Statistik disimpan: {stats_file}")
-    
+    renderer = FigureRenderer(output_dir, dpi, workers)
+    try:
+        for name in renderer.render(runs):
+            print(f"✓ Grafik disimpan: {output_dir / name}")
+    finally:
+        renderer.close()
+
     print("\n" + "="*70)
     print(" ANALISIS SELESAI! ".center(70, "="))
     print("="*70)
     print(f"\n📁 Semua hasil disimpan di: {output_dir.absolute()}")
     print("\nFile yang dihasilkan:")
-    print("  1. performance_metrics.png - Grafik metrik performa")
-    print("  2. loss_metrics.png - Grafik loss training & validasi")
-    print("  3. combined_metrics.png - Grafik gabungan semua metrik")
-    print("  4. comparison_bar_chart.png - Perbandingan awal vs akhir")
-    print("  5. training_statistics.txt - Ringkasan statistik training")
+    for i, (name, (_, _, description)) in enumerate(FIGURES.items(), 1):
+        print(f"  {i}. {name} - {description}")
+    print(f"  {len(FIGURES) + 1}. training_statistics*.txt - Ringkasan statistik training")
     print()
 
+def watch(results_paths, output_dir, dpi, workers, interval):
+    """Tail results.csv semua run, render ulang grafik yang berubah sampai CTRL+C"""
+    tails = {label: ResultsTail(path) for label, path in results_paths.items()}
+    renderer = FigureRenderer(output_dir, dpi, workers)
+    print(f"👀 Watch mode: {', '.join(str(p) for p in results_paths.values())} (CTRL+C untuk berhenti)")
+    try:
+        while True:
+            if any([tail.poll() for tail in tails.values()]):
+                runs = {label: tail.dataframe() for label, tail in tails.items()}
+                start = time.perf_counter()
+                rendered = renderer.render(runs)
+                status = " | ".join(
+                    f"{label}: epoch {int(df['epoch'].iloc[-1])} mAP50-95 {df['metrics/mAP_0.5:0.95'].iloc[-1]:.4f}"
+                    for label, df in runs.items() if not df.empty)
+                print(f"[{time.strftime('%H:%M:%S')}] {status} | render {len(rendered)} grafik "
+                      f"({time.perf_counter() - start:.1f} s)")
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        print("\n✓ Watch dihentikan")
+    finally:
+        renderer.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Analisis & visualisasi hasil training YOLO")
+    parser.add_argument("--runs", nargs="+", default=[DEFAULT_RUN],
+                        help="Folder run atau path results.csv (beberapa = dibandingkan)")
+    parser.add_argument("--output", default=OUTPUT_DIR, help="Folder output grafik")
+    parser.add_argument("--watch", action="store_true", help="Pantau results.csv selama training")
+    parser.add_argument("--interval", type=float, default=15.0, help="Interval polling watch (detik)")
+    parser.add_argument("--dpi", type=int, default=None, help="DPI grafik (default: 300, watch: 100)")
+    parser.add_argument("--workers", type=int, default=None, help="Jumlah worker render")
+    args = parser.parse_args()
+
+    output_dir = Path(args.output)
+    # Buat direktori output jika belum ada
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    results_paths = {}
+    for run in args.runs:
+        label = run_label(run)
+        while label in results_paths:
+            label += "'"
+        results_paths[label] = resolve_results_path(run)
+
+    if args.watch:
+        watch(results_paths, output_dir, args.dpi or 100, args.workers, args.interval)
+    else:
+        print("\n🔍 Memuat data hasil training...")
+        analyze_once(results_paths, output_dir, args.dpi or 300, args.workers)
+
 if __name__ == "__main__":
     main()
@@ -2,6 +2,7 @@
 Konfigurasi untuk Deteksi Jamur
 """
 
+import json
 import os
 from pathlib import Path
 
@@ -20,17 +21,46 @@ MODEL_CANDIDATES = [
     WEIGHTS_DIR / "best-Copy.pt"
 ]
 
+# Model yang dipromosikan (scripts/3_copy_model.py): weights/current.json menunjuk ke
+# weights/releases/<id>/ berisi best.pt, artefak TorchScript/ONNX siap pakai, dan manifest.json
+MODEL_POINTER_PATH = WEIGHTS_DIR / "current.json"
+MODEL_RELEASE_DIR = None
+try:
+    _release_dir = WEIGHTS_DIR / json.loads(MODEL_POINTER_PATH.read_text())['release']
+    if (_release_dir / "best.pt").exists():
+        MODEL_RELEASE_DIR = str(_release_dir)
+except (OSError, ValueError, KeyError):
+    pass
+
 # Cari file model yang ada
-MODEL_PATH = None
-for candidate in MODEL_CANDIDATES:
-    if candidate.exists():
-        MODEL_PATH = str(candidate)
-        break
+MODEL_PATH = str(Path(MODEL_RELEASE_DIR) / "best.pt") if MODEL_RELEASE_DIR else None
+if MODEL_PATH is None:
+    for candidate in MODEL_CANDIDATES:
+        if candidate.exists():
+            MODEL_PATH = str(candidate)
+            break
 
 # Jika tidak ada, gunakan default
 if MODEL_PATH is None:
     MODEL_PATH = str(WEIGHTS_DIR / "best.pt")
 
+# Dataset (format YOLOv5 dari Roboflow: {split}/images + {split}/labels)
+DATASET_DIR = str(PROJECT_ROOT / "dataset")
+DATASET_SPLITS = ['train', 'valid', 'test']
+
+# Cache turunan dataset (index label, dll)
+DATASET_CACHE_DIR = str(PROJECT_ROOT / "dataset" / ".cache")
+LABEL_INDEX_PATH = str(Path(DATASET_CACHE_DIR) / "label_index.npz")
+
+# Cache gambar pre-letterbox (memory-mapped, satu file per split & IMG_SIZE)
+IMAGE_CACHE_DIR = str(Path(DATASET_CACHE_DIR) / "images")
+
+# Cache prediksi mentah per weights (evaluasi & gate promosi model)
+PREDICTIONS_CACHE_DIR = str(Path(DATASET_CACHE_DIR) / "predictions")
+
+# Cache perceptual hash gambar (untuk deteksi near-duplicate)
+PHASH_CACHE_PATH = str(Path(DATASET_CACHE_DIR) / "phash.npz")
+
 # ============================================================
 # DETECTION CONFIGURATION
 # ============================================================
@@ -81,6 +111,112 @@ BBOX_THICKNESS = 2
 # Font scale
 FONT_SCALE = 0.6
 
+# ============================================================
+# WEBCAM PIPELINE
+# ============================================================
+
+# Pipeline threaded: capture thread (frame terbaru saja) -> inference worker -> render
+# False = loop serial (capture, inferensi, draw, display berurutan)
+PIPELINE_MODE = False
+
+# Interval log statistik pipeline ke console (detik)
+PIPELINE_STATS_INTERVAL = 5.0
+
+# ============================================================
+# LATENCY PER-STAGE (WEBCAM)
+# ============================================================
+
+# Overlay p50/p95 per stage (capture, inference, postprocess, draw)
+# Bisa di-toggle saat berjalan dengan tombol 'l'
+LATENCY_OVERLAY = False
+
+# Jumlah sampel terakhir untuk p50/p95 di overlay
+LATENCY_WINDOW = 300
+
+# Folder export ringkasan latency (CSV + JSON) saat program keluar
+# None = tidak export
+LATENCY_EXPORT_DIR = str(PROJECT_ROOT / "logs" / "latency")
+
+# ============================================================
+# WEBCAM TRACKING (DETEKSI SETIAP N FRAME)
+# ============================================================
+
+# Jalankan YOLOv5 penuh setiap N frame, frame lainnya pakai tracking ringan
+# 1 = deteksi setiap frame (tracking nonaktif)
+DETECT_EVERY_N = 1
+
+# Deteksi ulang lebih awal jika tracking confidence (0-1) di bawah nilai ini
+TRACK_MIN_CONFIDENCE = 0.5
+
+# IoU minimal untuk mencocokkan deteksi baru ke track yang ada
+TRACK_IOU_THRESHOLD = 0.3
+
+# Track dihapus setelah tidak cocok di N deteksi berturut-turut
+TRACK_MAX_MISSED = 2
+
+# Kelas track = voting dari N deteksi terakhir (jamur yang berubah fase di kamera
+# statis ikut berganti kelas setelah mayoritas window, bukan seumur track)
+TRACK_VOTE_WINDOW = 10
+
+# Geser box dengan sparse optical flow di antara deteksi
+TRACK_OPTICAL_FLOW = True
+
+# ============================================================
+# WEBCAM SCENE-CHANGE GATE
+# ============================================================
+
+# Pakai ulang deteksi terakhir jika scene tidak berubah (kamera ruang tumbuh statis)
+SCENE_GATE_ENABLED = False
+
+# Rata-rata selisih absolut fingerprint grayscale (0-255); di bawah ini = scene sama
+SCENE_DIFF_THRESHOLD = 4.0
+
+# Inferensi ulang paksa setelah deteksi berumur selama ini (detik)
+SCENE_MAX_STALE_SECONDS = 10.0
+
+# Ukuran fingerprint (lebar, tinggi)
+SCENE_FINGERPRINT_SIZE = (32, 24)
+
+# Interval log statistik gate ke console (detik)
+SCENE_LOG_INTERVAL = 10.0
+
+# ============================================================
+# MULTI-CAMERA (SHARED BATCHED INFERENCE)
+# ============================================================
+
+# Daftar sumber: index webcam (int), path file video, atau path folder gambar
+# Contoh: [0, 1, "rekaman/rak3.mp4", "foto/rak4"]
+# Kosong = mode satu webcam (WEBCAM_INDEX)
+MULTI_SOURCES = []
+
+# Ukuran batch maksimal (frame dari sumber berbeda dalam satu forward)
+MULTI_MAX_BATCH = 4
+
+# Waktu tunggu maksimal untuk mengisi batch (ms); sumber lambat tidak ditunggu lebih lama
+MULTI_BATCH_WAIT_MS = 30
+
+# Kecepatan putar sumber folder gambar (gambar per detik)
+MULTI_FOLDER_FPS = 1.0
+
+# ============================================================
+# UPLOAD GUI - FOLDER BATCH MODE
+# ============================================================
+
+# Jumlah gambar per forward batch
+FOLDER_BATCH_SIZE = 8
+
+# Jumlah thread decode gambar
+FOLDER_DECODE_WORKERS = 4
+
+# Ukuran thumbnail di grid (px, sisi terpanjang)
+THUMBNAIL_SIZE = 160
+
+# Jumlah thumbnail yang disimpan di cache (hanya yang terlihat di-decode)
+THUMBNAIL_CACHE_SIZE = 200
+
+# Folder export CSV ringkasan
+FOLDER_SUMMARY_DIR = str(PROJECT_ROOT / "output" / "uploads")
+
 # ============================================================
 # RASPBERRY PI 4 CONFIGURATION (Future)
 # ============================================================
@@ -99,16 +235,33 @@ PI_CONFIDENCE_THRESHOLD = 0.30
 # LOGGING CONFIGURATION
 # ============================================================
 
-# Enable logging
+# Enable logging (log JSONL deteksi per frame dari webcam)
 ENABLE_LOGGING = False
 
 # Log directory
 LOG_DIR = str(PROJECT_ROOT / "logs")
 
-# Save detection frames
+# Save detection frames (keyframe JPEG, hanya saat jumlah deteksi berubah)
 SAVE_FRAMES = False
 FRAMES_DIR = str(PROJECT_ROOT / "output" / "frames")
 
+# Jalankan webcam tanpa window (untuk mesin tanpa display); stop dengan CTRL+C
+HEADLESS = False
+
+# Rekam segmen video teranotasi
+RECORD_VIDEO = False
+VIDEO_DIR = str(PROJECT_ROOT / "output" / "videos")
+
+# Durasi per segmen (detik) dan jumlah segmen yang disimpan (yang lama dihapus)
+VIDEO_SEGMENT_SECONDS = 300
+VIDEO_MAX_SEGMENTS = 12
+
+# FPS file video hasil rekaman
+VIDEO_FPS = 10.0
+
+# Ukuran queue writer background; jika penuh, frame dibuang (loop tidak pernah tertahan)
+WRITER_QUEUE_SIZE = 64
+
 # ============================================================
 # ADVANCED SETTINGS
 # ============================================================
@@ -125,6 +278,136 @@ DEVICE = 'cpu'  # Auto-detect: will use GPU if available
 # Half precision (FP16) - only for GPU
 HALF_PRECISION = False
 
+# ============================================================
+# CPU OPTIMIZATION
+# ============================================================
+
+# Jalur inferensi CPU yang dioptimasi (inference mode, channels-last, fusi Conv+BN)
+# False = pakai model(image) bawaan AutoShape
+OPTIMIZED_CPU_MODE = False
+
+# Tensor & weights dalam format channels-last (NHWC)
+CHANNELS_LAST = True
+
+# Kompilasi graph: None, 'torchscript' (trace + freeze, di-cache ke disk) atau 'compile' (torch.compile)
+COMPILE_MODE = None
+
+# Folder cache artefak TorchScript (release yang dipromosikan membawa artefaknya sendiri)
+COMPILED_CACHE_DIR = str(Path(MODEL_RELEASE_DIR) / "compiled") if MODEL_RELEASE_DIR else str(WEIGHTS_DIR / "compiled")
+
+# ============================================================
+# ML SERVICE - LOAD ADAPTIVE
+# ============================================================
+
+# Turunkan resolusi inferensi otomatis saat service sedang sibuk
+ADAPTIVE_RESOLUTION = True
+
+# Tangga resolusi (dari IMG_SIZE turun ke ukuran terkecil)
+RESOLUTION_LADDER = [640, 512, 416, 320]
+
+# Turun satu level untuk setiap N request yang sedang antri
+ADAPTIVE_QUEUE_STEP = 2
+
+# Target latency inferensi per request (ms); jika estimasi melebihi, resolusi diturunkan
+ADAPTIVE_LATENCY_TARGET_MS = 1500
+
+# Jumlah request terakhir untuk estimasi latency
+ADAPTIVE_LATENCY_WINDOW = 20
+
+# ============================================================
+# ML SERVICE - QUALITY GATE
+# ============================================================
+
+# Tolak foto blur / gelap / terang / tanpa konten sebelum inferensi
+QUALITY_GATE_ENABLED = True
+
+# Sisi terpanjang salinan kecil untuk cek kualitas (piksel)
+QUALITY_DOWNSCALE = 256
+
+# Minimal variance Laplacian (di bawah ini = blur)
+QUALITY_MIN_SHARPNESS = 50.0
+
+# Maksimal porsi piksel sangat gelap (<= 20) / sangat terang (>= 235)
+QUALITY_MAX_DARK_FRACTION = 0.6
+QUALITY_MAX_BRIGHT_FRACTION = 0.6
+
+# Cek konten: minimal kontras (std grayscale) dan kepadatan tepi (Canny)
+QUALITY_MIN_CONTRAST = 12.0
+QUALITY_MIN_EDGE_DENSITY = 0.01
+
+# ============================================================
+# ML SERVICE - RAW PREDICTION CACHE
+# ============================================================
+
+# Simpan kandidat deteksi pre-NMS per gambar; request ulang dengan conf/iou/max_det
+# berbeda (slider sensitivitas) hanya menjalankan ulang NMS, tanpa forward pass.
+# Butuh jalur OptimizedDetector (fast_inference.py, eager jika OPTIMIZED_CPU_MODE=False)
+# sebagai pengganti AutoShape; default mati agar service tetap memakai AutoShape
+RAW_CACHE_ENABLED = False
+
+# Batas total memori kandidat yang di-cache (MB); entry paling lama dibuang lebih dulu
+RAW_CACHE_MAX_MB = 64
+
+# Confidence minimal kandidat yang disimpan (batas bawah slider sensitivitas)
+RAW_CACHE_MIN_CONF = 0.01
+
+# ============================================================
+# ML SERVICE - ROUTER (BEBERAPA INSTANCE)
+# ============================================================
+
+# Port ml_api_service.py (override: env ML_SERVICE_PORT atau --port)
+ML_SERVICE_PORT = int(os.environ.get('ML_SERVICE_PORT', 5000))
+
+# Port ml_router.py; backend Node cukup diarahkan ke router lewat ML_SERVICE_URL
+ROUTER_PORT = int(os.environ.get('ML_ROUTER_PORT', 5000))
+
+# Instance ml_api_service.py di belakang router (override: env ML_INSTANCES, pisahkan dengan koma)
+ROUTER_INSTANCES = [u.strip() for u in os.environ.get(
+    'ML_INSTANCES', 'http://127.0.0.1:5001,http://127.0.0.1:5002').split(',') if u.strip()]
+
+# Interval & timeout polling /health tiap instance (detik)
+ROUTER_HEALTH_INTERVAL = 2.0
+ROUTER_HEALTH_TIMEOUT = 2.0
+
+# Timeout satu request deteksi ke instance (detik)
+ROUTER_REQUEST_TIMEOUT = 60.0
+
+# Maksimal instance yang dicoba per request (retry ke instance lain saat gagal)
+ROUTER_MAX_ATTEMPTS = 3
+
+# Kegagalan berturut-turut sebelum instance dikeluarkan dari rotasi (masuk lagi saat /health sehat)
+ROUTER_FAILURES_TO_DOWN = 2
+
+# Gambar yang sama diarahkan ke instance yang sama (cache prediksi mentah) selama
+# antriannya tidak lebih dari antrian terpendek + nilai ini
+ROUTER_AFFINITY_SLACK = 2
+
+# Tunggu maksimal sampai ada instance siap (mis. semua sedang restart) sebelum 503 (detik)
+ROUTER_READY_WAIT = 30.0
+
+# Token untuk endpoint admin /router/instances (header X-Router-Token); None = tanpa token
+ROUTER_ADMIN_TOKEN = os.environ.get('ML_ROUTER_TOKEN')
+
+# ============================================================
+# ML SERVICE - BATAS MEMORI REQUEST
+# ============================================================
+
+# Ukuran maksimal body request /detect dan file /detect/upload (MB); lebih besar -> 413
+MAX_UPLOAD_MB = 15
+
+# Resolusi maksimal gambar (piksel, dicek dari header sebelum decode); lebih besar -> 413
+MAX_IMAGE_PIXELS = 40_000_000
+
+# Request yang dibaca/di-decode bersamaan; tiap slot menyimpan buffer body + gambar
+# (~1.75 x MAX_UPLOAD_MB) yang dipakai ulang. Request lain menunggu slot kosong
+INGEST_POOL_SIZE = 4
+
+# Tunggu slot ingestion maksimal sebelum 503 (detik)
+INGEST_WAIT_SECONDS = 30.0
+
+# Buffer input letterbox + tensor yang dipakai ulang per bentuk input (= forward bersamaan maksimal)
+INPUT_POOL_SIZE = 4
+
 # ============================================================
 # VALIDATION
 # ============================================================
@@ -149,10 +432,28 @@ def validate_config():
     if not 0.0 <= CONFIDENCE_THRESHOLD <= 1.0:
         errors.append(f"CONFIDENCE_THRESHOLD should be 0.0-1.0. Got: {CONFIDENCE_THRESHOLD}")
     
+    # Check RAW_CACHE_MIN_CONF (threshold default tidak boleh di bawah kandidat yang di-cache)
+    if RAW_CACHE_ENABLED and not 0.0 <= RAW_CACHE_MIN_CONF <= CONFIDENCE_THRESHOLD:
+        errors.append(f"RAW_CACHE_MIN_CONF should be 0.0-{CONFIDENCE_THRESHOLD}. Got: {RAW_CACHE_MIN_CONF}")
+    
+    # Check batas memori request
+    if MAX_UPLOAD_MB <= 0 or INGEST_POOL_SIZE < 1 or INPUT_POOL_SIZE < 1:
+        errors.append(f"MAX_UPLOAD_MB, INGEST_POOL_SIZE and INPUT_POOL_SIZE should be positive. "
+                      f"Got: {MAX_UPLOAD_MB}, {INGEST_POOL_SIZE}, {INPUT_POOL_SIZE}")
+    
     # Check CLASS_NAMES
     if len(CLASS_NAMES) != 3:
         errors.append(f"CLASS_NAMES should have 3 classes. Got: {len(CLASS_NAMES)}")
     
+    # Check RESOLUTION_LADDER
+    invalid_sizes = [s for s in RESOLUTION_LADDER if s not in [320, 416, 512, 640]]
+    if invalid_sizes:
+        errors.append(f"RESOLUTION_LADDER sizes should be 320, 416, 512, or 640. Got: {invalid_sizes}")
+    
+    # Check COMPILE_MODE
+    if COMPILE_MODE not in [None, 'torchscript', 'compile']:
+        errors.append(f"COMPILE_MODE should be None, 'torchscript', or 'compile'. Got: {COMPILE_MODE}")
+    
     return errors
 
 # ============================================================
@@ -182,4 +483,7 @@ if __name__ == "__main__":
     print(f"CONFIDENCE_THRESHOLD: {CONFIDENCE_THRESHOLD}")
     print(f"CLASS_NAMES         : {CLASS_NAMES}")
     print(f"HARVEST_ESTIMATION  : {HARVEST_ESTIMATION}")
-    print(f"DEVICE              : {DEVICE}")
\ No newline at end of file
+    print(f"DEVICE              : {DEVICE}")
+    print(f"OPTIMIZED_CPU_MODE  : {OPTIMIZED_CPU_MODE}")
+    print(f"COMPILE_MODE        : {COMPILE_MODE}")
+    print(f"ADAPTIVE_RESOLUTION : {ADAPTIVE_RESOLUTION} {RESOLUTION_LADDER}")
\ No newline at end of file
@@ -0,0 +1,326 @@
+"""
+Import dataset YOLOv5 secara incremental dari export lokal (.zip atau folder)
+
+Isi {split}/images dan {split}/labels di sumber dibandingkan dengan dataset
+yang ada lewat hash konten (blake2b). Hanya file baru/berubah yang disalin
+(atomic, lewat file sementara), file yang tidak ada lagi di sumber dihapus,
+data.yaml disalin lalu diperbaiki dengan fix_data_yaml(), dan manifest
+(hash, size, CRC32 per file) dicatat di dataset/manifest.json.
+
+File yang tidak disentuh mempertahankan mtime-nya, sehingga index label dan
+cache gambar (yang divalidasi dengan mtime/size) tetap terpakai.
+
+Untuk sumber .zip, CRC32 + ukuran di header zip dibandingkan dengan manifest
+lebih dulu, sehingga entry yang tidak berubah tidak perlu didekompres.
+"""
+
+import hashlib
+import json
+import os
+import time
+import zipfile
+import zlib
+from pathlib import Path
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+LABEL_EXTENSIONS = ('.txt',)
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+
+def fix_data_yaml(dataset_location):
+    """Fix data.yaml dengan absolute path"""
+    import yaml  # type: ignore
+
+    data_yaml = Path(dataset_location) / "data.yaml"
+
+    if not data_yaml.exists():
+        print(f"⚠️  data.yaml tidak ditemukan di: {data_yaml}")
+        return
+
+    print("\n🔧 Memperbaiki data.yaml...")
+
+    with open(data_yaml, 'r') as f:
+        data = yaml.safe_load(f)
+
+    # Convert ke absolute path
+    base_path = Path(dataset_location).resolve()
+
+    # Update paths - PENTING: gunakan absolute path
+    data['path'] = str(base_path)  # ✅ Tambah root path
+    data['train'] = 'train/images'  # ✅ Relative dari path
+    data['val'] = 'valid/images'    # ✅ Relative dari path
+
+    # Tambahkan test jika ada
+    test_path = base_path / 'test' / 'images'
+    if test_path.exists():
+        data['test'] = 'test/images'
+
+    # Save fixed yaml
+    with open(data_yaml, 'w') as f:
+        yaml.dump(data, f, default_flow_style=False, sort_keys=False)
+
+    print(f"✅ data.yaml diperbaiki:")
+    print(f"   path : {data['path']}")
+    print(f"   train: {data['train']}")
+    print(f"   val  : {data['val']}")
+
+
+def content_hash(data):
+    """(blake2b hex, CRC32) dari bytes"""
+    return hashlib.blake2b(data, digest_size=16).hexdigest(), zlib.crc32(data) & 0xFFFFFFFF
+
+
+def pair_key(rel_path):
+    """(split, stem) untuk mencocokkan gambar dengan labelnya"""
+    split, _, name = rel_path.split('/')
+    return split, os.path.splitext(name)[0]
+
+
+def dataset_member(rel_path, splits):
+    """True jika path relatif adalah {split}/images/* atau {split}/labels/*.txt"""
+    parts = rel_path.split('/')
+    if len(parts) != 3 or parts[0] not in splits:
+        return False
+    suffix = os.path.splitext(parts[2])[1].lower()
+    return ((parts[1] == 'images' and suffix in IMAGE_EXTENSIONS) or
+            (parts[1] == 'labels' and suffix in LABEL_EXTENSIONS))
+
+
+# ============================================================
+# SUMBER (ZIP / FOLDER)
+# ============================================================
+
+class ExportSource:
+    """
+    Export YOLOv5 lokal: file .zip atau folder
+
+    Root dataset dicari dari lokasi data.yaml (export Roboflow kadang
+    membungkus isinya dalam satu folder).
+
+    Attributes:
+        entries: Dict path relatif -> (size, crc32 atau None)
+    """
+
+    def __init__(self, path, splits):
+        self.path = Path(path)
+        self.splits = tuple(splits)
+        self._zip = None
+        if self.path.is_dir():
+            yaml_files = sorted(self.path.rglob("data.yaml"), key=lambda p: len(p.parts))
+            self.root = yaml_files[0].parent if yaml_files else self.path
+            self.entries = {}
+            for split in self.splits:
+                for kind in ('images', 'labels'):
+                    folder = self.root / split / kind
+                    if not folder.is_dir():
+                        continue
+                    for p in folder.iterdir():
+                        rel = f"{split}/{kind}/{p.name}"
+                        if p.is_file() and dataset_member(rel, self.splits):
+                            self.entries[rel] = (p.stat().st_size, None)
+        elif zipfile.is_zipfile(self.path):
+            self._zip = zipfile.ZipFile(self.path)
+            names = [i.filename for i in self._zip.infolist() if not i.is_dir()]
+            yaml_names = sorted((n for n in names if n.rsplit('/', 1)[-1] == "data.yaml"), key=len)
+            self.prefix = yaml_names[0][:-len("data.yaml")] if yaml_names else ""
+            self.entries = {}
+            self._infos = {}
+            for info in self._zip.infolist():
+                if info.is_dir() or not info.filename.startswith(self.prefix):
+                    continue
+                rel = info.filename[len(self.prefix):]
+                if dataset_member(rel, self.splits):
+                    self.entries[rel] = (info.file_size, info.CRC)
+                    self._infos[rel] = info
+        else:
+            raise ValueError(f"Sumber bukan folder atau .zip: {path}")
+
+    def read(self, rel):
+        if self._zip is not None:
+            return self._zip.read(self._infos[rel])
+        return (self.root / rel).read_bytes()
+
+    def read_data_yaml(self):
+        """Isi data.yaml sumber (bytes) atau None"""
+        if self._zip is not None:
+            name = self.prefix + "data.yaml"
+            return self._zip.read(name) if name in self._zip.namelist() else None
+        path = self.root / "data.yaml"
+        return path.read_bytes() if path.exists() else None
+
+    def close(self):
+        if self._zip is not None:
+            self._zip.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ============================================================
+# MANIFEST
+# ============================================================
+
+def load_manifest(dataset_dir):
+    path = Path(dataset_dir) / MANIFEST_NAME
+    if not path.exists():
+        return {'files': {}}
+    try:
+        manifest = json.loads(path.read_text())
+    except (OSError, ValueError):
+        return {'files': {}}
+    return manifest if manifest.get('version') == MANIFEST_VERSION else {'files': {}}
+
+
+def save_manifest(dataset_dir, manifest):
+    path = Path(dataset_dir) / MANIFEST_NAME
+    tmp = path.with_suffix('.tmp')
+    tmp.write_text(json.dumps(manifest, indent=1, sort_keys=True))
+    os.replace(tmp, path)
+
+
+def existing_files(dataset_dir, splits):
+    """Semua file dataset yang ada: path relatif -> os.stat_result"""
+    dataset_dir = Path(dataset_dir)
+    files = {}
+    for split in splits:
+        for kind in ('images', 'labels'):
+            folder = dataset_dir / split / kind
+            if not folder.is_dir():
+                continue
+            for p in folder.iterdir():
+                rel = f"{split}/{kind}/{p.name}"
+                if p.is_file() and dataset_member(rel, splits):
+                    files[rel] = p.stat()
+    return files
+
+
+def current_entry(dataset_dir, rel, stat, manifest_files):
+    """
+    Entry manifest untuk file yang ada; di-hash ulang hanya jika mtime/size
+    berbeda dari yang tercatat (file diubah di luar import)
+    """
+    entry = manifest_files.get(rel)
+    if entry and entry.get('mtime_ns') == stat.st_mtime_ns and entry.get('size') == stat.st_size:
+        return entry
+    digest, crc = content_hash((Path(dataset_dir) / rel).read_bytes())
+    return {'hash': digest, 'crc32': crc, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def write_atomic(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+# ============================================================
+# IMPORT
+# ============================================================
+
+def import_dataset(source_path, dataset_dir, splits, prune=True, dry_run=False, log=print):
+    """
+    Sinkronkan dataset_dir dengan export di source_path
+
+    Args:
+        source_path: File .zip atau folder export YOLOv5
+        dataset_dir: Folder dataset tujuan
+        splits: Split yang disinkronkan
+        prune: Hapus file yang tidak ada lagi di sumber
+        dry_run: Hanya hitung perubahan, tanpa menulis
+
+    Returns:
+        Dict jumlah added/updated/unchanged/removed, orphan label, dan waktu
+    """
+    start = time.perf_counter()
+    dataset_dir = Path(dataset_dir)
+    manifest = load_manifest(dataset_dir)
+    old_files = manifest.get('files', {})
+    present = existing_files(dataset_dir, splits)
+    report = {'added': 0, 'updated': 0, 'unchanged': 0, 'removed': 0, 'bytes_written': 0}
+    new_files = {}
+
+    with ExportSource(source_path, splits) as source:
+        if source._zip is None and source.root.resolve() == dataset_dir.resolve():
+            raise ValueError("Sumber dan tujuan adalah folder yang sama")
+        if not source.entries:
+            raise ValueError(f"Tidak ada {'/'.join(splits)}/images|labels di sumber: {source_path}")
+
+        # Label tanpa gambar di sumber tidak diimport
+        image_keys = {pair_key(rel) for rel in source.entries if '/images/' in rel}
+        wanted = {rel for rel in source.entries if '/images/' in rel or pair_key(rel) in image_keys}
+        report['orphan_labels'] = len(source.entries) - len(wanted)
+
+        for rel in sorted(wanted):
+            size, crc = source.entries[rel]
+
+            stat = present.get(rel)
+            entry = current_entry(dataset_dir, rel, stat, old_files) if stat else None
+
+            # Zip: CRC + size sama dengan file yang ada -> tidak perlu dekompres
+            if entry and crc is not None and entry['crc32'] == crc and entry['size'] == size:
+                new_files[rel] = entry
+                report['unchanged'] += 1
+                continue
+
+            data = source.read(rel)
+            digest, data_crc = content_hash(data)
+            if entry and entry['hash'] == digest:
+                new_files[rel] = entry
+                report['unchanged'] += 1
+                continue
+
+            report['updated' if entry else 'added'] += 1
+            report['bytes_written'] += len(data)
+            if dry_run:
+                continue
+            path = dataset_dir / rel
+            write_atomic(path, data)
+            st = path.stat()
+            new_files[rel] = {'hash': digest, 'crc32': data_crc, 'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+
+        stale = sorted(rel for rel in present if rel not in wanted)
+        if prune:
+            for rel in stale:
+                report['removed'] += 1
+                if not dry_run:
+                    (dataset_dir / rel).unlink(missing_ok=True)
+
+        data_yaml = source.read_data_yaml()
+
+    if dry_run:
+        report['seconds'] = time.perf_counter() - start
+        return report
+
+    # data.yaml hanya ditulis ulang jika versi sumbernya berubah
+    yaml_hash = content_hash(data_yaml)[0] if data_yaml is not None else manifest.get('data_yaml_hash')
+    if data_yaml is not None and (yaml_hash != manifest.get('data_yaml_hash') or
+                                  not (dataset_dir / "data.yaml").exists()):
+        write_atomic(dataset_dir / "data.yaml", data_yaml)
+        fix_data_yaml(dataset_dir)
+
+    # File yang tidak di-prune tetap dicatat agar manifest mencerminkan isi folder
+    if not prune:
+        for rel in stale:
+            new_files[rel] = current_entry(dataset_dir, rel, present[rel], old_files)
+
+    counts = {}
+    for rel in new_files:
+        split, kind, _ = rel.split('/')
+        counts.setdefault(split, {'images': 0, 'labels': 0})[kind] += 1
+
+    report['seconds'] = time.perf_counter() - start
+    save_manifest(dataset_dir, {
+        'version': MANIFEST_VERSION,
+        'source': str(Path(source_path).resolve()),
+        'imported_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'report': report,
+        'counts': counts,
+        'data_yaml_hash': yaml_hash,
+        'files': new_files,
+    })
+    return report
@@ -0,0 +1,418 @@
+"""
+Index label dataset YOLO dalam satu file kolumnar (.npz)
+
+Semua file label di dataset/{split}/labels di-parse (paralel) menjadi dua tabel:
+- files: satu baris per pasangan gambar/label (split, nama, ukuran gambar,
+  mtime/size/hash label, flag masalah integritas)
+- boxes: satu baris per bounding box (file_id, class, cx, cy, w, h ternormalisasi)
+
+Rebuild bersifat incremental: file yang mtime & size-nya tidak berubah dipakai
+ulang tanpa dibaca; file dengan mtime berubah tapi hash sama hanya di-update
+metadatanya. Statistik (class balance, distribusi ukuran box, per-split,
+pasangan rusak) dihitung dengan NumPy langsung dari array, dalam milidetik.
+"""
+
+import hashlib
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np  # type: ignore
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+INDEX_VERSION = 1
+
+# Flag masalah per file (bitmask)
+ISSUE_MISSING_IMAGE = 1      # label tanpa gambar
+ISSUE_MISSING_LABEL = 2      # gambar tanpa file label
+ISSUE_EMPTY_LABEL = 4        # file label kosong (gambar background)
+ISSUE_BAD_LINE = 8           # baris bukan 5 angka
+ISSUE_BAD_CLASS = 16         # class id di luar range names
+ISSUE_OUT_OF_BOUNDS = 32     # koordinat di luar [0, 1] atau w/h <= 0
+ISSUE_DUPLICATE_BOX = 64     # box identik muncul lebih dari sekali
+ISSUE_BAD_IMAGE = 128        # header gambar tidak bisa dibaca
+
+ISSUE_NAMES = {
+    ISSUE_MISSING_IMAGE: "missing_image",
+    ISSUE_MISSING_LABEL: "missing_label",
+    ISSUE_EMPTY_LABEL: "empty_label",
+    ISSUE_BAD_LINE: "bad_line",
+    ISSUE_BAD_CLASS: "bad_class",
+    ISSUE_OUT_OF_BOUNDS: "out_of_bounds",
+    ISSUE_DUPLICATE_BOX: "duplicate_box",
+    ISSUE_BAD_IMAGE: "bad_image",
+}
+
+# Pasangan yang dianggap rusak/mismatch (empty label & missing label = background, hanya info)
+CORRUPT_MASK = (ISSUE_MISSING_IMAGE | ISSUE_BAD_LINE | ISSUE_BAD_CLASS |
+                ISSUE_OUT_OF_BOUNDS | ISSUE_DUPLICATE_BOX | ISSUE_BAD_IMAGE)
+
+# Batas ukuran box (piksel, sqrt area) ala COCO: small < 32, medium < 96, large
+SIZE_BINS = (32, 96)
+
+FILE_COLUMNS = ('split', 'stem', 'image_name', 'width', 'height', 'label_mtime', 'label_size',
+                'label_hash', 'image_mtime', 'image_size', 'issues', 'n_boxes')
+BOX_COLUMNS = ('file_id', 'cls', 'cx', 'cy', 'w', 'h')
+
+
+def load_class_names(dataset_dir):
+    """Nama kelas dari data.yaml (urutan class id)"""
+    import yaml  # type: ignore
+
+    with open(Path(dataset_dir) / "data.yaml", 'r') as f:
+        names = yaml.safe_load(f).get('names', [])
+    if isinstance(names, dict):
+        names = [names[k] for k in sorted(names)]
+    return list(names)
+
+
+def image_size(path):
+    """(width, height) dari header gambar tanpa decode penuh; (0, 0) jika gagal"""
+    from PIL import Image  # type: ignore
+
+    try:
+        with Image.open(path) as img:
+            return img.size
+    except Exception:
+        return 0, 0
+
+
+def parse_label_file(label_path, num_classes):
+    """
+    Parse satu file label YOLO
+
+    Returns:
+        boxes: List (cls, cx, cy, w, h)
+        issues: Bitmask masalah
+        digest: Hash isi file (hex)
+    """
+    data = Path(label_path).read_bytes()
+    digest = hashlib.blake2b(data, digest_size=8).hexdigest()
+    issues = 0
+    boxes = []
+
+    lines = [line.split() for line in data.decode('utf-8', errors='replace').splitlines() if line.strip()]
+    if not lines:
+        issues |= ISSUE_EMPTY_LABEL
+
+    for parts in lines:
+        # Format polygon (segmentasi) tidak didukung di sini
+        if len(parts) != 5:
+            issues |= ISSUE_BAD_LINE
+            continue
+        try:
+            cls = int(float(parts[0]))
+            cx, cy, w, h = (float(v) for v in parts[1:])
+        except ValueError:
+            issues |= ISSUE_BAD_LINE
+            continue
+        if not 0 <= cls < num_classes:
+            issues |= ISSUE_BAD_CLASS
+        if not (0 <= cx <= 1 and 0 <= cy <= 1 and 0 < w <= 1 and 0 < h <= 1):
+            issues |= ISSUE_OUT_OF_BOUNDS
+        boxes.append((cls, cx, cy, w, h))
+
+    if len(set(boxes)) != len(boxes):
+        issues |= ISSUE_DUPLICATE_BOX
+    return boxes, issues, digest
+
+
+def _parse_pair(task):
+    """Worker: parse satu pasangan gambar/label (dipanggil di process pool)"""
+    label_path, image_path, num_classes = task
+    boxes, issues, digest = [], 0, ""
+    if label_path:
+        boxes, issues, digest = parse_label_file(label_path, num_classes)
+    else:
+        issues |= ISSUE_MISSING_LABEL
+    width, height = 0, 0
+    if image_path:
+        width, height = image_size(image_path)
+        if not width:
+            issues |= ISSUE_BAD_IMAGE
+    else:
+        issues |= ISSUE_MISSING_IMAGE
+    return boxes, issues, digest, width, height
+
+
+def _stat(path):
+    if path is None:
+        return 0, 0
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+
+def scan_dataset(dataset_dir, splits):
+    """
+    Pasangkan gambar dan label per split berdasarkan nama file (stem)
+
+    Returns:
+        List (split, stem, label_path atau None, image_path atau None)
+    """
+    pairs = []
+    for split in splits:
+        split_dir = Path(dataset_dir) / split
+        labels = {p.stem: p for p in (split_dir / "labels").glob("*.txt")}
+        images = {p.stem: p for p in (split_dir / "images").iterdir()
+                  if p.suffix.lower() in IMAGE_EXTENSIONS} if (split_dir / "images").is_dir() else {}
+        for stem in sorted(set(labels) | set(images)):
+            label = labels.get(stem)
+            image = images.get(stem)
+            pairs.append((split, stem, str(label) if label else None, str(image) if image else None))
+    return pairs
+
+
+class LabelIndex:
+    """
+    Index label kolumnar dengan query statistik vektorisasi
+
+    Args:
+        files: Dict kolom tabel files (array NumPy)
+        boxes: Dict kolom tabel boxes (array NumPy)
+        class_names: Nama kelas (urutan class id)
+        splits: Nama split (urutan kode split di kolom files['split'])
+    """
+
+    def __init__(self, files, boxes, class_names, splits):
+        self.files = files
+        self.boxes = boxes
+        self.class_names = list(class_names)
+        self.splits = list(splits)
+
+    # ---------------- Persistensi ----------------
+
+    @classmethod
+    def load(cls, path):
+        """Load index dari .npz (None jika tidak ada / versi berbeda)"""
+        path = Path(path)
+        if not path.exists():
+            return None
+        with np.load(path, allow_pickle=False) as data:
+            if int(data['version']) != INDEX_VERSION:
+                return None
+            files = {c: data[f"files_{c}"] for c in FILE_COLUMNS}
+            boxes = {c: data[f"boxes_{c}"] for c in BOX_COLUMNS}
+            return cls(files, boxes, data['class_names'].tolist(), data['splits'].tolist())
+
+    def save(self, path):
+        """Simpan index ke .npz (atomic: tulis ke file sementara lalu rename)"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.stem + ".tmp.npz")
+        np.savez(tmp, version=np.int32(INDEX_VERSION),
+                 class_names=np.array(self.class_names), splits=np.array(self.splits),
+                 **{f"files_{c}": v for c, v in self.files.items()},
+                 **{f"boxes_{c}": v for c, v in self.boxes.items()})
+        os.replace(tmp, path)
+
+    @classmethod
+    def build(cls, dataset_dir, splits, index_path=None, workers=None, class_names=None):
+        """
+        Bangun index secara incremental
+
+        Args:
+            dataset_dir: Folder dataset (berisi data.yaml dan {split}/labels)
+            splits: List nama split
+            index_path: Index lama untuk dipakai ulang (dan tujuan simpan)
+            workers: Jumlah proses parser (None = os.cpu_count(), 0 = serial)
+
+        Returns:
+            index: LabelIndex
+            report: Dict jumlah file reused/rehashed/parsed/removed dan waktu
+        """
+        start = time.perf_counter()
+        class_names = class_names or load_class_names(dataset_dir)
+        old = cls.load(index_path) if index_path else None
+        if old is not None and (old.class_names != class_names):
+            old = None
+
+        # Lookup index lama: (split, stem) -> baris
+        previous = {}
+        if old is not None:
+            for row in range(len(old.files['stem'])):
+                key = (old.splits[old.files['split'][row]], str(old.files['stem'][row]))
+                previous[key] = row
+            box_order = np.argsort(old.boxes['file_id'], kind='stable')
+            box_starts = np.searchsorted(old.boxes['file_id'][box_order], np.arange(len(old.files['stem']) + 1))
+
+        pairs = scan_dataset(dataset_dir, splits)
+        rows = [None] * len(pairs)
+        stats = [None] * len(pairs)
+        to_parse = []
+        report = {'reused': 0, 'rehashed': 0, 'parsed': 0, 'removed': 0}
+
+        for i, (split, stem, label_path, image_path) in enumerate(pairs):
+            label_stat = _stat(label_path)
+            image_stat = _stat(image_path)
+            stats[i] = (label_stat, image_stat)
+            prev = previous.pop((split, stem), None)
+            if prev is not None:
+                f = old.files
+                old_boxes = old.boxes_for(box_order[box_starts[prev]:box_starts[prev + 1]])
+                same_image = (int(f['image_mtime'][prev]), int(f['image_size'][prev])) == image_stat
+                if same_image and (int(f['label_mtime'][prev]), int(f['label_size'][prev])) == label_stat:
+                    rows[i] = (old_boxes, int(f['issues'][prev]), str(f['label_hash'][prev]),
+                               int(f['width'][prev]), int(f['height'][prev]))
+                    report['reused'] += 1
+                    continue
+                if same_image and label_path and int(f['label_size'][prev]) == label_stat[1]:
+                    # mtime berubah (mis. copy/checkout): cek hash sebelum parse ulang
+                    digest = hashlib.blake2b(Path(label_path).read_bytes(), digest_size=8).hexdigest()
+                    if digest == str(f['label_hash'][prev]):
+                        rows[i] = (old_boxes, int(f['issues'][prev]), digest,
+                                   int(f['width'][prev]), int(f['height'][prev]))
+                        report['rehashed'] += 1
+                        continue
+            to_parse.append(i)
+
+        report['removed'] = len(previous)
+        report['parsed'] = len(to_parse)
+
+        tasks = [(pairs[i][2], pairs[i][3], len(class_names)) for i in to_parse]
+        if workers == 0 or len(tasks) < 64:
+            parsed = map(_parse_pair, tasks)
+            for i, result in zip(to_parse, parsed):
+                rows[i] = result
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for i, result in zip(to_parse, pool.map(_parse_pair, tasks, chunksize=32)):
+                    rows[i] = result
+
+        index = cls._from_rows(pairs, rows, stats, class_names, splits)
+        if index_path:
+            index.save(index_path)
+        report['seconds'] = time.perf_counter() - start
+        return index, report
+
+    def boxes_for(self, box_rows):
+        """List (cls, cx, cy, w, h) untuk baris tabel boxes"""
+        b = self.boxes
+        return [(int(b['cls'][r]), float(b['cx'][r]), float(b['cy'][r]), float(b['w'][r]), float(b['h'][r]))
+                for r in box_rows]
+
+    @classmethod
+    def _from_rows(cls, pairs, rows, stats, class_names, splits):
+        split_code = {name: code for code, name in enumerate(splits)}
+        n = len(pairs)
+        files = {
+            'split': np.array([split_code[p[0]] for p in pairs], dtype=np.int8),
+            'stem': np.array([p[1] for p in pairs], dtype=str),
+            'image_name': np.array([Path(p[3]).name if p[3] else "" for p in pairs], dtype=str),
+            'width': np.array([r[3] for r in rows], dtype=np.int32),
+            'height': np.array([r[4] for r in rows], dtype=np.int32),
+            'label_mtime': np.array([s[0][0] for s in stats], dtype=np.int64),
+            'label_size': np.array([s[0][1] for s in stats], dtype=np.int64),
+            'label_hash': np.array([r[2] for r in rows], dtype='<U16'),
+            'image_mtime': np.array([s[1][0] for s in stats], dtype=np.int64),
+            'image_size': np.array([s[1][1] for s in stats], dtype=np.int64),
+            'issues': np.array([r[1] for r in rows], dtype=np.int16),
+            'n_boxes': np.array([len(r[0]) for r in rows], dtype=np.int32),
+        }
+
+        flat = [box for r in rows for box in r[0]]
+        arr = np.array(flat, dtype=np.float64).reshape(-1, 5)
+        boxes = {
+            'file_id': np.repeat(np.arange(n, dtype=np.int32), files['n_boxes']),
+            'cls': arr[:, 0].astype(np.int16),
+            'cx': arr[:, 1].astype(np.float32),
+            'cy': arr[:, 2].astype(np.float32),
+            'w': arr[:, 3].astype(np.float32),
+            'h': arr[:, 4].astype(np.float32),
+        }
+        return cls(files, boxes, class_names, splits)
+
+    # ---------------- Query statistik ----------------
+
+    def _box_split(self):
+        return self.files['split'][self.boxes['file_id']]
+
+    def class_balance(self):
+        """
+        Jumlah box per split per kelas
+
+        Returns:
+            Dict split -> Dict kelas -> jumlah (plus 'ALL')
+        """
+        nc = len(self.class_names)
+        cls = self.boxes['cls'].astype(np.int64)
+        valid = (cls >= 0) & (cls < nc)
+        table = np.zeros((len(self.splits), nc), dtype=np.int64)
+        np.add.at(table, (self._box_split()[valid], cls[valid]), 1)
+        result = {split: dict(zip(self.class_names, table[i].tolist())) for i, split in enumerate(self.splits)}
+        result['ALL'] = dict(zip(self.class_names, table.sum(axis=0).tolist()))
+        return result
+
+    def box_sizes(self, percentiles=(5, 25, 50, 75, 95)):
+        """
+        Distribusi ukuran box dalam piksel (sqrt area) per kelas
+
+        Returns:
+            Dict kelas -> {'count', 'small', 'medium', 'large', 'p5', ..., 'aspect_p50'}
+        """
+        fid = self.boxes['file_id']
+        width = self.files['width'][fid].astype(np.float32)
+        height = self.files['height'][fid].astype(np.float32)
+        px_w = self.boxes['w'] * width
+        px_h = self.boxes['h'] * height
+        size = np.sqrt(px_w * px_h)
+        aspect = np.divide(px_w, px_h, out=np.zeros_like(px_w), where=px_h > 0)
+        known = (width > 0) & (height > 0)
+
+        result = {}
+        for c, name in enumerate(self.class_names):
+            mask = known & (self.boxes['cls'] == c)
+            s = size[mask]
+            stats = {
+                'count': int(mask.sum()),
+                'small': int((s < SIZE_BINS[0]).sum()),
+                'medium': int(((s >= SIZE_BINS[0]) & (s < SIZE_BINS[1])).sum()),
+                'large': int((s >= SIZE_BINS[1]).sum()),
+            }
+            values = np.percentile(s, percentiles) if s.size else np.zeros(len(percentiles))
+            stats.update({f"p{p}": round(float(v), 1) for p, v in zip(percentiles, values)})
+            stats['aspect_p50'] = round(float(np.median(aspect[mask])), 2) if s.size else 0.0
+            result[name] = stats
+        return result
+
+    def split_stats(self):
+        """
+        Statistik per split: gambar, box, box/gambar, background, masalah
+
+        Returns:
+            Dict split -> Dict statistik
+        """
+        result = {}
+        for code, split in enumerate(self.splits):
+            mask = self.files['split'] == code
+            issues = self.files['issues'][mask]
+            n_boxes = self.files['n_boxes'][mask]
+            has_image = (issues & ISSUE_MISSING_IMAGE) == 0
+            result[split] = {
+                'images': int(has_image.sum()),
+                'boxes': int(n_boxes.sum()),
+                'boxes_per_image': round(float(n_boxes[has_image].mean()), 2) if has_image.any() else 0.0,
+                'max_boxes': int(n_boxes.max()) if n_boxes.size else 0,
+                'background': int((((issues & (ISSUE_EMPTY_LABEL | ISSUE_MISSING_LABEL)) != 0) & has_image).sum()),
+                'corrupt': int(((issues & CORRUPT_MASK) != 0).sum()),
+            }
+        return result
+
+    def issues(self, mask=CORRUPT_MASK):
+        """
+        File dengan masalah integritas
+
+        Returns:
+            List (split, stem, [nama masalah])
+        """
+        rows = np.nonzero(self.files['issues'] & mask)[0]
+        return [
+            (self.splits[self.files['split'][r]], str(self.files['stem'][r]),
+             [name for flag, name in ISSUE_NAMES.items() if self.files['issues'][r] & flag])
+            for r in rows
+        ]
+
+    def issue_counts(self):
+        """Jumlah file per jenis masalah"""
+        flags = self.files['issues']
+        return {name: int(((flags & flag) != 0).sum()) for flag, name in ISSUE_NAMES.items()}
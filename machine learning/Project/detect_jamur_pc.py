@@ -23,6 +23,49 @@ except ImportError:
         'Muda': (0, 165, 255),        # Orange
         'Matang': (0, 255, 0)         # Green
     }
+    OPTIMIZED_CPU_MODE = False
+    CHANNELS_LAST = True
+    COMPILE_MODE = None
+    COMPILED_CACHE_DIR = str(Path(MODEL_PATH).parent / "compiled")
+    PIPELINE_MODE = False
+    PIPELINE_STATS_INTERVAL = 5.0
+    LATENCY_OVERLAY = False
+    LATENCY_WINDOW = 300
+    LATENCY_EXPORT_DIR = "logs/latency"
+    DETECT_EVERY_N = 1
+    TRACK_MIN_CONFIDENCE = 0.5
+    TRACK_IOU_THRESHOLD = 0.3
+    TRACK_MAX_MISSED = 2
+    TRACK_VOTE_WINDOW = 10
+    TRACK_OPTICAL_FLOW = True
+    SCENE_GATE_ENABLED = False
+    SCENE_DIFF_THRESHOLD = 4.0
+    SCENE_MAX_STALE_SECONDS = 10.0
+    SCENE_FINGERPRINT_SIZE = (32, 24)
+    SCENE_LOG_INTERVAL = 10.0
+    MULTI_SOURCES = []
+    MULTI_MAX_BATCH = 4
+    MULTI_BATCH_WAIT_MS = 30
+    MULTI_FOLDER_FPS = 1.0
+    ENABLE_LOGGING = False
+    LOG_DIR = "logs"
+    SAVE_FRAMES = False
+    FRAMES_DIR = "output/frames"
+    HEADLESS = False
+    RECORD_VIDEO = False
+    VIDEO_DIR = "output/videos"
+    VIDEO_SEGMENT_SECONDS = 300
+    VIDEO_MAX_SEGMENTS = 12
+    VIDEO_FPS = 10.0
+    WRITER_QUEUE_SIZE = 64
+
+from fast_inference import optimize_model
+from webcam_pipeline import LatestFrameCapture, InferenceWorker, RateMeter, LatencyMeter
+from tracker import MushroomTracker, TrackedDetector
+from scene_gate import SceneChangeGate
+from multi_camera import open_source, BatchScheduler
+from recorder import DetectionRecorder
+from latency_stats import StageTimer, draw_latency_overlay
 
 # Mapping nama kelas dari model (hasil training) ke nama tampilan yang konsisten.
 # Dataset memiliki variasi penulisan seperti 'primordia' (lowercase) dan 'Fase Muda'.
@@ -67,6 +110,10 @@ def load_model(model_path=None):
         model.conf = CONFIDENCE_THRESHOLD
         print(f"[INFO] Model loaded successfully!")
         print(f"[INFO] Confidence threshold: {CONFIDENCE_THRESHOLD}")
+        if OPTIMIZED_CPU_MODE:
+            model = optimize_model(model, weights_path=model_path, img_size=IMG_SIZE,
+                                   channels_last=CHANNELS_LAST, compile_mode=COMPILE_MODE,
+                                   cache_dir=COMPILED_CACHE_DIR)
         return model
     except Exception as e:
         print(f"❌ Error loading model: {e}")
@@ -102,22 +149,92 @@ def infer_and_postprocess(model, frame):
     results = model(frame)
     return results
 
-def draw_results(frame, results):
+def infer_batch(model, frames, size=None):
     """
-    Draw bounding box, label, dan estimasi panen
+    Inferensi banyak frame dalam satu forward batch
+    
+    Args:
+        model: YOLOv5 model
+        frames: List frame
+        size: Ukuran input model (default: bawaan model)
+        
+    Returns:
+        List detections per frame (urutan sama dengan frames)
+    """
+    frames = [preprocess_frame(frame) for frame in frames]
+    results = model(frames, size=size) if size else model(frames)
+    return [parse_results(results, i) for i in range(len(frames))]
+
+def build_frame_processor(model, timer=None):
+    """
+    Buat fungsi frame -> list deteksi
+    
+    Jika DETECT_EVERY_N > 1, YOLOv5 hanya dijalankan setiap N frame (atau saat
+    tracking confidence turun) dan frame di antaranya memakai tracker ringan.
+    Jika SCENE_GATE_ENABLED, frame yang tidak berubah memakai ulang deteksi terakhir.
+    
+    Args:
+        model: YOLOv5 model
+        timer: StageTimer opsional (stage 'inference' dan 'postprocess')
+        
+    Returns:
+        processor: Callable frame -> detections
+    """
+    def detect_fn(frame):
+        if timer is None:
+            return parse_results(infer_and_postprocess(model, preprocess_frame(frame)))
+        with timer.measure('inference'):
+            results = infer_and_postprocess(model, preprocess_frame(frame))
+        with timer.measure('postprocess'):
+            return parse_results(results)
+    
+    processor = detect_fn
+    
+    if DETECT_EVERY_N > 1:
+        tracker = MushroomTracker(iou_threshold=TRACK_IOU_THRESHOLD,
+                                  max_missed=TRACK_MAX_MISSED,
+                                  vote_window=TRACK_VOTE_WINDOW,
+                                  use_flow=TRACK_OPTICAL_FLOW)
+        processor = TrackedDetector(processor, every_n=DETECT_EVERY_N,
+                                    min_confidence=TRACK_MIN_CONFIDENCE,
+                                    tracker=tracker, harvest_estimation=HARVEST_ESTIMATION)
+    
+    if SCENE_GATE_ENABLED:
+        processor = SceneChangeGate(processor, threshold=SCENE_DIFF_THRESHOLD,
+                                    max_stale_seconds=SCENE_MAX_STALE_SECONDS,
+                                    fingerprint_size=SCENE_FINGERPRINT_SIZE,
+                                    log_interval=SCENE_LOG_INTERVAL)
+    
+    return processor
+
+def find_stage(processor, stage_type):
+    """
+    Cari stage dengan tipe tertentu di rantai processor (SceneChangeGate -> TrackedDetector -> ...)
+    
+    Returns:
+        stage atau None
+    """
+    while processor is not None:
+        if isinstance(processor, stage_type):
+            return processor
+        processor = getattr(processor, 'process_fn', None)
+    return None
+
+def parse_results(results, index=0):
+    """
+    Ubah hasil YOLOv5 menjadi list deteksi
     
     Args:
-        frame: Frame untuk di-draw
         results: Hasil deteksi dari YOLOv5
+        index: Index gambar di dalam batch
         
     Returns:
-        frame: Frame dengan bounding box dan label
-        detections: List informasi deteksi
+        detections: List dict (class, confidence, bbox, harvest_days)
     """
     detections = []
     
     # Parse results
-    df = results.pandas().xyxy[0]  # Pandas dataframe
+    df = results.pandas().xyxy[index]  # Pandas dataframe
     
     for idx, row in df.iterrows():
         # Get detection info
@@ -126,17 +243,42 @@ def draw_results(frame, results):
         raw_name = row['name']
         cls_name = LABEL_MAP.get(raw_name, raw_name)  # Normalisasi nama kelas
         
+        detections.append({
+            'class': cls_name,
+            'confidence': conf,
+            'bbox': (x1, y1, x2, y2),
+            'harvest_days': HARVEST_ESTIMATION.get(cls_name, 0)
+        })
+    
+    return detections
+
+def draw_detections(frame, detections):
+    """
+    Draw bounding box, label, dan estimasi panen dari list deteksi
+    
+    Args:
+        frame: Frame untuk di-draw
+        detections: List deteksi (hasil parse_results)
+        
+    Returns:
+        frame: Frame dengan bounding box dan label
+    """
+    for det in detections:
+        x1, y1, x2, y2 = det['bbox']
+        cls_name = det['class']
+        conf = det['confidence']
+        harvest_days = det['harvest_days']
+        
         # Get color
         color = CLASS_COLORS.get(cls_name, (255, 255, 255))
         
-        # Get harvest estimation
-        harvest_days = HARVEST_ESTIMATION.get(cls_name, 0)
-        
         # Draw bounding box
         cv2.rectangle(frame, (x1, y1), (x2, y2), color, 2)
         
-        # Prepare label
+        # Prepare label (dengan ID track jika tracking aktif)
         label = f"{cls_name} {conf:.2f}"
+        if 'track_id' in det:
+            label = f"#{det['track_id']} {label}"
         harvest_label = f"Panen: +{harvest_days} hari" if harvest_days > 0 else "Siap Panen"
         
         # Draw label background
@@ -150,15 +292,23 @@ def draw_results(frame, results):
         # Draw harvest estimation
         cv2.putText(frame, harvest_label, (x1, y2 + 20),
                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 2)
-        
-        # Save detection info
-        detections.append({
-            'class': cls_name,
-            'confidence': conf,
-            'bbox': (x1, y1, x2, y2),
-            'harvest_days': harvest_days
-        })
     
+    return frame
+
+def draw_results(frame, results):
+    """
+    Draw bounding box, label, dan estimasi panen
+    
+    Args:
+        frame: Frame untuk di-draw
+        results: Hasil deteksi dari YOLOv5
+        
+    Returns:
+        frame: Frame dengan bounding box dan label
+        detections: List informasi deteksi
+    """
+    detections = parse_results(results)
+    frame = draw_detections(frame, detections)
     return frame, detections
 
 def draw_fps(frame, fps):
@@ -181,20 +331,56 @@ def draw_fps(frame, fps):
     
     return frame
 
-def draw_info_panel(frame, detections):
+def draw_tracking_info(frame, processor):
     """
-    Draw info panel dengan jumlah deteksi per kelas
+    Draw status deteksi/tracking di bawah FPS counter
     
     Args:
         frame: Frame untuk di-draw
-        detections: List deteksi
+        processor: TrackedDetector
         
     Returns:
-        frame: Frame dengan info panel
+        frame: Frame dengan info tracking
     """
-    w = frame.shape[1]
+    mode = "DETEKSI" if processor.last_detected else "TRACK"
+    text = f"{mode} 1/{processor.every_n} ({processor.detect_ratio * 100:.0f}%) conf {processor.tracking_confidence:.2f}"
     
-    # Count detections per class
+    cv2.rectangle(frame, (10, 45), (330, 70), (0, 0, 0), -1)
+    cv2.putText(frame, text, (15, 63),
+               cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 255), 1)
+    
+    return frame
+
+def draw_scene_gate_info(frame, gate):
+    """
+    Draw statistik scene-change gate (porsi frame dilewati & CPU dihemat)
+    
+    Args:
+        frame: Frame untuk di-draw
+        gate: SceneChangeGate
+        
+    Returns:
+        frame: Frame dengan info gate
+    """
+    mode = "REUSE" if gate.last_skipped else "INFER"
+    text = f"{mode} skip {gate.skip_ratio * 100:.0f}% hemat {gate.saved_ms / 1000:.1f}s diff {gate.last_diff:.1f}"
+    
+    cv2.rectangle(frame, (10, 75), (330, 100), (0, 0, 0), -1)
+    cv2.putText(frame, text, (15, 93),
+               cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 200, 0), 1)
+    
+    return frame
+
+def count_detections(detections):
+    """
+    Hitung jumlah deteksi per kelas
+    
+    Args:
+        detections: List deteksi
+        
+    Returns:
+        counts: Dict kelas -> jumlah (semua CLASS_NAMES selalu ada)
+    """
     counts = {name: 0 for name in CLASS_NAMES}
     for det in detections:
         cls = det['class']
@@ -203,6 +389,23 @@ def draw_info_panel(frame, detections):
             # Cegah KeyError dengan menambahkan kunci baru (untuk debugging atau kelas tak terduga)
             counts[cls] = 0
         counts[cls] += 1
+    return counts
+
+def draw_info_panel(frame, detections):
+    """
+    Draw info panel dengan jumlah deteksi per kelas
+    
+    Args:
+        frame: Frame untuk di-draw
+        detections: List deteksi
+        
+    Returns:
+        frame: Frame dengan info panel
+    """
+    w = frame.shape[1]
+    
+    # Count detections per class
+    counts = count_detections(detections)
     
     # Draw panel background
     panel_h = 120
@@ -232,10 +435,382 @@ def draw_info_panel(frame, detections):
     
     return frame
 
+def draw_pipeline_stats(frame, stats):
+    """
+    Draw statistik per-stage pipeline (FPS dan latency)
+    
+    Args:
+        frame: Frame untuk di-draw
+        stats: Dict dari collect_pipeline_stats()
+        
+    Returns:
+        frame: Frame dengan panel statistik
+    """
+    lines = [
+        f"Capture  : {stats['capture_fps']:5.1f} FPS",
+        f"Inferensi: {stats['inference_fps']:5.1f} FPS {stats['inference_ms']:6.1f} ms",
+        f"Display  : {stats['display_fps']:5.1f} FPS",
+        f"Glass2Gls: {stats['glass_to_glass_ms']:6.1f} ms",
+        f"Umur det : {stats['detection_age_ms']:6.1f} ms"
+    ]
+    
+    h = frame.shape[0]
+    panel_h = 20 * len(lines) + 10
+    cv2.rectangle(frame, (10, h - panel_h - 10), (290, h - 10), (0, 0, 0), -1)
+    
+    y = h - panel_h + 8
+    for line in lines:
+        cv2.putText(frame, line, (15, y),
+                   cv2.FONT_HERSHEY_SIMPLEX, 0.45, (0, 255, 0), 1)
+        y += 20
+    
+    return frame
+
 # ============================================================
 # MAIN LOOP
 # ============================================================
 
+def build_recorder():
+    """
+    Buat perekam asinkron dari config (RECORD_VIDEO, ENABLE_LOGGING, SAVE_FRAMES)
+    
+    Returns:
+        DetectionRecorder atau None jika tidak ada yang direkam
+    """
+    if not (RECORD_VIDEO or ENABLE_LOGGING or SAVE_FRAMES):
+        return None
+    return DetectionRecorder(
+        video_dir=VIDEO_DIR if RECORD_VIDEO else None,
+        log_dir=LOG_DIR if ENABLE_LOGGING else None,
+        frames_dir=FRAMES_DIR if SAVE_FRAMES else None,
+        segment_seconds=VIDEO_SEGMENT_SECONDS,
+        max_segments=VIDEO_MAX_SEGMENTS,
+        video_fps=VIDEO_FPS,
+        queue_size=WRITER_QUEUE_SIZE
+    )
+
+def display_frame(frame, window_name="Deteksi Jamur"):
+    """
+    Tampilkan frame (kecuali mode HEADLESS)
+    
+    Returns:
+        key: Tombol yang ditekan, atau -1 di mode headless
+    """
+    if HEADLESS:
+        return -1
+    cv2.imshow(window_name, frame)
+    return cv2.waitKey(1) & 0xFF
+
+def toggle_latency_overlay(key, show):
+    """Tombol 'l' menyalakan/mematikan overlay latency"""
+    return not show if key == ord('l') else show
+
+def run_serial(model, cap, recorder=None, timer=None):
+    """
+    Loop serial: capture -> inferensi -> draw -> display dalam satu thread
+    """
+    processor = build_frame_processor(model, timer)
+    tracking = find_stage(processor, TrackedDetector)
+    scene_gate = find_stage(processor, SceneChangeGate)
+    show_latency = LATENCY_OVERLAY and timer is not None
+    
+    # FPS calculation
+    fps = 0
+    frame_count = 0
+    start_time = time.time()
+    
+    while True:
+        # Read frame
+        capture_start = time.perf_counter()
+        ret, frame = cap.read()
+        if not ret:
+            print("❌ Cannot read frame")
+            break
+        if timer is not None:
+            timer.record('capture', (time.perf_counter() - capture_start) * 1000)
+        
+        # Inference (atau tracking di antara frame deteksi)
+        detections = processor(frame)
+        
+        # Draw results
+        draw_start = time.perf_counter()
+        frame = draw_detections(frame, detections)
+        
+        # Calculate FPS
+        frame_count += 1
+        if frame_count % 10 == 0:
+            end_time = time.time()
+            elapsed = end_time - start_time
+            if elapsed > 0:
+                fps = 10 / elapsed
+            start_time = time.time()
+        
+        # Draw FPS
+        frame = draw_fps(frame, fps)
+        if tracking:
+            frame = draw_tracking_info(frame, tracking)
+        if scene_gate:
+            frame = draw_scene_gate_info(frame, scene_gate)
+        
+        # Draw info panel
+        frame = draw_info_panel(frame, detections)
+        if show_latency:
+            frame = draw_latency_overlay(frame, timer)
+        if timer is not None:
+            timer.record('draw', (time.perf_counter() - draw_start) * 1000)
+        
+        # Record (async, tidak menahan loop)
+        if recorder is not None:
+            recorder.record(frame, detections, count_detections(detections), frame_count)
+        
+        # Display
+        key = display_frame(frame)
+        
+        # Check for quit
+        if key == ord('q'):
+            break
+        if timer is not None:
+            show_latency = toggle_latency_overlay(key, show_latency)
+    
+    if scene_gate:
+        print(f"[SCENE GATE] {scene_gate.summary()}")
+
+def collect_pipeline_stats(capture, worker, display_fps, glass_to_glass, detection_age):
+    """Kumpulkan statistik per-stage pipeline"""
+    return {
+        'capture_fps': capture.fps.fps,
+        'capture_read_ms': capture.read_ms.ms,
+        'inference_fps': worker.fps.fps,
+        'inference_ms': worker.infer_ms.ms,
+        'display_fps': display_fps.fps,
+        'glass_to_glass_ms': glass_to_glass.ms,
+        'detection_age_ms': detection_age.ms
+    }
+
+def run_pipelined(model, capture, recorder=None, timer=None):
+    """
+    Loop pipelined: capture thread -> inference worker -> render di main thread
+    
+    Render berjalan mengikuti frame rate kamera dengan hasil deteksi terakhir,
+    sehingga tampilan tidak tertahan oleh inferensi.
+    
+    Args:
+        model: YOLOv5 model
+        capture: LatestFrameCapture yang sudah di-start
+        recorder: DetectionRecorder opsional
+        timer: StageTimer opsional (stage 'capture' dicatat oleh capture thread)
+    """
+    processor = build_frame_processor(model, timer)
+    show_latency = LATENCY_OVERLAY and timer is not None
+    tracking = find_stage(processor, TrackedDetector)
+    scene_gate = find_stage(processor, SceneChangeGate)
+    worker = InferenceWorker(capture, processor).start()
+    
+    display_fps = RateMeter()
+    glass_to_glass = LatencyMeter()  # capture -> frame tampil di layar
+    detection_age = LatencyMeter()   # capture frame yang dideteksi -> tampil
+    last_shown = 0
+    last_log = time.perf_counter()
+    
+    try:
+        while True:
+            frame_id, frame, capture_time = capture.wait_newer(last_shown, timeout=1.0)
+            if frame is None:
+                if capture.failed or not capture.running:
+                    print("❌ Cannot read frame")
+                    break
+                continue
+            last_shown = frame_id
+            
+            if worker.error is not None:
+                break
+            
+            # Frame dari capture dipakai bersama; draw di salinan
+            draw_start = time.perf_counter()
+            frame = frame.copy()
+            result = worker.latest()
+            detections = result.detections if result is not None else []
+            
+            frame = draw_detections(frame, detections)
+            frame = draw_fps(frame, display_fps.fps)
+            if tracking:
+                frame = draw_tracking_info(frame, tracking)
+            if scene_gate:
+                frame = draw_scene_gate_info(frame, scene_gate)
+            frame = draw_info_panel(frame, detections)
+            stats = collect_pipeline_stats(capture, worker, display_fps, glass_to_glass, detection_age)
+            frame = draw_pipeline_stats(frame, stats)
+            if show_latency:
+                frame = draw_latency_overlay(frame, timer)
+            if timer is not None:
+                timer.record('draw', (time.perf_counter() - draw_start) * 1000)
+            
+            if recorder is not None:
+                recorder.record(frame, detections, count_detections(detections), frame_id)
+            
+            key = display_frame(frame)
+            
+            now = time.perf_counter()
+            display_fps.tick(now)
+            glass_to_glass.update((now - capture_time) * 1000)
+            if result is not None:
+                detection_age.update((now - result.capture_time) * 1000)
+            
+            if now - last_log >= PIPELINE_STATS_INTERVAL:
+                print("[PIPELINE] capture {capture_fps:.1f} FPS ({capture_read_ms:.1f} ms) | "
+                      "inferensi {inference_fps:.1f} FPS ({inference_ms:.1f} ms) | "
+                      "display {display_fps:.1f} FPS | glass-to-glass {glass_to_glass_ms:.1f} ms | "
+                      "umur deteksi {detection_age_ms:.1f} ms".format(**stats))
+                last_log = now
+            
+            if key == ord('q'):
+                break
+            if timer is not None:
+                show_latency = toggle_latency_overlay(key, show_latency)
+    finally:
+        worker.stop()
+        if scene_gate:
+            print(f"[SCENE GATE] {scene_gate.summary()}")
+
+def draw_source_label(frame, name, capture_fps, infer_fps):
+    """
+    Draw nama sumber dan FPS per sumber (mode multi-camera)
+    
+    Args:
+        frame: Frame untuk di-draw
+        name: Nama sumber
+        capture_fps: FPS capture sumber
+        infer_fps: FPS hasil inferensi untuk sumber ini
+        
+    Returns:
+        frame: Frame dengan label sumber
+    """
+    text = f"{name} | cap {capture_fps:.1f} | inf {infer_fps:.1f} FPS"
+    cv2.rectangle(frame, (10, 10), (330, 40), (0, 0, 0), -1)
+    cv2.putText(frame, text, (15, 30),
+               cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 1)
+    return frame
+
+def run_multi(model, sources):
+    """
+    Loop multi-source: semua sumber berbagi satu model dan forward batch
+    
+    Args:
+        model: YOLOv5 model
+        sources: List (nama, source) yang sudah di-start
+    """
+    scheduler = BatchScheduler(sources, lambda frames: infer_batch(model, frames),
+                               max_batch=MULTI_MAX_BATCH, wait_ms=MULTI_BATCH_WAIT_MS).start()
+    
+    last_shown = [0] * len(sources)
+    last_log = time.perf_counter()
+    
+    try:
+        while True:
+            if scheduler.error is not None:
+                break
+            if not any(source.running for _, source in sources):
+                print("[INFO] Semua sumber selesai")
+                break
+            
+            new_frames = 0
+            for i, (name, source) in enumerate(sources):
+                frame_id, frame, _ = source.read()
+                if frame is None or frame_id == last_shown[i]:
+                    continue
+                last_shown[i] = frame_id
+                new_frames += 1
+                
+                frame = frame.copy()
+                result = scheduler.latest(i)
+                detections = result.detections if result is not None else []
+                state = scheduler.states[i]
+                
+                frame = draw_detections(frame, detections)
+                frame = draw_source_label(frame, name, source.fps.fps, state.infer_fps.fps)
+                frame = draw_info_panel(frame, detections)
+                if not HEADLESS:
+                    cv2.imshow(f"Deteksi Jamur - {name}", frame)
+            
+            if HEADLESS:
+                key = -1
+                if not new_frames:
+                    # Tanpa waitKey loop ini berputar penuh; beri CPU/GIL ke thread inferensi
+                    time.sleep(0.005)
+            else:
+                key = cv2.waitKey(1) & 0xFF
+            if key == ord('q'):
+                break
+            
+            now = time.perf_counter()
+            if now - last_log >= PIPELINE_STATS_INTERVAL:
+                print(f"[MULTI] {scheduler.summary()}")
+                last_log = now
+    finally:
+        scheduler.stop()
+        print(f"[MULTI] {scheduler.summary()}")
+
+def main_multi(model):
+    """
+    Mode multi-source (MULTI_SOURCES di config.py)
+    
+    Args:
+        model: YOLOv5 model yang sudah di-load
+    """
+    sources = []
+    for spec in MULTI_SOURCES:
+        source = open_source(spec, folder_fps=MULTI_FOLDER_FPS)
+        if not source.isOpened():
+            print(f"❌ Cannot open source: {spec}")
+            continue
+        name = f"cam{spec}" if isinstance(spec, int) else Path(str(spec)).name
+        print(f"[INFO] Source opened: {name}")
+        sources.append((name, source.start()))
+    
+    if not sources:
+        print("❌ Tidak ada sumber yang bisa dibuka. Cek MULTI_SOURCES di config.py")
+        return
+    
+    print(f"[INFO] Starting multi-source detection ({len(sources)} sumber, batch max {MULTI_MAX_BATCH})...\n")
+    try:
+        run_multi(model, sources)
+    except KeyboardInterrupt:
+        print("\n[INFO] Interrupted by user")
+    finally:
+        for _, source in sources:
+            source.stop()
+        if not HEADLESS:
+            cv2.destroyAllWindows()
+        print("\n[INFO] Program selesai")
+
+def build_stage_timer():
+    """
+    Buat StageTimer dengan metadata sesi (sumber, backend model, mode loop)
+    
+    Returns:
+        StageTimer
+    """
+    backend = f"optimized-{COMPILE_MODE or 'eager'}" if OPTIMIZED_CPU_MODE else "autoshape"
+    return StageTimer(window=LATENCY_WINDOW, metadata={
+        'source': WEBCAM_INDEX,
+        'model': Path(str(MODEL_PATH)).name,
+        'backend': backend,
+        'img_size': IMG_SIZE,
+        'loop': 'pipelined' if PIPELINE_MODE else 'serial',
+        'detect_every_n': DETECT_EVERY_N,
+        'scene_gate': SCENE_GATE_ENABLED
+    })
+
+def export_latency(timer):
+    """Cetak ringkasan latency sesi dan export ke CSV/JSON (LATENCY_EXPORT_DIR)"""
+    summary = timer.report()
+    if not summary:
+        return
+    print(f"[LATENCY] {summary}")
+    if LATENCY_EXPORT_DIR:
+        csv_path, json_path = timer.export(LATENCY_EXPORT_DIR)
+        print(f"[LATENCY] Export: {csv_path}, {json_path}")
+
 def main():
     """
     Main loop untuk webcam detection
@@ -243,7 +818,7 @@ def main():
     print("="*70)
     print("DETEKSI REAL-TIME JAMUR")
     print("="*70)
-    print("\nTekan 'q' untuk keluar")
+    print("\nTekan 'q' untuk keluar, 'l' untuk overlay latency" if not HEADLESS else "\nMode headless: tekan CTRL+C untuk keluar")
     print("="*70 + "\n")
     
     # Load model
@@ -251,9 +826,14 @@ def main():
     if model is None:
         return
     
+    if MULTI_SOURCES:
+        main_multi(model)
+        return
+    
     # Open webcam
     print(f"[INFO] Opening webcam (index: {WEBCAM_INDEX})...")
-    cap = cv2.VideoCapture(WEBCAM_INDEX)
+    timer = build_stage_timer()
+    cap = LatestFrameCapture(WEBCAM_INDEX, timer=timer) if PIPELINE_MODE else cv2.VideoCapture(WEBCAM_INDEX)
     
     if not cap.isOpened():
         print(f"❌ Cannot open webcam {WEBCAM_INDEX}")
@@ -261,61 +841,34 @@ def main():
         return
     
     print("[INFO] Webcam opened!")
-    print("[INFO] Starting detection...\n")
+    raw_cap = cap.cap if PIPELINE_MODE else cap
+    timer.metadata['resolution'] = (f"{int(raw_cap.get(cv2.CAP_PROP_FRAME_WIDTH))}x"
+                                    f"{int(raw_cap.get(cv2.CAP_PROP_FRAME_HEIGHT))}")
+    print(f"[INFO] Starting detection ({'pipelined' if PIPELINE_MODE else 'serial'} mode)...\n")
     
-    # FPS calculation
-    fps = 0
-    frame_count = 0
-    start_time = time.time()
+    recorder = build_recorder()
     
     # Main loop
     try:
-        while True:
-            # Read frame
-            ret, frame = cap.read()
-            if not ret:
-                print("❌ Cannot read frame")
-                break
-            
-            # Preprocess
-            frame = preprocess_frame(frame)
-            
-            # Inference
-            results = infer_and_postprocess(model, frame)
-            
-            # Draw results
-            frame, detections = draw_results(frame, results)
-            
-            # Calculate FPS
-            frame_count += 1
-            if frame_count % 10 == 0:
-                end_time = time.time()
-                elapsed = end_time - start_time
-                if elapsed > 0:
-                    fps = 10 / elapsed
-                start_time = time.time()
-            
-            # Draw FPS
-            frame = draw_fps(frame, fps)
-            
-            # Draw info panel
-            frame = draw_info_panel(frame, detections)
-            
-            # Display
-            cv2.imshow("Deteksi Jamur", frame)
-            
-            # Check for quit
-            key = cv2.waitKey(1) & 0xFF
-            if key == ord('q'):
-                break
+        if PIPELINE_MODE:
+            run_pipelined(model, cap.start(), recorder, timer)
+        else:
+            run_serial(model, cap, recorder, timer)
     
     except KeyboardInterrupt:
         print("\n[INFO] Interrupted by user")
     
     finally:
         # Cleanup
-        cap.release()
-        cv2.destroyAllWindows()
+        if PIPELINE_MODE:
+            cap.stop()
+        else:
+            cap.release()
+        if recorder is not None:
+            recorder.close()
+        export_latency(timer)
+        if not HEADLESS:
+            cv2.destroyAllWindows()
         print("\n[INFO] Program selesai")
 
 # ============================================================
@@ -8,11 +8,15 @@ from PIL import Image, ImageTk
 import torch
 import cv2
 import numpy as np
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime, timedelta
 
 # Import config
 from config import *
+from fast_inference import optimize_model
+from folder_batch import FolderBatchWindow
 
 # Tambahkan normalisasi label (samakan dengan detect_jamur_pc.py)
 LABEL_MAP = {
@@ -24,6 +28,52 @@ LABEL_MAP = {
     'matang': 'Matang'
 }
 
+def parse_detections(df):
+    """
+    Ubah DataFrame hasil YOLOv5 menjadi list deteksi
+    
+    Args:
+        df: results.pandas().xyxy[i]
+        
+    Returns:
+        detections: List dict (class, confidence, bbox, harvest_date, days)
+    """
+    detections = []
+    for idx, row in df.iterrows():
+        x1, y1, x2, y2 = int(row['xmin']), int(row['ymin']), int(row['xmax']), int(row['ymax'])
+        cls_name = LABEL_MAP.get(row['name'], row['name'])  # normalisasi
+        days = HARVEST_ESTIMATION.get(cls_name, 0)
+        detections.append({
+            'class': cls_name,
+            'confidence': row['confidence'],
+            'bbox': (x1, y1, x2, y2),
+            'harvest_date': datetime.now() + timedelta(days=days),
+            'days': days
+        })
+    return detections
+
+def annotate_image(image, detections):
+    """
+    Gambar bbox, label, dan tanggal panen di salinan gambar
+    
+    Returns:
+        img_with_boxes: Gambar teranotasi
+    """
+    img_with_boxes = image.copy()
+    for det in detections:
+        x1, y1, x2, y2 = det['bbox']
+        cls_name = det['class']
+        days = det['days']
+        color = CLASS_COLORS.get(cls_name, (255, 255, 255))
+        cv2.rectangle(img_with_boxes, (x1, y1), (x2, y2), color, 2)
+        label = f"{cls_name} {det['confidence']:.2f}"
+        cv2.putText(img_with_boxes, label, (x1, y1 - 10),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
+        harvest_text = f"Panen: {det['harvest_date'].strftime('%d/%m/%Y')} (+{days}d)" if days > 0 else "Siap Panen!"
+        cv2.putText(img_with_boxes, harvest_text, (x1, y2 + 20),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 2)
+    return img_with_boxes
+
 class MushroomDetectorGUI:
     def __init__(self, root):
         self.root = root
@@ -31,16 +81,82 @@ class MushroomDetectorGUI:
         self.root.geometry("1200x800")
         self.root.configure(bg='#1a1a1a')
         
-        # Load model
-        print("[INFO] Loading model...")
-        self.model = self.load_model()
+        # Model di-load di background worker setelah window tampil
+        self.model = None
+        
+        # Satu worker: load model dan inferensi berjalan berurutan di luar Tk main thread
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="gui-worker")
+        self.futures = set()  # Job yang belum selesai (dibatalkan saat window ditutup)
+        self.busy = False
+        self.model_lock = threading.Lock()  # Deteksi tunggal & mode folder berbagi satu model
         
         # Current image
         self.current_image = None
         self.current_image_path = None
+        self.result_image = None  # Gambar teranotasi hasil deteksi terakhir
         
         # Setup UI
         self.setup_ui()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        
+        # Load model
+        print("[INFO] Loading model...")
+        self.run_in_background(self.load_model, self.on_model_loaded, "⏳ Loading model...")
+    
+    def run_in_background(self, fn, on_done, message, *args):
+        """
+        Jalankan fn(*args) di worker, lalu panggil on_done(result, error) di Tk main thread
+        
+        Args:
+            fn: Fungsi yang dijalankan di worker
+            on_done: Callback (result, error) setelah selesai
+            message: Teks status selama proses
+        """
+        self.set_busy(True, message)
+        future = self.executor.submit(fn, *args)
+        self.futures.add(future)
+        future.add_done_callback(self.futures.discard)
+        self.root.after(50, self.poll_future, future, on_done)
+    
+    def poll_future(self, future, on_done):
+        """Cek hasil worker tanpa blocking event loop Tk"""
+        if not future.done():
+            self.root.after(50, self.poll_future, future, on_done)
+            return
+        self.set_busy(False)
+        error = future.exception()
+        on_done(None if error else future.result(), error)
+    
+    def set_busy(self, busy, message=None):
+        """Update progress bar dan status tombol selama worker berjalan"""
+        self.busy = busy
+        if busy:
+            self.progress.start(10)
+        else:
+            self.progress.stop()
+        if message:
+            self.status_var.set(message)
+        self.upload_btn.config(state='disabled' if busy else 'normal')
+        self.folder_btn.config(state='normal' if not busy and self.model is not None else 'disabled')
+        can_detect = not busy and self.model is not None and self.current_image is not None
+        self.detect_btn.config(state='normal' if can_detect else 'disabled')
+    
+    def on_model_loaded(self, model, error):
+        """Callback setelah model selesai di-load"""
+        self.model = model
+        self.set_busy(False)
+        if model is None:
+            self.status_var.set(f"❌ Error loading model: {error}" if error else "❌ Error loading model")
+        else:
+            self.status_var.set("✅ Model loaded - Ready")
+    
+    def on_close(self):
+        """Tutup window tanpa menunggu worker yang sedang berjalan"""
+        # shutdown(cancel_futures=True) baru ada di Python 3.9; batalkan job antrian sendiri
+        for future in list(self.futures):
+            future.cancel()
+        self.executor.shutdown(wait=False)
+        self.root.destroy()
     
     def load_model(self):
         """Load YOLOv5 model"""
@@ -48,6 +164,10 @@ class MushroomDetectorGUI:
             model = torch.hub.load('ultralytics/yolov5', 'custom', 
                                   path=MODEL_PATH, force_reload=False)
             model.conf = CONFIDENCE_THRESHOLD
+            if OPTIMIZED_CPU_MODE:
+                model = optimize_model(model, weights_path=MODEL_PATH, img_size=IMG_SIZE,
+                                       channels_last=CHANNELS_LAST, compile_mode=COMPILE_MODE,
+                                       cache_dir=COMPILED_CACHE_DIR)
             print("[INFO] Model loaded successfully!")
             return model
         except Exception as e:
@@ -87,11 +207,18 @@ class MushroomDetectorGUI:
         right_frame.pack(side='right', fill='both', padx=(10, 0))
         
         # Upload button
-        upload_btn = tk.Button(right_frame, text="📁 Upload Image",
-                              font=('Arial', 14, 'bold'), bg='#4CAF50', fg='white',
-                              command=self.upload_image, cursor='hand2',
-                              padx=20, pady=10)
-        upload_btn.pack(pady=20, padx=20, fill='x')
+        self.upload_btn = tk.Button(right_frame, text="📁 Upload Image",
+                                    font=('Arial', 14, 'bold'), bg='#4CAF50', fg='white',
+                                    command=self.upload_image, cursor='hand2',
+                                    padx=20, pady=10)
+        self.upload_btn.pack(pady=20, padx=20, fill='x')
+        
+        # Folder button (mode batch)
+        self.folder_btn = tk.Button(right_frame, text="📂 Open Folder",
+                                    font=('Arial', 12), bg='#607D8B', fg='white',
+                                    command=self.open_folder, cursor='hand2',
+                                    padx=20, pady=6, state='disabled')
+        self.folder_btn.pack(pady=(0, 20), padx=20, fill='x')
         
         # Detect button
         self.detect_btn = tk.Button(right_frame, text="🔍 Detect Mushrooms",
@@ -128,6 +255,10 @@ class MushroomDetectorGUI:
                              bg='#2d2d2d', fg='#4CAF50', font=('Arial', 10),
                              anchor='w', padx=10)
         status_bar.pack(side='bottom', fill='x')
+        
+        # Progress bar (berjalan selama load model / deteksi)
+        self.progress = ttk.Progressbar(self.root, mode='indeterminate')
+        self.progress.pack(side='bottom', fill='x')
     
     def upload_image(self):
         """Upload image from file"""
@@ -141,11 +272,15 @@ class MushroomDetectorGUI:
         
         if not file_path:
             return
-        
+        self.load_image(file_path)
+    
+    def load_image(self, file_path):
+        """Load gambar ke viewer utama"""
         try:
             # Read image
             self.current_image = cv2.imread(file_path)
             self.current_image_path = file_path
+            self.result_image = None
             
             if self.current_image is None:
                 self.status_var.set("❌ Error: Cannot read image")
@@ -154,8 +289,8 @@ class MushroomDetectorGUI:
             # Display image
             self.display_image(self.current_image)
             
-            # Enable detect button
-            self.detect_btn.config(state='normal')
+            # Enable detect button (jika model sudah siap)
+            self.detect_btn.config(state='normal' if self.model is not None else 'disabled')
             self.save_btn.config(state='disabled')
             
             # Clear results
@@ -203,43 +338,65 @@ class MushroomDetectorGUI:
         self.canvas.image = img_tk  # Keep reference
     
     def detect_image(self):
-        """Run detection on current image"""
-        if self.current_image is None or self.model is None:
+        """Run detection on current image (di background worker)"""
+        if self.current_image is None or self.model is None or self.busy:
             return
-        try:
-            self.status_var.set("🔍 Detecting...")
-            self.root.update()
-            results = self.model(self.current_image)
-            df = results.pandas().xyxy[0]
-            img_with_boxes = self.current_image.copy()
-            detections = []
-            for idx, row in df.iterrows():
-                x1, y1, x2, y2 = int(row['xmin']), int(row['ymin']), int(row['xmax']), int(row['ymax'])
-                conf = row['confidence']
-                raw_name = row['name']
-                cls_name = LABEL_MAP.get(raw_name, raw_name)  # normalisasi
-                color = CLASS_COLORS.get(cls_name, (255, 255, 255))
-                cv2.rectangle(img_with_boxes, (x1, y1), (x2, y2), color, 2)
-                label = f"{cls_name} {conf:.2f}"
-                cv2.putText(img_with_boxes, label, (x1, y1 - 10),
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
-                days = HARVEST_ESTIMATION.get(cls_name, 0)
-                harvest_date = datetime.now() + timedelta(days=days)
-                harvest_text = f"Panen: {harvest_date.strftime('%d/%m/%Y')} (+{days}d)" if days > 0 else "Siap Panen!"
-                cv2.putText(img_with_boxes, harvest_text, (x1, y2 + 20),
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 2)
-                detections.append({
-                    'class': cls_name,
-                    'confidence': conf,
-                    'harvest_date': harvest_date,
-                    'days': days
-                })
-            self.display_image(img_with_boxes, is_result=True)
-            self.update_results(detections)
-            self.save_btn.config(state='normal')
-            self.status_var.set(f"✅ Detected {len(detections)} mushroom(s)")
-        except Exception as e:
-            self.status_var.set(f"❌ Detection error: {str(e)}")
+        self.save_btn.config(state='disabled')
+        self.run_in_background(self.run_detection, self.on_detection_done,
+                               "🔍 Detecting...", self.current_image)
+    
+    def run_detection(self, image):
+        """
+        Inferensi dan anotasi gambar (berjalan di worker thread, tanpa akses widget Tk)
+        
+        Returns:
+            img_with_boxes: Gambar teranotasi
+            detections: List deteksi
+        """
+        with self.model_lock:
+            results = self.model(image)
+        detections = parse_detections(results.pandas().xyxy[0])
+        return annotate_image(image, detections), detections
+    
+    def infer_batch(self, images):
+        """Inferensi batch untuk mode folder (dipanggil dari thread FolderBatchProcessor)"""
+        with self.model_lock:
+            results = self.model(images)
+        return [parse_detections(results.pandas().xyxy[i]) for i in range(len(images))]
+    
+    def open_folder(self):
+        """Buka folder gambar di window mode batch"""
+        if self.model is None:
+            return
+        folder = filedialog.askdirectory(title="Select Image Folder")
+        if not folder:
+            return
+        FolderBatchWindow(self.root, folder, self.infer_batch, CLASS_NAMES, CLASS_COLORS,
+                          HARVEST_ESTIMATION, batch_size=FOLDER_BATCH_SIZE,
+                          workers=FOLDER_DECODE_WORKERS, thumb_size=THUMBNAIL_SIZE,
+                          cache_size=THUMBNAIL_CACHE_SIZE, summary_dir=FOLDER_SUMMARY_DIR,
+                          on_open=self.open_record)
+        self.status_var.set(f"📂 Folder mode: {Path(folder).name}")
+    
+    def open_record(self, record):
+        """Double-click thumbnail: tampilkan gambar di viewer utama dan deteksi ulang"""
+        if self.busy:
+            return
+        self.load_image(record['path'])
+        if self.current_image is not None:
+            self.detect_image()
+    
+    def on_detection_done(self, result, error):
+        """Callback setelah deteksi selesai (di Tk main thread)"""
+        if error is not None:
+            self.status_var.set(f"❌ Detection error: {str(error)}")
+            return
+        img_with_boxes, detections = result
+        self.result_image = img_with_boxes
+        self.display_image(img_with_boxes, is_result=True)
+        self.update_results(detections)
+        self.save_btn.config(state='normal')
+        self.status_var.set(f"✅ Detected {len(detections)} mushroom(s)")
     
     def update_results(self, detections):
         """Update results text"""
@@ -286,7 +443,7 @@ class MushroomDetectorGUI:
     
     def save_result(self):
         """Save result image"""
-        if self.current_image is None:
+        if self.result_image is None:
             return
         
         try:
@@ -299,13 +456,8 @@ class MushroomDetectorGUI:
             original_name = Path(self.current_image_path).stem
             output_path = output_dir / f"{original_name}_result_{timestamp}.jpg"
             
-            # Get current canvas image (with detections)
-            # We'll re-run detection to get clean result
-            results = self.model(self.current_image)
-            
-            # Render and save
-            results.render()
-            cv2.imwrite(str(output_path), results.ims[0])
+            # Simpan gambar teranotasi dari deteksi terakhir (tanpa inferensi ulang)
+            cv2.imwrite(str(output_path), self.result_image)
             
             self.status_var.set(f"✅ Saved: {output_path.name}")
             
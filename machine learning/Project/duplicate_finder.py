@@ -0,0 +1,334 @@
+"""
+Deteksi gambar near-duplicate di dataset dengan perceptual hash (pHash)
+
+- pHash 64-bit (DCT 32x32 grayscale) dihitung paralel, di-cache per file
+  (mtime/size) sehingga run berikutnya hanya meng-hash gambar baru
+- Pencarian pasangan dengan jarak Hamming <= d memakai multi-index hashing:
+  hash dipecah menjadi d+1 potongan; dua hash dengan jarak <= d pasti identik
+  di minimal satu potongan (pigeonhole), jadi kandidat cukup dicari per bucket
+  lalu diverifikasi dengan popcount XOR
+- Pasangan digabung menjadi cluster (union-find), dilaporkan per split dan
+  lintas split (kebocoran train -> valid/test)
+- Daftar train hasil de-duplikasi ditulis sebagai .txt + data.yaml turunan
+  yang bisa langsung dipakai yolov5/train.py
+"""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import cv2  # type: ignore
+import numpy as np  # type: ignore
+
+from image_cache import list_split_images
+
+HASH_BITS = 64
+HASH_VERSION = 1
+MAX_DISTANCE = 16
+
+_POPCOUNT8 = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+# ============================================================
+# HASH
+# ============================================================
+
+def phash(gray):
+    """pHash 64-bit dari gambar grayscale"""
+    small = cv2.resize(gray, (32, 32), interpolation=cv2.INTER_AREA).astype(np.float32)
+    low = cv2.dct(small)[:8, :8].flatten()
+    bits = low > np.median(low[1:])  # koefisien DC diabaikan untuk median
+    return np.uint64(int(np.packbits(bits).view('>u8')[0]))
+
+
+def hash_file(path):
+    """pHash satu file (decode grayscale tereduksi); None jika gagal dibaca"""
+    gray = cv2.imread(str(path), cv2.IMREAD_REDUCED_GRAYSCALE_2)
+    if gray is None:
+        return None
+    return phash(gray)
+
+
+def popcount64(x):
+    """Jumlah bit 1 per elemen array uint64"""
+    x = np.ascontiguousarray(x, dtype=np.uint64)
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(x).astype(np.int64)
+    return _POPCOUNT8[x.view(np.uint8)].reshape(-1, 8).sum(axis=1).astype(np.int64)
+
+
+def source_name(name):
+    """Nama gambar asli sebelum augmentasi Roboflow (xxx_jpg.rf.<hash>.jpg -> xxx_jpg)"""
+    return name.split('.rf.')[0] if '.rf.' in name else Path(name).stem
+
+
+class HashTable:
+    """
+    pHash semua gambar di beberapa split
+
+    Attributes:
+        splits: Nama split (index = kode di kolom split)
+        split: Array (N,) kode split
+        names: Nama file
+        hashes: Array (N,) uint64
+        valid: Array (N,) bool (False = gambar gagal dibaca)
+        stats: Array (N, 2) mtime_ns dan size
+    """
+
+    def __init__(self, splits, split, names, hashes, valid, stats, dataset_dir=None):
+        self.splits = list(splits)
+        self.split = split
+        self.names = list(names)
+        self.hashes = hashes
+        self.valid = valid
+        self.stats = stats
+        self.dataset_dir = Path(dataset_dir) if dataset_dir else None
+
+    def __len__(self):
+        return len(self.names)
+
+    def path(self, i):
+        return self.dataset_dir / self.splits[self.split[i]] / "images" / self.names[i]
+
+    def save(self, path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.stem + ".tmp.npz")
+        np.savez(tmp, version=np.int32(HASH_VERSION), splits=np.array(self.splits, dtype=str),
+                 split=self.split, names=np.array(self.names, dtype=str), hashes=self.hashes,
+                 valid=self.valid, stats=self.stats)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        path = Path(path)
+        if not path.exists():
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                if int(data['version']) != HASH_VERSION:
+                    return None
+                return cls(data['splits'].tolist(), data['split'], data['names'].tolist(),
+                           data['hashes'], data['valid'], data['stats'])
+        except Exception:
+            return None
+
+    @classmethod
+    def build(cls, dataset_dir, splits, cache_path=None, workers=4):
+        """
+        Hash semua gambar; yang mtime/size-nya sama dengan cache dipakai ulang
+
+        Returns:
+            table: HashTable
+            report: Dict jumlah reused/hashed/failed dan waktu
+        """
+        start = time.perf_counter()
+        old = cls.load(cache_path) if cache_path else None
+        previous = {}
+        if old is not None:
+            for i, name in enumerate(old.names):
+                previous[(old.splits[old.split[i]], name)] = i
+
+        paths, split_codes = [], []
+        for code, split in enumerate(splits):
+            for path in list_split_images(dataset_dir, split):
+                paths.append(path)
+                split_codes.append(code)
+
+        n = len(paths)
+        hashes = np.zeros(n, dtype=np.uint64)
+        valid = np.ones(n, dtype=bool)
+        stats = np.zeros((n, 2), dtype=np.int64)
+        report = {'reused': 0, 'hashed': 0, 'failed': 0}
+
+        to_hash = []
+        for i, path in enumerate(paths):
+            st = path.stat()
+            stats[i] = (st.st_mtime_ns, st.st_size)
+            j = previous.get((splits[split_codes[i]], path.name))
+            if j is not None and old.valid[j] and tuple(old.stats[j]) == tuple(stats[i]):
+                hashes[i] = old.hashes[j]
+                report['reused'] += 1
+            else:
+                to_hash.append(i)
+
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            for i, value in zip(to_hash, pool.map(lambda i: hash_file(paths[i]), to_hash)):
+                if value is None:
+                    valid[i] = False
+                    report['failed'] += 1
+                else:
+                    hashes[i] = value
+                    report['hashed'] += 1
+
+        table = cls(splits, np.array(split_codes, dtype=np.int8), [p.name for p in paths],
+                    hashes, valid, stats, dataset_dir)
+        if cache_path and (to_hash or old is None or len(old) != n):
+            table.save(cache_path)
+        report['seconds'] = time.perf_counter() - start
+        return table, report
+
+
+# ============================================================
+# MULTI-INDEX HASHING
+# ============================================================
+
+def chunk_masks(max_distance):
+    """(shift, mask) untuk memecah hash 64-bit menjadi max_distance + 1 potongan"""
+    m = max_distance + 1
+    bounds = np.linspace(0, HASH_BITS, m + 1).astype(int)
+    return [(int(lo), (1 << int(hi - lo)) - 1) for lo, hi in zip(bounds[:-1], bounds[1:])]
+
+
+def near_duplicate_pairs(hashes, max_distance):
+    """
+    Semua pasangan (i, j), i < j, dengan jarak Hamming <= max_distance
+
+    Returns:
+        pairs: Array (P, 2) int64
+        distances: Array (P,) int64
+    """
+    if not 0 <= max_distance <= MAX_DISTANCE:
+        raise ValueError(f"max_distance harus 0..{MAX_DISTANCE}")
+    n = len(hashes)
+    hashes = np.asarray(hashes, dtype=np.uint64)
+    candidates = []
+    for shift, mask in chunk_masks(max_distance):
+        keys = (hashes >> np.uint64(shift)) & np.uint64(mask)
+        order = np.argsort(keys, kind='stable')
+        sorted_keys = keys[order]
+        starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+        sizes = np.diff(np.r_[starts, n])
+        for start, size in zip(starts[sizes > 1], sizes[sizes > 1]):
+            members = np.sort(order[start:start + size])
+            i, j = np.triu_indices(size, k=1)
+            candidates.append(members[i] * n + members[j])
+
+    if not candidates:
+        return np.zeros((0, 2), dtype=np.int64), np.zeros(0, dtype=np.int64)
+    flat = np.unique(np.concatenate(candidates))
+    pairs = np.stack([flat // n, flat % n], axis=1)
+    distances = popcount64(hashes[pairs[:, 0]] ^ hashes[pairs[:, 1]])
+    keep = distances <= max_distance
+    return pairs[keep], distances[keep]
+
+
+def cluster_pairs(n, pairs):
+    """
+    Union-find atas pasangan
+
+    Returns:
+        List cluster (array index, ukuran >= 2), terurut dari yang terbesar
+    """
+    parent = np.arange(n)
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for i, j in pairs:
+        ri, rj = find(i), find(j)
+        if ri != rj:
+            parent[max(ri, rj)] = min(ri, rj)
+
+    roots = np.array([find(i) for i in range(n)])
+    order = np.argsort(roots, kind='stable')
+    groups = np.split(order, np.flatnonzero(np.diff(roots[order])) + 1)
+    return sorted((g for g in groups if len(g) > 1), key=len, reverse=True)
+
+
+# ============================================================
+# LAPORAN & DE-DUPLIKASI
+# ============================================================
+
+def find_duplicates(table, max_distance=6):
+    """
+    Cluster near-duplicate + kebocoran nama sumber lintas split
+
+    Returns:
+        Dict clusters (list dict members, splits, cross_split), pairs, dan
+        source_leaks (gambar asli Roboflow yang augmentasinya ada di > 1 split)
+    """
+    ids = np.flatnonzero(table.valid)
+    pairs, distances = near_duplicate_pairs(table.hashes[ids], max_distance)
+    pairs = ids[pairs] if len(pairs) else pairs
+
+    clusters = []
+    for members in cluster_pairs(len(table), pairs):
+        member_splits = sorted({table.splits[table.split[i]] for i in members})
+        clusters.append({
+            'members': [int(i) for i in members],
+            'splits': member_splits,
+            'cross_split': len(member_splits) > 1,
+        })
+
+    by_source = {}
+    for i, name in enumerate(table.names):
+        by_source.setdefault(source_name(name), []).append(i)
+    source_leaks = {src: idx for src, idx in by_source.items()
+                    if len({int(table.split[i]) for i in idx}) > 1}
+
+    return {'clusters': clusters, 'pairs': pairs, 'distances': distances, 'source_leaks': source_leaks}
+
+
+def dedup_split(table, report, split='train', drop_leaks=True):
+    """
+    Gambar split yang dipertahankan: satu wakil per cluster; jika drop_leaks,
+    gambar train yang punya duplikat di split lain (atau berasal dari gambar
+    sumber yang sama) dibuang seluruhnya
+
+    Returns:
+        keep: Index gambar yang dipertahankan (urut)
+        dropped: Dict alasan -> jumlah
+    """
+    code = table.splits.index(split)
+    in_split = set(np.flatnonzero(table.split == code).tolist())
+    drop = {}
+
+    for cluster in report['clusters']:
+        members = sorted((i for i in cluster['members'] if i in in_split), key=lambda i: table.names[i])
+        if not members:
+            continue
+        if drop_leaks and cluster['cross_split']:
+            for i in members:
+                drop.setdefault(i, 'leak')
+        else:
+            for i in members[1:]:
+                drop.setdefault(i, 'duplicate')
+
+    if drop_leaks:
+        for idx in report['source_leaks'].values():
+            for i in idx:
+                if i in in_split:
+                    drop.setdefault(i, 'leak')
+
+    keep = sorted(i for i in in_split if i not in drop)
+    dropped = {}
+    for reason in drop.values():
+        dropped[reason] = dropped.get(reason, 0) + 1
+    return keep, dropped
+
+
+def write_dedup_dataset(table, keep, dataset_dir, split='train', name="dedup"):
+    """
+    Tulis daftar gambar ({split}_{name}.txt) dan data_{name}.yaml yang memakainya
+
+    Returns:
+        Path data yaml baru
+    """
+    import yaml  # type: ignore
+
+    dataset_dir = Path(dataset_dir).resolve()
+    list_path = dataset_dir / f"{split}_{name}.txt"
+    list_path.write_text("".join(f"{table.path(i).resolve()}\n" for i in keep))
+
+    with open(dataset_dir / "data.yaml") as f:
+        data = yaml.safe_load(f)
+    data[{'valid': 'val'}.get(split, split)] = str(list_path)
+    yaml_path = dataset_dir / f"data_{name}.yaml"
+    with open(yaml_path, 'w') as f:
+        yaml.dump(data, f, default_flow_style=False, sort_keys=False)
+    return yaml_path
@@ -0,0 +1,389 @@
+"""
+Metrik evaluasi deteksi (vektorisasi NumPy) dan cache prediksi mentah
+
+Prediksi satu split disimpan sekali (conf minimal rendah) sebagai array datar
+(image_idx, box xyxy, conf, cls). Semua metrik dihitung dari array tersebut
+sekaligus untuk semua gambar, sehingga scoring ulang dengan threshold lain
+tidak perlu menjalankan model lagi.
+
+Algoritma matching dan AP mengikuti YOLOv5 val.py (interpolasi 101 titik,
+IoU 0.5:0.95), confusion matrix mengikuti ConfusionMatrix YOLOv5.
+"""
+
+from pathlib import Path
+
+import numpy as np  # type: ignore
+
+IOU_THRESHOLDS = np.linspace(0.5, 0.95, 10)
+EPS = 1e-9
+
+_trapezoid = getattr(np, 'trapezoid', None) or np.trapz
+
+
+# ============================================================
+# CACHE PREDIKSI
+# ============================================================
+
+def save_predictions(path, image_idx, boxes, conf, cls, **meta):
+    """Simpan prediksi mentah + metadata ke .npz"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    np.savez(path,
+             image_idx=np.asarray(image_idx, dtype=np.int32),
+             boxes=np.asarray(boxes, dtype=np.float32).reshape(-1, 4),
+             conf=np.asarray(conf, dtype=np.float32),
+             cls=np.asarray(cls, dtype=np.int16),
+             **{f"meta_{k}": np.array(v) for k, v in meta.items()})
+
+
+def load_predictions(path):
+    """
+    Load prediksi dari .npz
+
+    Returns:
+        Dict image_idx, boxes, conf, cls, meta (None jika file tidak ada)
+    """
+    path = Path(path)
+    if not path.exists():
+        return None
+    with np.load(path, allow_pickle=False) as data:
+        preds = {k: data[k] for k in ('image_idx', 'boxes', 'conf', 'cls')}
+        preds['meta'] = {k[5:]: data[k].tolist() for k in data.files if k.startswith('meta_')}
+    return preds
+
+
+def predictions_path(pred_dir, weights, split, img_size, bgr):
+    """Path cache prediksi: unik per hash weights, split, ukuran, dan urutan channel"""
+    from fast_inference import weights_hash
+
+    color = "bgr" if bgr else "rgb"
+    return Path(pred_dir) / f"{Path(weights).stem}-{weights_hash(weights)}-{split}-{img_size}-{color}.npz"
+
+
+def predict_split(weights, cache, batch_size=16, bgr=False, conf=0.001, iou=0.6, max_det=100, log=print):
+    """
+    Inferensi batch seluruh split dari cache gambar memmap (image_cache.ImageCache)
+
+    Returns:
+        Dict image_idx, boxes (xyxy piksel asli), conf, cls
+    """
+    import time
+    import torch  # type: ignore
+
+    log(f"\n[INFO] Loading model: {weights}")
+    model = torch.hub.load('ultralytics/yolov5', 'custom', path=str(weights), force_reload=False)
+    model.conf = conf
+    model.iou = iou
+    model.max_det = max_det
+
+    image_idx, boxes, scores, classes = [], [], [], []
+    start = time.perf_counter()
+    for first, last, batch in cache.batches(batch_size):
+        # AutoShape mengharapkan RGB; view memmap BGR dibalik tanpa decode ulang
+        images = list(batch) if bgr else [img[..., ::-1] for img in batch]
+        results = model(images, size=cache.img_size)
+        for offset, det in enumerate(results.xyxy):
+            det = det.cpu().numpy()
+            i = first + offset
+            image_idx.append(np.full(len(det), i, dtype=np.int32))
+            boxes.append(cache.to_original(det[:, :4], i))
+            scores.append(det[:, 4])
+            classes.append(det[:, 5].astype(np.int16))
+        elapsed = time.perf_counter() - start
+        print(f"\r  {last}/{len(cache)} gambar | {last / elapsed:.1f} img/s", end="", flush=True)
+    print()
+
+    return {
+        'image_idx': np.concatenate(image_idx) if image_idx else np.zeros(0, np.int32),
+        'boxes': np.concatenate(boxes) if boxes else np.zeros((0, 4), np.float32),
+        'conf': np.concatenate(scores) if scores else np.zeros(0, np.float32),
+        'cls': np.concatenate(classes) if classes else np.zeros(0, np.int16),
+    }
+
+
+def cached_predictions(weights, cache, split, pred_dir, batch_size=16, bgr=False, rerun=False,
+                       conf=0.001, iou=0.6, max_det=100, log=print):
+    """
+    Prediksi mentah satu split: dari cache .npz jika weights & gambar sama, selain itu inferensi lalu simpan
+
+    Returns:
+        preds: Dict image_idx, boxes, conf, cls, meta
+        cached: True jika dari cache
+    """
+    path = predictions_path(pred_dir, weights, split, cache.img_size, bgr)
+    preds = None if rerun else load_predictions(path)
+    if preds is not None and preds['meta'].get('cache_fingerprint') == cache.fingerprint:
+        log(f"[INFO] Memakai prediksi dari cache: {path.name}")
+        return preds, True
+
+    preds = predict_split(weights, cache, batch_size, bgr, conf, iou, max_det, log=log)
+    save_predictions(path, **preds, weights=str(weights), split=split, img_size=cache.img_size,
+                     min_conf=conf, nms_iou=iou, cache_fingerprint=cache.fingerprint)
+    log(f"[INFO] Prediksi di-cache: {path}")
+    return load_predictions(path), False
+
+
+def subset(data, keep):
+    """Subset baris semua kolom array (field lain, mis. meta, dibiarkan)"""
+    return {k: (v[keep] if isinstance(v, np.ndarray) else v) for k, v in data.items()}
+
+
+def filter_predictions(preds, conf_thres):
+    """Subset prediksi dengan conf >= conf_thres"""
+    return subset(preds, preds['conf'] >= conf_thres)
+
+
+def valid_classes(data, num_classes):
+    """
+    Buang box dengan class id di luar 0..num_classes-1 (label ISSUE_BAD_CLASS
+    di LabelIndex, atau model dengan kelas lebih banyak)
+
+    Returns:
+        data: Subset dengan class valid
+        skipped: Jumlah box yang dibuang
+    """
+    cls = np.asarray(data['cls'])
+    keep = (cls >= 0) & (cls < num_classes)
+    if keep.all():
+        return data, 0
+    return subset(data, keep), int((~keep).sum())
+
+
+# ============================================================
+# MATCHING
+# ============================================================
+
+def box_iou_pairs(a, b):
+    """IoU elemen-per-elemen untuk pasangan box xyxy (N, 4) dan (N, 4)"""
+    iw = (np.minimum(a[:, 2], b[:, 2]) - np.maximum(a[:, 0], b[:, 0])).clip(0)
+    ih = (np.minimum(a[:, 3], b[:, 3]) - np.maximum(a[:, 1], b[:, 1])).clip(0)
+    inter = iw * ih
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    return inter / (area_a + area_b - inter + EPS)
+
+
+def same_image_pairs(pred_img, gt_img, num_images):
+    """
+    Semua pasangan (prediksi, ground truth) yang berada di gambar yang sama
+
+    Returns:
+        pi, gi: Index prediksi dan index ground truth per pasangan
+    """
+    gt_counts = np.bincount(gt_img, minlength=num_images)
+    gt_order = np.argsort(gt_img, kind='stable')
+    gt_start = np.cumsum(gt_counts) - gt_counts
+
+    repeats = gt_counts[pred_img]
+    pi = np.repeat(np.arange(len(pred_img)), repeats)
+    segment_start = np.repeat(np.cumsum(repeats) - repeats, repeats)
+    within = np.arange(len(pi)) - segment_start
+    gi = gt_order[gt_start[pred_img[pi]] + within]
+    return pi, gi
+
+
+def greedy_unique(pi, gi, iou):
+    """Matching satu-satu: urut IoU tertinggi, tiap prediksi dan tiap GT maksimal sekali"""
+    order = np.argsort(-iou, kind='stable')
+    pi, gi, iou = pi[order], gi[order], iou[order]
+    _, first = np.unique(pi, return_index=True)
+    first = np.sort(first)  # pertahankan urutan IoU menurun
+    pi, gi, iou = pi[first], gi[first], iou[first]
+    _, first = np.unique(gi, return_index=True)
+    return pi[first], gi[first], iou[first]
+
+
+def match_predictions(preds, gts, num_images, iou_thresholds=IOU_THRESHOLDS):
+    """
+    Tandai prediksi true positive untuk setiap threshold IoU
+
+    Args:
+        preds: Dict image_idx, boxes, cls
+        gts: Dict image_idx, boxes, cls
+        num_images: Jumlah gambar
+
+    Returns:
+        correct: Array bool (P, T)
+    """
+    correct = np.zeros((len(preds['cls']), len(iou_thresholds)), dtype=bool)
+    if not len(preds['cls']) or not len(gts['cls']):
+        return correct
+    pi, gi = same_image_pairs(preds['image_idx'], gts['image_idx'], num_images)
+    iou = box_iou_pairs(preds['boxes'][pi], gts['boxes'][gi])
+    same_class = preds['cls'][pi] == gts['cls'][gi]
+    for t, thr in enumerate(iou_thresholds):
+        m = same_class & (iou >= thr)
+        if m.any():
+            mp, _, _ = greedy_unique(pi[m], gi[m], iou[m])
+            correct[mp, t] = True
+    return correct
+
+
+# ============================================================
+# METRIK
+# ============================================================
+
+def compute_ap(recall, precision):
+    """AP dari kurva precision-recall (envelope + interpolasi 101 titik, seperti COCO/YOLOv5)"""
+    mrec = np.concatenate(([0.0], recall, [1.0]))
+    mpre = np.concatenate(([1.0], precision, [0.0]))
+    mpre = np.flip(np.maximum.accumulate(np.flip(mpre)))
+    x = np.linspace(0, 1, 101)
+    return float(_trapezoid(np.interp(x, mrec, mpre), x))
+
+
+def ap_per_class(correct, conf, pred_cls, gt_cls, num_classes):
+    """
+    AP per kelas untuk semua threshold IoU
+
+    Returns:
+        ap: Array (C, T)
+    """
+    order = np.argsort(-conf, kind='stable')
+    correct, pred_cls = correct[order], pred_cls[order]
+    ap = np.zeros((num_classes, correct.shape[1]))
+    for c in range(num_classes):
+        mask = pred_cls == c
+        n_gt = int((gt_cls == c).sum())
+        if not mask.any() or not n_gt:
+            continue
+        tpc = correct[mask].cumsum(0)
+        fpc = (~correct[mask]).cumsum(0)
+        recall = tpc / (n_gt + EPS)
+        precision = tpc / (tpc + fpc)
+        for t in range(correct.shape[1]):
+            ap[c, t] = compute_ap(recall[:, t], precision[:, t])
+    return ap
+
+
+def confusion_matrix(preds, gts, num_images, num_classes, iou_thres=0.45):
+    """
+    Confusion matrix (C+1) x (C+1), baris = prediksi, kolom = ground truth;
+    index terakhir = background (FP di kolom terakhir, FN di baris terakhir)
+    """
+    preds, _ = valid_classes(preds, num_classes)
+    gts, _ = valid_classes(gts, num_classes)
+    matrix = np.zeros((num_classes + 1, num_classes + 1), dtype=np.int64)
+    bg = num_classes
+    matched_p = np.zeros(len(preds['cls']), dtype=bool)
+    matched_g = np.zeros(len(gts['cls']), dtype=bool)
+
+    if len(preds['cls']) and len(gts['cls']):
+        pi, gi = same_image_pairs(preds['image_idx'], gts['image_idx'], num_images)
+        iou = box_iou_pairs(preds['boxes'][pi], gts['boxes'][gi])
+        m = iou > iou_thres
+        if m.any():
+            mp, mg, _ = greedy_unique(pi[m], gi[m], iou[m])
+            np.add.at(matrix, (preds['cls'][mp], gts['cls'][mg]), 1)
+            matched_p[mp] = True
+            matched_g[mg] = True
+
+    np.add.at(matrix, (preds['cls'][~matched_p], bg), 1)
+    np.add.at(matrix, (bg, gts['cls'][~matched_g]), 1)
+    return matrix
+
+
+def evaluate(preds, gts, num_images, class_names, conf_thres=0.25, map_conf=0.001, confusion_iou=0.45):
+    """
+    Hitung semua metrik dari prediksi yang sudah di-cache
+
+    Args:
+        preds: Dict image_idx, boxes (xyxy), conf, cls
+        gts: Dict image_idx, boxes (xyxy), cls
+        num_images: Jumlah gambar di split
+        class_names: Nama kelas
+        conf_thres: Threshold conf untuk precision/recall & confusion matrix
+        map_conf: Threshold conf minimal untuk mAP
+
+    Box dengan class id di luar class_names tidak dinilai; jumlahnya dilaporkan
+    di skipped_gt (termasuk gts['skipped'] dari ground_truth_from_index) dan skipped_pred.
+
+    Returns:
+        Dict precision, recall, map50, map, per_class, confusion_matrix, skipped_gt, skipped_pred
+    """
+    nc = len(class_names)
+    preds, skipped_pred = valid_classes(preds, nc)
+    gts, skipped_gt = valid_classes(gts, nc)
+    skipped_gt += int(gts.get('skipped', 0))
+    gt_cls = gts['cls']
+
+    # mAP: semua prediksi >= map_conf (kurva PR lengkap)
+    p_map = filter_predictions(preds, map_conf)
+    correct = match_predictions(p_map, gts, num_images)
+    ap = ap_per_class(correct, p_map['conf'], p_map['cls'], gt_cls, nc)
+
+    # Precision/recall di conf_thres (IoU 0.5)
+    keep = p_map['conf'] >= conf_thres
+    tp50 = correct[keep, 0]
+    kept_cls = p_map['cls'][keep]
+    n_pred = np.bincount(kept_cls, minlength=nc)[:nc]
+    n_tp = np.bincount(kept_cls[tp50], minlength=nc)[:nc]
+    n_gt = np.bincount(gt_cls, minlength=nc)[:nc]
+    precision = n_tp / np.maximum(n_pred, 1)
+    recall = n_tp / np.maximum(n_gt, 1)
+
+    present = n_gt > 0
+    per_class = {
+        name: {
+            'n_gt': int(n_gt[c]),
+            'n_pred': int(n_pred[c]),
+            'precision': round(float(precision[c]), 4),
+            'recall': round(float(recall[c]), 4),
+            'ap50': round(float(ap[c, 0]), 4),
+            'ap50_95': round(float(ap[c].mean()), 4),
+        }
+        for c, name in enumerate(class_names)
+    }
+    mean = lambda v: float(v[present].mean()) if present.any() else 0.0
+    return {
+        'conf_thres': conf_thres,
+        'precision': round(mean(precision), 4),
+        'recall': round(mean(recall), 4),
+        'map50': round(mean(ap[:, 0]), 4),
+        'map50_95': round(mean(ap.mean(axis=1)), 4),
+        'per_class': per_class,
+        'confusion_matrix': confusion_matrix(filter_predictions(preds, conf_thres), gts,
+                                             num_images, nc, confusion_iou).tolist(),
+        'skipped_gt': skipped_gt,
+        'skipped_pred': skipped_pred,
+    }
+
+
+def ground_truth_from_index(label_index, split, image_names, orig_shapes):
+    """
+    Ground truth xyxy (piksel asli) untuk urutan gambar tertentu dari LabelIndex
+
+    Args:
+        label_index: dataset_index.LabelIndex
+        split: Nama split
+        image_names: Nama file gambar (urutan = image_idx)
+        orig_shapes: Array (N, 2) (h, w) gambar asli
+
+    Returns:
+        Dict image_idx, boxes, cls, skipped (box dengan class id di luar class_names)
+    """
+    files, boxes = label_index.files, label_index.boxes
+    code = label_index.splits.index(split)
+    rows = np.nonzero(files['split'] == code)[0]
+    row_to_image = np.full(len(files['stem']), -1, dtype=np.int64)
+    position = {Path(name).stem: i for i, name in enumerate(image_names)}
+    for r in rows:
+        row_to_image[r] = position.get(str(files['stem'][r]), -1)
+
+    image_idx = row_to_image[boxes['file_id']]
+    cls = boxes['cls'].astype(np.int64)
+    bad_class = (cls < 0) | (cls >= len(label_index.class_names))
+    in_split = image_idx >= 0
+    skipped = int((in_split & bad_class).sum())
+    keep = in_split & ~bad_class
+    image_idx = image_idx[keep]
+    h = orig_shapes[image_idx, 0].astype(np.float32)
+    w = orig_shapes[image_idx, 1].astype(np.float32)
+    cx, cy = boxes['cx'][keep] * w, boxes['cy'][keep] * h
+    bw, bh = boxes['w'][keep] * w, boxes['h'][keep] * h
+    return {
+        'image_idx': image_idx.astype(np.int32),
+        'boxes': np.stack([cx - bw / 2, cy - bh / 2, cx + bw / 2, cy + bh / 2], axis=1),
+        'cls': cls[keep],
+        'skipped': skipped,
+    }
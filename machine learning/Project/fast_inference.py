@@ -0,0 +1,560 @@
+"""
+Jalur inferensi CPU yang dioptimasi untuk YOLOv5
+
+Pengganti drop-in untuk `model(image)` AutoShape:
+- eksekusi di bawah torch.inference_mode()
+- tensor channels-last (tanpa copy tambahan dari HWC numpy)
+- fusi Conv+BN dipastikan sebelum dipakai
+- opsional TorchScript (trace + freeze, di-cache ke disk) atau torch.compile
+- letterbox persegi panjang (sisi dibulatkan ke kelipatan stride) seperti
+  AutoShape, jadi frame 4:3 tidak diproses sebagai kotak penuh
+"""
+
+import hashlib
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from types import SimpleNamespace
+
+import cv2  # type: ignore
+import numpy as np  # type: ignore
+import torch  # type: ignore
+import torch.nn as nn  # type: ignore
+import torchvision  # type: ignore
+
+COMPILE_MODES = (None, 'torchscript', 'compile')
+
+# Offset per kelas untuk batched NMS (sama seperti YOLOv5)
+MAX_WH = 7680
+MAX_NMS = 30000
+
+# Rasio (tinggi, lebar) kamera umum yang disiapkan prepare() (satu artefak TorchScript per bentuk input)
+COMMON_ASPECTS = ((1, 1), (3, 4), (4, 3), (9, 16), (16, 9))
+
+# ============================================================
+# PRE / POST PROCESSING
+# ============================================================
+
+def input_shape(shape, size, stride=32):
+    """
+    Bentuk input model (tinggi, lebar) untuk gambar berukuran shape, sama seperti AutoShape
+
+    Sisi terpanjang menjadi `size`, sisi lain mengikuti rasio gambar, lalu
+    keduanya dibulatkan ke atas ke kelipatan stride.
+    """
+    h, w = shape[:2]
+    gain = size / max(h, w)
+    return tuple(int(np.ceil(int(d * gain) / stride) * stride) for d in (h, w))
+
+def letterbox(image, new_shape, color=114, out=None):
+    """
+    Resize dengan rasio tetap lalu padding ke bentuk new_shape
+
+    Args:
+        image: Gambar HWC uint8
+        new_shape: (tinggi, lebar) input model, atau int untuk kotak persegi
+        out: Canvas (tinggi x lebar x 3) yang dipakai ulang (InputPool);
+            hasil resize ditulis langsung ke dalamnya tanpa array sementara
+
+    Returns:
+        canvas: Gambar hasil letterbox (tinggi x lebar x 3)
+        ratio: Skala resize yang dipakai
+        pad: (left, top) padding dalam piksel
+    """
+    if isinstance(new_shape, int):
+        new_shape = (new_shape, new_shape)
+    out_h, out_w = new_shape
+    h, w = image.shape[:2]
+    ratio = min(out_h / h, out_w / w)
+    new_w, new_h = int(round(w * ratio)), int(round(h * ratio))
+
+    left = int(round((out_w - new_w) / 2 - 0.1))
+    top = int(round((out_h - new_h) / 2 - 0.1))
+
+    if out is None:
+        canvas = np.full((out_h, out_w, 3), color, dtype=np.uint8)
+    else:
+        # Canvas dipakai ulang: cukup isi border, bagian tengah ditimpa hasil resize
+        canvas = out
+        canvas[:top] = color
+        canvas[top + new_h:] = color
+        canvas[top:top + new_h, :left] = color
+        canvas[top:top + new_h, left + new_w:] = color
+
+    roi = canvas[top:top + new_h, left:left + new_w]
+    if (new_w, new_h) != (w, h):
+        cv2.resize(image, (new_w, new_h), dst=roi, interpolation=cv2.INTER_LINEAR)
+    else:
+        roi[...] = image
+    return canvas, ratio, (left, top)
+
+def to_tensor(canvas, channels_last=True, out=None):
+    """
+    Konversi gambar HWC uint8 ke tensor float 1x3xHxW (0-1)
+
+    permute() dari HWC sudah menghasilkan layout channels-last,
+    jadi mode channels-last tidak butuh copy tambahan.
+
+    Args:
+        out: Tensor float 1x3xHxW yang dipakai ulang (InputPool)
+    """
+    x = torch.from_numpy(canvas).permute(2, 0, 1).unsqueeze(0)
+    if out is not None:
+        return out.copy_(x).div_(255.0)
+    if not channels_last:
+        x = x.contiguous()
+    return x.float().div_(255.0)
+
+def xywh2xyxy(x):
+    """Konversi box [cx, cy, w, h] ke [x1, y1, x2, y2]"""
+    y = x.clone()
+    y[:, 0] = x[:, 0] - x[:, 2] / 2
+    y[:, 1] = x[:, 1] - x[:, 3] / 2
+    y[:, 2] = x[:, 0] + x[:, 2] / 2
+    y[:, 3] = x[:, 1] + x[:, 3] / 2
+    return y
+
+def nms_candidates(pred, conf_thres=0.25):
+    """
+    Kandidat sebelum NMS untuk satu gambar (single-label)
+
+    Args:
+        pred: Tensor (N, 5 + nc) -> [cx, cy, w, h, obj, cls...]
+
+    Returns:
+        Tensor (K, 6) -> [x1, y1, x2, y2, conf, cls], conf > conf_thres
+    """
+    x = pred[pred[:, 4] > conf_thres]
+    if not x.shape[0]:
+        return torch.zeros((0, 6), device=pred.device)
+
+    scores = x[:, 5:] * x[:, 4:5]
+    conf, j = scores.max(1, keepdim=True)
+    return torch.cat((xywh2xyxy(x[:, :4]), conf, j.float()), 1)[conf.view(-1) > conf_thres]
+
+def nms(candidates, conf_thres=0.25, iou_thres=0.45, max_det=1000):
+    """
+    Filter confidence + batched NMS atas kandidat dari nms_candidates()
+
+    Kandidat yang di-cache dengan conf rendah bisa difilter ulang dengan
+    threshold berbeda tanpa forward pass.
+
+    Returns:
+        Tensor (M, 6) -> [x1, y1, x2, y2, conf, cls]
+    """
+    x = candidates[candidates[:, 4] > conf_thres]
+    if not x.shape[0]:
+        return x
+
+    x = x[x[:, 4].argsort(descending=True)[:MAX_NMS]]
+    offsets = x[:, 5:6] * MAX_WH
+    keep = torchvision.ops.nms(x[:, :4] + offsets, x[:, 4], iou_thres)[:max_det]
+    return x[keep]
+
+def non_max_suppression(pred, conf_thres=0.25, iou_thres=0.45, max_det=1000):
+    """
+    NMS untuk satu gambar (output mentah YOLOv5, single-label)
+
+    Args:
+        pred: Tensor (N, 5 + nc) -> [cx, cy, w, h, obj, cls...]
+
+    Returns:
+        Tensor (M, 6) -> [x1, y1, x2, y2, conf, cls]
+    """
+    return nms(nms_candidates(pred, conf_thres), conf_thres, iou_thres, max_det)
+
+def scale_boxes(det, ratio, pad, shape):
+    """Kembalikan box dari koordinat letterbox ke koordinat gambar asli"""
+    det[:, [0, 2]] -= pad[0]
+    det[:, [1, 3]] -= pad[1]
+    det[:, :4] /= ratio
+    det[:, [0, 2]] = det[:, [0, 2]].clamp(0, shape[1])
+    det[:, [1, 3]] = det[:, [1, 3]].clamp(0, shape[0])
+    return det
+
+# ============================================================
+# HASIL DETEKSI
+# ============================================================
+
+class FastDetections:
+    """
+    Hasil deteksi yang kompatibel dengan `results.pandas().xyxy[i]` YOLOv5
+
+    Args:
+        dets: List tensor (M, 6) per gambar
+        names: Nama kelas model
+        shapes: List shape gambar asli
+    """
+
+    def __init__(self, dets, names, shapes, times=None):
+        self.xyxy = list(dets)
+        self.names = names
+        self.shapes = list(shapes)
+        self.times = times or {}
+
+    def pandas(self):
+        """DataFrame per gambar dengan kolom yang sama seperti YOLOv5 Detections"""
+        import pandas as pd  # type: ignore
+
+        columns = ['xmin', 'ymin', 'xmax', 'ymax', 'confidence', 'class', 'name']
+        frames = []
+        for det in self.xyxy:
+            rows = []
+            for *box, conf, cls in det.tolist():
+                rows.append(box + [conf, int(cls), self.names[int(cls)]])
+            frames.append(pd.DataFrame(rows, columns=columns))
+        return SimpleNamespace(xyxy=frames)
+
+    def __len__(self):
+        return len(self.xyxy)
+
+# ============================================================
+# POOL BUFFER INPUT
+# ============================================================
+
+class InputPool:
+    """
+    Buffer input model yang dipakai ulang antar request: canvas letterbox
+    (uint8 HxWx3) + tensor float 1x3xHxW per bentuk input (tinggi, lebar)
+
+    Jumlah buffer yang dipinjam bersamaan dibatasi `capacity` (peminjam lain
+    menunggu), jadi memori input model tidak tumbuh dengan jumlah request
+    paralel; paling banyak capacity buffer per bentuk yang pernah dipakai.
+    """
+
+    def __init__(self, capacity=4, channels_last=True):
+        self.capacity = max(1, int(capacity))
+        self.channels_last = channels_last
+        self._sem = threading.BoundedSemaphore(self.capacity)
+        self._lock = threading.Lock()
+        self._free = {}
+        self.allocated = 0
+        self.allocated_bytes = 0
+        self.in_use = 0
+        self.peak_in_use = 0
+
+    def _allocate(self, shape):
+        h, w = shape
+        canvas = np.empty((h, w, 3), dtype=np.uint8)
+        tensor = torch.empty((1, 3, h, w), dtype=torch.float32)
+        if self.channels_last:
+            tensor = tensor.contiguous(memory_format=torch.channels_last)
+        with self._lock:
+            self.allocated += 1
+            self.allocated_bytes += canvas.nbytes + tensor.element_size() * tensor.nelement()
+        return canvas, tensor
+
+    @contextmanager
+    def borrow(self, shape):
+        """Pinjam (canvas, tensor) untuk satu bentuk (tinggi, lebar); dikembalikan otomatis"""
+        shape = tuple(shape)
+        self._sem.acquire()
+        try:
+            with self._lock:
+                free = self._free.get(shape)
+                buffers = free.pop() if free else None
+                self.in_use += 1
+                self.peak_in_use = max(self.peak_in_use, self.in_use)
+            if buffers is None:
+                buffers = self._allocate(shape)
+            try:
+                yield buffers
+            finally:
+                with self._lock:
+                    self._free.setdefault(shape, []).append(buffers)
+                    self.in_use -= 1
+        finally:
+            self._sem.release()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'capacity': self.capacity,
+                'in_use': self.in_use,
+                'peak_in_use': self.peak_in_use,
+                'buffers': self.allocated,
+                'mb': round(self.allocated_bytes / (1024 * 1024), 1)
+            }
+
+# ============================================================
+# OPTIMIZED DETECTOR
+# ============================================================
+
+def unwrap_model(hub_model):
+    """
+    Ambil DetectionModel (nn.Module) dari model torch.hub AutoShape
+
+    AutoShape -> DetectMultiBackend -> DetectionModel
+    """
+    backend = getattr(hub_model, 'model', hub_model)
+    if not getattr(backend, 'pt', False):
+        raise ValueError("Optimized CPU mode hanya mendukung model PyTorch (.pt)")
+    return backend.model
+
+def count_batchnorm(module):
+    """Jumlah layer BatchNorm2d yang belum di-fuse"""
+    return sum(isinstance(m, nn.BatchNorm2d) for m in module.modules())
+
+def weights_hash(weights_path):
+    """SHA1 singkat dari file weights (untuk kunci cache artefak)"""
+    h = hashlib.sha1()
+    with open(weights_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()[:12]
+
+class OptimizedDetector:
+    """
+    Pengganti drop-in untuk model AutoShape pada CPU
+
+    Channel warna dipakai apa adanya (sama seperti `model(image)` yang
+    selama ini dipanggil dengan frame BGR), dan bentuk input mengikuti
+    AutoShape (letterbox persegi panjang kelipatan stride), sehingga hasil
+    deteksi setara.
+    """
+
+    def __init__(self, hub_model, img_size=640, channels_last=True,
+                 compile_mode=None, cache_dir=None, weights_path=None, input_pool=None):
+        if compile_mode not in COMPILE_MODES:
+            raise ValueError(f"COMPILE_MODE harus salah satu dari {COMPILE_MODES}. Got: {compile_mode}")
+
+        self.names = hub_model.names
+        self.conf = getattr(hub_model, 'conf', 0.25)
+        self.iou = getattr(hub_model, 'iou', 0.45)
+        self.max_det = getattr(hub_model, 'max_det', 1000)
+        stride = getattr(hub_model, 'stride', 32)
+        self.stride = max(int(stride.max()) if hasattr(stride, 'max') else int(stride), 32)
+        self.img_size = img_size
+        self.channels_last = channels_last
+        self.compile_mode = compile_mode
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.weights_path = weights_path
+        self.input_pool = input_pool
+
+        net = unwrap_model(hub_model).float().eval()
+        if count_batchnorm(net) and hasattr(net, 'fuse'):
+            net = net.fuse()
+        self.fused = count_batchnorm(net) == 0
+        if channels_last:
+            net = net.to(memory_format=torch.channels_last)
+        self.net = net
+
+        self._weights_key = None
+        self._forward_fns = {}
+        self._lock = threading.Lock()
+        self.compiled_path = None
+        if compile_mode == 'compile':
+            self._compiled_net = torch.compile(self.net, dynamic=False)
+
+        # Warmup (juga memicu trace/kompilasi untuk bentuk persegi default)
+        self._forward(to_tensor(np.zeros((img_size, img_size, 3), np.uint8), channels_last))
+
+    @property
+    def forward_fn(self):
+        """Fungsi forward untuk input persegi ukuran default (img_size)"""
+        return self._forward_fn((self.img_size, self.img_size))
+
+    def _forward_fn(self, shape):
+        """
+        Fungsi forward per bentuk input (tinggi, lebar)
+
+        TorchScript hasil trace terikat ke satu bentuk, jadi tiap bentuk
+        punya artefak sendiri. Eager dan torch.compile dipakai bersama.
+        """
+        shape = tuple(shape)
+        fn = self._forward_fns.get(shape)
+        if fn is None:
+            with self._lock:
+                fn = self._forward_fns.get(shape)
+                if fn is None:
+                    if self.compile_mode == 'torchscript':
+                        fn = self._load_or_trace(shape)
+                    elif self.compile_mode == 'compile':
+                        fn = self._compiled_net
+                    else:
+                        fn = self.net
+                    self._forward_fns[shape] = fn
+        return fn
+
+    def input_shape(self, image_shape, size=None):
+        """Bentuk input model untuk gambar berukuran image_shape (lihat input_shape())"""
+        return input_shape(image_shape, size or self.img_size, self.stride)
+
+    def _artifact_path(self, shape):
+        """Path artefak TorchScript di cache, unik per weights/bentuk input/versi torch"""
+        if self._weights_key is None:
+            self._weights_key = weights_hash(self.weights_path) if self.weights_path else 'nohash'
+        layout = 'cl' if self.channels_last else 'cf'
+        torch_ver = torch.__version__.split('+')[0]
+        stem = Path(self.weights_path or 'model').stem
+        h, w = shape
+        return self.cache_dir / f"{stem}-{self._weights_key}-{h}x{w}-{layout}-torch{torch_ver}.torchscript"
+
+    def _load_or_trace(self, shape):
+        """Load TorchScript yang sudah di-cache, atau trace + freeze lalu simpan"""
+        path = self._artifact_path(shape) if self.cache_dir else None
+        if path is not None and path.exists():
+            print(f"[INFO] Loading cached TorchScript: {path}")
+            self.compiled_path = path
+            return torch.jit.load(str(path), map_location='cpu')
+
+        h, w = shape
+        print(f"[INFO] Tracing TorchScript model ({w}x{h})...")
+        example = to_tensor(np.zeros((h, w, 3), np.uint8), self.channels_last)
+        with torch.inference_mode(False), torch.no_grad():
+            traced = torch.jit.trace(self.net, example, strict=False, check_trace=False)
+            traced = torch.jit.freeze(traced.eval())
+
+        if path is not None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix('.tmp')
+            torch.jit.save(traced, str(tmp_path))
+            tmp_path.replace(path)
+            self.compiled_path = path
+            print(f"[INFO] TorchScript cached: {path}")
+        return traced
+
+    def _forward(self, x):
+        """Forward pass mentah, mengembalikan tensor (B, N, 5 + nc)"""
+        fn = self._forward_fn(tuple(x.shape[-2:]))
+        if x.shape[0] != 1 and self.compile_mode == 'torchscript':
+            # Hasil trace terikat ke batch 1; batch lain pakai eager
+            fn = self.net
+        with torch.inference_mode():
+            pred = fn(x)
+        if isinstance(pred, (list, tuple)):
+            pred = pred[0]
+        return pred
+
+    def parameters(self):
+        return self.net.parameters()
+
+    def prepare(self, sizes, aspects=COMMON_ASPECTS):
+        """
+        Siapkan fungsi forward untuk beberapa ukuran sekaligus (trace + simpan
+        artefak TorchScript di cache_dir), mis. saat load model atau promosi
+
+        Args:
+            sizes: Ukuran sisi terpanjang (mis. RESOLUTION_LADDER)
+            aspects: Rasio (tinggi, lebar) gambar yang disiapkan per ukuran
+
+        Returns:
+            List path artefak TorchScript (kosong untuk mode lain)
+        """
+        shapes = sorted({self.input_shape(aspect, size) for size in sizes for aspect in aspects})
+        paths = []
+        for shape in shapes:
+            self._forward_fn(shape)
+            if self.compile_mode == 'torchscript' and self.cache_dir:
+                paths.append(self._artifact_path(shape))
+        return paths
+
+    def candidates(self, image, size=None, conf_floor=0.001):
+        """
+        Kandidat pre-NMS satu gambar (koordinat letterbox) untuk di-cache
+
+        Returns:
+            candidates: Tensor (K, 6) dengan conf > conf_floor
+            letterbox_info: (ratio, pad, shape) untuk scale_boxes()
+        """
+        shape = self.input_shape(image.shape, size)
+        if self.input_pool is not None:
+            # Canvas & tensor input dipinjam dari pool, tidak dialokasikan per request
+            with self.input_pool.borrow(shape) as (canvas, tensor):
+                _, ratio, pad = letterbox(image, shape, out=canvas)
+                pred = self._forward(to_tensor(canvas, self.channels_last, out=tensor))
+        else:
+            canvas, ratio, pad = letterbox(image, shape)
+            x = to_tensor(canvas, self.channels_last)
+            if self.channels_last:
+                x = x.contiguous(memory_format=torch.channels_last)
+            pred = self._forward(x)
+        with torch.inference_mode():
+            return nms_candidates(pred[0], conf_floor), (ratio, pad, image.shape)
+
+    def __call__(self, images, size=None):
+        """
+        Deteksi pada satu gambar HWC uint8 atau list gambar (satu forward batch)
+
+        Args:
+            images: Gambar input atau list gambar
+            size: Sisi terpanjang input model (default: img_size); satu batch
+                memakai bentuk terbesar dari semua gambar, seperti AutoShape
+
+        Returns:
+            FastDetections: Hasil dengan API `pandas().xyxy[i]`
+        """
+        if not isinstance(images, (list, tuple)):
+            images = [images]
+        t0 = time.perf_counter()
+        shape = tuple(np.max([self.input_shape(image.shape, size) for image in images], axis=0).tolist())
+        letterboxed = [letterbox(image, shape) for image in images]
+        x = torch.cat([to_tensor(canvas, self.channels_last) for canvas, _, _ in letterboxed])
+        if self.channels_last:
+            x = x.contiguous(memory_format=torch.channels_last)
+        t1 = time.perf_counter()
+
+        pred = self._forward(x)
+        t2 = time.perf_counter()
+
+        dets = []
+        with torch.inference_mode():
+            for i, (image, (_, ratio, pad)) in enumerate(zip(images, letterboxed)):
+                det = non_max_suppression(pred[i], self.conf, self.iou, self.max_det)
+                dets.append(scale_boxes(det, ratio, pad, image.shape))
+        t3 = time.perf_counter()
+
+        times = {
+            'preprocess_ms': (t1 - t0) * 1000,
+            'inference_ms': (t2 - t1) * 1000,
+            'postprocess_ms': (t3 - t2) * 1000
+        }
+        return FastDetections(dets, self.names, [image.shape for image in images], times)
+
+def optimize_model(hub_model, weights_path=None, img_size=640, channels_last=True,
+                   compile_mode=None, cache_dir=None, input_pool=None):
+    """
+    Bungkus model AutoShape dengan OptimizedDetector
+
+    Jika optimasi gagal (mis. backend bukan .pt), model asli dikembalikan
+    supaya deteksi tetap berjalan.
+    """
+    try:
+        detector = OptimizedDetector(hub_model, img_size=img_size, channels_last=channels_last,
+                                     compile_mode=compile_mode, cache_dir=cache_dir,
+                                     weights_path=weights_path, input_pool=input_pool)
+        print(f"[INFO] Optimized CPU mode aktif (img={img_size}, channels_last={channels_last}, "
+              f"fused={detector.fused}, compile={compile_mode})")
+        return detector
+    except Exception as e:
+        print(f"[WARNING] Optimized CPU mode gagal, pakai model bawaan: {e}")
+        return hub_model
+
+# ============================================================
+# BENCHMARK
+# ============================================================
+
+def benchmark(fn, image, runs=30, warmup=5):
+    """
+    Ukur latency fn(image) dalam milidetik
+
+    Returns:
+        dict: mean, p50, p95, min (ms)
+    """
+    for _ in range(warmup):
+        fn(image)
+
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn(image)
+        times.append((time.perf_counter() - start) * 1000)
+
+    times = np.array(times)
+    return {
+        'mean': float(times.mean()),
+        'p50': float(np.percentile(times, 50)),
+        'p95': float(np.percentile(times, 95)),
+        'min': float(times.min())
+    }
@@ -0,0 +1,519 @@
+"""
+Mode folder untuk upload GUI: inferensi batch + grid thumbnail virtual
+
+- FolderBatchProcessor: decode gambar di thread pool, inferensi per batch di
+  satu thread, hasil (jumlah & bbox saja, tanpa piksel) dikirim lewat queue
+- ThumbnailGrid: canvas yang hanya menggambar sel yang terlihat; thumbnail
+  di-decode on-demand di background dan disimpan di cache LRU terbatas
+
+Memori tetap datar berapapun jumlah gambar: yang disimpan per gambar hanya
+record kecil, piksel hanya untuk batch yang sedang diproses dan cache thumbnail.
+"""
+
+import csv
+import queue
+import threading
+import time
+import tkinter as tk
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import cv2  # type: ignore
+from PIL import Image, ImageTk  # type: ignore
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+# Label pendek untuk caption grid (huruf pertama Muda & Matang sama)
+SHORT_LABELS = {'Primordia': 'P', 'Muda': 'Md', 'Matang': 'Mt'}
+
+
+def list_images(folder):
+    """Daftar file gambar di folder (rekursif, urut nama)"""
+    return sorted(p for p in Path(folder).rglob('*') if p.suffix.lower() in IMAGE_EXTENSIONS)
+
+
+def summarize_detections(detections, class_names, harvest_estimation):
+    """
+    Ringkas deteksi satu gambar
+
+    Returns:
+        counts: Dict kelas -> jumlah
+        next_harvest_days: Estimasi hari panen terdekat (None jika tidak ada deteksi)
+    """
+    counts = {name: 0 for name in class_names}
+    for det in detections:
+        counts[det['class']] = counts.get(det['class'], 0) + 1
+    days = [harvest_estimation.get(det['class'], 0) for det in detections]
+    return counts, (min(days) if days else None)
+
+
+def export_summary_csv(records, output_path, class_names):
+    """
+    Simpan ringkasan per gambar ke CSV
+
+    Args:
+        records: List record (None = belum diproses, dilewati)
+        output_path: Path file CSV
+        class_names: Urutan kolom kelas
+    """
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    extra = sorted({cls for rec in records if rec for cls in rec['counts']} - set(class_names))
+    fields = ['filename', 'path'] + list(class_names) + extra + ['total', 'next_harvest_days', 'error']
+    with open(output_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        for rec in records:
+            if rec is None:
+                continue
+            writer.writerow({
+                'filename': Path(rec['path']).name,
+                'path': rec['path'],
+                **{cls: rec['counts'].get(cls, 0) for cls in list(class_names) + extra},
+                'total': len(rec['detections']),
+                'next_harvest_days': '' if rec['next_harvest_days'] is None else rec['next_harvest_days'],
+                'error': rec['error'] or ''
+            })
+    return output_path
+
+
+class FolderBatchProcessor:
+    """
+    Proses daftar gambar dengan decode paralel dan inferensi batch
+
+    Decode batch berikutnya berjalan di pool selama batch sekarang diinferensi,
+    jadi paling banyak dua batch gambar penuh ada di memori.
+
+    Args:
+        paths: List path gambar
+        infer_batch_fn: Fungsi list gambar BGR -> list deteksi per gambar
+        class_names: Nama kelas untuk counts
+        harvest_estimation: Dict kelas -> hari panen
+        batch_size: Gambar per forward batch
+        workers: Thread decode
+    """
+
+    def __init__(self, paths, infer_batch_fn, class_names, harvest_estimation,
+                 batch_size=8, workers=4):
+        self.paths = [str(p) for p in paths]
+        self.infer_batch_fn = infer_batch_fn
+        self.class_names = class_names
+        self.harvest_estimation = harvest_estimation
+        self.batch_size = max(1, int(batch_size))
+        self.workers = max(1, int(workers))
+        self.results = queue.Queue()
+        self.processed = 0
+        self.failed = 0
+        self.error = None
+
+        self._running = False
+        self._thread = None
+        self._started_at = 0.0
+
+    def start(self):
+        self._running = True
+        self._started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="folder-batch", daemon=True)
+        self._thread.start()
+        return self
+
+    @staticmethod
+    def _load(path):
+        return cv2.imread(path)
+
+    def _submit(self, pool, start):
+        chunk = range(start, min(start + self.batch_size, len(self.paths)))
+        return [(i, pool.submit(self._load, self.paths[i])) for i in chunk]
+
+    def _record(self, index, image, detections, error=None):
+        counts, next_days = summarize_detections(detections, self.class_names, self.harvest_estimation)
+        h, w = image.shape[:2] if image is not None else (0, 0)
+        return {
+            'index': index,
+            'path': self.paths[index],
+            'width': w,
+            'height': h,
+            'counts': counts,
+            'detections': [
+                {'class': d['class'], 'confidence': float(d['confidence']),
+                 'bbox': tuple(int(v) for v in d['bbox'])}
+                for d in detections
+            ],
+            'next_harvest_days': next_days,
+            'error': error
+        }
+
+    def _run(self):
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="folder-decode") as pool:
+            upcoming = self._submit(pool, 0)
+            start = 0
+            while upcoming and self._running:
+                current = upcoming
+                start += self.batch_size
+                upcoming = self._submit(pool, start) if start < len(self.paths) else []
+
+                loaded = [(i, future.result()) for i, future in current]
+                for i, image in loaded:
+                    if image is None:
+                        self.failed += 1
+                        self.results.put(self._record(i, None, [], error="unreadable"))
+                valid = [(i, image) for i, image in loaded if image is not None]
+                if not valid:
+                    continue
+
+                try:
+                    batch_detections = self.infer_batch_fn([image for _, image in valid])
+                except Exception as e:
+                    self.error = e
+                    print(f"❌ Folder batch error: {e}")
+                    break
+
+                for (i, image), detections in zip(valid, batch_detections):
+                    self.results.put(self._record(i, image, detections))
+                self.processed += len(valid)
+
+            for _, future in upcoming:
+                future.cancel()
+        self._running = False
+
+    @property
+    def running(self):
+        return self._running
+
+    @property
+    def rate(self):
+        """Gambar per detik sejak mulai"""
+        elapsed = time.perf_counter() - self._started_at
+        return self.processed / elapsed if elapsed > 0 else 0.0
+
+    def stop(self, wait=True):
+        """Hentikan setelah batch yang sedang berjalan; wait=False agar tidak menahan UI"""
+        self._running = False
+        if wait and self._thread is not None:
+            self._thread.join(timeout=5.0)
+
+
+def make_thumbnail(record, size, class_colors):
+    """
+    Decode gambar dalam resolusi kecil, gambar bbox, dan resize ke thumbnail
+
+    Returns:
+        Array RGB (atau None jika gagal dibaca)
+    """
+    # Decode tereduksi (libjpeg scaling) jika gambar jauh lebih besar dari thumbnail
+    longest = max(record['width'], record['height'])
+    flag = cv2.IMREAD_COLOR
+    for reduce, reduced_flag in ((8, cv2.IMREAD_REDUCED_COLOR_8), (4, cv2.IMREAD_REDUCED_COLOR_4),
+                                 (2, cv2.IMREAD_REDUCED_COLOR_2)):
+        if longest >= size * reduce:
+            flag = reduced_flag
+            break
+    image = cv2.imread(record['path'], flag)
+    if image is None:
+        return None
+
+    h, w = image.shape[:2]
+    sx = w / record['width'] if record['width'] else 1.0
+    sy = h / record['height'] if record['height'] else 1.0
+    for det in record['detections']:
+        x1, y1, x2, y2 = det['bbox']
+        color = class_colors.get(det['class'], (255, 255, 255))
+        cv2.rectangle(image, (int(x1 * sx), int(y1 * sy)), (int(x2 * sx), int(y2 * sy)), color, 2)
+
+    scale = size / max(h, w)
+    image = cv2.resize(image, (max(1, int(w * scale)), max(1, int(h * scale))), interpolation=cv2.INTER_AREA)
+    return cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+
+
+class ThumbnailGrid(tk.Frame):
+    """
+    Grid thumbnail virtual: hanya sel yang terlihat yang digambar/di-decode
+
+    Args:
+        parent: Widget parent
+        paths: List path gambar (urutan sel)
+        records: List record (None = belum diproses); di-update oleh pemilik
+        thumb_size: Ukuran thumbnail (px)
+        cache_size: Jumlah PhotoImage di cache LRU
+        class_colors: Warna bbox per kelas (BGR)
+        on_open: Callback(record) saat sel di-double-click
+    """
+
+    PADDING = 8
+    LABEL_H = 36
+
+    def __init__(self, parent, paths, records, thumb_size=160, cache_size=200, class_colors=None, on_open=None):
+        super().__init__(parent, bg='#1a1a1a')
+        self.paths = paths
+        self.records = records
+        self.thumb_size = thumb_size
+        self.cache_size = cache_size
+        self.class_colors = class_colors or {}
+        self.on_open = on_open
+        self.cell_w = thumb_size + self.PADDING * 2
+        self.cell_h = thumb_size + self.LABEL_H + self.PADDING * 2
+        self.cols = 1
+
+        self.canvas = tk.Canvas(self, bg='#000000', highlightthickness=0)
+        scrollbar = tk.Scrollbar(self, orient='vertical', command=self._on_scroll)
+        self.canvas.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side='right', fill='y')
+        self.canvas.pack(side='left', fill='both', expand=True)
+
+        self._drawn = set()
+        self._visible = frozenset()
+        self._cache = OrderedDict()  # index -> PhotoImage
+        self._pending = set()
+        self._futures = set()  # Job thumbnail yang belum selesai (dibatalkan saat close)
+        self._loaded = queue.Queue()
+        self._loader = ThreadPoolExecutor(max_workers=2, thread_name_prefix="thumbnail")
+        self._closed = False
+
+        self.canvas.bind('<Configure>', lambda e: self.layout())
+        self.canvas.bind('<MouseWheel>', self._on_wheel)
+        self.canvas.bind('<Button-4>', lambda e: self._scroll_units(-1))
+        self.canvas.bind('<Button-5>', lambda e: self._scroll_units(1))
+        self.canvas.bind('<Double-Button-1>', self._on_double_click)
+        self.after(50, self._poll_loaded)
+
+    # ---------------- Layout & scroll ----------------
+
+    def layout(self):
+        """Hitung ulang jumlah kolom dan scroll region, lalu gambar ulang"""
+        width = max(self.canvas.winfo_width(), self.cell_w)
+        cols = max(1, width // self.cell_w)
+        rows = (len(self.records) + cols - 1) // cols
+        if cols != self.cols:
+            self.cols = cols
+            self.canvas.delete('all')
+            self._drawn.clear()
+        self.canvas.configure(scrollregion=(0, 0, width, rows * self.cell_h))
+        self.refresh()
+
+    def _on_scroll(self, *args):
+        self.canvas.yview(*args)
+        self.refresh()
+
+    def _scroll_units(self, units):
+        self.canvas.yview_scroll(units, 'units')
+        self.refresh()
+
+    def _on_wheel(self, event):
+        self._scroll_units(-1 if event.delta > 0 else 1)
+
+    def _index_at(self, x, y):
+        col = int(self.canvas.canvasx(x) // self.cell_w)
+        row = int(self.canvas.canvasy(y) // self.cell_h)
+        index = row * self.cols + col
+        return index if col < self.cols and 0 <= index < len(self.records) else None
+
+    def _on_double_click(self, event):
+        index = self._index_at(event.x, event.y)
+        if index is not None and self.records[index] is not None and self.on_open:
+            self.on_open(self.records[index])
+
+    # ---------------- Drawing ----------------
+
+    def visible_range(self):
+        """Index sel yang terlihat (plus satu baris buffer atas/bawah)"""
+        top = self.canvas.canvasy(0)
+        bottom = top + self.canvas.winfo_height()
+        first_row = max(0, int(top // self.cell_h) - 1)
+        last_row = int(bottom // self.cell_h) + 1
+        return range(first_row * self.cols, min(len(self.records), (last_row + 1) * self.cols))
+
+    def refresh(self):
+        """Gambar sel yang baru terlihat, hapus sel yang keluar layar"""
+        visible = set(self.visible_range())
+        self._visible = frozenset(visible)
+        for index in self._drawn - visible:
+            self.canvas.delete(f"cell{index}")
+        for index in sorted(visible - self._drawn):
+            self._draw_cell(index)
+        self._drawn = visible
+
+    def update_cell(self, index):
+        """Gambar ulang satu sel (jika terlihat) setelah record-nya berubah"""
+        if index in self._drawn:
+            self.canvas.delete(f"cell{index}")
+            self._draw_cell(index)
+
+    def _draw_cell(self, index):
+        row, col = divmod(index, self.cols)
+        x = col * self.cell_w + self.PADDING
+        y = row * self.cell_h + self.PADDING
+        tag = f"cell{index}"
+        record = self.records[index]
+
+        self.canvas.create_rectangle(x, y, x + self.thumb_size, y + self.thumb_size,
+                                     fill='#2d2d2d', outline='', tags=tag)
+        photo = self._cache.get(index)
+        if photo is not None:
+            self._cache.move_to_end(index)
+            self.canvas.create_image(x + self.thumb_size // 2, y + self.thumb_size // 2,
+                                     image=photo, tags=tag)
+        elif record is not None and not record['error']:
+            self._request_thumbnail(index)
+
+        if record is None:
+            caption, color = "⏳ menunggu...", '#888888'
+        elif record['error']:
+            caption, color = f"❌ {record['error']}", '#F44336'
+        else:
+            counts = " ".join(f"{SHORT_LABELS.get(cls, cls[:3])}:{n}" for cls, n in record['counts'].items())
+            caption, color = f"{len(record['detections'])} jamur | {counts}", '#4CAF50'
+        name = Path(self.paths[index]).name
+        self.canvas.create_text(x, y + self.thumb_size + 4, anchor='nw', width=self.thumb_size,
+                                text=f"{name[:22]}\n{caption}", fill=color,
+                                font=('Arial', 8), tags=tag)
+
+    # ---------------- Thumbnail loading ----------------
+
+    def _request_thumbnail(self, index):
+        if index in self._pending or self._closed:
+            return
+        self._pending.add(index)
+        future = self._loader.submit(self._load_thumbnail, index, self.records[index])
+        self._futures.add(future)
+        future.add_done_callback(self._futures.discard)
+
+    def _load_thumbnail(self, index, record):
+        # Lewati jika sel sudah tidak terlihat saat giliran decode tiba (scroll cepat)
+        if index not in self._visible:
+            self._loaded.put((index, None))
+            return
+        try:
+            self._loaded.put((index, make_thumbnail(record, self.thumb_size, self.class_colors)))
+        except Exception as e:
+            print(f"❌ Thumbnail error ({record['path']}): {e}")
+            self._loaded.put((index, None))
+
+    def _poll_loaded(self):
+        """Ubah array thumbnail jadi PhotoImage di Tk main thread"""
+        if self._closed:
+            return
+        while True:
+            try:
+                index, array = self._loaded.get_nowait()
+            except queue.Empty:
+                break
+            self._pending.discard(index)
+            if array is None:
+                continue
+            self._cache[index] = ImageTk.PhotoImage(Image.fromarray(array))
+            self._cache.move_to_end(index)
+            while len(self._cache) > self.cache_size:
+                evicted, _ = self._cache.popitem(last=False)
+                if evicted in self._drawn:
+                    # Masih terlihat: gambar ulang tanpa gambar (akan diminta lagi)
+                    self.canvas.delete(f"cell{evicted}")
+                    self._drawn.discard(evicted)
+            self.update_cell(index)
+        self.after(50, self._poll_loaded)
+
+    def close(self):
+        self._closed = True
+        # shutdown(cancel_futures=True) baru ada di Python 3.9
+        for future in list(self._futures):
+            future.cancel()
+        self._loader.shutdown(wait=False)
+        self._cache.clear()
+
+
+class FolderBatchWindow(tk.Toplevel):
+    """
+    Window mode folder: progress, grid thumbnail, dan export CSV
+
+    Args:
+        parent: Root Tk
+        folder: Folder gambar
+        infer_batch_fn: Fungsi list gambar -> list deteksi
+        on_open: Callback(record) saat thumbnail di-double-click
+    """
+
+    def __init__(self, parent, folder, infer_batch_fn, class_names, class_colors, harvest_estimation,
+                 batch_size=8, workers=4, thumb_size=160, cache_size=200, summary_dir="output/uploads",
+                 on_open=None):
+        super().__init__(parent)
+        self.folder = Path(folder)
+        self.class_names = class_names
+        self.summary_dir = Path(summary_dir)
+        self.title(f"🍄 Folder Mode - {self.folder.name}")
+        self.geometry("1000x750")
+        self.configure(bg='#1a1a1a')
+
+        paths = list_images(self.folder)
+        self.records = [None] * len(paths)
+        self.summary_path = None
+
+        # Header: progress dan tombol
+        header = tk.Frame(self, bg='#2d2d2d')
+        header.pack(fill='x', padx=10, pady=10)
+        self.progress_var = tk.StringVar(value=f"0/{len(paths)} gambar")
+        tk.Label(header, textvariable=self.progress_var, bg='#2d2d2d', fg='#4CAF50',
+                 font=('Arial', 11)).pack(side='left', padx=10, pady=8)
+        tk.Button(header, text="💾 Export CSV", bg='#FF9800', fg='white', font=('Arial', 10),
+                  command=self.export_csv).pack(side='right', padx=5, pady=5)
+        self.stop_btn = tk.Button(header, text="⏹ Stop", bg='#F44336', fg='white', font=('Arial', 10),
+                                  command=self.stop)
+        self.stop_btn.pack(side='right', padx=5, pady=5)
+
+        self.grid_view = ThumbnailGrid(self, paths, self.records, thumb_size=thumb_size, cache_size=cache_size,
+                                       class_colors=class_colors, on_open=on_open)
+        self.grid_view.pack(fill='both', expand=True, padx=10, pady=(0, 10))
+
+        self.processor = FolderBatchProcessor(paths, infer_batch_fn, class_names, harvest_estimation,
+                                              batch_size=batch_size, workers=workers).start()
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.after(100, self._poll_results)
+
+    def _poll_results(self):
+        """Masukkan hasil baru ke grid; export CSV otomatis setelah selesai"""
+        done = 0
+        while True:
+            try:
+                record = self.processor.results.get_nowait()
+            except queue.Empty:
+                break
+            self.records[record['index']] = record
+            self.grid_view.update_cell(record['index'])
+            done += 1
+
+        total = len(self.records)
+        finished = sum(rec is not None for rec in self.records)
+        self.progress_var.set(f"{finished}/{total} gambar | {self.processor.rate:.1f} img/s"
+                              + (f" | {self.processor.failed} gagal" if self.processor.failed else ""))
+
+        if self.processor.running or done:
+            self.after(100, self._poll_results)
+            return
+
+        self.stop_btn.config(state='disabled')
+        if self.processor.error is not None:
+            self.progress_var.set(f"❌ Error: {self.processor.error}")
+        self.summary_path = self.export_csv(auto=True)
+        if self.summary_path:
+            self.progress_var.set(self.progress_var.get() + f" | CSV: {self.summary_path.name}")
+
+    def export_csv(self, auto=False):
+        """Export ringkasan ke FOLDER_SUMMARY_DIR (otomatis) atau path pilihan user"""
+        if auto:
+            stamp = time.strftime('%Y%m%d_%H%M%S')
+            path = self.summary_dir / f"batch_{self.folder.name}_{stamp}.csv"
+        else:
+            from tkinter import filedialog
+            path = filedialog.asksaveasfilename(parent=self, defaultextension='.csv',
+                                                initialfile=f"batch_{self.folder.name}.csv",
+                                                filetypes=[("CSV", "*.csv")])
+            if not path:
+                return None
+        return export_summary_csv(self.records, path, self.class_names)
+
+    def stop(self):
+        self.processor.stop(wait=False)
+
+    def on_close(self):
+        self.processor.stop(wait=False)
+        self.grid_view.close()
+        self.destroy()
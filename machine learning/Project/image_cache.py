@@ -0,0 +1,255 @@
+"""
+Cache gambar pre-letterbox dalam array uint8 memory-mapped
+
+Setiap split di-letterbox SEKALI ke IMG_SIZE dan disimpan sebagai file .npy
+(N x S x S x 3, BGR) plus sidecar index (.npz) berisi nama file, ukuran asli,
+rasio & padding letterbox, serta mtime/size sumber.
+
+Pembaca memakai np.load(mmap_mode) sehingga batch adalah view langsung ke
+page cache OS tanpa decode/resize/copy. Cache tidak valid jika ukuran target
+atau daftar/mtime/size gambar sumber berubah; saat rebuild, baris yang
+sumbernya tidak berubah disalin dari cache lama tanpa decode ulang.
+
+Dipakai oleh evaluasi (evaluation, 4_test_model, model_registry). Training
+tetap lewat yolov5/train.py dengan cache bawaannya (--cache ram/disk, dipilih
+training_launcher), karena dataloader YOLOv5 tidak bisa diganti dari luar.
+"""
+
+import hashlib
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import cv2  # type: ignore
+import numpy as np  # type: ignore
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+CACHE_VERSION = 1
+PAD_COLOR = 114
+
+
+def letterbox_into(image, out, color=PAD_COLOR):
+    """
+    Letterbox gambar langsung ke buffer out (S x S x 3), tanpa canvas sementara
+
+    Pembulatan sama dengan fast_inference.letterbox.
+
+    Returns:
+        ratio: Skala resize
+        pad: (left, top) padding dalam piksel
+    """
+    size = out.shape[0]
+    h, w = image.shape[:2]
+    ratio = min(size / h, size / w)
+    new_w, new_h = int(round(w * ratio)), int(round(h * ratio))
+    left = int(round((size - new_w) / 2 - 0.1))
+    top = int(round((size - new_h) / 2 - 0.1))
+
+    if (new_w, new_h) != (w, h):
+        image = cv2.resize(image, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+    out[...] = color
+    out[top:top + new_h, left:left + new_w] = image
+    return ratio, (left, top)
+
+
+def list_split_images(dataset_dir, split):
+    """Gambar di dataset/{split}/images (urut nama)"""
+    folder = Path(dataset_dir) / split / "images"
+    if not folder.is_dir():
+        return []
+    return sorted(p for p in folder.iterdir() if p.suffix.lower() in IMAGE_EXTENSIONS)
+
+
+def source_fingerprint(paths, img_size):
+    """
+    Fingerprint sumber: ukuran target + (nama, mtime, size) semua gambar
+
+    Returns:
+        fingerprint: Hex digest
+        stats: Array (N, 2) int64 mtime_ns dan size per gambar
+    """
+    stats = np.zeros((len(paths), 2), dtype=np.int64)
+    digest = hashlib.blake2b(f"v{CACHE_VERSION}:{img_size}".encode(), digest_size=16)
+    for i, path in enumerate(paths):
+        st = os.stat(path)
+        stats[i] = (st.st_mtime_ns, st.st_size)
+        digest.update(f"{path.name}:{st.st_mtime_ns}:{st.st_size}\n".encode())
+    return digest.hexdigest(), stats
+
+
+class ImageCache:
+    """
+    Cache letterbox satu split (read-only, memory-mapped)
+
+    Attributes:
+        images: Array (N, S, S, 3) uint8 BGR (memmap)
+        names: Nama file gambar
+        orig_shapes: Array (N, 2) (h, w) asli
+        ratios: Array (N,) skala letterbox
+        pads: Array (N, 2) (left, top)
+    """
+
+    def __init__(self, images_path, index_path, mmap_mode='r'):
+        self.images_path = Path(images_path)
+        self.index_path = Path(index_path)
+        self.images = np.load(self.images_path, mmap_mode=mmap_mode)
+        with np.load(self.index_path, allow_pickle=False) as meta:
+            self.names = meta['names'].tolist()
+            self.orig_shapes = meta['orig_shapes']
+            self.ratios = meta['ratios']
+            self.pads = meta['pads']
+            self.stats = meta['stats']
+            self.valid = meta['valid']
+            self.img_size = int(meta['img_size'])
+            self.fingerprint = str(meta['fingerprint'])
+
+    def __len__(self):
+        return len(self.names)
+
+    def __getitem__(self, index):
+        """View (S, S, 3) tanpa copy"""
+        return self.images[index]
+
+    def batches(self, batch_size):
+        """
+        Iterasi batch berurutan sebagai view memmap
+
+        Yields:
+            (start, stop, array (B, S, S, 3))
+        """
+        for start in range(0, len(self), batch_size):
+            stop = min(start + batch_size, len(self))
+            yield start, stop, self.images[start:stop]
+
+    def to_original(self, boxes, index):
+        """
+        Ubah box xyxy di koordinat letterbox ke koordinat gambar asli
+
+        Args:
+            boxes: Array (M, 4+) xyxy piksel letterbox (kolom lain dibiarkan)
+            index: Index gambar
+        """
+        boxes = np.array(boxes, dtype=np.float32, copy=True)
+        left, top = self.pads[index]
+        h, w = self.orig_shapes[index]
+        boxes[:, [0, 2]] = ((boxes[:, [0, 2]] - left) / self.ratios[index]).clip(0, w)
+        boxes[:, [1, 3]] = ((boxes[:, [1, 3]] - top) / self.ratios[index]).clip(0, h)
+        return boxes
+
+    @staticmethod
+    def paths(cache_dir, split, img_size):
+        base = Path(cache_dir) / f"{split}_{img_size}"
+        return base.with_suffix(".npy"), base.with_name(base.name + "_index.npz")
+
+    @classmethod
+    def open(cls, cache_dir, dataset_dir, split, img_size, mmap_mode='r'):
+        """
+        Buka cache jika masih valid untuk sumber & ukuran sekarang
+
+        Returns:
+            ImageCache atau None (tidak ada / kadaluarsa)
+        """
+        images_path, index_path = cls.paths(cache_dir, split, img_size)
+        if not images_path.exists() or not index_path.exists():
+            return None
+        cache = cls(images_path, index_path, mmap_mode=mmap_mode)
+        fingerprint, _ = source_fingerprint(list_split_images(dataset_dir, split), img_size)
+        return cache if cache.fingerprint == fingerprint else None
+
+    @classmethod
+    def build(cls, cache_dir, dataset_dir, split, img_size, workers=4):
+        """
+        Bangun (atau perbarui) cache satu split
+
+        Returns:
+            cache: ImageCache
+            report: Dict jumlah gambar reused/decoded/failed dan waktu
+        """
+        start = time.perf_counter()
+        paths = list_split_images(dataset_dir, split)
+        fingerprint, stats = source_fingerprint(paths, img_size)
+        images_path, index_path = cls.paths(cache_dir, split, img_size)
+        images_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Cache lama (ukuran sama) untuk menyalin baris yang sumbernya tidak berubah
+        old = None
+        if images_path.exists() and index_path.exists():
+            try:
+                old = cls(images_path, index_path)
+            except Exception:
+                old = None
+            if old is not None and old.fingerprint == fingerprint:
+                return old, {'reused': len(old), 'decoded': 0, 'failed': int((~old.valid).sum()),
+                             'seconds': time.perf_counter() - start}
+        previous = {}
+        if old is not None and old.img_size == img_size:
+            previous = {name: i for i, name in enumerate(old.names)}
+
+        n = len(paths)
+        tmp_images = images_path.with_name(images_path.stem + ".tmp.npy")
+        out = np.lib.format.open_memmap(tmp_images, mode='w+', dtype=np.uint8,
+                                        shape=(n, img_size, img_size, 3))
+        orig_shapes = np.zeros((n, 2), dtype=np.int32)
+        ratios = np.zeros(n, dtype=np.float32)
+        pads = np.zeros((n, 2), dtype=np.int32)
+        valid = np.ones(n, dtype=bool)
+        report = {'reused': 0, 'decoded': 0, 'failed': 0}
+
+        to_decode = []
+        for i, path in enumerate(paths):
+            j = previous.get(path.name)
+            if j is not None and old.valid[j] and tuple(old.stats[j]) == tuple(stats[i]):
+                out[i] = old.images[j]
+                orig_shapes[i], ratios[i], pads[i] = old.orig_shapes[j], old.ratios[j], old.pads[j]
+                report['reused'] += 1
+            else:
+                to_decode.append(i)
+
+        def decode(i):
+            image = cv2.imread(str(paths[i]))
+            if image is None:
+                out[i] = PAD_COLOR
+                return i, None, 0.0, (0, 0)
+            ratio, pad = letterbox_into(image, out[i])
+            return i, image.shape[:2], ratio, pad
+
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            for i, shape, ratio, pad in pool.map(decode, to_decode):
+                if shape is None:
+                    valid[i] = False
+                    report['failed'] += 1
+                    continue
+                orig_shapes[i], ratios[i], pads[i] = shape, ratio, pad
+                report['decoded'] += 1
+
+        out.flush()
+        # Lepas memmap baru (pool sudah selesai); `del` tidak bisa dipakai
+        # karena `out` juga direferensikan closure decode()
+        out = None
+        if old is not None:
+            # Lepas memmap lama sebelum file-nya diganti (wajib di Windows)
+            del old.images
+            old = None
+
+        tmp_index = index_path.with_name(index_path.stem + ".tmp.npz")
+        np.savez(tmp_index, version=np.int32(CACHE_VERSION), img_size=np.int32(img_size),
+                 fingerprint=np.array(fingerprint), names=np.array([p.name for p in paths], dtype=str),
+                 orig_shapes=orig_shapes, ratios=ratios, pads=pads, stats=stats, valid=valid)
+        os.replace(tmp_images, images_path)
+        os.replace(tmp_index, index_path)
+
+        report['seconds'] = time.perf_counter() - start
+        return cls(images_path, index_path), report
+
+
+def open_or_build(cache_dir, dataset_dir, split, img_size, workers=4):
+    """Buka cache yang valid, atau bangun ulang jika tidak ada/kadaluarsa"""
+    cache = ImageCache.open(cache_dir, dataset_dir, split, img_size)
+    if cache is not None:
+        return cache
+    cache, report = ImageCache.build(cache_dir, dataset_dir, split, img_size, workers=workers)
+    print(f"[CACHE] {split} @ {img_size}: reused {report['reused']} | decoded {report['decoded']} | "
+          f"gagal {report['failed']} ({report['seconds']:.1f} s)")
+    return cache
+
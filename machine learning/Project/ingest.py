@@ -0,0 +1,351 @@
+"""
+Ingestion request gambar dengan memori terbatas untuk ML service
+
+- Body request dibaca streaming ke buffer yang dipakai ulang (tidak ada salinan
+  body sebagai str/bytes per request); ukuran dibatasi MAX_UPLOAD_MB (413)
+- JSON /detect: nilai "image" (base64) tidak di-parse menjadi str Python;
+  posisinya dicari di buffer, field lain di-parse tanpa gambar, lalu base64
+  di-decode per potongan langsung ke buffer kedua
+- Multipart /detect/upload: file dibaca streaming ke buffer body (batas penuh MAX_UPLOAD_MB)
+- Dimensi gambar dicek dari header sebelum decode (tolak gambar raksasa)
+- Jumlah slot (pasangan buffer body + decode) dibatasi; request berikutnya
+  menunggu slot sehingga memori ingestion tidak tumbuh dengan jumlah request
+"""
+
+import binascii
+import io
+import json
+import os
+import queue
+import sys
+import threading
+from contextlib import contextmanager
+
+import cv2  # type: ignore
+import numpy as np  # type: ignore
+
+READ_CHUNK = 1 << 20
+B64_CHUNK = 4 * (1 << 18)   # Kelipatan 4 agar tiap potongan base64 bisa di-decode sendiri
+HEADER_BYTES = 256 * 1024    # Cukup untuk marker SOF JPEG (setelah EXIF) dan IHDR PNG
+
+
+class IngestError(ValueError):
+    """Request gambar tidak bisa diproses; status = kode HTTP response"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def read_into(stream, buf):
+    """
+    Baca stream ke buffer sampai habis
+
+    Returns:
+        Jumlah byte yang dibaca
+
+    Raises:
+        IngestError 413 jika isi stream lebih besar dari buffer
+    """
+    view = memoryview(buf)
+    readinto = getattr(stream, 'readinto', None)
+    pos = 0
+    while pos < len(buf):
+        end = min(pos + READ_CHUNK, len(buf))
+        if readinto is not None:
+            n = readinto(view[pos:end]) or 0
+        else:
+            chunk = stream.read(end - pos)
+            n = len(chunk)
+            view[pos:pos + n] = chunk
+        if not n:
+            return pos
+        pos += n
+    if stream.read(1):
+        raise IngestError(f"Ukuran request melebihi batas {len(buf) / (1024 * 1024):.0f} MB", 413)
+    return pos
+
+
+def _string_end(buf, i, n):
+    """Index tanda kutip penutup string JSON yang dibuka di buf[i], atau -1"""
+    end = buf.find(b'"', i + 1, n)
+    while end >= 0:
+        slashes = 0
+        while buf[end - 1 - slashes] == ord('\\'):
+            slashes += 1
+        if slashes % 2 == 0:
+            return end
+        end = buf.find(b'"', end + 1, n)
+    return -1
+
+
+def find_json_string(buf, n, key):
+    """
+    Posisi nilai string `key` di JSON top-level (tanpa parse seluruh body)
+
+    Status string (termasuk escape) dan kedalaman {}/[] dilacak, jadi hanya key
+    di object terluar yang cocok; isi string dilewati dengan find() sehingga
+    base64 besar tidak di-loop per byte.
+
+    Returns:
+        (start, end) isi string tanpa tanda kutip, atau None jika tidak ada,
+        bukan string, atau ambigu (key muncul dua kali / key ber-escape) --
+        pemanggil lalu memakai json.loads penuh
+    """
+    needle = key.encode()
+    span = None
+    depth = 0
+    prev = 0            # Karakter non-spasi terakhir di luar string
+    i = 0
+    while i < n:
+        c = buf[i]
+        if c == ord('"'):
+            end = _string_end(buf, i, n)
+            if end < 0:
+                return None
+            if depth == 1 and prev in b'{,':
+                if buf.find(b'\\', i + 1, end) >= 0:
+                    return None
+                j = end + 1
+                while j < n and buf[j] in b' \t\r\n':
+                    j += 1
+                if buf[i + 1:end] == needle and j < n and buf[j] == ord(':'):
+                    j += 1
+                    while j < n and buf[j] in b' \t\r\n':
+                        j += 1
+                    if span is not None or j >= n or buf[j] != ord('"'):
+                        return None
+                    value_end = _string_end(buf, j, n)
+                    if value_end < 0:
+                        return None
+                    span = (j + 1, value_end)
+                    end = value_end
+            prev = ord('"')
+            i = end + 1
+            continue
+        if c in b'{[':
+            if depth == 0 and c != ord('{'):
+                return None
+            depth += 1
+        elif c in b'}]':
+            depth -= 1
+        if c not in b' \t\r\n':
+            prev = c
+        i += 1
+    return span
+
+
+def image_header_size(view):
+    """(width, height) dari header gambar tanpa decode piksel, atau None"""
+    try:
+        from PIL import Image  # type: ignore
+    except ImportError:
+        return None
+    try:
+        with Image.open(io.BytesIO(view[:HEADER_BYTES])) as img:
+            return img.size
+    except Exception:
+        return None
+
+
+def decode_image(view, max_pixels=None):
+    """
+    Decode bytes file gambar (memoryview buffer) ke array BGR
+
+    Raises:
+        IngestError 413 (resolusi melebihi max_pixels) atau 400 (bukan gambar)
+    """
+    if max_pixels:
+        size = image_header_size(view)
+        if size and size[0] * size[1] > max_pixels:
+            raise IngestError(f"Resolusi gambar {size[0]}x{size[1]} melebihi batas "
+                              f"{max_pixels / 1e6:.0f} MP", 413)
+    image = cv2.imdecode(np.frombuffer(view, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if image is None:
+        raise IngestError("Format gambar tidak valid atau corrupt", 400)
+    return image
+
+
+# ============================================================
+# SLOT & POOL
+# ============================================================
+
+class IngestSlot:
+    """
+    Sepasang buffer yang dipakai ulang: body request dan bytes gambar hasil decode
+
+    Buffer dialokasikan saat pertama dipakai lalu dipertahankan.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._body = None
+        self._image = None
+
+    @property
+    def nbytes(self):
+        return sum(len(b) for b in (self._body, self._image) if b is not None)
+
+    def _buffers(self):
+        if self._body is None:
+            self._body = bytearray(self.max_bytes)
+            self._image = bytearray(self.max_bytes * 3 // 4 + 4)
+        return self._body, self._image
+
+    def _b64decode(self, src, dst):
+        try:
+            pos = 0
+            for i in range(0, len(src), B64_CHUNK):
+                chunk = binascii.a2b_base64(src[i:i + B64_CHUNK])
+                dst[pos:pos + len(chunk)] = chunk
+                pos += len(chunk)
+            return pos
+        except (binascii.Error, ValueError) as e:
+            raise IngestError(f"Base64 gambar tidak valid: {e}", 400)
+
+    def read_json(self, stream, image_field='image'):
+        """
+        Baca body JSON; field gambar base64 di-decode ke buffer tanpa jadi str
+
+        Returns:
+            data: Dict field lain (field gambar diganti string kosong)
+            image: memoryview bytes file gambar, atau None jika tidak ada
+        """
+        body, image_buf = self._buffers()
+        n = read_into(stream, body)
+        span = find_json_string(body, n, image_field)
+        src = None
+        try:
+            if span is None or body.find(b'\\', span[0], span[1]) >= 0:
+                # Tidak ditemukan, ambigu, atau string ber-escape (jarang untuk
+                # base64): parse biasa, aturan JSON yang menentukan nilainya
+                data = json.loads(bytes(body[:n]))
+                if isinstance(data, dict) and isinstance(data.get(image_field), str):
+                    src = data[image_field].encode()
+                    data[image_field] = ''
+            else:
+                start, end = span
+                data = json.loads(bytes(body[:start]) + bytes(body[end:n]))
+                src = memoryview(body)[start:end]
+        except (ValueError, UnicodeDecodeError):
+            raise IngestError("Body request bukan JSON yang valid", 400)
+        if not isinstance(data, dict):
+            raise IngestError("Body request harus object JSON", 400)
+        if src is None:
+            return data, None
+
+        # Prefix data URL (data:image/jpeg;base64,...)
+        comma = bytes(src[:128]).find(b',')
+        if comma >= 0:
+            src = src[comma + 1:]
+        size = self._b64decode(src, image_buf)
+        if not size:
+            raise IngestError("Image data is required", 400)
+        return data, memoryview(image_buf)[:size]
+
+    def read_file(self, stream):
+        """Baca file upload (streaming) ke buffer body (max_bytes penuh). Returns: memoryview bytes file"""
+        body, _ = self._buffers()
+        size = read_into(stream, body)
+        if not size:
+            raise IngestError("No file selected", 400)
+        return memoryview(body)[:size]
+
+
+class IngestPool:
+    """
+    Pool slot ingestion (LIFO agar buffer yang masih resident dipakai duluan)
+
+    Args:
+        slots: Jumlah request yang dibaca/di-decode bersamaan
+        max_bytes: Ukuran maksimal body request
+        wait_seconds: Tunggu slot maksimal sebelum 503
+    """
+
+    def __init__(self, slots=4, max_bytes=15 * 1024 * 1024, wait_seconds=30.0):
+        self.slots = max(1, int(slots))
+        self.max_bytes = int(max_bytes)
+        self.wait_seconds = wait_seconds
+        self._free = queue.LifoQueue()
+        self._all = [IngestSlot(self.max_bytes) for _ in range(self.slots)]
+        for slot in self._all:
+            self._free.put(slot)
+        self._lock = threading.Lock()
+        self.in_use = 0
+        self.peak_in_use = 0
+        self.waited = 0
+        self.timeouts = 0
+
+    @contextmanager
+    def slot(self):
+        try:
+            slot = self._free.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                self.waited += 1
+            try:
+                slot = self._free.get(timeout=self.wait_seconds)
+            except queue.Empty:
+                with self._lock:
+                    self.timeouts += 1
+                raise IngestError("Service sedang sibuk, coba lagi", 503)
+        with self._lock:
+            self.in_use += 1
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+        try:
+            yield slot
+        finally:
+            with self._lock:
+                self.in_use -= 1
+            self._free.put(slot)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'slots': self.slots,
+                'in_use': self.in_use,
+                'peak_in_use': self.peak_in_use,
+                'waited': self.waited,
+                'timeouts': self.timeouts,
+                'max_request_mb': round(self.max_bytes / (1024 * 1024), 1),
+                'allocated_mb': round(sum(s.nbytes for s in self._all) / (1024 * 1024), 1)
+            }
+
+
+# ============================================================
+# MEMORI PROSES
+# ============================================================
+
+def memory_stats():
+    """RSS saat ini dan puncak (MB) proses ini"""
+    mb = 1024 * 1024
+    rss = peak = None
+    try:
+        with open(f"/proc/{os.getpid()}/status") as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    rss = int(line.split()[1]) * 1024 / mb
+                elif line.startswith('VmHWM:'):
+                    peak = int(line.split()[1]) * 1024 / mb
+    except OSError:
+        pass
+    if rss is None or peak is None:
+        try:
+            import psutil  # type: ignore
+            info = psutil.Process().memory_info()
+            rss = rss if rss is not None else info.rss / mb
+            if peak is None and hasattr(info, 'peak_wset'):  # Windows
+                peak = info.peak_wset / mb
+        except ImportError:
+            pass
+    if peak is None:
+        try:
+            import resource
+            maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            peak = maxrss / mb if sys.platform == 'darwin' else maxrss * 1024 / mb
+        except ImportError:
+            pass
+    return {
+        'rss_mb': round(rss, 1) if rss is not None else None,
+        'peak_rss_mb': round(peak, 1) if peak is not None else None
+    }
@@ -0,0 +1,232 @@
+"""
+Instrumentasi latency per-stage untuk deteksi webcam
+
+Setiap stage (capture, inference, postprocess, draw) menyimpan sampel
+latency dalam window bergulir untuk overlay p50/p95, plus histogram satu sesi
+penuh (bin tetap, memori konstan walau berjalan berhari-hari) untuk export
+CSV/JSON saat program keluar. Export menyertakan metadata
+(host, sumber, backend model) agar hasil antar kamera/mesin bisa dibandingkan.
+"""
+
+import csv
+import json
+import math
+import platform
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+import cv2  # type: ignore
+import numpy as np  # type: ignore
+
+STAGES = ('capture', 'inference', 'postprocess', 'draw')
+
+
+def percentiles(samples, qs=(50, 95)):
+    """Percentile dari list sampel (0.0 jika kosong)"""
+    if not samples:
+        return [0.0 for _ in qs]
+    return [float(v) for v in np.percentile(np.asarray(samples, dtype=np.float64), qs)]
+
+
+class LatencyHistogram:
+    """
+    Histogram latency dengan bin logaritmik tetap (memori konstan)
+
+    Lebar bin relatif `growth` (default 2%), jadi percentile dari histogram
+    meleset maksimal ~1% dari nilai sebenarnya; count, mean dan max eksak.
+
+    Args:
+        min_ms / max_ms: Rentang bin (sampel di luar rentang masuk bin tepi)
+        growth: Rasio batas atas / batas bawah satu bin
+    """
+
+    def __init__(self, min_ms=0.01, max_ms=100_000.0, growth=1.02):
+        self.min_ms = min_ms
+        self._log_growth = math.log(growth)
+        self.growth = growth
+        self.counts = np.zeros(int(math.ceil(math.log(max_ms / min_ms) / self._log_growth)) + 1, dtype=np.int64)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, ms):
+        index = int(math.log(ms / self.min_ms) / self._log_growth) if ms > self.min_ms else 0
+        self.counts[min(index, len(self.counts) - 1)] += 1
+        self.count += 1
+        self.total += ms
+        self.max = max(self.max, ms)
+
+    def percentiles(self, qs=(50, 95)):
+        """Percentile (titik tengah geometris bin, dibatasi max); 0.0 jika kosong"""
+        if not self.count:
+            return [0.0 for _ in qs]
+        cumulative = np.cumsum(self.counts)
+        result = []
+        for q in qs:
+            index = int(np.searchsorted(cumulative, q / 100.0 * self.count))
+            value = self.min_ms * self.growth ** (index + 0.5)
+            result.append(float(min(value, self.max)))
+        return result
+
+    def copy(self):
+        clone = LatencyHistogram.__new__(LatencyHistogram)
+        clone.__dict__.update(self.__dict__)
+        clone.counts = self.counts.copy()
+        return clone
+
+
+class StageTimer:
+    """
+    Kumpulkan latency per stage (thread-safe)
+
+    Args:
+        stages: Nama stage (urutan tampil)
+        window: Jumlah sampel terakhir untuk statistik rolling
+        metadata: Dict info sesi yang ikut di-export
+    """
+
+    def __init__(self, stages=STAGES, window=300, metadata=None):
+        self.stages = list(stages)
+        self.window = window
+        self.metadata = dict(metadata or {})
+        self.started_at = time.time()
+
+        self._lock = threading.Lock()
+        self._recent = {stage: deque(maxlen=window) for stage in self.stages}
+        self._session = {stage: LatencyHistogram() for stage in self.stages}
+
+    def record(self, stage, ms):
+        """Tambah satu sampel latency (ms) untuk stage"""
+        with self._lock:
+            if stage not in self._recent:
+                self.stages.append(stage)
+                self._recent[stage] = deque(maxlen=self.window)
+                self._session[stage] = LatencyHistogram()
+            self._recent[stage].append(ms)
+            self._session[stage].add(ms)
+
+    @contextmanager
+    def measure(self, stage):
+        """Context manager: ukur durasi blok sebagai sampel stage"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, (time.perf_counter() - start) * 1000)
+
+    def rolling(self):
+        """
+        Statistik window bergulir
+
+        Returns:
+            Dict stage -> {'p50', 'p95', 'count'}
+        """
+        with self._lock:
+            stages = list(self.stages)
+            recent = {stage: list(samples) for stage, samples in self._recent.items()}
+        result = {}
+        for stage in stages:
+            p50, p95 = percentiles(recent[stage])
+            result[stage] = {'p50': p50, 'p95': p95, 'count': len(recent[stage])}
+        return result
+
+    def session_summary(self):
+        """
+        Statistik satu sesi penuh
+
+        Returns:
+            Dict stage -> {'count', 'mean_ms', 'p50_ms', 'p95_ms', 'max_ms'}
+        """
+        with self._lock:
+            stages = list(self.stages)
+            session = {stage: hist.copy() for stage, hist in self._session.items()}
+        summary = {}
+        for stage in stages:
+            hist = session[stage]
+            p50, p95 = hist.percentiles()
+            summary[stage] = {
+                'count': hist.count,
+                'mean_ms': round(hist.total / hist.count, 3) if hist.count else 0.0,
+                'p50_ms': round(p50, 3),
+                'p95_ms': round(p95, 3),
+                'max_ms': round(hist.max, 3)
+            }
+        return summary
+
+    def export(self, output_dir):
+        """
+        Simpan ringkasan sesi ke CSV dan JSON
+
+        CSV berisi satu baris per stage dengan kolom metadata, sehingga file
+        dari beberapa mesin/kamera bisa langsung digabung.
+
+        Returns:
+            (csv_path, json_path)
+        """
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.fromtimestamp(self.started_at).strftime('%Y%m%d_%H%M%S')
+        csv_path = output_dir / f"latency_{stamp}.csv"
+        json_path = output_dir / f"latency_{stamp}.json"
+
+        metadata = {
+            'host': platform.node(),
+            'platform': platform.platform(),
+            'processor': platform.processor(),
+            'started_at': datetime.fromtimestamp(self.started_at).isoformat(timespec='seconds'),
+            'duration_s': round(time.time() - self.started_at, 1),
+            **self.metadata
+        }
+        summary = self.session_summary()
+
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump({'metadata': metadata, 'stages': summary}, f, indent=2)
+
+        fields = list(metadata) + ['stage', 'count', 'mean_ms', 'p50_ms', 'p95_ms', 'max_ms']
+        with open(csv_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=fields)
+            writer.writeheader()
+            for stage, stats in summary.items():
+                writer.writerow({**metadata, 'stage': stage, **stats})
+
+        return csv_path, json_path
+
+    def report(self):
+        """Teks ringkasan sesi untuk console"""
+        return " | ".join(
+            f"{stage} p50 {s['p50_ms']:.1f} / p95 {s['p95_ms']:.1f} ms"
+            for stage, s in self.session_summary().items() if s['count']
+        )
+
+
+def draw_latency_overlay(frame, timer):
+    """
+    Draw panel p50/p95 per stage di pojok kanan bawah
+
+    Args:
+        frame: Frame untuk di-draw
+        timer: StageTimer
+
+    Returns:
+        frame: Frame dengan panel latency
+    """
+    stats = timer.rolling()
+    lines = [f"{'stage':<11}{'p50':>7}{'p95':>7} ms"]
+    lines += [f"{stage:<11}{s['p50']:7.1f}{s['p95']:7.1f}" for stage, s in stats.items()]
+
+    h, w = frame.shape[:2]
+    panel_h = 18 * len(lines) + 10
+    x0 = w - 250
+    cv2.rectangle(frame, (x0, h - panel_h - 10), (w - 10, h - 10), (0, 0, 0), -1)
+
+    y = h - panel_h + 6
+    for line in lines:
+        cv2.putText(frame, line, (x0 + 5, y),
+                   cv2.FONT_HERSHEY_SIMPLEX, 0.42, (255, 255, 0), 1)
+        y += 18
+
+    return frame
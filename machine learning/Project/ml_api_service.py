@@ -4,6 +4,7 @@ Endpoint untuk deteksi fase pertumbuhan jamur menggunakan YOLOv5
 """
 
 from flask import Flask, request, jsonify  # type: ignore
+from werkzeug.exceptions import RequestEntityTooLarge  # type: ignore
 try:
     from flask_cors import CORS  # type: ignore
     cors_available = True
@@ -19,6 +20,7 @@ import base64
 from datetime import datetime, timedelta
 import sys
 import os
+import threading
 
 # Import config
 try:
@@ -42,7 +44,9 @@ except ImportError:
     if MODEL_PATH is None:
         MODEL_PATH = "weights/best.pt"
     
-    CONFIDENCE_THRESHOLD = 0.40
+    CONFIDENCE_THRESHOLD = 0.15
+    IOU_THRESHOLD = 0.45
+    MAX_DETECTIONS = 100
     CLASS_NAMES = ['Primordia', 'Muda', 'Matang']
     HARVEST_ESTIMATION = {'Primordia': 4, 'Muda': 2, 'Matang': 0}
     CLASS_COLORS = {
@@ -50,6 +54,38 @@ except ImportError:
         'Muda': (0, 165, 255),         # Orange
         'Matang': (0, 255, 0)          # Green
     }
+    IMG_SIZE = 640
+    OPTIMIZED_CPU_MODE = False
+    CHANNELS_LAST = True
+    COMPILE_MODE = None
+    COMPILED_CACHE_DIR = str(weights_dir / "compiled")
+    ADAPTIVE_RESOLUTION = True
+    RESOLUTION_LADDER = [640, 512, 416, 320]
+    ADAPTIVE_QUEUE_STEP = 2
+    ADAPTIVE_LATENCY_TARGET_MS = 1500
+    ADAPTIVE_LATENCY_WINDOW = 20
+    QUALITY_GATE_ENABLED = True
+    QUALITY_DOWNSCALE = 256
+    QUALITY_MIN_SHARPNESS = 50.0
+    QUALITY_MAX_DARK_FRACTION = 0.6
+    QUALITY_MAX_BRIGHT_FRACTION = 0.6
+    QUALITY_MIN_CONTRAST = 12.0
+    QUALITY_MIN_EDGE_DENSITY = 0.01
+    RAW_CACHE_ENABLED = False
+    RAW_CACHE_MAX_MB = 64
+    RAW_CACHE_MIN_CONF = 0.01
+    ML_SERVICE_PORT = int(os.environ.get('ML_SERVICE_PORT', 5000))
+    MAX_UPLOAD_MB = 15
+    MAX_IMAGE_PIXELS = 40_000_000
+    INGEST_POOL_SIZE = 4
+    INGEST_WAIT_SECONDS = 30.0
+    INPUT_POOL_SIZE = 4
+
+from fast_inference import optimize_model, OptimizedDetector, FastDetections, InputPool
+from prediction_cache import RawPrediction, RawPredictionCache, image_key
+from ingest import IngestError, IngestPool, decode_image, memory_stats
+from adaptive_resolution import AdaptiveResolution
+from quality_gate import QualityGate
 
 # Label mapping
 LABEL_MAP = {
@@ -62,6 +98,8 @@ LABEL_MAP = {
 }
 
 app = Flask(__name__)
+# Body lebih besar ditolak 413 sebelum dibaca (multipart /detect/upload & JSON /detect)
+app.config['MAX_CONTENT_LENGTH'] = int(MAX_UPLOAD_MB * 1024 * 1024)
 if cors_available:
     CORS(app)  # Enable CORS for all routes
 else:
@@ -76,6 +114,46 @@ else:
 # Global model variable
 model = None
 
+# Pemilih resolusi berdasarkan beban (antrian + latency terakhir)
+resolution_tracker = AdaptiveResolution(
+    base_size=IMG_SIZE,
+    ladder=RESOLUTION_LADDER,
+    queue_step=ADAPTIVE_QUEUE_STEP,
+    latency_target_ms=ADAPTIVE_LATENCY_TARGET_MS,
+    window=ADAPTIVE_LATENCY_WINDOW,
+    enabled=ADAPTIVE_RESOLUTION
+)
+
+# Gate kualitas foto sebelum inferensi
+quality_gate = QualityGate(
+    enabled=QUALITY_GATE_ENABLED,
+    downscale=QUALITY_DOWNSCALE,
+    min_sharpness=QUALITY_MIN_SHARPNESS,
+    max_dark_fraction=QUALITY_MAX_DARK_FRACTION,
+    max_bright_fraction=QUALITY_MAX_BRIGHT_FRACTION,
+    min_contrast=QUALITY_MIN_CONTRAST,
+    min_edge_density=QUALITY_MIN_EDGE_DENSITY
+)
+
+# Kandidat pre-NMS per gambar: ganti conf/iou/max_det tanpa forward pass ulang
+raw_cache = RawPredictionCache(
+    max_bytes=int(RAW_CACHE_MAX_MB * 1024 * 1024),
+    min_conf=RAW_CACHE_MIN_CONF,
+    enabled=RAW_CACHE_ENABLED
+)
+
+# Threshold AutoShape adalah atribut model; diganti per request di bawah lock
+autoshape_lock = threading.Lock()
+
+# Buffer body/decode request dan buffer input model yang dipakai ulang:
+# memori tidak tumbuh dengan jumlah request bersamaan
+ingest_pool = IngestPool(
+    slots=INGEST_POOL_SIZE,
+    max_bytes=int(MAX_UPLOAD_MB * 1024 * 1024),
+    wait_seconds=INGEST_WAIT_SECONDS
+)
+input_pool = InputPool(capacity=INPUT_POOL_SIZE, channels_last=CHANNELS_LAST)
+
 def load_model():
     """Load YOLOv5 model"""
     global model
@@ -101,13 +179,28 @@ def load_model():
             model = torch.hub.load('ultralytics/yolov5', 'custom', 
                                   path=MODEL_PATH, force_reload=False)
             model.conf = CONFIDENCE_THRESHOLD
-            model.iou = 0.45  # IoU threshold untuk NMS
+            model.iou = IOU_THRESHOLD
+            model.max_det = MAX_DETECTIONS
             print(f"[INFO] ✅ Model loaded successfully!")
             print(f"[INFO] Model path: {MODEL_PATH}")
-            print(f"[INFO] Confidence threshold: {CONFIDENCE_THRESHOLD}")
-            print(f"[INFO] IoU threshold: 0.45")
+            print(f"[INFO] Default thresholds: conf={CONFIDENCE_THRESHOLD}, iou={IOU_THRESHOLD}, "
+                  f"max_det={MAX_DETECTIONS} (bisa diganti per request)")
             print(f"[INFO] Model classes: {model.names}")
             print(f"[INFO] Model device: {next(model.parameters()).device}")
+            
+            if OPTIMIZED_CPU_MODE or RAW_CACHE_ENABLED:
+                # Default (keduanya mati) tetap AutoShape. Cache prediksi mentah (opt-in) butuh
+                # output pre-NMS dari jalur OptimizedDetector; tanpa OPTIMIZED_CPU_MODE eager
+                model = optimize_model(model, weights_path=MODEL_PATH, img_size=IMG_SIZE,
+                                       channels_last=CHANNELS_LAST,
+                                       compile_mode=COMPILE_MODE if OPTIMIZED_CPU_MODE else None,
+                                       cache_dir=COMPILED_CACHE_DIR, input_pool=input_pool)
+                if isinstance(model, OptimizedDetector):
+                    # Trace/kompilasi semua ukuran ladder sekarang, bukan di request pertama
+                    # saat service sibuk (turun resolusi) sambil memegang lock detector
+                    sizes = sorted(set(RESOLUTION_LADDER) | {IMG_SIZE}) if ADAPTIVE_RESOLUTION else [IMG_SIZE]
+                    model.prepare(sizes)
+                    print(f"[INFO] Forward siap untuk ukuran {sizes}")
         except Exception as e:
             error_msg = f"Error loading model: {str(e)}"
             print(f"❌ {error_msg}")
@@ -118,28 +211,99 @@ def load_model():
         print(f"[INFO] Model already loaded")
     return model
 
-def base64_to_image(base64_string):
-    """Convert base64 string to OpenCV image"""
-    try:
-        # Remove data URL prefix if present
-        if ',' in base64_string:
-            base64_string = base64_string.split(',')[1]
-        
-        # Decode base64
-        image_data = base64.b64decode(base64_string)
-        nparr = np.frombuffer(image_data, np.uint8)
-        img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-        return img
-    except Exception as e:
-        print(f"Error decoding base64: {e}")
-        raise
-
 def image_to_base64(image):
     """Convert OpenCV image to base64 string"""
     _, buffer = cv2.imencode('.jpg', image)
     image_base64 = base64.b64encode(buffer).decode('utf-8')
     return image_base64
 
+def parse_thresholds(params):
+    """
+    conf / iou / max_det dari request (default dari config, max_det dibatasi MAX_DETECTIONS)
+
+    Raises:
+        ValueError: Nilai tidak valid
+    """
+    try:
+        conf = float(params.get('conf', CONFIDENCE_THRESHOLD))
+        iou = float(params.get('iou', IOU_THRESHOLD))
+        max_det = float(params.get('max_det', MAX_DETECTIONS))
+    except (TypeError, ValueError):
+        raise ValueError("conf dan iou harus angka, max_det harus bilangan bulat")
+    # int() diam-diam memotong 1.5 -> 1; tolak nilai pecahan
+    if not max_det.is_integer():
+        raise ValueError(f"max_det harus bilangan bulat. Got: {params.get('max_det')}")
+    max_det = int(max_det)
+    if not 0.0 <= conf <= 1.0:
+        raise ValueError(f"conf harus 0.0-1.0. Got: {conf}")
+    if not 0.0 < iou <= 1.0:
+        raise ValueError(f"iou harus 0.0-1.0. Got: {iou}")
+    if max_det < 1:
+        raise ValueError(f"max_det harus >= 1. Got: {max_det}")
+    return {'conf': conf, 'iou': iou, 'max_det': min(max_det, MAX_DETECTIONS)}
+
+def run_inference(image, thresholds, key=None, entry=None):
+    """
+    Deteksi dengan threshold per request
+
+    Jika kandidat pre-NMS gambar ini sudah di-cache (entry), hanya filter + NMS
+    yang dijalankan. Selain itu model dijalankan dengan resolusi yang dipilih
+    dari beban service saat ini, lalu kandidatnya di-cache dengan key.
+
+    Returns:
+        df: DataFrame deteksi (format results.pandas().xyxy[0])
+        inference_size: Ukuran input model yang dipakai
+        thresholds: Threshold efektif (conf dinaikkan ke batas bawah cache jika perlu)
+    """
+    if entry is not None:
+        det = raw_cache.detections(entry, **thresholds)
+        df = FastDetections([det], model.names, [entry.shape]).pandas().xyxy[0]
+        return df, entry.size, dict(thresholds, conf=max(thresholds['conf'], entry.min_conf))
+
+    start, queue_depth = resolution_tracker.begin()
+    inference_size = resolution_tracker.choose(queue_depth)
+    df = None
+    try:
+        if isinstance(model, OptimizedDetector):
+            floor = raw_cache.min_conf if raw_cache.enabled else thresholds['conf']
+            candidates, letterbox_info = model.candidates(image, inference_size, floor)
+            entry = RawPrediction(candidates, letterbox_info, inference_size, floor)
+            raw_cache.put(key, entry)
+            det = raw_cache.detections(entry, **thresholds)
+            df = FastDetections([det], model.names, [image.shape]).pandas().xyxy[0]
+            thresholds = dict(thresholds, conf=max(thresholds['conf'], floor))
+        else:
+            with autoshape_lock:
+                model.conf, model.iou, model.max_det = thresholds['conf'], thresholds['iou'], thresholds['max_det']
+                results = model(image, size=inference_size)
+            df = results.pandas().xyxy[0]
+    finally:
+        resolution_tracker.end(start, inference_size if df is not None else None)
+    return df, inference_size, thresholds
+
+def build_summary_response(df, inference_size):
+    """
+    Response mode=summary: hanya jumlah per kelas dan estimasi panen,
+    tanpa serialisasi bounding box dan tanpa render gambar
+    """
+    summary = {name: 0 for name in CLASS_NAMES}
+    for raw_name in df['name']:
+        cls_name = LABEL_MAP.get(raw_name, raw_name)
+        if cls_name in summary:
+            summary[cls_name] += 1
+    
+    harvest_estimation = {cls: HARVEST_ESTIMATION.get(cls, 0) for cls, count in summary.items() if count > 0}
+    
+    return {
+        'success': True,
+        'mode': 'summary',
+        'summary': summary,
+        'harvest_estimation': harvest_estimation,
+        'next_harvest_days': min(harvest_estimation.values()) if harvest_estimation else None,
+        'total_detections': len(df),
+        'inference_size': inference_size
+    }
+
 def draw_detections(image, detections):
     """Draw bounding boxes and labels on image"""
     img_with_boxes = image.copy()
@@ -172,6 +336,21 @@ def draw_detections(image, detections):
     
     return img_with_boxes
 
+@app.errorhandler(413)
+def request_too_large(e):
+    """Body melebihi MAX_CONTENT_LENGTH: JSON, bukan halaman HTML bawaan Flask"""
+    return jsonify({
+        'success': False,
+        'error': f'Ukuran request melebihi batas {MAX_UPLOAD_MB} MB'
+    }), 413
+
+@app.before_request
+def reject_oversized_request():
+    """Tolak dari header Content-Length sebelum body dibaca (bukan 500 dari handler endpoint)"""
+    length = request.content_length
+    if length is not None and length > app.config['MAX_CONTENT_LENGTH']:
+        return request_too_large(None)
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint - fast response, doesn't wait for model"""
@@ -181,8 +360,18 @@ def health_check():
         'model_loaded': model is not None,
         'model_status': model_status,
         'model_path': MODEL_PATH,
+        'optimized_cpu_mode': OPTIMIZED_CPU_MODE,
+        'load': resolution_tracker.stats(),
+        'quality_gate': quality_gate.stats(resolution_tracker.mean_latency_ms()),
+        'thresholds': {'conf': CONFIDENCE_THRESHOLD, 'iou': IOU_THRESHOLD, 'max_det': MAX_DETECTIONS},
+        'raw_cache': raw_cache.stats(),
+        'memory': {
+            **memory_stats(),
+            'ingest_pool': ingest_pool.stats(),
+            'input_pool': input_pool.stats()
+        },
         'service': 'ML Detection API',
-        'port': 5000
+        'port': ML_SERVICE_PORT
     }), 200
 
 @app.route('/detect', methods=['POST'])
@@ -193,7 +382,13 @@ def detect():
     Request body:
     {
         "image": "base64_encoded_image_string",
-        "return_image": true/false  // optional, default false
+        "image_key": "...",          // optional (hanya jika RAW_CACHE_ENABLED), pengganti image
+                                     // untuk gambar yang sudah dikirim; 404 = kirim ulang image
+        "conf": 0.15,                // optional, default CONFIDENCE_THRESHOLD
+        "iou": 0.45,                 // optional, default IOU_THRESHOLD
+        "max_det": 100,              // optional, maksimal MAX_DETECTIONS
+        "return_image": true/false,  // optional, default false
+        "mode": "full" | "summary"   // optional, default "full"
     }
     
     Response:
@@ -212,8 +407,15 @@ def detect():
             "Muda": 1,
             "Matang": 0
         },
-        "image_with_detections": "base64_string"  // if return_image=true
+        "image_with_detections": "base64_string",  // if return_image=true
+        "inference_size": 640,  // resolusi yang dipakai (adaptif terhadap beban)
+        "image_key": "...",     // hanya jika RAW_CACHE_ENABLED: kirim ulang dengan conf/iou lain tanpa field image
+        "thresholds": {"conf": 0.15, "iou": 0.45, "max_det": 100},
+        "cached": false         // true = hanya NMS ulang dari prediksi yang di-cache
     }
+    
+    mode=summary hanya mengembalikan summary, harvest_estimation,
+    total_detections, inference_size, image_key (jika cache aktif), thresholds dan cached.
     """
     try:
         # Check if model is loaded
@@ -230,34 +432,74 @@ def detect():
                     'details': 'Pastikan file model ada di folder weights/ dan ML service sudah di-restart'
                 }), 500
         
-        # Get request data
-        data = request.get_json()
-        if not data or 'image' not in data:
-            return jsonify({
-                'success': False,
-                'error': 'Image data is required'
-            }), 400
-        
-        image_base64 = data['image']
-        return_image = data.get('return_image', False)
-        
-        # Convert base64 to image
+        # Body dibaca streaming ke buffer slot ingestion; slot hanya dipegang sampai
+        # gambar ter-decode (atau ditemukan di cache), bukan selama inferensi
         try:
-            image = base64_to_image(image_base64)
-        except Exception as e:
-            error_msg = f"Gagal memproses gambar: {str(e)}"
-            print(f"[DETECT] ERROR: {error_msg}")
+            with ingest_pool.slot() as slot:
+                data, image_view = slot.read_json(request.stream)
+                # image_key hanya berlaku jika cache prediksi mentah aktif (opt-in)
+                if image_view is None and not (raw_cache.enabled and 'image_key' in data):
+                    return jsonify({
+                        'success': False,
+                        'error': 'Image data is required'
+                    }), 400
+                
+                return_image = data.get('return_image', False)
+                mode = data.get('mode', 'full')
+                
+                try:
+                    thresholds = parse_thresholds(data)
+                except ValueError as e:
+                    return jsonify({'success': False, 'error': str(e)}), 400
+                if image_view is None and not isinstance(data['image_key'], str):
+                    return jsonify({'success': False, 'error': 'image_key harus string'}), 400
+                
+                # Hash bytes gambar = key cache prediksi mentah (tidak dihitung jika cache mati).
+                # Entry dari resolusi lebih kecil dari pilihan saat ini dianggap miss
+                key = None
+                if raw_cache.enabled:
+                    key = image_key(image_view) if image_view is not None else data['image_key']
+                entry = raw_cache.get(key, min_size=resolution_tracker.preview())
+                if entry is None and image_view is None:
+                    return jsonify({
+                        'success': False,
+                        'error': 'image_key tidak ada di cache (atau dari resolusi lebih kecil)',
+                        'details': 'Kirim ulang gambar lewat field image'
+                    }), 404
+                
+                # Decode hanya jika perlu forward pass atau render gambar
+                image = None
+                if entry is None or return_image:
+                    if image_view is None:
+                        return jsonify({
+                            'success': False,
+                            'error': 'return_image membutuhkan field image'
+                        }), 400
+                    image = decode_image(image_view, MAX_IMAGE_PIXELS)
+        except RequestEntityTooLarge as e:
+            return request_too_large(e)
+        except IngestError as e:
+            print(f"[DETECT] Rejected request: {e}")
             return jsonify({
                 'success': False,
-                'error': error_msg,
-                'details': 'Format gambar tidak valid atau corrupt'
-            }), 400
+                'error': 'Gagal memproses gambar' if e.status == 400 else str(e),
+                'details': str(e)
+            }), e.status
+        
+        # Quality gate: tolak foto tidak layak sebelum inferensi (gambar di cache sudah lolos)
+        if entry is None:
+            quality = quality_gate.check(image)
+            if quality is not None and not quality['passed']:
+                print(f"[DETECT] Rejected by quality gate: {quality['reasons']} ({quality['elapsed_ms']} ms)")
+                return jsonify(quality_gate.retake_response(quality))
         
         # Run detection
-        print(f"[DETECT] Running inference on image shape: {image.shape}")
+        if entry is None:
+            print(f"[DETECT] Running inference on image shape: {image.shape}")
+        else:
+            print(f"[DETECT] Cached raw predictions {key}: re-run NMS only {thresholds}")
         try:
-            results = model(image)
-            df = results.pandas().xyxy[0]
+            df, inference_size, thresholds = run_inference(image, thresholds, key, entry)
         except Exception as e:
             error_msg = f"Error saat menjalankan deteksi: {str(e)}"
             print(f"[DETECT] ERROR: {error_msg}")
@@ -269,7 +511,14 @@ def detect():
                 'details': 'Model mungkin tidak ter-load dengan benar atau gambar tidak valid'
             }), 500
         
-        print(f"[DETECT] Raw detections from model: {len(df)} detections")
+        print(f"[DETECT] Raw detections from model: {len(df)} detections (size={inference_size})")
+        
+        request_info = {'thresholds': thresholds, 'cached': entry is not None}
+        if key is not None:
+            request_info['image_key'] = key
+        if mode == 'summary':
+            return jsonify({**build_summary_response(df, inference_size), **request_info})
+        
         if len(df) > 0:
             print(f"[DETECT] Detection details:")
             print(df[['name', 'confidence', 'xmin', 'ymin', 'xmax', 'ymax']].head())
@@ -306,7 +555,9 @@ def detect():
             'success': True,
             'detections': detections,
             'summary': summary,
-            'total_detections': len(detections)
+            'total_detections': len(detections),
+            'inference_size': inference_size,
+            **request_info
         }
         
         # Add image with detections if requested
@@ -329,6 +580,10 @@ def detect():
 def detect_upload():
     """
     Detect from uploaded file (multipart/form-data)
+    
+    Form field opsional `mode=summary` (atau query ?mode=summary) untuk
+    response ringkas tanpa bounding box dan gambar. Field/query opsional
+    conf, iou, max_det sama seperti /detect.
     """
     try:
         model = load_model()
@@ -340,20 +595,43 @@ def detect_upload():
         if file.filename == '':
             return jsonify({'error': 'No file selected'}), 400
         
-        # Read image
-        image_bytes = file.read()
-        nparr = np.frombuffer(image_bytes, np.uint8)
-        image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+        params = {**request.args.to_dict(), **request.form.to_dict()}
+        mode = params.get('mode', 'full')
+        try:
+            thresholds = parse_thresholds(params)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
         
-        if image is None:
-            return jsonify({'error': 'Invalid image file'}), 400
+        # Read image (streaming ke buffer slot ingestion, dilepas setelah decode)
+        try:
+            with ingest_pool.slot() as slot:
+                image_view = slot.read_file(file.stream)
+                key = image_key(image_view) if raw_cache.enabled else None
+                image = decode_image(image_view, MAX_IMAGE_PIXELS)
+        except RequestEntityTooLarge as e:
+            return request_too_large(e)
+        except IngestError as e:
+            return jsonify({'success': False, 'error': str(e)}), e.status
+        entry = raw_cache.get(key, min_size=resolution_tracker.preview())
+        
+        # Quality gate: tolak foto tidak layak sebelum inferensi (gambar di cache sudah lolos)
+        if entry is None:
+            quality = quality_gate.check(image)
+            if quality is not None and not quality['passed']:
+                print(f"[DETECT/UPLOAD] Rejected by quality gate: {quality['reasons']} ({quality['elapsed_ms']} ms)")
+                return jsonify(quality_gate.retake_response(quality))
         
         # Run detection
-        print(f"[DETECT/UPLOAD] Running inference on image shape: {image.shape}")
-        results = model(image)
-        df = results.pandas().xyxy[0]
+        print(f"[DETECT/UPLOAD] Running inference on image shape: {image.shape} (cached={entry is not None})")
+        df, inference_size, thresholds = run_inference(image, thresholds, key, entry)
+        
+        print(f"[DETECT/UPLOAD] Raw detections from model: {len(df)} detections (size={inference_size})")
         
-        print(f"[DETECT/UPLOAD] Raw detections from model: {len(df)} detections")
+        request_info = {'thresholds': thresholds, 'cached': entry is not None}
+        if key is not None:
+            request_info['image_key'] = key
+        if mode == 'summary':
+            return jsonify({**build_summary_response(df, inference_size), **request_info})
         if len(df) > 0:
             print(f"[DETECT/UPLOAD] Detection details:")
             print(df[['name', 'confidence', 'xmin', 'ymin', 'xmax', 'ymax']].head())
@@ -394,7 +672,9 @@ def detect_upload():
             'detections': detections,
             'summary': summary,
             'total_detections': len(detections),
-            'image_with_detections': image_base64
+            'image_with_detections': image_base64,
+            'inference_size': inference_size,
+            **request_info
         })
         
     except FileNotFoundError as e:
@@ -434,19 +714,24 @@ def load_model_async():
     return thread
 
 if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description="ML Detection API Service")
+    parser.add_argument("--port", type=int, default=ML_SERVICE_PORT, help="Port service (beberapa instance di belakang ml_router.py)")
+    ML_SERVICE_PORT = parser.parse_args().port
+    
     print("="*70)
     print("ML Detection API Service")
     print("="*70)
     print(f"Model path: {MODEL_PATH}")
-    print(f"Confidence threshold: {CONFIDENCE_THRESHOLD}")
+    print(f"Confidence threshold: {CONFIDENCE_THRESHOLD} (default, bisa diganti per request)")
     print("="*70)
     
     # Start Flask app first (non-blocking)
     print("\n" + "="*70)
     print("[INFO] ML Detection Service is starting...")
     print("="*70)
-    print(f"[INFO] Service URL: http://localhost:5000")
-    print(f"[INFO] Health check: http://localhost:5000/health")
+    print(f"[INFO] Service URL: http://localhost:{ML_SERVICE_PORT}")
+    print(f"[INFO] Health check: http://localhost:{ML_SERVICE_PORT}/health")
     print("="*70)
     print("\n[INFO] Model will be loaded in background...")
     print("[WARNING] IMPORTANT: Keep this window open while using detection feature!")
@@ -457,5 +742,5 @@ if __name__ == '__main__':
     load_model_async()
     
     # Run Flask app (this will start immediately)
-    app.run(host='0.0.0.0', port=5000, debug=False, threaded=True)
+    app.run(host='0.0.0.0', port=ML_SERVICE_PORT, debug=False, threaded=True)
 
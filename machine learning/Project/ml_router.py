@@ -0,0 +1,527 @@
+"""
+Router untuk beberapa instance ml_api_service.py
+
+Backend Node cukup menunjuk ke router (ML_SERVICE_URL); router meneruskan
+/detect dan /detect/upload ke salah satu instance:
+- hanya instance yang siap (model_loaded di /health) dan tidak sedang drain
+- beban = max(request in-flight dari router, antrian yang dilaporkan instance)
+- gambar yang sama (hash isi file, sama dengan image_key di service) diarahkan
+  ke instance yang sama dengan rendezvous hashing, supaya cache prediksi mentah
+  terpakai; affinity dilepas jika instance itu jauh lebih sibuk dari yang lain
+- gagal koneksi / timeout -> dicoba ulang di instance lain; instance yang gagal
+  berturut-turut keluar dari rotasi sampai /health-nya sehat lagi
+- 503 dari service (slot ingestion penuh) -> dicoba di instance lain tanpa
+  menghitung kegagalan; 5xx lain (mis. gambar yang selalu error) langsung
+  diteruskan ke client, instance tetap di rotasi
+- instance bisa ditambah, di-drain (tidak menerima request baru, dilepas setelah
+  request yang berjalan selesai) dan diaktifkan lagi lewat /router/instances
+
+Contoh:
+    python ml_router.py                                  # instance dari ROUTER_INSTANCES
+    python ml_router.py --spawn 2                        # jalankan 2 instance di port 5001, 5002
+    python ml_router.py --instances http://10.0.0.5:5000 http://10.0.0.6:5000
+"""
+
+import base64
+import binascii
+import hashlib
+import http.client
+import json
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+from flask import Flask, request, jsonify, Response  # type: ignore
+try:
+    from flask_cors import CORS  # type: ignore
+    cors_available = True
+except ImportError:
+    cors_available = False
+
+try:
+    from config import (ROUTER_PORT, ROUTER_INSTANCES, ROUTER_HEALTH_INTERVAL, ROUTER_HEALTH_TIMEOUT,
+                        ROUTER_REQUEST_TIMEOUT, ROUTER_MAX_ATTEMPTS, ROUTER_FAILURES_TO_DOWN,
+                        ROUTER_AFFINITY_SLACK, ROUTER_READY_WAIT, ROUTER_ADMIN_TOKEN)
+except ImportError:
+    ROUTER_PORT = 5000
+    ROUTER_INSTANCES = ['http://127.0.0.1:5001', 'http://127.0.0.1:5002']
+    ROUTER_HEALTH_INTERVAL = 2.0
+    ROUTER_HEALTH_TIMEOUT = 2.0
+    ROUTER_REQUEST_TIMEOUT = 60.0
+    ROUTER_MAX_ATTEMPTS = 3
+    ROUTER_FAILURES_TO_DOWN = 2
+    ROUTER_AFFINITY_SLACK = 2
+    ROUTER_READY_WAIT = 30.0
+    ROUTER_ADMIN_TOKEN = None
+
+
+def image_key(image_bytes):
+    """Hash isi file gambar; harus sama dengan prediction_cache.image_key di service"""
+    return hashlib.blake2b(image_bytes, digest_size=12).hexdigest()
+
+
+def routing_key(body, content_type, files=None):
+    """
+    Key affinity dari request deteksi (None = tanpa affinity)
+
+    JSON: image_key jika dikirim, selain itu hash gambar base64.
+    Multipart: hash file `image`.
+    """
+    try:
+        if content_type and content_type.startswith('application/json'):
+            data = json.loads(body)
+            if 'image' in data:
+                image = data['image']
+                if ',' in image:
+                    image = image.split(',')[1]
+                return image_key(base64.b64decode(image))
+            return data.get('image_key')
+        if files is not None and 'image' in files:
+            return image_key(files['image'].read())
+    except (ValueError, TypeError, AttributeError, binascii.Error):
+        pass
+    return None
+
+
+def rendezvous_score(key, url):
+    """Highest random weight: instance dengan skor tertinggi untuk key menang"""
+    return hashlib.blake2b(f"{key}|{url}".encode(), digest_size=8).digest()
+
+
+# ============================================================
+# INSTANCE & ROUTER
+# ============================================================
+
+class Instance:
+    """
+    Satu instance ml_api_service.py
+
+    Attributes:
+        state: 'loading' (hidup, model belum siap), 'ready', atau 'down'
+        draining: Tidak menerima request baru
+        in_flight: Request dari router yang sedang berjalan di instance ini
+        reported_queue: load.in_flight dari /health terakhir
+    """
+
+    def __init__(self, url):
+        self.url = url.rstrip('/')
+        self.state = 'loading'
+        self.draining = False
+        self.remove_when_idle = False
+        self.in_flight = 0
+        self.reported_queue = 0
+        self.failures = 0
+        self.requests = 0
+        self.errors = 0
+        self.latency_ms = None
+        self.last_health = None
+
+    def load(self):
+        return max(self.in_flight, self.reported_queue)
+
+    def stats(self):
+        return {
+            'url': self.url,
+            'state': self.state,
+            'draining': self.draining,
+            'in_flight': self.in_flight,
+            'reported_queue': self.reported_queue,
+            'requests': self.requests,
+            'errors': self.errors,
+            'latency_ms': round(self.latency_ms, 1) if self.latency_ms is not None else None,
+            'last_health_age_s': round(time.time() - self.last_health, 1) if self.last_health else None
+        }
+
+
+class Router:
+    """
+    Pemilihan instance, retry, dan rotasi (thread-safe)
+
+    Args:
+        urls: URL awal instance
+        health_interval / health_timeout: Polling /health (detik)
+        request_timeout: Timeout request deteksi (detik)
+        max_attempts: Maksimal instance yang dicoba per request
+        failures_to_down: Kegagalan berturut-turut sebelum instance keluar rotasi
+        affinity_slack: Toleransi antrian untuk tetap memakai instance affinity
+        ready_wait: Tunggu maksimal sampai ada instance siap (detik)
+    """
+
+    def __init__(self, urls, health_interval=2.0, health_timeout=2.0, request_timeout=60.0, max_attempts=3,
+                 failures_to_down=2, affinity_slack=2, ready_wait=30.0):
+        self.health_interval = health_interval
+        self.health_timeout = health_timeout
+        self.request_timeout = request_timeout
+        self.max_attempts = max(1, max_attempts)
+        self.failures_to_down = max(1, failures_to_down)
+        self.affinity_slack = affinity_slack
+        self.ready_wait = ready_wait
+
+        self._cond = threading.Condition()
+        self.instances = {}
+        self.affinity_hits = 0
+        self.retries = 0
+        self.rejected = 0
+        for url in urls:
+            self.add(url)
+
+    # ---------- rotasi ----------
+
+    def add(self, url):
+        """Tambah instance (masuk rotasi setelah /health melaporkan model siap)"""
+        instance = Instance(url)
+        with self._cond:
+            existing = self.instances.get(instance.url)
+            if existing is not None:
+                existing.draining = existing.remove_when_idle = False
+                return existing
+            self.instances[instance.url] = instance
+        threading.Thread(target=self.check, args=(instance,), daemon=True).start()
+        return instance
+
+    def drain(self, url, remove=False, wait=0.0):
+        """
+        Keluarkan instance dari rotasi tanpa memutus request yang sedang berjalan
+
+        Args:
+            remove: Lepas instance dari daftar setelah idle
+            wait: Tunggu sampai idle maksimal sekian detik
+
+        Returns:
+            True jika instance sudah idle
+        """
+        deadline = time.monotonic() + wait
+        with self._cond:
+            instance = self.instances.get(url.rstrip('/'))
+            if instance is None:
+                raise KeyError(url)
+            instance.draining = True
+            instance.remove_when_idle = remove
+            self._remove_if_idle(instance)
+            while instance.in_flight and time.monotonic() < deadline:
+                self._cond.wait(deadline - time.monotonic())
+            return instance.in_flight == 0
+
+    def enable(self, url):
+        with self._cond:
+            instance = self.instances.get(url.rstrip('/'))
+            if instance is None:
+                raise KeyError(url)
+            instance.draining = instance.remove_when_idle = False
+            self._cond.notify_all()
+
+    def _remove_if_idle(self, instance):
+        if instance.remove_when_idle and instance.in_flight == 0:
+            self.instances.pop(instance.url, None)
+        self._cond.notify_all()
+
+    # ---------- health ----------
+
+    def check(self, instance):
+        """Poll /health satu instance dan perbarui status"""
+        try:
+            with urllib.request.urlopen(instance.url + "/health", timeout=self.health_timeout) as resp:
+                info = json.loads(resp.read())
+            ready = bool(info.get('model_loaded'))
+            queue = int((info.get('load') or {}).get('in_flight', 0))
+        except Exception:
+            with self._cond:
+                instance.failures += 1
+                if instance.failures >= self.failures_to_down:
+                    instance.state = 'down'
+            return
+        with self._cond:
+            instance.state = 'ready' if ready else 'loading'
+            instance.reported_queue = queue
+            instance.failures = 0
+            instance.last_health = time.time()
+            self._cond.notify_all()
+
+    def poll_forever(self):
+        while True:
+            with self._cond:
+                instances = list(self.instances.values())
+            for instance in instances:
+                self.check(instance)
+            time.sleep(self.health_interval)
+
+    def start(self):
+        threading.Thread(target=self.poll_forever, daemon=True).start()
+        return self
+
+    # ---------- pemilihan ----------
+
+    def _select(self, key, exclude):
+        candidates = [i for i in self.instances.values()
+                      if i.state == 'ready' and not i.draining and i.url not in exclude]
+        if not candidates:
+            return None
+        least = min(i.load() for i in candidates)
+        chosen = None
+        if key is not None:
+            preferred = max(candidates, key=lambda i: rendezvous_score(key, i.url))
+            if preferred.load() <= least + self.affinity_slack:
+                chosen = preferred
+                self.affinity_hits += 1
+        if chosen is None:
+            chosen = min(candidates, key=lambda i: (i.load(), i.requests))
+        chosen.in_flight += 1
+        chosen.requests += 1
+        return chosen
+
+    def acquire(self, key, exclude, deadline):
+        """
+        Instance untuk request ini (in_flight sudah dinaikkan)
+
+        Menunggu hanya jika belum ada instance siap sama sekali (mis. semua
+        sedang restart); None jika semua instance siap sudah dicoba.
+        """
+        with self._cond:
+            while True:
+                instance = self._select(key, exclude)
+                if instance is not None:
+                    return instance
+                any_ready = any(i.state == 'ready' and not i.draining for i in self.instances.values())
+                remaining = deadline - time.monotonic()
+                if any_ready or remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+
+    def release(self, instance, ok, elapsed_ms=None, unreachable=True):
+        """
+        Selesai memakai instance
+
+        Args:
+            ok: Response sukses (bukan 5xx)
+            unreachable: Untuk ok=False, True jika gagal koneksi/timeout (dihitung
+                ke failures_to_down); False untuk 5xx dari aplikasi (hanya statistik)
+        """
+        with self._cond:
+            instance.in_flight = max(0, instance.in_flight - 1)
+            if ok:
+                instance.failures = 0
+                if elapsed_ms is not None:
+                    instance.latency_ms = elapsed_ms if instance.latency_ms is None else \
+                        0.8 * instance.latency_ms + 0.2 * elapsed_ms
+            else:
+                instance.errors += 1
+                if unreachable:
+                    instance.failures += 1
+                    if instance.failures >= self.failures_to_down:
+                        instance.state = 'down'
+            self._remove_if_idle(instance)
+
+    # ---------- proxy ----------
+
+    def _send(self, instance, method, path, body, content_type):
+        headers = {'Content-Type': content_type} if content_type else {}
+        req = urllib.request.Request(instance.url + path, data=body if method != 'GET' else None,
+                                     headers=headers, method=method)
+        try:
+            with urllib.request.urlopen(req, timeout=self.request_timeout) as resp:
+                return resp.status, resp.headers.get('Content-Type'), resp.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.headers.get('Content-Type'), e.read()
+
+    def forward(self, method, path, body, content_type, key=None):
+        """
+        Teruskan request
+
+        Gagal koneksi/timeout dan 503 (instance sibuk) dicoba ulang di instance
+        lain; hanya gagal koneksi/timeout yang bisa mengeluarkan instance dari
+        rotasi. 5xx lain langsung dikembalikan (error aplikasi, bukan instance).
+
+        Returns:
+            (status, content_type, body, instance_url atau None)
+        """
+        deadline = time.monotonic() + self.ready_wait
+        tried = set()
+        last = None
+        for attempt in range(self.max_attempts):
+            instance = self.acquire(key, tried, deadline)
+            if instance is None:
+                break
+            if attempt:
+                with self._cond:
+                    self.retries += 1
+            tried.add(instance.url)
+            start = time.perf_counter()
+            try:
+                status, resp_type, data = self._send(instance, method, path, body, content_type)
+            except (urllib.error.URLError, OSError, http.client.HTTPException) as e:
+                print(f"[ROUTER] {instance.url} gagal: {e}")
+                self.release(instance, ok=False)
+                continue
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            if status == 503:
+                print(f"[ROUTER] {instance.url} sibuk (503), coba instance lain")
+                self.release(instance, ok=False, unreachable=False)
+                last = (status, resp_type, data, instance.url)
+                continue
+            if status >= 500:
+                print(f"[ROUTER] {instance.url} -> {status}, diteruskan ke client")
+                self.release(instance, ok=False, unreachable=False)
+                return status, resp_type, data, instance.url
+            self.release(instance, ok=True, elapsed_ms=elapsed_ms)
+            return status, resp_type, data, instance.url
+
+        if last is not None:
+            return last
+        with self._cond:
+            self.rejected += 1
+        error = {'success': False, 'error': 'Tidak ada instance ML service yang siap',
+                 'details': 'Semua instance sedang sibuk, restart, atau tidak dapat dihubungi'}
+        return 503, 'application/json', json.dumps(error).encode(), None
+
+    def stats(self):
+        with self._cond:
+            instances = [i.stats() for i in self.instances.values()]
+            return {
+                'instances': instances,
+                'ready': sum(1 for i in instances if i['state'] == 'ready' and not i['draining']),
+                'affinity_hits': self.affinity_hits,
+                'retries': self.retries,
+                'rejected': self.rejected
+            }
+
+
+# ============================================================
+# FLASK APP
+# ============================================================
+
+app = Flask(__name__)
+if cors_available:
+    CORS(app)
+
+router = Router(ROUTER_INSTANCES, health_interval=ROUTER_HEALTH_INTERVAL, health_timeout=ROUTER_HEALTH_TIMEOUT,
+                request_timeout=ROUTER_REQUEST_TIMEOUT, max_attempts=ROUTER_MAX_ATTEMPTS,
+                failures_to_down=ROUTER_FAILURES_TO_DOWN, affinity_slack=ROUTER_AFFINITY_SLACK,
+                ready_wait=ROUTER_READY_WAIT)
+
+def proxy(path):
+    body = request.get_data(cache=True)
+    content_type = request.headers.get('Content-Type')
+    files = request.files if content_type and content_type.startswith('multipart/') else None
+    key = routing_key(body, content_type, files)
+    if request.query_string:
+        # Parameter query (?mode=summary&conf=...) dibaca service lewat request.args
+        path = f"{path}?{request.query_string.decode('latin-1')}"
+    status, resp_type, data, instance_url = router.forward('POST', path, body, content_type, key)
+    response = Response(data, status=status, content_type=resp_type or 'application/json')
+    if instance_url:
+        response.headers['X-ML-Instance'] = instance_url
+    return response
+
+@app.route('/detect', methods=['POST'])
+def detect():
+    return proxy('/detect')
+
+@app.route('/detect/upload', methods=['POST'])
+def detect_upload():
+    return proxy('/detect/upload')
+
+@app.route('/health', methods=['GET'])
+def health_check():
+    """Ringkasan router; kompatibel dengan /health service (model_loaded = ada instance siap)"""
+    stats = router.stats()
+    return jsonify({
+        'status': 'healthy' if stats['ready'] else 'degraded',
+        'model_loaded': stats['ready'] > 0,
+        'model_status': 'loaded' if stats['ready'] else 'loading',
+        'service': 'ML Detection Router',
+        'port': ROUTER_PORT,
+        'router': stats
+    }), 200
+
+def admin_allowed():
+    return ROUTER_ADMIN_TOKEN is None or request.headers.get('X-Router-Token') == ROUTER_ADMIN_TOKEN
+
+@app.route('/router/instances', methods=['GET', 'POST'])
+def instances():
+    """GET: status semua instance. POST {"url": ...}: tambah instance"""
+    if request.method == 'GET':
+        return jsonify(router.stats())
+    if not admin_allowed():
+        return jsonify({'success': False, 'error': 'Token admin tidak valid'}), 403
+    data = request.get_json(silent=True) or {}
+    if not data.get('url'):
+        return jsonify({'success': False, 'error': 'url is required'}), 400
+    return jsonify({'success': True, 'instance': router.add(data['url']).stats()})
+
+@app.route('/router/instances/drain', methods=['POST'])
+def drain_instance():
+    """
+    {"url": ..., "remove": false, "wait": 30}: stop request baru ke instance;
+    idle=true jika request yang berjalan sudah selesai (aman untuk restart)
+    """
+    if not admin_allowed():
+        return jsonify({'success': False, 'error': 'Token admin tidak valid'}), 403
+    data = request.get_json(silent=True) or {}
+    try:
+        idle = router.drain(data.get('url', ''), remove=bool(data.get('remove')), wait=float(data.get('wait', 0)))
+    except KeyError:
+        return jsonify({'success': False, 'error': 'Instance tidak dikenal'}), 404
+    return jsonify({'success': True, 'idle': idle})
+
+@app.route('/router/instances/enable', methods=['POST'])
+def enable_instance():
+    """{"url": ...}: kembalikan instance yang di-drain ke rotasi"""
+    if not admin_allowed():
+        return jsonify({'success': False, 'error': 'Token admin tidak valid'}), 403
+    data = request.get_json(silent=True) or {}
+    try:
+        router.enable(data.get('url', ''))
+    except KeyError:
+        return jsonify({'success': False, 'error': 'Instance tidak dikenal'}), 404
+    return jsonify({'success': True})
+
+def spawn_instances(count, base_port):
+    """Jalankan `count` ml_api_service.py lokal mulai dari base_port"""
+    service = Path(__file__).resolve().parent / "ml_api_service.py"
+    processes, urls = [], []
+    for port in range(base_port, base_port + count):
+        processes.append(subprocess.Popen([sys.executable, str(service), "--port", str(port)],
+                                          cwd=str(service.parent)))
+        urls.append(f"http://127.0.0.1:{port}")
+    return processes, urls
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description="Router untuk beberapa instance ML service")
+    parser.add_argument("--port", type=int, default=ROUTER_PORT, help="Port router")
+    parser.add_argument("--instances", nargs="+", default=None, help="URL instance (default: ROUTER_INSTANCES)")
+    parser.add_argument("--spawn", type=int, default=0, help="Jalankan N instance lokal")
+    parser.add_argument("--base-port", type=int, default=5001, help="Port instance pertama untuk --spawn")
+    args = parser.parse_args()
+    ROUTER_PORT = args.port
+
+    processes = []
+    if args.instances or args.spawn:
+        for url in list(router.instances):
+            router.drain(url, remove=True)
+        urls = list(args.instances or [])
+        if args.spawn:
+            processes, spawned = spawn_instances(args.spawn, args.base_port)
+            urls += spawned
+        for url in urls:
+            router.add(url)
+
+    print("="*70)
+    print("ML Detection Router")
+    print("="*70)
+    print(f"[INFO] Router URL: http://localhost:{ROUTER_PORT}")
+    for url in router.instances:
+        print(f"[INFO] Instance  : {url}")
+    print(f"[INFO] Arahkan backend ke router: ML_SERVICE_URL=http://localhost:{ROUTER_PORT}")
+    print("="*70 + "\n")
+
+    router.start()
+    try:
+        app.run(host='0.0.0.0', port=ROUTER_PORT, debug=False, threaded=True)
+    finally:
+        for process in processes:
+            process.terminate()
@@ -0,0 +1,324 @@
+"""
+Kompresi model YOLOv5 untuk budget latency CPU: channel pruning + distilasi
+
+- Pruning struktural hanya pada channel yang tidak terikat residual/concat lain:
+  channel tersembunyi Bottleneck (cv1 -> cv2) dan cabang cv2 di C3 (-> cv3).
+  Channel diurutkan berdasarkan |gamma| BatchNorm (network slimming) dan
+  jumlah yang dipertahankan dibulatkan ke kelipatan 8 (ramah SIMD CPU)
+- Rasio pruning dicari dari latency forward yang diukur langsung di mesin ini;
+  overhead pre/postprocess AutoShape (diukur dari teacher) ikut diperhitungkan
+  sehingga budget berlaku per gambar end-to-end
+- Student di-fine-tune dengan loss deteksi YOLOv5 + distilasi output head
+  teacher (dibobot objectness teacher), checkpoint terbaik dipilih dari mAP
+  split validasi
+- Checkpoint disimpan dalam format YOLOv5 (model utuh di-pickle), jadi bisa
+  dimuat torch.hub.load('ultralytics/yolov5', 'custom', path=...) oleh semua
+  entry point dan dipromosikan dengan scripts/3_copy_model.py
+"""
+
+import copy
+import json
+import math
+import sys
+import time
+from pathlib import Path
+
+import numpy as np  # type: ignore
+import torch  # type: ignore
+import torch.nn as nn  # type: ignore
+
+ROUND_TO = 8
+MIN_CHANNELS = 8
+RATIO_STEPS = (0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7)
+
+
+def use_yolov5(yolov5_dir):
+    """Modul yolov5 (models.*, utils.*) harus bisa di-import untuk unpickle checkpoint"""
+    path = str(Path(yolov5_dir).resolve())
+    if not Path(path, "models", "yolo.py").exists():
+        raise FileNotFoundError(f"Clone YOLOv5 tidak ditemukan: {path} (jalankan scripts/setup_yolov5.py)")
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+
+def load_checkpoint(weights, yolov5_dir="yolov5"):
+    """
+    Returns:
+        model: DetectionModel float32 (BatchNorm belum di-fuse)
+        ckpt: Dict checkpoint asli
+    """
+    use_yolov5(yolov5_dir)
+    ckpt = torch.load(str(weights), map_location='cpu', weights_only=False)
+    model = (ckpt.get('ema') or ckpt['model']).float()
+    for p in model.parameters():
+        p.requires_grad_(True)
+    return model, ckpt
+
+
+def save_checkpoint(model, path, **meta):
+    """Simpan dalam format checkpoint YOLOv5 (model FP16, tanpa optimizer)"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    student = copy.deepcopy(model).half().eval()
+    for p in student.parameters():
+        p.requires_grad_(False)
+    tmp = path.with_name(f".{path.name}.tmp")
+    torch.save({'model': student, 'ema': None, 'updates': None, 'optimizer': None, 'epoch': -1,
+                'date': time.strftime('%Y-%m-%dT%H:%M:%S'), 'compression': meta}, tmp)
+    tmp.replace(path)
+    return path
+
+
+def count_parameters(model):
+    return sum(p.numel() for p in model.parameters())
+
+
+# ============================================================
+# PRUNING
+# ============================================================
+
+def prunable_groups(model):
+    """
+    Pasangan (producer Conv, consumer Conv, offset input consumer) yang aman di-prune
+
+    Bottleneck: cv1 -> cv2 (residual ada di output cv2, bukan di channel tengah)
+    C3        : cv2 -> cv3, cv2 adalah separuh kedua concat [m(cv1(x)), cv2(x)]
+    """
+    groups = []
+    for module in model.modules():
+        kind = type(module).__name__
+        if kind == 'Bottleneck':
+            groups.append((module.cv1, module.cv2, lambda m=module: 0))
+        elif kind == 'C3':
+            # Offset dihitung saat prune: lebar output m bisa berubah jika ikut di-prune
+            groups.append((module.cv2, module.cv3, lambda m=module: m.m[-1].cv2.conv.out_channels))
+    return [(p, c, off) for p, c, off in groups
+            if getattr(p, 'bn', None) is not None and p.conv.groups == 1 and c.conv.groups == 1]
+
+
+def channel_importance(conv):
+    """|gamma| BatchNorm per channel output"""
+    return conv.bn.weight.detach().abs()
+
+
+def keep_count(channels, ratio, round_to=ROUND_TO, min_channels=MIN_CHANNELS):
+    keep = int(round(channels * (1.0 - ratio) / round_to)) * round_to
+    return int(min(channels, max(min_channels, keep)))
+
+
+def _new_conv(conv, in_idx=None, out_idx=None):
+    weight = conv.weight.detach()
+    if out_idx is not None:
+        weight = weight[out_idx]
+    if in_idx is not None:
+        weight = weight[:, in_idx]
+    new = nn.Conv2d(weight.shape[1], weight.shape[0], conv.kernel_size, conv.stride, conv.padding,
+                    conv.dilation, groups=1, bias=conv.bias is not None)
+    new.weight.data.copy_(weight)
+    if conv.bias is not None:
+        new.bias.data.copy_(conv.bias.detach()[out_idx] if out_idx is not None else conv.bias.detach())
+    return new.train(conv.training)
+
+
+def _new_bn(bn, idx):
+    new = nn.BatchNorm2d(len(idx), eps=bn.eps, momentum=bn.momentum)
+    for name in ('weight', 'bias'):
+        getattr(new, name).data.copy_(getattr(bn, name).detach()[idx])
+    new.running_mean.copy_(bn.running_mean[idx])
+    new.running_var.copy_(bn.running_var[idx])
+    new.num_batches_tracked.copy_(bn.num_batches_tracked)
+    # Modul baru default mode train; ikuti mode modul lama agar model eval tetap
+    # memakai running stats (bukan statistik batch)
+    return new.train(bn.training)
+
+
+def prune_group(producer, consumer, offset, keep):
+    """Buang channel output producer (dan input consumer yang sama) kecuali `keep` terpenting"""
+    n = producer.conv.out_channels
+    if keep >= n:
+        return 0
+    idx = torch.sort(torch.argsort(channel_importance(producer), descending=True)[:keep]).values
+    producer.conv = _new_conv(producer.conv, out_idx=idx)
+    producer.bn = _new_bn(producer.bn, idx)
+
+    total_in = consumer.conv.in_channels
+    in_idx = torch.cat([torch.arange(offset), idx + offset, torch.arange(offset + n, total_in)])
+    consumer.conv = _new_conv(consumer.conv, in_idx=in_idx)
+    return n - keep
+
+
+def prune_model(model, ratio, round_to=ROUND_TO, min_channels=MIN_CHANNELS):
+    """
+    Prune seragam `ratio` dari setiap grup prunable (in-place)
+
+    Returns:
+        Dict jumlah channel dibuang, parameter sebelum/sesudah
+    """
+    before = count_parameters(model)
+    removed = 0
+    groups = prunable_groups(model)
+    for producer, consumer, offset in groups:
+        keep = keep_count(producer.conv.out_channels, ratio, round_to, min_channels)
+        removed += prune_group(producer, consumer, offset(), keep)
+    return {'ratio': ratio, 'groups': len(groups), 'channels_removed': removed,
+            'params_before': before, 'params_after': count_parameters(model)}
+
+
+# ============================================================
+# LATENCY
+# ============================================================
+
+def forward_latency(model, img_size, runs=20, warmup=5):
+    """Latency forward murni (model di-fuse, inference mode), ms"""
+    from fast_inference import benchmark
+
+    net = copy.deepcopy(model).float().eval()
+    if hasattr(net, 'fuse'):
+        net = net.fuse()
+    x = torch.zeros(1, 3, img_size, img_size)
+    with torch.inference_mode():
+        return benchmark(lambda im: net(im), x, runs, warmup)
+
+
+def search_ratio(model, img_size, forward_budget_ms, ratios=RATIO_STEPS, log=print):
+    """
+    Rasio pruning terkecil yang forward p50-nya <= budget
+
+    Returns:
+        ratio, p50 (ms), met (False jika rasio terbesar pun belum cukup)
+    """
+    p50 = None
+    for ratio in ratios:
+        candidate = copy.deepcopy(model)
+        prune_model(candidate, ratio)
+        p50 = forward_latency(candidate, img_size)['p50']
+        log(f"  ratio {ratio:.1f}: forward p50 {p50:.1f} ms | {count_parameters(candidate) / 1e6:.2f}M param")
+        if p50 <= forward_budget_ms:
+            return ratio, p50, True
+    return ratios[-1], p50, False
+
+
+# ============================================================
+# DISTILASI
+# ============================================================
+
+def distillation_loss(student_out, teacher_out):
+    """
+    MSE logit head per level: objectness untuk semua anchor, box & kelas
+    dibobot objectness teacher (fokus ke anchor yang benar-benar mendeteksi)
+    """
+    total = 0.0
+    for s, t in zip(student_out, teacher_out):
+        w = torch.sigmoid(t[..., 4:5])
+        obj = ((s[..., 4] - t[..., 4]) ** 2).mean()
+        box = (w * (s[..., :4] - t[..., :4]) ** 2).sum() / (w.sum() * 4 + 1e-6)
+        cls = (w * (s[..., 5:] - t[..., 5:]) ** 2).sum() / (w.sum() * max(s.shape[-1] - 5, 1) + 1e-6)
+        total = total + obj + box + cls
+    return total
+
+
+def load_hyp(hyp_path, model, img_size, nc):
+    """Hyp YOLOv5 + skala loss per jumlah layer deteksi (sama seperti train.py)"""
+    import yaml  # type: ignore
+
+    with open(hyp_path) as f:
+        hyp = yaml.safe_load(f)
+    nl = model.model[-1].nl
+    hyp['box'] *= 3 / nl
+    hyp['cls'] *= nc / 80 * 3 / nl
+    hyp['obj'] *= (img_size / 640) ** 2 * 3 / nl
+    hyp['label_smoothing'] = 0.0
+    return hyp
+
+
+def distill(teacher, student, data_yaml, hyp_path, run_dir, evaluate_fn, img_size=640, epochs=30,
+            batch_size=16, workers=2, alpha=1.0, lr_scale=0.1, log=print):
+    """
+    Fine-tune student dengan loss deteksi + alpha * loss distilasi
+
+    Args:
+        evaluate_fn: fn(weights_path) -> report evaluasi (mAP split validasi)
+        run_dir: Folder output (weights/last.pt, weights/best.pt, distill_log.csv)
+
+    Returns:
+        Dict best_epoch, best (report validasi), weights (path best.pt)
+    """
+    from utils.dataloaders import create_dataloader  # type: ignore
+    from utils.general import check_dataset  # type: ignore
+    from utils.loss import ComputeLoss  # type: ignore
+
+    run_dir = Path(run_dir)
+    data = check_dataset(str(data_yaml))
+    nc = int(data['nc'])
+    stride = max(int(student.stride.max()), 32)
+
+    hyp = load_hyp(hyp_path, student, img_size, nc)
+    student.nc = nc
+    student.hyp = hyp
+    student.names = teacher.names
+    compute_loss = ComputeLoss(student)
+
+    loader, _ = create_dataloader(data['train'], img_size, batch_size, stride, hyp=hyp, augment=True,
+                                  workers=workers, shuffle=True, prefix='distill: ')
+    optimizer = torch.optim.SGD(student.parameters(), lr=hyp['lr0'] * lr_scale, momentum=hyp['momentum'],
+                                nesterov=True, weight_decay=hyp['weight_decay'])
+    scheduler = torch.optim.lr_scheduler.LambdaLR(
+        optimizer, lambda e: 0.5 * (1 + math.cos(math.pi * e / max(epochs, 1))) * (1 - hyp['lrf']) + hyp['lrf'])
+
+    teacher.eval()
+    for p in teacher.parameters():
+        p.requires_grad_(False)
+
+    log_path = run_dir / "distill_log.csv"
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    log_path.write_text("epoch,loss_det,loss_kd,map50,map50_95,seconds\n")
+    best = {'best_epoch': None, 'best': None, 'weights': None}
+
+    for epoch in range(epochs):
+        student.train()
+        start = time.perf_counter()
+        sums = np.zeros(2)
+        for i, (imgs, targets, _, _) in enumerate(loader):
+            imgs = imgs.float() / 255
+            with torch.no_grad():
+                teacher_out = teacher(imgs)[1]
+            student_out = student(imgs)
+            loss_det, _ = compute_loss(student_out, targets)
+            loss_kd = distillation_loss(student_out, teacher_out) * imgs.shape[0]
+            loss = loss_det + alpha * loss_kd
+
+            optimizer.zero_grad(set_to_none=True)
+            loss.backward()
+            torch.nn.utils.clip_grad_norm_(student.parameters(), max_norm=10.0)
+            optimizer.step()
+            sums += (float(loss_det), float(loss_kd))
+            print(f"\r  epoch {epoch + 1}/{epochs} | batch {i + 1}/{len(loader)} | "
+                  f"det {sums[0] / (i + 1):.3f} | kd {sums[1] / (i + 1):.3f}", end="", flush=True)
+        print()
+        scheduler.step()
+
+        last = save_checkpoint(student, run_dir / "weights" / "last.pt", epoch=epoch)
+        report = evaluate_fn(last)
+        seconds = time.perf_counter() - start
+        with open(log_path, 'a') as f:
+            f.write(f"{epoch},{sums[0] / len(loader):.5f},{sums[1] / len(loader):.5f},"
+                    f"{report['map50']:.5f},{report['map50_95']:.5f},{seconds:.1f}\n")
+        log(f"  mAP50 {report['map50']:.4f} | mAP50-95 {report['map50_95']:.4f} | {seconds:.0f} s")
+
+        if best['best'] is None or report['map50_95'] > best['best']['map50_95']:
+            best_path = run_dir / "weights" / "best.pt"
+            last_bytes = last.read_bytes()
+            tmp = best_path.with_name(".best.pt.tmp")
+            tmp.write_bytes(last_bytes)
+            tmp.replace(best_path)
+            best = {'best_epoch': epoch, 'best': report, 'weights': str(best_path)}
+
+    return best
+
+
+def write_report(run_dir, report):
+    path = Path(run_dir) / "compression_report.json"
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_text(json.dumps(report, indent=2))
+    tmp.replace(path)
+    return path
@@ -0,0 +1,315 @@
+"""
+Promosi model ke weights/ secara atomic
+
+Satu langkah promosi:
+1. Weights kandidat disalin ke folder staging weights/releases/.staging-<id>
+2. Eval gate: mAP kandidat di split validasi dibandingkan dengan batas minimal
+   dan dengan release yang sedang aktif (prediksi di-cache per hash weights)
+3. Artefak serving dibangun sekali: TorchScript per ukuran (dan rasio gambar umum) di
+   RESOLUTION_LADDER (format cache OptimizedDetector) dan ONNX opsional
+4. Latency diukur, manifest.json ditulis (sha256 semua file, metrik, latency)
+5. Folder staging di-rename menjadi weights/releases/<id>, lalu pointer
+   weights/current.json diganti dengan os.replace (atomic), begitu juga salinan
+   lama weights/best.pt untuk konsumen yang masih memakai path tersebut
+
+Service yang start membaca pointer (config.py) dan langsung memakai artefak
+yang sudah jadi; pembaca tidak pernah melihat file setengah tertulis.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+
+RELEASES_DIR = "releases"
+POINTER_NAME = "current.json"
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+
+def file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def write_json_atomic(path, data):
+    path = Path(path)
+    tmp = path.with_name(f".{path.name}.tmp")
+    with open(tmp, 'w') as f:
+        json.dump(data, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def copy_atomic(src, dst):
+    """Salin ke file sementara di folder tujuan lalu os.replace"""
+    dst = Path(dst)
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dst.with_name(f".{dst.name}.tmp")
+    shutil.copy2(src, tmp)
+    with open(tmp, 'rb+') as f:
+        os.fsync(f.fileno())
+    os.replace(tmp, dst)
+
+
+# ============================================================
+# RELEASE & POINTER
+# ============================================================
+
+def read_pointer(weights_dir):
+    """Isi weights/current.json atau None"""
+    try:
+        return json.loads((Path(weights_dir) / POINTER_NAME).read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def load_manifest(release_dir):
+    try:
+        return json.loads((Path(release_dir) / MANIFEST_NAME).read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def current_release(weights_dir):
+    """
+    Release yang sedang aktif
+
+    Returns:
+        (release_dir, manifest) atau (None, None)
+    """
+    pointer = read_pointer(weights_dir)
+    if not pointer:
+        return None, None
+    release_dir = Path(weights_dir) / pointer['release']
+    manifest = load_manifest(release_dir)
+    return (release_dir, manifest) if manifest else (None, None)
+
+
+def list_releases(weights_dir):
+    """Semua release (manifest), terbaru dulu"""
+    root = Path(weights_dir) / RELEASES_DIR
+    if not root.is_dir():
+        return []
+    manifests = [load_manifest(p) for p in root.iterdir() if p.is_dir() and not p.name.startswith('.')]
+    return sorted((m for m in manifests if m), key=lambda m: m['created_at'], reverse=True)
+
+
+def verify_release(release_dir):
+    """
+    Cek sha256 semua file di manifest
+
+    Returns:
+        List file yang hilang/berubah (kosong = utuh)
+    """
+    manifest = load_manifest(release_dir)
+    if manifest is None:
+        return [MANIFEST_NAME]
+    bad = []
+    for name, info in manifest['files'].items():
+        path = Path(release_dir) / name
+        if not path.exists() or file_sha256(path) != info['sha256']:
+            bad.append(name)
+    return bad
+
+
+def swap_pointer(weights_dir, release_id, legacy_weights=True):
+    """
+    Arahkan weights/current.json ke release (atomic); opsional perbarui weights/best.pt
+    """
+    weights_dir = Path(weights_dir)
+    release_dir = weights_dir / RELEASES_DIR / release_id
+    manifest = load_manifest(release_dir)
+    write_json_atomic(weights_dir / POINTER_NAME, {
+        'release': f"{RELEASES_DIR}/{release_id}",
+        'sha256': manifest['files']['best.pt']['sha256'] if manifest else None,
+        'switched_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+    })
+    if legacy_weights:
+        copy_atomic(release_dir / "best.pt", weights_dir / "best.pt")
+
+
+# ============================================================
+# GATE, ARTEFAK, LATENCY
+# ============================================================
+
+def evaluate_candidate(weights, split, img_size, dataset_dir, splits, label_index_path, image_cache_dir,
+                       predictions_dir, batch_size=16, max_det=100, log=print):
+    """
+    mAP kandidat di satu split (prediksi di-cache per hash weights)
+
+    Returns:
+        Report evaluation.evaluate
+    """
+    from dataset_index import LabelIndex
+    from evaluation import cached_predictions, evaluate, ground_truth_from_index
+    from image_cache import open_or_build
+
+    label_index, _ = LabelIndex.build(dataset_dir, splits, index_path=label_index_path)
+    cache = open_or_build(image_cache_dir, dataset_dir, split, img_size)
+    if not len(cache):
+        raise ValueError(f"Tidak ada gambar di split {split}")
+    preds, _ = cached_predictions(weights, cache, split, predictions_dir, batch_size, max_det=max_det, log=log)
+    gts = ground_truth_from_index(label_index, split, cache.names, cache.orig_shapes)
+    return evaluate(preds, gts, len(cache), label_index.class_names)
+
+
+def check_gate(report, baseline, min_map50_95=0.0, max_drop=0.01):
+    """
+    Returns:
+        passed: bool
+        reasons: List alasan gagal
+    """
+    reasons = []
+    if report['map50_95'] < min_map50_95:
+        reasons.append(f"mAP50-95 {report['map50_95']:.4f} < minimal {min_map50_95:.4f}")
+    if baseline is not None:
+        base = baseline.get('metrics', {}).get('map50_95')
+        if base is not None and report['map50_95'] < base - max_drop:
+            reasons.append(f"mAP50-95 {report['map50_95']:.4f} turun > {max_drop} dari release aktif "
+                           f"{baseline['id']} ({base:.4f})")
+    return not reasons, reasons
+
+
+def build_artifacts(weights, release_dir, sizes, img_size, channels_last=True, onnx=True, log=print):
+    """
+    TorchScript per ukuran & rasio gambar umum (di release_dir/compiled, dipakai langsung oleh
+    OptimizedDetector) + ONNX opsional, lalu ukur latency
+
+    Returns:
+        files: List path artefak
+        latency: Dict mode -> statistik benchmark (ms)
+    """
+    import numpy as np  # type: ignore
+    import torch  # type: ignore
+
+    from fast_inference import OptimizedDetector, benchmark, unwrap_model, to_tensor
+
+    release_dir = Path(release_dir)
+    hub_model = torch.hub.load('ultralytics/yolov5', 'custom', path=str(weights), force_reload=False)
+    image = np.random.default_rng(0).integers(0, 255, (480, 640, 3), dtype=np.uint8)
+    latency = {'autoshape': benchmark(lambda im: hub_model(im, size=img_size), image)}
+
+    detector = OptimizedDetector(hub_model, img_size=img_size, channels_last=channels_last,
+                                 compile_mode='torchscript', cache_dir=release_dir / "compiled",
+                                 weights_path=str(weights))
+    files = detector.prepare(sorted(set(sizes) | {img_size}))
+    latency['torchscript'] = benchmark(detector, image)
+
+    if onnx:
+        class FirstOutput(torch.nn.Module):
+            """Detect mengembalikan (pred, feature maps) saat eval; ONNX cukup pred"""
+
+            def __init__(self, net):
+                super().__init__()
+                self.net = net
+
+            def forward(self, x):
+                y = self.net(x)
+                return y[0] if isinstance(y, (list, tuple)) else y
+
+        path = release_dir / f"best-{img_size}.onnx"
+        try:
+            net = unwrap_model(hub_model).float().eval()
+            example = to_tensor(np.zeros((img_size, img_size, 3), np.uint8), channels_last=False)
+            with torch.no_grad():
+                torch.onnx.export(FirstOutput(net), example, str(path), opset_version=12,
+                                  input_names=['images'], output_names=['output'])
+            files.append(path)
+        except Exception as e:
+            log(f"⚠️  Export ONNX dilewati: {e}")
+            path.unlink(missing_ok=True)
+
+    latency = {mode: {k: round(v, 2) for k, v in stats.items()} for mode, stats in latency.items()}
+    return files, latency
+
+
+# ============================================================
+# PROMOSI
+# ============================================================
+
+def promote(weights, weights_dir, gate_report, latency_builder=None, source=None, force=False,
+            baseline=None, legacy_weights=True, log=print, **meta):
+    """
+    Finalisasi release: staging -> manifest -> rename -> swap pointer
+
+    Args:
+        weights: Path weights kandidat
+        weights_dir: Folder weights/
+        gate_report: Report evaluasi kandidat (evaluation.evaluate)
+        latency_builder: fn(staged_weights, staging_dir) -> (files, latency)
+        baseline: Manifest release aktif (untuk catatan 'previous')
+        meta: Field tambahan manifest (split, img_size, gate, ...)
+
+    Returns:
+        Manifest release baru
+    """
+    weights_dir = Path(weights_dir)
+    digest = file_sha256(weights)
+    release_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{digest[:8]}"
+    releases = weights_dir / RELEASES_DIR
+    staging = releases / f".staging-{release_id}"
+    final = releases / release_id
+    staging.mkdir(parents=True, exist_ok=False)
+
+    try:
+        staged = staging / "best.pt"
+        shutil.copy2(weights, staged)
+        if file_sha256(staged) != digest:
+            raise IOError("Salinan weights tidak cocok dengan sumber")
+
+        files, latency = latency_builder(staged, staging) if latency_builder else ([], {})
+
+        manifest = {
+            'version': MANIFEST_VERSION,
+            'id': release_id,
+            'created_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'source': str(source or weights),
+            'previous': baseline['id'] if baseline else None,
+            'forced': bool(force),
+            'metrics': {k: gate_report[k] for k in ('precision', 'recall', 'map50', 'map50_95')},
+            'per_class': gate_report['per_class'],
+            'latency_ms': latency,
+            'files': {},
+            **meta,
+        }
+        for path in [staged, *files]:
+            rel = Path(path).relative_to(staging).as_posix()
+            manifest['files'][rel] = {'sha256': file_sha256(path), 'size': Path(path).stat().st_size}
+        write_json_atomic(staging / MANIFEST_NAME, manifest)
+
+        os.replace(staging, final)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    swap_pointer(weights_dir, release_id, legacy_weights)
+    log(f"✅ Pointer {weights_dir / POINTER_NAME} -> {RELEASES_DIR}/{release_id}")
+    return manifest
+
+
+def rollback(weights_dir, release_id=None, legacy_weights=True):
+    """
+    Kembalikan pointer ke release sebelumnya (atau release_id tertentu)
+
+    Returns:
+        Manifest release yang diaktifkan
+    """
+    weights_dir = Path(weights_dir)
+    if release_id is None:
+        _, manifest = current_release(weights_dir)
+        if not manifest or not manifest.get('previous'):
+            raise ValueError("Tidak ada release sebelumnya")
+        release_id = manifest['previous']
+    release_dir = weights_dir / RELEASES_DIR / release_id
+    bad = verify_release(release_dir)
+    if bad:
+        raise ValueError(f"Release {release_id} rusak/tidak lengkap: {bad}")
+    swap_pointer(weights_dir, release_id, legacy_weights)
+    return load_manifest(release_dir)
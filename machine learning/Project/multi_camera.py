@@ -0,0 +1,248 @@
+"""
+Multi-source detector dengan inferensi batch bersama
+
+Banyak sumber (index webcam, file video, folder gambar) memakai SATU model.
+Frame terbaru dari setiap sumber digabung menjadi satu forward batch, lalu
+hasilnya dikembalikan ke sumber masing-masing.
+
+Kebijakan fairness: setiap sumber maksimal satu frame per batch, dan jika
+sumber yang siap melebihi ukuran batch, sumber yang paling lama tidak
+dilayani didahulukan. Batch tidak menunggu sumber lambat lebih dari
+`wait_ms`, sehingga sumber lambat tidak menahan sumber lain (dan sumber
+cepat tidak memonopoli batch).
+"""
+
+import threading
+import time
+from pathlib import Path
+
+import cv2  # type: ignore
+
+from webcam_pipeline import LatestFrameCapture, InferenceResult, RateMeter, LatencyMeter
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+
+class FolderSource:
+    """
+    Sumber frame dari folder gambar (diputar berulang dengan kecepatan tetap)
+
+    Interface sama dengan LatestFrameCapture.
+    """
+
+    def __init__(self, folder, fps=1.0, loop=True):
+        self.source = str(folder)
+        self.files = sorted(p for p in Path(folder).iterdir() if p.suffix.lower() in IMAGE_EXTENSIONS)
+        self.interval = 1.0 / fps if fps else 0.0
+        self.loop = loop
+        self.fps = RateMeter()
+        self.read_ms = LatencyMeter()
+        self.failed = False
+
+        self._cond = threading.Condition()
+        self._frame = None
+        self._frame_id = 0
+        self._timestamp = 0.0
+        self._running = False
+        self._thread = None
+
+    def isOpened(self):
+        return bool(self.files)
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name=f"folder:{self.source}", daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        index = 0
+        while self._running:
+            if index >= len(self.files):
+                if not self.loop:
+                    break
+                index = 0
+            start = time.perf_counter()
+            frame = cv2.imread(str(self.files[index]))
+            index += 1
+            now = time.perf_counter()
+            if frame is None:
+                continue
+            self.read_ms.update((now - start) * 1000)
+            self.fps.tick(now)
+            with self._cond:
+                self._frame = frame
+                self._frame_id += 1
+                self._timestamp = now
+                self._cond.notify_all()
+            if self.interval:
+                time.sleep(max(0.0, self.interval - (time.perf_counter() - start)))
+
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+
+    def read(self):
+        with self._cond:
+            return self._frame_id, self._frame, self._timestamp
+
+    def wait_newer(self, last_id, timeout=1.0):
+        with self._cond:
+            self._cond.wait_for(lambda: self._frame_id > last_id or not self._running, timeout)
+            if self._frame_id > last_id:
+                return self._frame_id, self._frame, self._timestamp
+            return last_id, None, 0.0
+
+    @property
+    def running(self):
+        return self._running
+
+    def stop(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+
+
+def open_source(spec, folder_fps=1.0):
+    """
+    Buka sumber frame dari spesifikasi
+
+    Args:
+        spec: int (index webcam), path file video, atau path folder gambar
+
+    Returns:
+        LatestFrameCapture atau FolderSource (belum di-start)
+    """
+    if isinstance(spec, int) or (isinstance(spec, str) and spec.isdigit()):
+        return LatestFrameCapture(int(spec))
+
+    path = Path(spec)
+    if path.is_dir():
+        return FolderSource(path, fps=folder_fps)
+
+    # File video: baca sesuai FPS aslinya agar berperilaku seperti kamera
+    probe = cv2.VideoCapture(str(path))
+    video_fps = probe.get(cv2.CAP_PROP_FPS) or 25.0
+    probe.release()
+    return LatestFrameCapture(str(path), pace_fps=video_fps)
+
+
+class SourceState:
+    """Status per sumber: hasil terakhir dan FPS inferensi"""
+
+    def __init__(self, name, source):
+        self.name = name
+        self.source = source
+        self.last_id = 0
+        self.last_served = 0.0
+        self.result = None
+        self.infer_fps = RateMeter()
+
+
+class BatchScheduler:
+    """
+    Thread yang mengumpulkan frame terbaru dari semua sumber menjadi batch
+
+    Args:
+        sources: List (nama, source)
+        infer_batch_fn: Fungsi list frame -> list detections (urutan sama)
+        max_batch: Ukuran batch maksimal
+        wait_ms: Waktu tunggu maksimal untuk mengisi batch
+    """
+
+    def __init__(self, sources, infer_batch_fn, max_batch=4, wait_ms=30):
+        self.states = [SourceState(name, source) for name, source in sources]
+        self.infer_batch_fn = infer_batch_fn
+        self.max_batch = max(1, int(max_batch))
+        self.wait_s = wait_ms / 1000.0
+        self.batch_ms = LatencyMeter()
+        self.batch_size = LatencyMeter()
+        self.batches = 0
+        self.error = None
+
+        self._lock = threading.Lock()
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="batch-inference", daemon=True)
+        self._thread.start()
+        return self
+
+    def _ready_states(self):
+        """Sumber yang punya frame baru, urut dari yang paling lama tidak dilayani"""
+        ready = [st for st in self.states if st.source.read()[0] > st.last_id]
+        return sorted(ready, key=lambda st: st.last_served)
+
+    def _collect(self):
+        """Kumpulkan batch: penuh, atau sampai wait_ms habis setelah ada frame pertama"""
+        deadline = None
+        while self._running:
+            ready = self._ready_states()
+            alive = sum(st.source.running for st in self.states)
+            if ready:
+                if deadline is None:
+                    deadline = time.perf_counter() + self.wait_s
+                if len(ready) >= min(self.max_batch, max(1, alive)) or time.perf_counter() >= deadline:
+                    return ready[:self.max_batch]
+            elif not alive:
+                return []
+            time.sleep(0.002)
+        return []
+
+    def _run(self):
+        while self._running:
+            batch = self._collect()
+            if not batch:
+                if not any(st.source.running for st in self.states):
+                    break
+                continue
+
+            frames = []
+            for st in batch:
+                frame_id, frame, capture_time = st.source.read()
+                st.last_id = frame_id
+                frames.append((frame, capture_time))
+
+            start = time.perf_counter()
+            try:
+                results = self.infer_batch_fn([frame for frame, _ in frames])
+            except Exception as e:
+                self.error = e
+                print(f"❌ Batch inference error: {e}")
+                break
+            now = time.perf_counter()
+            elapsed_ms = (now - start) * 1000
+
+            self.batch_ms.update(elapsed_ms)
+            self.batch_size.update(len(batch))
+            self.batches += 1
+            with self._lock:
+                for st, (frame, capture_time), detections in zip(batch, frames, results):
+                    st.result = InferenceResult(st.last_id, capture_time, detections, elapsed_ms)
+                    st.last_served = now
+                    st.infer_fps.tick(now)
+
+        self._running = False
+
+    def latest(self, index):
+        """Hasil inferensi terakhir untuk sumber ke-index"""
+        with self._lock:
+            return self.states[index].result
+
+    @property
+    def running(self):
+        return self._running
+
+    def stop(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=5.0)
+
+    def summary(self):
+        per_source = " | ".join(
+            f"{st.name}: cap {st.source.fps.fps:.1f} / inf {st.infer_fps.fps:.1f} FPS"
+            for st in self.states
+        )
+        return (f"batch {self.batch_size.ms:.1f} frame, {self.batch_ms.ms:.1f} ms | {per_source}")
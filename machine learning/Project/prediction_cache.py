@@ -0,0 +1,147 @@
+"""
+Cache prediksi mentah (pre-NMS) per gambar untuk ML service
+
+Forward pass hanya dijalankan sekali per gambar: kandidat deteksi dengan
+confidence di atas batas bawah (min_conf) disimpan bersama info letterbox.
+Request ulang dengan conf/iou/max_det berbeda (slider sensitivitas di
+frontend) cukup menjalankan filter + NMS atas kandidat tersebut, dalam
+hitungan milidetik.
+
+Key cache adalah hash isi file gambar (bytes terenkode), jadi gambar yang
+sama tidak perlu di-decode ulang; client juga bisa mengirim image_key dari
+response sebelumnya tanpa mengunggah gambar lagi. Entry mencatat resolusi
+forward-nya: entry dari resolusi yang diturunkan saat service sibuk tidak
+dipakai lagi begitu service bisa memakai resolusi lebih besar.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+import torch  # type: ignore
+
+from fast_inference import nms, scale_boxes
+
+
+def image_key(image_bytes):
+    """Hash isi file gambar (key cache)"""
+    return hashlib.blake2b(image_bytes, digest_size=12).hexdigest()
+
+
+class RawPrediction:
+    """
+    Kandidat pre-NMS satu gambar
+
+    Attributes:
+        candidates: Tensor (K, 6) [x1, y1, x2, y2, conf, cls] koordinat letterbox
+        size: Ukuran input model yang dipakai saat forward
+        min_conf: Batas bawah confidence kandidat yang disimpan
+    """
+
+    def __init__(self, candidates, letterbox_info, size, min_conf):
+        self.candidates = candidates
+        self.ratio, self.pad, self.shape = letterbox_info
+        self.size = size
+        self.min_conf = min_conf
+
+    @property
+    def nbytes(self):
+        return self.candidates.element_size() * self.candidates.nelement()
+
+    def detections(self, conf, iou, max_det):
+        """
+        Returns:
+            Tensor (M, 6) [x1, y1, x2, y2, conf, cls] di koordinat gambar asli
+        """
+        with torch.inference_mode():
+            det = nms(self.candidates, max(conf, self.min_conf), iou, max_det)
+            return scale_boxes(det.clone(), self.ratio, self.pad, self.shape)
+
+
+class RawPredictionCache:
+    """
+    LRU thread-safe RawPrediction per image_key, dibatasi total byte kandidat
+
+    Args:
+        max_bytes: Batas total ukuran kandidat yang disimpan
+        min_conf: Batas bawah confidence kandidat (threshold request di bawah ini dinaikkan)
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, min_conf=0.01, enabled=True):
+        self.max_bytes = max_bytes
+        self.min_conf = min_conf
+        self.enabled = enabled
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.nms_count = 0
+        self.nms_ms_total = 0.0
+
+    def get(self, key, min_size=None):
+        """
+        Entry untuk key, atau None
+
+        Args:
+            min_size: Entry hasil forward pada resolusi lebih kecil (diambil saat
+                service sibuk) dianggap miss, supaya gambar yang sama diproses
+                ulang pada resolusi penuh begitu beban turun
+        """
+        if not self.enabled or key is None:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or (min_size is not None and entry.size < min_size):
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, entry):
+        if not self.enabled or key is None or entry.nbytes > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old.nbytes
+            self._entries[key] = entry
+            self._bytes += entry.nbytes
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.nbytes
+                self.evictions += 1
+
+    def detections(self, entry, conf, iou, max_det):
+        """entry.detections() + catat waktu filter/NMS"""
+        start = time.perf_counter()
+        det = entry.detections(conf, iou, max_det)
+        with self._lock:
+            self.nms_count += 1
+            self.nms_ms_total += (time.perf_counter() - start) * 1000
+        return det
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """Snapshot untuk endpoint /health"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'enabled': self.enabled,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'min_conf': self.min_conf,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'avg_nms_ms': round(self.nms_ms_total / self.nms_count, 2) if self.nms_count else None
+            }
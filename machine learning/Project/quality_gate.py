@@ -0,0 +1,158 @@
+"""
+Quality gate murah sebelum inferensi
+
+Menolak foto yang tidak layak (blur, terlalu gelap/terang, atau tidak ada
+konten) dalam beberapa milidetik, sebelum membayar forward YOLOv5 dan
+encode JPEG hasil anotasi.
+"""
+
+import threading
+import time
+
+import cv2  # type: ignore
+import numpy as np  # type: ignore
+
+# Pesan "ambil ulang foto" per alasan penolakan
+RETAKE_MESSAGES = {
+    'blurry': 'Foto buram. Pegang kamera dengan stabil dan pastikan fokus pada baglog.',
+    'too_dark': 'Foto terlalu gelap. Tambah pencahayaan atau nyalakan lampu.',
+    'too_bright': 'Foto terlalu terang. Hindari cahaya langsung atau pantulan lampu.',
+    'no_content': 'Baglog tidak terlihat. Arahkan kamera ke baglog dari jarak lebih dekat.'
+}
+
+
+def assess_image_quality(image, downscale=256, min_sharpness=50.0, max_dark_fraction=0.6,
+                         max_bright_fraction=0.6, min_contrast=12.0, min_edge_density=0.01):
+    """
+    Hitung metrik kualitas pada salinan kecil grayscale
+
+    Args:
+        image: Gambar BGR (OpenCV)
+        downscale: Sisi terpanjang salinan kecil (piksel)
+
+    Returns:
+        dict: passed, reasons, metrics, elapsed_ms
+    """
+    start = time.perf_counter()
+
+    h, w = image.shape[:2]
+    scale = downscale / max(h, w)
+    if scale < 1.0:
+        small = cv2.resize(image, (max(1, int(w * scale)), max(1, int(h * scale))),
+                           interpolation=cv2.INTER_AREA)
+    else:
+        small = image
+    gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY) if small.ndim == 3 else small
+
+    # Blur: variance Laplacian (rendah = sedikit detail tajam)
+    sharpness = float(cv2.Laplacian(gray, cv2.CV_64F).var())
+
+    # Exposure: porsi piksel yang terpotong gelap / terang
+    hist = cv2.calcHist([gray], [0], None, [256], [0, 256]).ravel()
+    total = max(1.0, float(hist.sum()))
+    dark_fraction = float(hist[:21].sum() / total)
+    bright_fraction = float(hist[235:].sum() / total)
+
+    # Konten: kontras dan kepadatan tepi (gambar polos/kosong hampir tanpa tepi)
+    contrast = float(gray.std())
+    edges = cv2.Canny(gray, 50, 150)
+    edge_density = float(np.count_nonzero(edges) / edges.size)
+
+    reasons = []
+    if contrast < min_contrast or edge_density < min_edge_density:
+        reasons.append('no_content')
+    elif sharpness < min_sharpness:
+        reasons.append('blurry')
+    if dark_fraction > max_dark_fraction:
+        reasons.append('too_dark')
+    if bright_fraction > max_bright_fraction:
+        reasons.append('too_bright')
+
+    return {
+        'passed': not reasons,
+        'reasons': reasons,
+        'metrics': {
+            'sharpness': round(sharpness, 2),
+            'dark_fraction': round(dark_fraction, 4),
+            'bright_fraction': round(bright_fraction, 4),
+            'contrast': round(contrast, 2),
+            'edge_density': round(edge_density, 4)
+        },
+        'elapsed_ms': round((time.perf_counter() - start) * 1000, 2)
+    }
+
+
+class QualityGate:
+    """
+    Gate kualitas dengan threshold dari config dan counter penolakan
+    """
+
+    def __init__(self, enabled=True, downscale=256, min_sharpness=50.0, max_dark_fraction=0.6,
+                 max_bright_fraction=0.6, min_contrast=12.0, min_edge_density=0.01):
+        self.enabled = enabled
+        self.params = {
+            'downscale': downscale,
+            'min_sharpness': min_sharpness,
+            'max_dark_fraction': max_dark_fraction,
+            'max_bright_fraction': max_bright_fraction,
+            'min_contrast': min_contrast,
+            'min_edge_density': min_edge_density
+        }
+        self._lock = threading.Lock()
+        self.checked = 0
+        self.rejected = 0
+        self.gate_ms_total = 0.0
+        self.reason_counts = {reason: 0 for reason in RETAKE_MESSAGES}
+
+    def check(self, image):
+        """
+        Jalankan gate pada satu gambar
+
+        Returns:
+            dict hasil assess_image_quality, atau None jika gate nonaktif
+        """
+        if not self.enabled:
+            return None
+
+        result = assess_image_quality(image, **self.params)
+        with self._lock:
+            self.checked += 1
+            self.gate_ms_total += result['elapsed_ms']
+            if not result['passed']:
+                self.rejected += 1
+                for reason in result['reasons']:
+                    self.reason_counts[reason] += 1
+        return result
+
+    def retake_response(self, result):
+        """Response terstruktur 'ambil ulang foto' untuk frontend"""
+        return {
+            'success': False,
+            'retake': True,
+            'error': 'Kualitas foto tidak memadai, silakan ambil ulang foto',
+            'reasons': result['reasons'],
+            'messages': [RETAKE_MESSAGES[r] for r in result['reasons']],
+            'quality': result['metrics'],
+            'gate_ms': result['elapsed_ms']
+        }
+
+    def stats(self, avg_inference_ms=None):
+        """
+        Statistik penolakan
+
+        Args:
+            avg_inference_ms: Rata-rata latency inferensi per request, untuk
+                estimasi compute yang dihemat (belum termasuk render/encode)
+        """
+        with self._lock:
+            stats = {
+                'enabled': self.enabled,
+                'checked': self.checked,
+                'rejected': self.rejected,
+                'rejection_rate': round(self.rejected / self.checked, 4) if self.checked else 0.0,
+                'reasons': dict(self.reason_counts),
+                'avg_gate_ms': round(self.gate_ms_total / self.checked, 2) if self.checked else None
+            }
+        if avg_inference_ms:
+            stats['estimated_saved_ms'] = round(stats['rejected'] * avg_inference_ms, 1)
+        return stats
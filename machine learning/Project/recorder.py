@@ -0,0 +1,242 @@
+"""
+Perekam asinkron untuk mode headless webcam
+
+Semua I/O disk (segmen video teranotasi, log JSONL per frame, keyframe JPEG)
+dikerjakan di thread background dengan queue terbatas. Jika disk lambat,
+item dibuang (dan dihitung) alih-alih menahan loop capture/inferensi.
+"""
+
+import json
+import queue
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+import cv2  # type: ignore
+
+
+class AsyncWriter:
+    """
+    Base class writer di thread background
+
+    Subclass mengimplementasikan _write(item) dan _close().
+    """
+
+    def __init__(self, name, queue_size=64):
+        self.name = name
+        self.written = 0
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, item):
+        """Masukkan item ke queue tanpa pernah blocking"""
+        try:
+            self._queue.put_nowait(item)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            try:
+                self._write(item)
+                self.written += 1
+            except Exception as e:
+                print(f"❌ [{self.name}] write error: {e}")
+        self._close()
+
+    def _write(self, item):
+        raise NotImplementedError
+
+    def _close(self):
+        pass
+
+    def close(self):
+        """Flush sisa queue lalu hentikan thread"""
+        self._queue.put(None)
+        self._thread.join(timeout=10.0)
+
+
+class VideoSegmentWriter(AsyncWriter):
+    """
+    Tulis frame teranotasi ke segmen video berdurasi tetap dengan rotasi
+
+    Frame datang dengan laju loop (bisa lebih cepat atau lebih lambat dari
+    `fps`), jadi penempatan frame mengikuti timestamp: frame yang jatuh di
+    slot 1/fps yang sama dilewati, slot yang kosong diisi frame sebelumnya.
+    Durasi putar segmen sama dengan waktu nyata.
+
+    Args:
+        output_dir: Folder segmen video
+        segment_seconds: Durasi per segmen
+        max_segments: Jumlah segmen yang disimpan (yang lama dihapus)
+        fps: FPS file video
+    """
+
+    def __init__(self, output_dir, segment_seconds=300, max_segments=12, fps=10.0, queue_size=64):
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.segment_seconds = segment_seconds
+        self.max_segments = max_segments
+        self.fps = fps
+        self._writer = None
+        self._segment_start = 0.0
+        self._segment_frames = 0
+        self._last_slot = None
+        self.segments = sorted(self.output_dir.glob("segment_*.mp4"))
+        super().__init__("video-writer", queue_size)
+
+    def _open_segment(self, frame, timestamp):
+        if self._writer is not None:
+            self._writer.release()
+        h, w = frame.shape[:2]
+        path = self.output_dir / f"segment_{datetime.now().strftime('%Y%m%d_%H%M%S')}.mp4"
+        self._writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*'mp4v'), self.fps, (w, h))
+        self._segment_start = timestamp
+        self._segment_frames = 0
+        self.segments.append(path)
+        print(f"[RECORD] Segmen baru: {path.name}")
+
+        # Rotasi: hapus segmen tertua
+        while self.max_segments and len(self.segments) > self.max_segments:
+            old = self.segments.pop(0)
+            try:
+                old.unlink()
+                print(f"[RECORD] Segmen lama dihapus: {old.name}")
+            except OSError:
+                pass
+
+    def due(self, timestamp):
+        """
+        True jika frame pada timestamp mengisi slot 1/fps baru
+
+        Dipanggil dari loop sebelum frame di-copy, agar frame yang toh akan
+        dilewati tidak membebani queue.
+        """
+        slot = int(timestamp * self.fps)
+        if slot == self._last_slot:
+            return False
+        self._last_slot = slot
+        return True
+
+    def _write(self, item):
+        frame, timestamp = item
+        if self._writer is None or timestamp - self._segment_start >= self.segment_seconds:
+            self._open_segment(frame, timestamp)
+        # Jumlah frame yang seharusnya sudah ada di segmen pada timestamp ini
+        target = int((timestamp - self._segment_start) * self.fps) + 1
+        for _ in range(target - self._segment_frames):
+            self._writer.write(frame)
+            self._segment_frames += 1
+
+    def _close(self):
+        if self._writer is not None:
+            self._writer.release()
+
+
+class JsonlLogWriter(AsyncWriter):
+    """Tulis satu baris JSON per frame ke file log"""
+
+    def __init__(self, log_dir, queue_size=64):
+        Path(log_dir).mkdir(parents=True, exist_ok=True)
+        self.path = Path(log_dir) / f"detections_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl"
+        self._file = open(self.path, 'a', encoding='utf-8')
+        super().__init__("jsonl-writer", queue_size)
+
+    def _write(self, record):
+        self._file.write(json.dumps(record) + "\n")
+
+    def _close(self):
+        self._file.close()
+
+
+class KeyframeWriter(AsyncWriter):
+    """Simpan frame JPEG ke folder"""
+
+    def __init__(self, frames_dir, queue_size=64):
+        self.frames_dir = Path(frames_dir)
+        self.frames_dir.mkdir(parents=True, exist_ok=True)
+        super().__init__("keyframe-writer", queue_size)
+
+    def _write(self, item):
+        frame, filename = item
+        cv2.imwrite(str(self.frames_dir / filename), frame)
+
+
+class DetectionRecorder:
+    """
+    Fasad perekam: video segmen, log JSONL, dan keyframe saat jumlah berubah
+
+    Args:
+        video_dir: Folder segmen video (None = tanpa video)
+        log_dir: Folder log JSONL (None = tanpa log)
+        frames_dir: Folder keyframe (None = tanpa keyframe)
+    """
+
+    def __init__(self, video_dir=None, log_dir=None, frames_dir=None, segment_seconds=300,
+                 max_segments=12, video_fps=10.0, queue_size=64):
+        self.video = VideoSegmentWriter(video_dir, segment_seconds, max_segments,
+                                        video_fps, queue_size) if video_dir else None
+        self.log = JsonlLogWriter(log_dir, queue_size) if log_dir else None
+        self.keyframes = KeyframeWriter(frames_dir, queue_size) if frames_dir else None
+        self._last_counts = None
+
+        if self.log is not None:
+            print(f"[RECORD] Log deteksi: {self.log.path}")
+
+    @property
+    def active(self):
+        return any(w is not None for w in (self.video, self.log, self.keyframes))
+
+    def record(self, frame, detections, counts, frame_id, timestamp=None):
+        """
+        Rekam satu frame (tidak pernah blocking)
+
+        Args:
+            frame: Frame teranotasi
+            detections: List deteksi
+            counts: Dict jumlah per kelas
+            frame_id: Nomor frame
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+
+        if self.video is not None and self.video.due(timestamp):
+            # Frame teranotasi di-copy karena akan dipakai ulang oleh loop display
+            self.video.submit((frame.copy(), timestamp))
+
+        if self.log is not None:
+            self.log.submit({
+                'time': round(timestamp, 3),
+                'frame': frame_id,
+                'counts': counts,
+                'detections': [
+                    {
+                        'class': det['class'],
+                        'confidence': round(float(det['confidence']), 4),
+                        'bbox': [int(v) for v in det['bbox']],
+                        **({'track_id': det['track_id']} if 'track_id' in det else {})
+                    }
+                    for det in detections
+                ]
+            })
+
+        if self.keyframes is not None and counts != self._last_counts:
+            stamp = datetime.fromtimestamp(timestamp).strftime('%Y%m%d_%H%M%S_%f')[:-3]
+            # Jumlah terakhir hanya diperbarui jika keyframe masuk queue, agar
+            # perubahan yang terbuang karena queue penuh dicoba lagi di frame berikutnya
+            if self.keyframes.submit((frame.copy(), f"keyframe_{stamp}_{frame_id}.jpg")):
+                self._last_counts = counts
+
+    def close(self):
+        """Flush dan tutup semua writer, lalu cetak ringkasan"""
+        for writer in (self.video, self.log, self.keyframes):
+            if writer is not None:
+                writer.close()
+                print(f"[RECORD] {writer.name}: {writer.written} ditulis, {writer.dropped} dibuang")
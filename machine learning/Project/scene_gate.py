@@ -0,0 +1,99 @@
+"""
+Scene-change gate: lewati inferensi pada frame yang statis
+
+Setiap frame diringkas menjadi fingerprint grayscale kecil. Jika selisihnya
+dengan frame terakhir yang di-inferensi di bawah threshold, deteksi lama
+dipakai ulang. Inferensi dijalankan lagi saat ada perubahan nyata atau
+setelah batas umur (staleness) terlewati.
+"""
+
+import time
+
+import cv2  # type: ignore
+import numpy as np  # type: ignore
+
+
+def frame_fingerprint(frame, size=(32, 24)):
+    """Fingerprint grayscale kecil (float32) dari frame BGR"""
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+    return cv2.resize(gray, size, interpolation=cv2.INTER_AREA).astype(np.float32)
+
+
+class SceneChangeGate:
+    """
+    Bungkus fungsi frame -> deteksi dengan gate perubahan scene
+
+    Args:
+        process_fn: Fungsi frame -> list deteksi
+        threshold: Rata-rata selisih absolut fingerprint (0-255) untuk dianggap berubah
+        max_stale_seconds: Inferensi ulang paksa setelah deteksi berumur selama ini
+        fingerprint_size: Ukuran fingerprint (w, h)
+        log_interval: Interval log statistik ke console (detik), 0 = tanpa log
+    """
+
+    def __init__(self, process_fn, threshold=4.0, max_stale_seconds=10.0,
+                 fingerprint_size=(32, 24), log_interval=10.0):
+        self.process_fn = process_fn
+        self.threshold = threshold
+        self.max_stale_seconds = max_stale_seconds
+        self.fingerprint_size = tuple(fingerprint_size)
+        self.log_interval = log_interval
+
+        self.frames = 0
+        self.skipped = 0
+        self.last_diff = 0.0
+        self.last_skipped = False
+        self.process_ms_total = 0.0
+        self.gate_ms_total = 0.0
+
+        self._fingerprint = None
+        self._detections = []
+        self._inferred_at = 0.0
+        self._last_log = time.perf_counter()
+
+    def __call__(self, frame):
+        start = time.perf_counter()
+        fingerprint = frame_fingerprint(frame, self.fingerprint_size)
+        self.frames += 1
+
+        if self._fingerprint is not None:
+            self.last_diff = float(np.mean(np.abs(fingerprint - self._fingerprint)))
+        stale = start - self._inferred_at >= self.max_stale_seconds
+        changed = self._fingerprint is None or self.last_diff >= self.threshold
+        self.gate_ms_total += (time.perf_counter() - start) * 1000
+
+        if changed or stale:
+            process_start = time.perf_counter()
+            self._detections = self.process_fn(frame)
+            self.process_ms_total += (time.perf_counter() - process_start) * 1000
+            self._fingerprint = fingerprint
+            self._inferred_at = process_start
+            self.last_skipped = False
+        else:
+            self.skipped += 1
+            self.last_skipped = True
+
+        if self.log_interval and start - self._last_log >= self.log_interval:
+            print(f"[SCENE GATE] {self.summary()}")
+            self._last_log = start
+
+        return self._detections
+
+    @property
+    def skip_ratio(self):
+        """Porsi frame yang melewati inferensi"""
+        return self.skipped / self.frames if self.frames else 0.0
+
+    @property
+    def saved_ms(self):
+        """Estimasi waktu CPU yang dihemat (ms): frame dilewati x rata-rata biaya proses"""
+        processed = self.frames - self.skipped
+        if not processed:
+            return 0.0
+        return self.skipped * (self.process_ms_total / processed)
+
+    def summary(self):
+        return (f"skip {self.skipped}/{self.frames} frame ({self.skip_ratio * 100:.1f}%) | "
+                f"diff {self.last_diff:.2f} (thr {self.threshold}) | "
+                f"hemat ~{self.saved_ms / 1000:.1f} s CPU | "
+                f"biaya gate {self.gate_ms_total / max(1, self.frames):.2f} ms/frame")
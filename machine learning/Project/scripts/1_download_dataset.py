@@ -4,9 +4,14 @@ Script 1: Download Dataset dari Roboflow
 
 from roboflow import Roboflow
 import os
+import sys
 from pathlib import Path
-import shutil
-import yaml
+
+# Agar modul di root project bisa di-import
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config import DATASET_SPLITS
+from dataset_import import import_dataset
 
 # ============================================================
 # KONFIGURASI - SESUAI DENGAN KODE ROBOFLOW ANDA
@@ -18,6 +23,9 @@ VERSION = 8
 
 DOWNLOAD_PATH = "dataset"
 
+# Export Roboflow diunduh ke sini dulu, lalu diimport incremental ke DOWNLOAD_PATH
+STAGING_PATH = f"downloads/roboflow-v{VERSION}"
+
 # ============================================================
 
 def count_images(path):
@@ -26,41 +34,6 @@ def count_images(path):
         return 0
     return len(list(Path(path).glob("*.jpg"))) + len(list(Path(path).glob("*.png")))
 
-def fix_data_yaml(dataset_location):
-    """Fix data.yaml dengan absolute path"""
-    data_yaml = Path(dataset_location) / "data.yaml"
-    
-    if not data_yaml.exists():
-        print(f"⚠️  data.yaml tidak ditemukan di: {data_yaml}")
-        return
-    
-    print("\n🔧 Memperbaiki data.yaml...")
-    
-    with open(data_yaml, 'r') as f:
-        data = yaml.safe_load(f)
-    
-    # Convert ke absolute path
-    base_path = Path(dataset_location).resolve()
-    
-    # Update paths - PENTING: gunakan absolute path
-    data['path'] = str(base_path)  # ✅ Tambah root path
-    data['train'] = 'train/images'  # ✅ Relative dari path
-    data['val'] = 'valid/images'    # ✅ Relative dari path
-    
-    # Tambahkan test jika ada
-    test_path = base_path / 'test' / 'images'
-    if test_path.exists():
-        data['test'] = 'test/images'
-    
-    # Save fixed yaml
-    with open(data_yaml, 'w') as f:
-        yaml.dump(data, f, default_flow_style=False, sort_keys=False)
-    
-    print(f"✅ data.yaml diperbaiki:")
-    print(f"   path : {data['path']}")
-    print(f"   train: {data['train']}")
-    print(f"   val  : {data['val']}")
-
 def download_dataset():
     print("="*70)
     print("STEP 1: Download Dataset dari Roboflow")
@@ -73,17 +46,6 @@ def download_dataset():
     print()
     
     try:
-        # Hapus dataset lama jika ada
-        if Path(DOWNLOAD_PATH).exists():
-            response = input("⚠️  Dataset sudah ada. Hapus dan download ulang? (y/n): ").lower()
-            if response == 'y':
-                print(f"🗑️  Menghapus dataset lama...")
-                shutil.rmtree(DOWNLOAD_PATH)
-                print("✅ Dataset lama dihapus")
-            else:
-                print("❌ Download dibatalkan")
-                return None
-        
         # Initialize Roboflow
         print("\n🔗 Connecting to Roboflow...")
         rf = Roboflow(api_key=API_KEY)
@@ -101,18 +63,21 @@ def download_dataset():
         print(f"\n📥 Downloading dataset...")
         print("   This may take a few minutes...")
         
-        dataset = version.download("yolov5", location=DOWNLOAD_PATH)
+        version.download("yolov5", location=STAGING_PATH, overwrite=True)
         
         print("\n" + "="*70)
         print("✅ DOWNLOAD BERHASIL!")
         print("="*70)
         
-        # Fix data.yaml
-        fix_data_yaml(dataset.location)
+        # Import incremental: hanya file baru/berubah yang disalin, data.yaml diperbaiki
+        print(f"\n🔄 Sinkronisasi {STAGING_PATH} -> {DOWNLOAD_PATH}...")
+        report = import_dataset(STAGING_PATH, DOWNLOAD_PATH, DATASET_SPLITS)
+        print(f"✅ Baru {report['added']} | berubah {report['updated']} | sama {report['unchanged']} | "
+              f"dihapus {report['removed']} ({report['seconds']:.1f} s)")
         
         # Show dataset info
         print("\n📊 Dataset Statistics:")
-        dataset_path = Path(dataset.location)
+        dataset_path = Path(DOWNLOAD_PATH)
         
         total = 0
         for split in ['train', 'valid', 'test']:
@@ -123,10 +88,10 @@ def download_dataset():
                 print(f"   {split.upper():6s}: {count:4d} images")
         
         print(f"   {'TOTAL':6s}: {total:4d} images")
-        print(f"\n✅ Dataset location: {dataset.location}")
+        print(f"\n✅ Dataset location: {dataset_path.resolve()}")
         print(f"✅ Next: python scripts/2_train_model.py")
         
-        return dataset.location
+        return str(dataset_path)
         
     except Exception as e:
         print(f"\n❌ Error: {e}")
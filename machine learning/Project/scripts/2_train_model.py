@@ -1,10 +1,26 @@
 """
 Script 2: Training YOLOv5
+
+Batch size, dataloader workers, dan cache gambar dipilih otomatis dari RAM &
+core yang tersedia. results.csv dipantau selama training: waktu per epoch dan
+images/s dicatat, dan training dihentikan jika mAP tidak naik selama PATIENCE
+epoch. Run yang terputus otomatis di-resume dari last.pt.
+
+Contoh:
+    python scripts/2_train_model.py                     # otomatis (resume jika terputus)
+    python scripts/2_train_model.py --patience 30 --batch 16
+    python scripts/2_train_model.py --fresh             # abaikan run terputus, mulai baru
 """
 
+import argparse
 import os
-import subprocess
 import sys
+from pathlib import Path
+
+# Agar modul di root project bisa di-import
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from training_launcher import TrainingLauncher
 
 # ============================================================
 # KONFIGURASI TRAINING
@@ -12,9 +28,13 @@ import sys
 DATA_YAML = "dataset/data.yaml"
 MODEL_SIZE = "yolov5n"              
 IMG_SIZE = 640
-BATCH_SIZE = 8                      # ✅ Kurangi batch size untuk CPU
-EPOCHS = 200                        # ✅ Ubah dari 50 ke 150-200
-DEVICE = "cpu"                      # ✅ UBAH DARI "0" KE "cpu"
+BATCH_SIZE = None                   # ✅ None = otomatis dari RAM tersedia
+WORKERS = None                      # ✅ None = otomatis dari jumlah core
+CACHE = None                        # ✅ None = otomatis ('ram' jika muat, selain itu 'disk')
+EPOCHS = 200                        # Batas atas, biasanya berhenti lebih awal
+PATIENCE = 20                       # ✅ Stop jika mAP tidak naik selama N epoch
+MIN_DELTA = 0.001                   # Kenaikan minimal yang dihitung sebagai "naik"
+METRIC = "metrics/mAP_0.5:0.95"     # Kolom results.csv untuk early stopping
 
 PROJECT_DIR = "runs/train"
 EXPERIMENT_NAME = "jamur_detector"
@@ -34,6 +54,21 @@ def check_yolov5():
     return True
 
 def train_yolov5():
+    parser = argparse.ArgumentParser(description="Training YOLOv5 dengan resource otomatis & early stopping")
+    parser.add_argument("--data", default=DATA_YAML, help="Data yaml (mis. dataset/data_dedup.yaml)")
+    parser.add_argument("--model", default=MODEL_SIZE, help="yolov5n / yolov5s / ...")
+    parser.add_argument("--img", type=int, default=IMG_SIZE, help="Ukuran training")
+    parser.add_argument("--epochs", type=int, default=EPOCHS, help="Epoch maksimal")
+    parser.add_argument("--batch", type=int, default=BATCH_SIZE, help="Batch size (default: otomatis)")
+    parser.add_argument("--workers", type=int, default=WORKERS, help="Dataloader workers (default: otomatis)")
+    parser.add_argument("--cache", choices=["ram", "disk", "none"], default=CACHE,
+                        help="Mode cache gambar (default: otomatis)")
+    parser.add_argument("--patience", type=int, default=PATIENCE, help="Epoch tanpa kenaikan mAP (0 = nonaktif)")
+    parser.add_argument("--metric", default=METRIC, help="Kolom results.csv untuk early stopping")
+    parser.add_argument("--name", default=EXPERIMENT_NAME, help="Nama run di runs/train")
+    parser.add_argument("--fresh", action="store_true", help="Jangan resume run yang terputus")
+    args = parser.parse_args()
+
     print("="*70)
     print("STEP 2: Training YOLOv5")
     print("="*70)
@@ -43,53 +78,50 @@ def train_yolov5():
         return
     
     # Cek data.yaml
-    if not os.path.exists(DATA_YAML):
-        print(f"❌ {DATA_YAML} tidak ditemukan!")
+    if not os.path.exists(args.data):
+        print(f"❌ {args.data} tidak ditemukan!")
         print("\nJalankan dulu: python scripts/1_download_dataset.py")
         return
+
+    cache = "" if args.cache == "none" else args.cache
+    launcher = TrainingLauncher(args.data, model_size=args.model, img_size=args.img, epochs=args.epochs,
+                                project_dir=PROJECT_DIR, name=args.name, batch=args.batch,
+                                workers=args.workers, cache=cache, patience=args.patience,
+                                min_delta=MIN_DELTA, metric=args.metric)
     
     print(f"\n[CONFIG]")
-    print(f"  Dataset  : {DATA_YAML}")
-    print(f"  Model    : {MODEL_SIZE}")
-    print(f"  Image    : {IMG_SIZE}x{IMG_SIZE}")
-    print(f"  Batch    : {BATCH_SIZE}")
-    print(f"  Epochs   : {EPOCHS}")
-    print(f"  Device   : {DEVICE}")
-    
-    # Command training
-    cmd = [
-        sys.executable, "yolov5/train.py",
-        "--img", str(IMG_SIZE),
-        "--batch", str(BATCH_SIZE),
-        "--epochs", str(EPOCHS),
-        "--data", DATA_YAML,
-        "--weights", f"{MODEL_SIZE}.pt",
-        "--device", DEVICE,
-        "--project", PROJECT_DIR,
-        "--name", EXPERIMENT_NAME,
-        "--exist-ok"
-    ]
+    print(f"  Dataset  : {args.data} ({launcher.n_train_images} gambar train)")
+    print(f"  Model    : {args.model}")
+    print(f"  Image    : {args.img}x{args.img}")
+    print(f"  Batch    : {launcher.plan['batch']}")
+    print(f"  Workers  : {launcher.plan['workers']}")
+    print(f"  Cache    : {launcher.plan['cache']}")
+    print(f"  Epochs   : {args.epochs} (patience {args.patience})")
+    print(f"  Device   : cpu")
     
-    print(f"\n[COMMAND] {' '.join(cmd)}")
     print("\n" + "="*70)
     print("Training dimulai...")
     print("="*70 + "\n")
     
-    try:
-        subprocess.run(cmd, check=True)
-        
-        print("\n" + "="*70)
-        print("✅ TRAINING SELESAI!")
-        print("="*70)
-        
-        best_model = f"{PROJECT_DIR}/{EXPERIMENT_NAME}/weights/best.pt"
-        print(f"\nBest model: {best_model}")
-        print(f"\nNext: python scripts/3_copy_model.py")
-        
-    except subprocess.CalledProcessError as e:
-        print(f"\n❌ Training error: {e}")
-    except KeyboardInterrupt:
-        print("\n\n⚠️ Training dihentikan")
+    summary = launcher.run(resume=not args.fresh)
+    status = summary['status']
+
+    if status == 'interrupted':
+        print("   Jalankan ulang script ini untuk melanjutkan dari last.pt")
+        return
+    if status == 'failed':
+        print(f"\n❌ Training error (lihat log di atas)")
+        return
+
+    print("\n" + "="*70)
+    print("✅ TRAINING SELESAI!" if status == 'finished' else "✅ TRAINING DIHENTIKAN (early stopping)")
+    print("="*70)
+    if summary['best'] is not None:
+        print(f"\nBest {args.metric.split('/')[-1]}: {summary['best']:.4f} (epoch {summary['best_epoch']})")
+    print(f"Rata-rata epoch: {summary['mean_epoch_s']:.0f} s | {summary['images_per_s']:.1f} img/s")
+    print(f"Log epoch: {launcher.run_dir / 'launcher_log.csv'}")
+    print(f"\nBest model: {summary['weights']}")
+    print(f"\nNext: python scripts/3_copy_model.py")
 
 if __name__ == "__main__":
     train_yolov5()
@@ -1,52 +1,152 @@
 """
-Script 3: Copy Model ke Folder Weights
+Script 3: Promosi Model ke Folder Weights
+
+Satu langkah: eval gate (mAP di split validasi) -> bangun artefak serving
+(TorchScript per ukuran, ONNX) -> ukur latency -> tulis manifest (sha256,
+metrik, latency) -> rename folder release -> ganti pointer weights/current.json
+secara atomic. Service yang sedang berjalan tidak pernah membaca file
+setengah tertulis, dan service baru langsung memakai artefak yang sudah jadi.
+
+Contoh:
+    python scripts/3_copy_model.py                          # promosi best.pt hasil training
+    python scripts/3_copy_model.py --weights runs/sweep/runs/<key>/weights/best.pt
+    python scripts/3_copy_model.py --list
+    python scripts/3_copy_model.py --rollback               # kembali ke release sebelumnya
 """
 
-import os
-import shutil
+import argparse
+import sys
+from pathlib import Path
+
+# Agar modul di root project bisa di-import
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config import (WEIGHTS_DIR, IMG_SIZE, CHANNELS_LAST, ADAPTIVE_RESOLUTION, RESOLUTION_LADDER,
+                    DATASET_DIR, DATASET_SPLITS, LABEL_INDEX_PATH, IMAGE_CACHE_DIR,
+                    PREDICTIONS_CACHE_DIR, MAX_DETECTIONS)
+from model_registry import (current_release, list_releases, evaluate_candidate, check_gate,
+                            build_artifacts, promote, rollback, POINTER_NAME)
 
 # ============================================================
 # KONFIGURASI
 # ============================================================
 SOURCE_MODEL = "runs/train/jamur_detector/weights/best.pt"
-DEST_DIR = "weights"
-DEST_MODEL = f"{DEST_DIR}/best.pt"
+GATE_SPLIT = "valid"
+MIN_MAP50_95 = 0.30                 # mAP@0.5:0.95 minimal di split validasi
+MAX_DROP = 0.01                     # Penurunan maksimal dibanding release aktif
 
 # ============================================================
 
+def print_releases():
+    _, active = current_release(WEIGHTS_DIR)
+    releases = list_releases(WEIGHTS_DIR)
+    if not releases:
+        print("Belum ada release")
+        return
+    print(f"  {'':2s}{'id':26s}{'mAP50':>8s}{'mAP50-95':>10s}{'p50 ms':>9s}  sumber")
+    for m in releases:
+        mark = "*" if active and m['id'] == active['id'] else " "
+        p50 = m['latency_ms'].get('torchscript', {}).get('p50', 0.0)
+        print(f"  {mark} {m['id']:26s}{m['metrics']['map50']:>8.3f}{m['metrics']['map50_95']:>10.3f}"
+              f"{p50:>9.1f}  {m['source']}")
+
 def copy_model():
+    parser = argparse.ArgumentParser(description="Promosi model (gate + artefak + swap atomic)")
+    parser.add_argument("--weights", default=SOURCE_MODEL, help="Weights kandidat")
+    parser.add_argument("--split", default=GATE_SPLIT, choices=DATASET_SPLITS, help="Split eval gate")
+    parser.add_argument("--img", type=int, default=IMG_SIZE, help="Ukuran eval & artefak utama")
+    parser.add_argument("--min-map", type=float, default=MIN_MAP50_95, help="mAP50-95 minimal")
+    parser.add_argument("--max-drop", type=float, default=MAX_DROP, help="Penurunan maksimal vs release aktif")
+    parser.add_argument("--force", action="store_true", help="Promosikan walau gate gagal")
+    parser.add_argument("--no-onnx", action="store_true", help="Lewati export ONNX")
+    parser.add_argument("--list", action="store_true", help="Tampilkan semua release")
+    parser.add_argument("--rollback", nargs="?", const="", default=None, metavar="ID",
+                        help="Aktifkan release sebelumnya (atau ID tertentu)")
+    args = parser.parse_args()
+
     print("="*70)
-    print("STEP 3: Copy Model ke Weights Folder")
+    print("STEP 3: Promosi Model ke Weights Folder")
     print("="*70)
-    
+
+    if args.list:
+        print()
+        print_releases()
+        return
+
+    if args.rollback is not None:
+        try:
+            manifest = rollback(WEIGHTS_DIR, args.rollback or None)
+        except ValueError as e:
+            print(f"❌ {e}")
+            return
+        print(f"✅ Rollback: release aktif sekarang {manifest['id']} (mAP50-95 {manifest['metrics']['map50_95']:.4f})")
+        print("   Restart service agar memakai release ini")
+        return
+
     # Cek source model
-    if not os.path.exists(SOURCE_MODEL):
-        print(f"❌ Model tidak ditemukan: {SOURCE_MODEL}")
+    if not Path(args.weights).exists():
+        print(f"❌ Model tidak ditemukan: {args.weights}")
         print("\nJalankan dulu: python scripts/2_train_model.py")
         return
-    
-    # Create dest dir jika belum ada
-    os.makedirs(DEST_DIR, exist_ok=True)
-    
-    # Copy model
+
+    _, baseline = current_release(WEIGHTS_DIR)
+    sizes = RESOLUTION_LADDER if ADAPTIVE_RESOLUTION else [args.img]
+    print(f"\n[CONFIG]")
+    print(f"  Kandidat : {args.weights}")
+    print(f"  Aktif    : {baseline['id'] if baseline else '-'}")
+    print(f"  Gate     : {args.split}, mAP50-95 >= {args.min_map}, turun <= {args.max_drop}")
+    print(f"  Artefak  : TorchScript {sorted(set(sizes) | {args.img})}{'' if args.no_onnx else ' + ONNX'}")
+
+    # 1. Eval gate
+    print(f"\n[1/3] Eval gate ({args.split})...")
+    report = evaluate_candidate(args.weights, args.split, args.img, DATASET_DIR, DATASET_SPLITS,
+                                LABEL_INDEX_PATH, IMAGE_CACHE_DIR, PREDICTIONS_CACHE_DIR,
+                                max_det=MAX_DETECTIONS)
+    passed, reasons = check_gate(report, baseline, args.min_map, args.max_drop)
+    print(f"  mAP50 {report['map50']:.4f} | mAP50-95 {report['map50_95']:.4f} | "
+          f"P {report['precision']:.3f} | R {report['recall']:.3f}")
+    if not passed:
+        for reason in reasons:
+            print(f"  ❌ {reason}")
+        if not args.force:
+            print("\n❌ Promosi dibatalkan (pakai --force untuk tetap mempromosikan)")
+            return
+        print("  ⚠️ --force: gate diabaikan")
+    else:
+        print("  ✅ Gate lolos")
+
+    # 2-3. Artefak, manifest, swap
+    print(f"\n[2/3] Membangun artefak serving & mengukur latency...")
+
+    def builder(staged_weights, staging_dir):
+        return build_artifacts(staged_weights, staging_dir, sizes, args.img,
+                               channels_last=CHANNELS_LAST, onnx=not args.no_onnx)
+
+    import torch
+
+    print(f"\n[3/3] Manifest & swap pointer...")
     try:
-        shutil.copy2(SOURCE_MODEL, DEST_MODEL)
-        
-        # Get file size
-        size_mb = os.path.getsize(DEST_MODEL) / (1024 * 1024)
-        
-        print(f"✅ Model copied!")
-        print(f"   From: {SOURCE_MODEL}")
-        print(f"   To  : {DEST_MODEL}")
-        print(f"   Size: {size_mb:.2f} MB")
-        
-        print("\n" + "="*70)
-        print("✅ MODEL SIAP DIGUNAKAN!")
-        print("="*70)
-        print(f"\nNext: python detect_jamur_pc.py")
-        
+        manifest = promote(args.weights, WEIGHTS_DIR, report, latency_builder=builder, force=not passed,
+                           baseline=baseline, split=args.split, img_size=args.img,
+                           gate={'min_map50_95': args.min_map, 'max_drop': args.max_drop,
+                                 'passed': passed, 'reasons': reasons},
+                           torch_version=torch.__version__.split('+')[0],
+                           channels_last=CHANNELS_LAST)
     except Exception as e:
         print(f"❌ Error: {e}")
+        return
+
+    for mode, stats in manifest['latency_ms'].items():
+        print(f"  {mode:12s} p50 {stats['p50']:7.1f} ms | p95 {stats['p95']:7.1f} ms")
+    size_mb = manifest['files']['best.pt']['size'] / (1024 * 1024)
+
+    print("\n" + "="*70)
+    print("✅ MODEL SIAP DIGUNAKAN!")
+    print("="*70)
+    print(f"   Release : {manifest['id']} ({len(manifest['files'])} file, best.pt {size_mb:.2f} MB)")
+    print(f"   Pointer : {WEIGHTS_DIR / POINTER_NAME}")
+    print("\nArtefak TorchScript dipakai langsung jika COMPILE_MODE = 'torchscript' di config.py")
+    print(f"\nNext: python detect_jamur_pc.py")
 
 if __name__ == "__main__":
     copy_model()
@@ -1,81 +1,150 @@
 """
-Script 4: Test Model dengan Sample Image
+Script 4: Evaluasi Model pada Satu Split Penuh
+
+Inferensi batch atas SELURUH split (dari cache gambar pre-letterbox), prediksi
+mentah di-cache per weights, lalu precision/recall, mAP@0.5, mAP@0.5:0.95,
+AP per kelas dan confusion matrix dihitung dengan NumPy. Scoring ulang dengan
+--conf lain memakai cache prediksi, tanpa menjalankan model lagi.
+
+Contoh:
+    python scripts/4_test_model.py                       # split test, weights/best.pt
+    python scripts/4_test_model.py --split valid --conf 0.4
+    python scripts/4_test_model.py --samples 5           # simpan juga 5 gambar teranotasi
 """
 
-import torch
-import cv2
+import argparse
+import json
 import os
+import sys
+import time
+from datetime import datetime
 from pathlib import Path
 
+# Agar modul di root project bisa di-import
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config import (DATASET_DIR, PREDICTIONS_CACHE_DIR, IMAGE_CACHE_DIR, LABEL_INDEX_PATH,
+                    DATASET_SPLITS, IMG_SIZE, MAX_DETECTIONS, CLASS_COLORS)
+from dataset_index import LabelIndex
+from image_cache import open_or_build
+from evaluation import cached_predictions, evaluate, ground_truth_from_index
+
 # ============================================================
 # KONFIGURASI
 # ============================================================
 MODEL_PATH = "weights/best.pt"
-TEST_IMAGE = "dataset/test/images"  # Folder test images
 OUTPUT_DIR = "output/test_results"
 
+# Prediksi di-cache dengan conf sangat rendah agar kurva PR lengkap (seperti val.py YOLOv5)
+CACHE_CONF = 0.001
+CACHE_IOU = 0.6
+BATCH_SIZE = 16
+
 # ============================================================
 
+def print_report(report, class_names):
+    print("\n" + "="*70)
+    print(f"HASIL EVALUASI (conf {report['conf_thres']})")
+    print("="*70)
+    print(f"  {'Kelas':<12s}{'GT':>6s}{'Pred':>7s}{'P':>8s}{'R':>8s}{'AP50':>8s}{'AP50-95':>9s}")
+    for name, m in report['per_class'].items():
+        print(f"  {name:<12s}{m['n_gt']:>6d}{m['n_pred']:>7d}{m['precision']:>8.3f}{m['recall']:>8.3f}"
+              f"{m['ap50']:>8.3f}{m['ap50_95']:>9.3f}")
+    print(f"  {'ALL':<12s}{'':>13s}{report['precision']:>8.3f}{report['recall']:>8.3f}"
+          f"{report['map50']:>8.3f}{report['map50_95']:>9.3f}")
+
+    if report.get('skipped_gt') or report.get('skipped_pred'):
+        print(f"\n  ⚠️  Dilewati (class id di luar {len(class_names)} kelas): "
+              f"{report['skipped_gt']} box GT, {report['skipped_pred']} prediksi "
+              f"(cek: python scripts/index_dataset.py --issues)")
+
+    labels = class_names + ['background']
+    print("\n  Confusion matrix (baris = prediksi, kolom = ground truth)")
+    print("  " + " " * 12 + "".join(f"{name[:10]:>11s}" for name in labels))
+    for name, row in zip(labels, report['confusion_matrix']):
+        print(f"  {name[:12]:<12s}" + "".join(f"{v:>11d}" for v in row))
+
+def save_samples(cache, preds, conf_thres, count, class_names):
+    """Simpan beberapa gambar teranotasi dari prediksi yang di-cache"""
+    import cv2
+
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    dataset_images = Path(DATASET_DIR)
+    for i in range(min(count, len(cache))):
+        path = next(dataset_images.glob(f"*/images/{cache.names[i]}"), None)
+        img = cv2.imread(str(path)) if path else None
+        if img is None:
+            continue
+        mask = (preds['image_idx'] == i) & (preds['conf'] >= conf_thres)
+        for box, conf, c in zip(preds['boxes'][mask], preds['conf'][mask], preds['cls'][mask]):
+            name = class_names[c] if c < len(class_names) else str(c)
+            x1, y1, x2, y2 = box.astype(int)
+            color = CLASS_COLORS.get(name, (255, 255, 255))
+            cv2.rectangle(img, (x1, y1), (x2, y2), color, 2)
+            cv2.putText(img, f"{name} {conf:.2f}", (x1, y1 - 5), cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
+        output_path = f"{OUTPUT_DIR}/{Path(cache.names[i]).stem}_result.jpg"
+        cv2.imwrite(output_path, img)
+        print(f"  Saved: {output_path}")
+
 def test_model():
+    parser = argparse.ArgumentParser(description="Evaluasi model pada satu split dataset")
+    parser.add_argument("--weights", default=MODEL_PATH, help="Path weights .pt")
+    parser.add_argument("--split", default="test", choices=DATASET_SPLITS, help="Split dataset")
+    parser.add_argument("--img", type=int, default=IMG_SIZE, help="Ukuran inferensi")
+    parser.add_argument("--batch", type=int, default=BATCH_SIZE, help="Ukuran batch inferensi")
+    parser.add_argument("--conf", type=float, default=0.25, help="Conf untuk precision/recall & confusion matrix")
+    parser.add_argument("--bgr", action="store_true", help="Kirim gambar BGR seperti jalur webcam/service")
+    parser.add_argument("--rerun", action="store_true", help="Abaikan cache prediksi")
+    parser.add_argument("--samples", type=int, default=0, help="Simpan N gambar teranotasi")
+    args = parser.parse_args()
+
     print("="*70)
-    print("STEP 4: Test Model dengan Sample Image")
+    print("STEP 4: Evaluasi Model")
     print("="*70)
-    
+
     # Cek model
-    if not os.path.exists(MODEL_PATH):
-        print(f"❌ Model tidak ditemukan: {MODEL_PATH}")
+    if not os.path.exists(args.weights):
+        print(f"❌ Model tidak ditemukan: {args.weights}")
         print("\nJalankan: python scripts/3_copy_model.py")
         return
-    
-    # Load model
-    print(f"\n[INFO] Loading model: {MODEL_PATH}")
-    model = torch.hub.load('ultralytics/yolov5', 'custom', path=MODEL_PATH, force_reload=False)
-    print(f"[INFO] Model loaded!")
-    
-    # Create output dir
-    os.makedirs(OUTPUT_DIR, exist_ok=True)
-    
-    # Get test images
-    test_path = Path(TEST_IMAGE)
-    if not test_path.exists():
-        print(f"❌ Test images tidak ditemukan: {TEST_IMAGE}")
-        return
-    
-    image_files = list(test_path.glob("*.jpg")) + list(test_path.glob("*.png"))
-    
-    if not image_files:
-        print(f"❌ Tidak ada image di: {TEST_IMAGE}")
+
+    # Ground truth & gambar (cache memmap)
+    label_index, _ = LabelIndex.build(DATASET_DIR, DATASET_SPLITS, index_path=LABEL_INDEX_PATH)
+    cache = open_or_build(IMAGE_CACHE_DIR, DATASET_DIR, args.split, args.img)
+    if not len(cache):
+        print(f"❌ Tidak ada image di split: {args.split}")
         return
-    
-    print(f"\n[INFO] Found {len(image_files)} test images")
-    print(f"[INFO] Testing first 5 images...\n")
-    
-    # Test first 5 images
-    for i, img_path in enumerate(image_files[:5]):
-        print(f"Testing {i+1}/5: {img_path.name}")
-        
-        # Read image
-        img = cv2.imread(str(img_path))
-        
-        # Inference
-        results = model(img)
-        
-        # Get detections
-        detections = results.pandas().xyxy[0]
-        print(f"  Detections: {len(detections)}")
-        
-        # Render results
-        results.render()
-        
-        # Save output
-        output_path = f"{OUTPUT_DIR}/{img_path.stem}_result.jpg"
-        cv2.imwrite(output_path, results.ims[0])
-        print(f"  Saved: {output_path}\n")
-    
-    print("="*70)
-    print("✅ TEST SELESAI!")
+    print(f"\n[INFO] Split {args.split}: {len(cache)} gambar @ {args.img}")
+
+    # Prediksi mentah (cache per weights)
+    start = time.perf_counter()
+    preds, cached = cached_predictions(args.weights, cache, args.split, PREDICTIONS_CACHE_DIR, args.batch, args.bgr,
+                                       rerun=args.rerun, conf=CACHE_CONF, iou=CACHE_IOU, max_det=MAX_DETECTIONS)
+    if not cached:
+        print(f"[INFO] Inferensi selesai dalam {time.perf_counter() - start:.1f} s")
+
+    # Scoring
+    start = time.perf_counter()
+    gts = ground_truth_from_index(label_index, args.split, cache.names, cache.orig_shapes)
+    report = evaluate(preds, gts, len(cache), label_index.class_names, conf_thres=args.conf)
+    score_ms = (time.perf_counter() - start) * 1000
+    print_report(report, label_index.class_names)
+    print(f"\n⏱️  Scoring: {score_ms:.1f} ms")
+
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    report_path = Path(OUTPUT_DIR) / f"eval_{Path(args.weights).stem}_{args.split}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(report_path, 'w') as f:
+        json.dump({'weights': str(args.weights), 'split': args.split, 'img_size': args.img,
+                   'images': len(cache), **report}, f, indent=2)
+
+    if args.samples:
+        print()
+        save_samples(cache, preds, args.conf, args.samples, label_index.class_names)
+
+    print("\n" + "="*70)
+    print("✅ EVALUASI SELESAI!")
     print("="*70)
-    print(f"\nHasil test tersimpan di: {OUTPUT_DIR}")
+    print(f"\nReport: {report_path}")
     print(f"\nNext: python detect_jamur_pc.py (demo webcam)")
 
 if __name__ == "__main__":
@@ -0,0 +1,91 @@
+"""
+Script Benchmark: Bandingkan jalur inferensi bawaan vs optimized CPU mode
+"""
+
+import sys
+from pathlib import Path
+
+import cv2
+import numpy as np
+import torch
+
+# Agar config.py & fast_inference.py di root project bisa di-import
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config import MODEL_PATH, IMG_SIZE, CONFIDENCE_THRESHOLD, CHANNELS_LAST, COMPILED_CACHE_DIR
+from fast_inference import OptimizedDetector, benchmark
+
+# ============================================================
+# KONFIGURASI
+# ============================================================
+TEST_IMAGE_DIR = "dataset/test/images"
+RUNS = 30
+WARMUP = 5
+
+# ============================================================
+
+def load_sample_image():
+    """Ambil satu gambar test, atau gambar acak jika dataset tidak ada"""
+    image_files = sorted(Path(TEST_IMAGE_DIR).glob("*.jpg"))
+    if image_files:
+        print(f"[INFO] Sample image: {image_files[0].name}")
+        return cv2.imread(str(image_files[0]))
+    print("[INFO] Dataset test tidak ada, pakai gambar acak 480x640")
+    return np.random.randint(0, 255, (480, 640, 3), dtype=np.uint8)
+
+def print_row(name, stats, baseline=None):
+    speedup = f"{baseline['mean'] / stats['mean']:.2f}x" if baseline else "-"
+    print(f"  {name:28s} mean {stats['mean']:7.1f} ms | p50 {stats['p50']:7.1f} | "
+          f"p95 {stats['p95']:7.1f} | speedup {speedup}")
+
+def run_benchmark():
+    print("="*70)
+    print("BENCHMARK: Inferensi CPU")
+    print("="*70)
+
+    if not Path(MODEL_PATH).exists():
+        print(f"❌ Model tidak ditemukan: {MODEL_PATH}")
+        print("\nJalankan: python scripts/3_copy_model.py")
+        return
+
+    print(f"\n[CONFIG]")
+    print(f"  Model    : {MODEL_PATH}")
+    print(f"  Image    : {IMG_SIZE}x{IMG_SIZE}")
+    print(f"  Threads  : {torch.get_num_threads()}")
+    print(f"  Runs     : {RUNS} (warmup {WARMUP})")
+
+    model = torch.hub.load('ultralytics/yolov5', 'custom', path=MODEL_PATH, force_reload=False)
+    model.conf = CONFIDENCE_THRESHOLD
+    image = load_sample_image()
+
+    print("\n[RESULTS]")
+    baseline = benchmark(lambda im: model(im, size=IMG_SIZE), image, RUNS, WARMUP)
+    print_row("AutoShape model(image)", baseline)
+
+    variants = [
+        ("optimized (eager)", dict(compile_mode=None)),
+        ("optimized + torchscript", dict(compile_mode='torchscript')),
+    ]
+    if hasattr(torch, 'compile'):
+        variants.append(("optimized + torch.compile", dict(compile_mode='compile')))
+
+    for name, kwargs in variants:
+        try:
+            detector = OptimizedDetector(model, img_size=IMG_SIZE, channels_last=CHANNELS_LAST,
+                                         cache_dir=COMPILED_CACHE_DIR, weights_path=MODEL_PATH,
+                                         **kwargs)
+        except Exception as e:
+            print(f"  {name:28s} gagal: {e}")
+            continue
+        stats = benchmark(detector, image, RUNS, WARMUP)
+        print_row(name, stats, baseline)
+        if kwargs['compile_mode'] is None:
+            print(f"  {'':28s} Conv+BN fused: {detector.fused}")
+
+    print("\n" + "="*70)
+    print("✅ BENCHMARK SELESAI!")
+    print("="*70)
+    print("\nAktifkan di config.py: OPTIMIZED_CPU_MODE = True (dan COMPILE_MODE jika lebih cepat)")
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,57 @@
+"""
+Script: Bangun Cache Gambar Pre-letterbox (memory-mapped)
+
+Letterbox setiap split SEKALI ke IMG_SIZE dan simpan sebagai array uint8
+memory-mapped, agar evaluasi (test model, evaluasi kandidat registry) tidak
+decode/resize JPEG berulang. Training memakai --cache bawaan YOLOv5.
+Cache otomatis dibangun ulang jika gambar sumber atau ukuran target berubah.
+
+Contoh:
+    python scripts/build_image_cache.py
+    python scripts/build_image_cache.py --splits valid test --img 416
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+# Agar modul di root project bisa di-import
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config import DATASET_DIR, DATASET_SPLITS, IMAGE_CACHE_DIR, IMG_SIZE
+from image_cache import ImageCache
+
+# ============================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Bangun cache gambar pre-letterbox")
+    parser.add_argument("--dataset", default=DATASET_DIR, help="Folder dataset")
+    parser.add_argument("--cache-dir", default=IMAGE_CACHE_DIR, help="Folder cache")
+    parser.add_argument("--splits", nargs="+", default=DATASET_SPLITS, help="Split yang di-cache")
+    parser.add_argument("--img", type=int, default=IMG_SIZE, help="Ukuran letterbox")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4, help="Thread decode")
+    args = parser.parse_args()
+
+    print("="*70)
+    print("IMAGE CACHE (PRE-LETTERBOX, MEMORY-MAPPED)")
+    print("="*70)
+    print(f"\n[CONFIG]")
+    print(f"  Dataset  : {args.dataset}")
+    print(f"  Cache dir: {args.cache_dir}")
+    print(f"  Img size : {args.img}")
+    print()
+
+    total_bytes = 0
+    for split in args.splits:
+        cache, report = ImageCache.build(args.cache_dir, args.dataset, split, args.img, workers=args.workers)
+        size_mb = cache.images_path.stat().st_size / 1e6
+        total_bytes += cache.images_path.stat().st_size
+        print(f"  {split.upper():6s}: {len(cache):4d} gambar | reused {report['reused']} | "
+              f"decoded {report['decoded']} | gagal {report['failed']} | "
+              f"{size_mb:.0f} MB | {report['seconds']:.1f} s")
+
+    print(f"\n✅ Cache siap ({total_bytes / 1e6:.0f} MB) di: {args.cache_dir}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+Script Kompresi: Model lebih kecil untuk target latency CPU per gambar
+
+Pipeline: ukur teacher (weights/best.pt) -> cari rasio channel pruning yang
+memenuhi budget -> fine-tune student dengan distilasi dari teacher ->
+bandingkan akurasi di dataset/test dan speedup yang terukur di mesin ini.
+
+Hasil (runs/compress/<nama>/weights/best.pt) berformat checkpoint YOLOv5 biasa;
+promosikan dengan:
+    python scripts/3_copy_model.py --weights runs/compress/<nama>/weights/best.pt
+
+Contoh:
+    python scripts/compress_model.py --budget 250
+    python scripts/compress_model.py --budget 150 --img 416 --epochs 50
+    python scripts/compress_model.py --ratio 0.5              # rasio tetap, tanpa pencarian
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Agar modul di root project bisa di-import
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import torch
+
+from config import (MODEL_PATH, IMG_SIZE, DATASET_DIR, DATASET_SPLITS, LABEL_INDEX_PATH,
+                    IMAGE_CACHE_DIR, MAX_DETECTIONS)
+from model_compression import (load_checkpoint, prune_model, forward_latency, search_ratio,
+                               count_parameters, distill, save_checkpoint, write_report)
+from model_registry import evaluate_candidate
+from sweep_runner import measure_latency
+
+# ============================================================
+# KONFIGURASI
+# ============================================================
+DATA_YAML = "dataset/data.yaml"
+HYP = "yolov5/data/hyps/hyp.scratch-low.yaml"
+YOLOV5_DIR = "yolov5"
+OUTPUT_DIR = "runs/compress"
+
+LATENCY_BUDGET_MS = 250             # Target latency per gambar (end-to-end, p50)
+EPOCHS = 30
+BATCH_SIZE = 16
+ALPHA = 1.0                         # Bobot loss distilasi
+
+# ============================================================
+
+def compress():
+    parser = argparse.ArgumentParser(description="Channel pruning + distilasi untuk budget latency CPU")
+    parser.add_argument("--weights", default=MODEL_PATH, help="Teacher (default: model aktif)")
+    parser.add_argument("--budget", type=float, default=LATENCY_BUDGET_MS, help="Target p50 per gambar (ms)")
+    parser.add_argument("--ratio", type=float, default=None, help="Rasio pruning tetap (lewati pencarian)")
+    parser.add_argument("--img", type=int, default=IMG_SIZE, help="Ukuran inferensi")
+    parser.add_argument("--epochs", type=int, default=EPOCHS, help="Epoch fine-tune distilasi")
+    parser.add_argument("--batch", type=int, default=BATCH_SIZE, help="Batch size fine-tune")
+    parser.add_argument("--workers", type=int, default=2, help="Worker dataloader")
+    parser.add_argument("--alpha", type=float, default=ALPHA, help="Bobot loss distilasi")
+    parser.add_argument("--threads", type=int, default=torch.get_num_threads(),
+                        help="Thread torch saat mengukur latency (samakan dengan serving)")
+    parser.add_argument("--data", default=DATA_YAML, help="data.yaml")
+    parser.add_argument("--name", default=None, help="Nama run (default: budget & ukuran)")
+    args = parser.parse_args()
+
+    name = args.name or f"b{int(args.budget)}-{args.img}"
+    run_dir = Path(OUTPUT_DIR) / name
+
+    print("="*70)
+    print("KOMPRESI MODEL: PRUNING + DISTILASI")
+    print("="*70)
+    print(f"\n[CONFIG]")
+    print(f"  Teacher : {args.weights}")
+    print(f"  Budget  : {args.budget:.0f} ms/gambar @ {args.img}, {args.threads} thread")
+    print(f"  Output  : {run_dir}")
+
+    if not Path(args.weights).exists():
+        print(f"\n❌ Model tidak ditemukan: {args.weights}")
+        return
+
+    torch.set_num_threads(args.threads)
+
+    def evaluate(weights, split):
+        return evaluate_candidate(weights, split, args.img, DATASET_DIR, DATASET_SPLITS, LABEL_INDEX_PATH,
+                                  IMAGE_CACHE_DIR, str(run_dir / "predictions"), max_det=MAX_DETECTIONS,
+                                  log=lambda *a: None)
+
+    # 1. Teacher: latency end-to-end vs forward murni -> overhead pre/postprocess
+    print(f"\n[1/4] Mengukur teacher...")
+    teacher, _ = load_checkpoint(args.weights, YOLOV5_DIR)
+    teacher_latency = measure_latency(args.weights, args.img, args.threads)
+    teacher_forward = forward_latency(teacher, args.img)
+    overhead = max(teacher_latency['p50'] - teacher_forward['p50'], 0.0)
+    print(f"  End-to-end p50 {teacher_latency['p50']:.1f} ms (forward {teacher_forward['p50']:.1f} ms, "
+          f"overhead {overhead:.1f} ms) | {count_parameters(teacher) / 1e6:.2f}M param")
+    if args.ratio is None and teacher_latency['p50'] <= args.budget:
+        print(f"\n✅ Teacher sudah memenuhi budget {args.budget:.0f} ms, kompresi tidak diperlukan")
+        return
+
+    # 2. Rasio pruning
+    if args.ratio is None:
+        forward_budget = args.budget - overhead
+        print(f"\n[2/4] Mencari rasio pruning (forward <= {forward_budget:.1f} ms)...")
+        if forward_budget <= 0:
+            print(f"❌ Overhead pre/postprocess ({overhead:.1f} ms) sudah melebihi budget; coba --img lebih kecil")
+            return
+        ratio, _, met = search_ratio(teacher, args.img, forward_budget)
+        if not met:
+            print(f"  ⚠️ Rasio {ratio:.1f} pun belum memenuhi budget; dilanjutkan dengan rasio ini")
+    else:
+        ratio = args.ratio
+        print(f"\n[2/4] Rasio pruning tetap: {ratio:.2f}")
+
+    student, _ = load_checkpoint(args.weights, YOLOV5_DIR)
+    pruned = prune_model(student, ratio)
+    print(f"  {pruned['channels_removed']} channel dibuang dari {pruned['groups']} grup | "
+          f"{pruned['params_before'] / 1e6:.2f}M -> {pruned['params_after'] / 1e6:.2f}M param")
+    save_checkpoint(student, run_dir / "weights" / "pruned.pt", ratio=ratio, teacher=str(args.weights))
+
+    # 3. Fine-tune distilasi (best.pt dipilih dari mAP validasi)
+    print(f"\n[3/4] Fine-tune distilasi ({args.epochs} epoch)...")
+    result = distill(teacher, student, args.data, HYP, run_dir, lambda w: evaluate(w, 'valid'),
+                     img_size=args.img, epochs=args.epochs, batch_size=args.batch, workers=args.workers,
+                     alpha=args.alpha)
+    if result['weights'] is None:
+        print("❌ Fine-tune tidak menghasilkan checkpoint")
+        return
+
+    # 4. Akurasi di test & speedup (jalur serving yang sama dengan entry point)
+    print(f"\n[4/4] Evaluasi di split test & latency...")
+    teacher_test = evaluate(args.weights, 'test')
+    student_test = evaluate(result['weights'], 'test')
+    student_latency = measure_latency(result['weights'], args.img, args.threads)
+
+    retained = student_test['map50_95'] / teacher_test['map50_95'] if teacher_test['map50_95'] else 0.0
+    speedup = teacher_latency['p50'] / student_latency['p50']
+    report = {
+        'teacher': str(args.weights),
+        'student': result['weights'],
+        'img_size': args.img,
+        'threads': args.threads,
+        'budget_ms': args.budget,
+        'pruning': pruned,
+        'best_epoch': result['best_epoch'],
+        'test': {
+            'teacher': {k: teacher_test[k] for k in ('precision', 'recall', 'map50', 'map50_95')},
+            'student': {k: student_test[k] for k in ('precision', 'recall', 'map50', 'map50_95')},
+            'map50_95_retained': retained,
+        },
+        'latency_ms': {'teacher': teacher_latency, 'student': student_latency},
+        'speedup': speedup,
+        'budget_met': student_latency['p50'] <= args.budget,
+    }
+    report_path = write_report(run_dir, report)
+
+    print("\n" + "="*70)
+    print("HASIL KOMPRESI")
+    print("="*70)
+    print(f"  {'':10s}{'mAP50':>8s}{'mAP50-95':>10s}{'p50 ms':>9s}{'param':>9s}")
+    print(f"  {'teacher':10s}{teacher_test['map50']:>8.3f}{teacher_test['map50_95']:>10.3f}"
+          f"{teacher_latency['p50']:>9.1f}{pruned['params_before'] / 1e6:>8.2f}M")
+    print(f"  {'student':10s}{student_test['map50']:>8.3f}{student_test['map50_95']:>10.3f}"
+          f"{student_latency['p50']:>9.1f}{pruned['params_after'] / 1e6:>8.2f}M")
+    print(f"\n  Akurasi dipertahankan : {retained * 100:.1f}% (mAP50-95, split test)")
+    print(f"  Speedup               : {speedup:.2f}x")
+    print(f"  Budget {args.budget:.0f} ms         : {'✅ terpenuhi' if report['budget_met'] else '❌ belum terpenuhi'}")
+    print(f"\n  Report : {report_path}")
+    print(f"  Student: {result['weights']}")
+    print(f"\nNext: python scripts/3_copy_model.py --weights {result['weights']}")
+
+if __name__ == "__main__":
+    compress()
@@ -0,0 +1,105 @@
+"""
+Script: Cari Gambar Near-Duplicate di Dataset (pHash)
+
+Menghitung perceptual hash semua gambar (paralel, di-cache), mencari pasangan
+dengan jarak Hamming kecil lewat multi-index hashing, lalu melaporkan cluster
+duplikat di dalam satu split dan lintas split (kebocoran train ke valid/test).
+Opsional menulis daftar train tanpa duplikat + data_dedup.yaml untuk training.
+
+Contoh:
+    python scripts/find_duplicates.py                   # laporan, jarak <= 6
+    python scripts/find_duplicates.py --distance 4 --show 20
+    python scripts/find_duplicates.py --write-list      # dataset/train_dedup.txt + data_dedup.yaml
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Agar modul di root project bisa di-import
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config import DATASET_DIR, DATASET_SPLITS, PHASH_CACHE_PATH
+from duplicate_finder import HashTable, find_duplicates, dedup_split, write_dedup_dataset, MAX_DISTANCE
+
+# ============================================================
+# KONFIGURASI
+# ============================================================
+MAX_HAMMING = 6                     # Jarak Hamming maksimal (dari 64 bit) = near-duplicate
+WORKERS = 8
+
+# ============================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Cari gambar near-duplicate di dataset dengan pHash")
+    parser.add_argument("--dataset", default=DATASET_DIR, help="Folder dataset")
+    parser.add_argument("--distance", type=int, default=MAX_HAMMING,
+                        help=f"Jarak Hamming maksimal (0-{MAX_DISTANCE})")
+    parser.add_argument("--workers", type=int, default=WORKERS, help="Thread hashing")
+    parser.add_argument("--show", type=int, default=10, help="Jumlah cluster yang ditampilkan")
+    parser.add_argument("--write-list", action="store_true",
+                        help="Tulis train_dedup.txt + data_dedup.yaml")
+    parser.add_argument("--keep-leaks", action="store_true",
+                        help="Jangan buang gambar train yang bocor ke valid/test (hanya de-duplikasi)")
+    args = parser.parse_args()
+
+    print("="*70)
+    print("NEAR-DUPLICATE FINDER (pHash)")
+    print("="*70)
+
+    table, report = HashTable.build(args.dataset, DATASET_SPLITS, cache_path=PHASH_CACHE_PATH,
+                                    workers=args.workers)
+    if not len(table):
+        print(f"❌ Tidak ada gambar di {args.dataset}")
+        return
+    print(f"\n[HASH] {len(table)} gambar | reused {report['reused']} | hashed {report['hashed']} | "
+          f"gagal {report['failed']} ({report['seconds']:.2f} s)")
+
+    start = time.perf_counter()
+    result = find_duplicates(table, args.distance)
+    print(f"[SEARCH] {len(result['pairs'])} pasangan <= {args.distance} bit "
+          f"({(time.perf_counter() - start) * 1000:.1f} ms)")
+
+    clusters = result['clusters']
+    within = [c for c in clusters if not c['cross_split']]
+    cross = [c for c in clusters if c['cross_split']]
+
+    print(f"\n📊 Cluster duplikat: {len(clusters)}")
+    for split in DATASET_SPLITS:
+        in_split = [c for c in within if c['splits'] == [split]]
+        extra = sum(len(c['members']) - 1 for c in in_split)
+        print(f"   {split.upper():6s}: {len(in_split):4d} cluster | {extra:4d} gambar berlebih")
+    print(f"   LINTAS : {len(cross):4d} cluster (kebocoran antar split)")
+    print(f"   Sumber Roboflow yang sama di > 1 split: {len(result['source_leaks'])}")
+
+    if clusters and args.show:
+        print(f"\n🔎 {min(args.show, len(clusters))} cluster terbesar (lintas split ditandai ⚠️):")
+        for c in clusters[:args.show]:
+            flag = "⚠️ " if c['cross_split'] else "   "
+            print(f"  {flag}{len(c['members'])} gambar [{', '.join(c['splits'])}]")
+            for i in c['members'][:5]:
+                print(f"      {table.splits[table.split[i]]:6s} {table.names[i]}")
+            if len(c['members']) > 5:
+                print(f"      ... +{len(c['members']) - 5}")
+
+    if 'train' in DATASET_SPLITS:
+        keep, dropped = dedup_split(table, result, 'train', drop_leaks=not args.keep_leaks)
+        total = int((table.split == DATASET_SPLITS.index('train')).sum())
+        print(f"\n✂️  Train setelah de-duplikasi: {len(keep)}/{total} gambar "
+              f"({', '.join(f'{k} {v}' for k, v in dropped.items()) or 'tidak ada yang dibuang'})")
+        if total:
+            print(f"   Perkiraan waktu epoch: -{(1 - len(keep) / total) * 100:.0f}%")
+
+        if args.write_list:
+            yaml_path = write_dedup_dataset(table, keep, args.dataset, 'train')
+            print(f"\n✅ Data yaml: {yaml_path}")
+            print(f"   Bandingkan waktu epoch (launcher_log.csv):")
+            print(f"   python scripts/2_train_model.py --data {yaml_path} --name jamur_dedup")
+
+    print("\n" + "="*70)
+    print("✅ SELESAI!")
+    print("="*70)
+
+if __name__ == "__main__":
+    main()
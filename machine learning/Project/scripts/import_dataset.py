@@ -0,0 +1,84 @@
+"""
+Script: Import Dataset dari Export Lokal (offline, incremental)
+
+Sinkronkan dataset/ dengan export YOLOv5 (file .zip atau folder, mis. hasil
+download manual dari Roboflow). Hanya pasangan gambar/label yang baru atau
+berubah (berdasarkan hash konten) yang disalin, file yang hilang dari export
+dihapus, data.yaml diperbaiki, dan manifest dicatat di dataset/manifest.json.
+
+Contoh:
+    python scripts/import_dataset.py ~/Downloads/mushroom-detection.v9i.yolov5pytorch.zip
+    python scripts/import_dataset.py export_folder --dry-run
+    python scripts/import_dataset.py export.zip --no-prune
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Agar modul di root project bisa di-import
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config import DATASET_DIR, DATASET_SPLITS, LABEL_INDEX_PATH
+from dataset_import import import_dataset
+
+# ============================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Import incremental dataset YOLOv5 dari .zip/folder lokal")
+    parser.add_argument("source", help="File .zip atau folder export YOLOv5")
+    parser.add_argument("--dataset", default=DATASET_DIR, help="Folder dataset tujuan")
+    parser.add_argument("--no-prune", action="store_true", help="Jangan hapus file yang tidak ada di export")
+    parser.add_argument("--dry-run", action="store_true", help="Tampilkan perubahan tanpa menulis")
+    parser.add_argument("--no-index", action="store_true", help="Jangan update index label setelah import")
+    args = parser.parse_args()
+
+    print("="*70)
+    print("IMPORT DATASET (INCREMENTAL)")
+    print("="*70)
+    print(f"\n[CONFIG]")
+    print(f"  Sumber   : {args.source}")
+    print(f"  Tujuan   : {args.dataset}")
+    print(f"  Prune    : {not args.no_prune}")
+    print(f"  Dry run  : {args.dry_run}")
+
+    if not Path(args.source).exists():
+        print(f"\n❌ Sumber tidak ditemukan: {args.source}")
+        return
+
+    try:
+        report = import_dataset(args.source, args.dataset, DATASET_SPLITS,
+                                prune=not args.no_prune, dry_run=args.dry_run)
+    except ValueError as e:
+        print(f"\n❌ {e}")
+        return
+
+    print("\n📊 Perubahan:")
+    print(f"   Baru        : {report['added']}")
+    print(f"   Berubah     : {report['updated']}")
+    print(f"   Sama        : {report['unchanged']}")
+    print(f"   Dihapus     : {report['removed']}")
+    if report['orphan_labels']:
+        print(f"   ⚠️ Label tanpa gambar (dilewati): {report['orphan_labels']}")
+    print(f"   Ditulis     : {report['bytes_written'] / 1e6:.1f} MB dalam {report['seconds']:.2f} s")
+
+    if args.dry_run:
+        print("\n(dry run: tidak ada file yang ditulis)")
+        return
+
+    if not args.no_index:
+        from dataset_index import LabelIndex
+
+        _, index_report = LabelIndex.build(args.dataset, DATASET_SPLITS, index_path=LABEL_INDEX_PATH)
+        print(f"\n[INDEX] reused {index_report['reused']} | rehashed {index_report['rehashed']} | "
+              f"parsed {index_report['parsed']} | removed {index_report['removed']} "
+              f"({index_report['seconds']:.2f} s)")
+
+    print("\n" + "="*70)
+    print("✅ IMPORT SELESAI!")
+    print("="*70)
+    print(f"\nManifest: {Path(args.dataset) / 'manifest.json'}")
+    print(f"Next: python scripts/2_train_model.py")
+
+if __name__ == "__main__":
+    main()
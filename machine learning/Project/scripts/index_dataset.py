@@ -0,0 +1,89 @@
+"""
+Script: Index Label Dataset + Statistik & Cek Integritas
+
+Membangun (incremental) index kolumnar dari semua file label YOLO di
+dataset/{split}/labels, lalu menampilkan class balance, distribusi ukuran box,
+statistik per split, dan pasangan gambar/label yang rusak.
+
+Contoh:
+    python scripts/index_dataset.py                 # update index + tampilkan semua statistik
+    python scripts/index_dataset.py --no-update     # pakai index yang ada saja
+    python scripts/index_dataset.py --rebuild --issues
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Agar modul di root project bisa di-import
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config import DATASET_DIR, DATASET_SPLITS, LABEL_INDEX_PATH
+from dataset_index import LabelIndex
+
+# ============================================================
+
+def print_table(title, rows, columns):
+    """Print dict-of-dict sebagai tabel sederhana"""
+    print(f"\n📊 {title}")
+    name_w = max([len(str(name)) for name in rows] + [6])
+    widths = [max(10, len(col) + 2) for col in columns]
+    print("   " + " " * name_w + "".join(f"{col:>{w}s}" for col, w in zip(columns, widths)))
+    for name, values in rows.items():
+        print(f"   {str(name):<{name_w}s}" + "".join(f"{values.get(col, ''):>{w}}" for col, w in zip(columns, widths)))
+
+def main():
+    parser = argparse.ArgumentParser(description="Index label dataset YOLO + statistik")
+    parser.add_argument("--dataset", default=DATASET_DIR, help="Folder dataset")
+    parser.add_argument("--index", default=LABEL_INDEX_PATH, help="File index (.npz)")
+    parser.add_argument("--workers", type=int, default=None, help="Jumlah proses parser (0 = serial)")
+    parser.add_argument("--rebuild", action="store_true", help="Abaikan index lama, parse ulang semua")
+    parser.add_argument("--no-update", action="store_true", help="Jangan scan dataset, pakai index yang ada")
+    parser.add_argument("--issues", action="store_true", help="Tampilkan daftar file bermasalah")
+    args = parser.parse_args()
+
+    print("="*70)
+    print("DATASET LABEL INDEX")
+    print("="*70)
+
+    if args.no_update:
+        index = LabelIndex.load(args.index)
+        if index is None:
+            print(f"❌ Index tidak ditemukan: {args.index}")
+            print("Jalankan tanpa --no-update untuk membangun index")
+            return
+    else:
+        if args.rebuild and Path(args.index).exists():
+            Path(args.index).unlink()
+        index, report = LabelIndex.build(args.dataset, DATASET_SPLITS, index_path=args.index,
+                                         workers=args.workers)
+        print(f"\n✅ Index diperbarui dalam {report['seconds']:.2f} s")
+        print(f"   reused {report['reused']} | rehashed {report['rehashed']} | "
+              f"parsed {report['parsed']} | removed {report['removed']}")
+        print(f"   File: {args.index}")
+
+    start = time.perf_counter()
+    split_stats = index.split_stats()
+    balance = index.class_balance()
+    sizes = index.box_sizes()
+    issue_counts = index.issue_counts()
+    query_ms = (time.perf_counter() - start) * 1000
+
+    print_table("Per split", split_stats,
+                ['images', 'boxes', 'boxes_per_image', 'max_boxes', 'background', 'corrupt'])
+    print_table("Class balance (jumlah box)", balance, index.class_names)
+    print_table("Ukuran box (px, sqrt area)", sizes,
+                ['count', 'small', 'medium', 'large', 'p5', 'p50', 'p95', 'aspect_p50'])
+    print_table("Masalah integritas (jumlah file)", {'files': issue_counts}, list(issue_counts))
+
+    if args.issues:
+        problems = index.issues()
+        print(f"\n⚠️  {len(problems)} file bermasalah:")
+        for split, stem, names in problems:
+            print(f"   [{split}] {stem}: {', '.join(names)}")
+
+    print(f"\n⏱️  Query statistik: {query_ms:.1f} ms")
+
+if __name__ == "__main__":
+    main()
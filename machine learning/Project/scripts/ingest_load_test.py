@@ -0,0 +1,201 @@
+"""
+Script Load Test: Memori ML service di bawah request bersamaan
+
+Mengirim request /detect paralel (gambar dataset test, base64 seperti backend)
+sambil mencatat memori proses service dari /health. Setiap request unik
+(byte penanda di belakang marker akhir JPEG): gambar tetap sama bagi decoder,
+tetapi image_key berbeda, jadi tidak ada yang dilayani dari cache prediksi
+mentah. Yang diukur adalah ingestion + decode + inferensi penuh.
+
+- baseline : RSS sebelum beban
+- peak     : RSS tertinggi proses (VmHWM) setelah beban
+- steady   : median RSS di paruh akhir beban (buffer sudah terisi & dipakai ulang)
+
+Dengan pool ingestion/input, steady state seharusnya datar walau jumlah
+request dan concurrency dinaikkan. Opsi --oversize mengecek request di atas
+MAX_UPLOAD_MB ditolak 413 tanpa menaikkan memori.
+
+Contoh:
+    python scripts/ingest_load_test.py
+    python scripts/ingest_load_test.py --concurrency 16 --requests 400
+    python scripts/ingest_load_test.py --url http://localhost:5001 --oversize
+"""
+
+import argparse
+import base64
+import json
+import statistics
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Agar config.py di root project bisa di-import
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config import ML_SERVICE_PORT, MAX_UPLOAD_MB
+
+# ============================================================
+# KONFIGURASI
+# ============================================================
+TEST_IMAGE_DIR = "dataset/test/images"
+CONCURRENCY = 8
+REQUESTS = 200
+SAMPLE_INTERVAL = 0.5               # Interval polling /health (detik)
+TIMEOUT = 120
+
+# ============================================================
+
+def post_json(url, payload, timeout=TIMEOUT):
+    """POST JSON; Returns: (status, body dict)"""
+    body = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+    req = urllib.request.Request(url, data=body, headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            return resp.status, json.loads(resp.read())
+    except urllib.error.HTTPError as e:
+        try:
+            return e.code, json.loads(e.read())
+        except ValueError:
+            return e.code, {}
+
+def get_memory(base_url):
+    with urllib.request.urlopen(f"{base_url}/health", timeout=5) as resp:
+        return json.loads(resp.read()).get('memory', {})
+
+def load_images(limit):
+    """Bytes file gambar test"""
+    return [p.read_bytes() for p in sorted(Path(TEST_IMAGE_DIR).glob("*.jpg"))[:limit]]
+
+def make_payload(image_bytes, request_id):
+    """
+    Body /detect (mode summary) yang unik per request
+
+    Decoder JPEG mengabaikan data setelah marker EOI, jadi penanda di
+    belakang file hanya mengubah hash (image_key), bukan gambarnya.
+    """
+    unique = image_bytes + f"\x00load-test-{request_id}".encode()
+    return json.dumps({
+        'image': 'data:image/jpeg;base64,' + base64.b64encode(unique).decode(),
+        'mode': 'summary'
+    }).encode()
+
+class MemorySampler(threading.Thread):
+    """Polling /health selama beban berjalan"""
+
+    def __init__(self, base_url, interval):
+        super().__init__(daemon=True)
+        self.base_url = base_url
+        self.interval = interval
+        self.samples = []
+        self.stop_event = threading.Event()
+
+    def run(self):
+        while not self.stop_event.is_set():
+            try:
+                memory = get_memory(self.base_url)
+                if memory.get('rss_mb') is not None:
+                    self.samples.append(memory['rss_mb'])
+            except Exception:
+                pass
+            self.stop_event.wait(self.interval)
+
+def load_test():
+    parser = argparse.ArgumentParser(description="Load test memori ingestion ML service")
+    parser.add_argument("--url", default=f"http://localhost:{ML_SERVICE_PORT}", help="Base URL service/router")
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY, help="Request paralel")
+    parser.add_argument("--requests", type=int, default=REQUESTS, help="Total request")
+    parser.add_argument("--images", type=int, default=50, help="Jumlah gambar test yang diputar (byte penanda membuat tiap request unik)")
+    parser.add_argument("--oversize", action="store_true", help=f"Cek request > {MAX_UPLOAD_MB} MB ditolak 413")
+    args = parser.parse_args()
+    base_url = args.url.rstrip('/')
+
+    print("="*70)
+    print("LOAD TEST: MEMORI INGESTION")
+    print("="*70)
+    print(f"\n[CONFIG]")
+    print(f"  URL         : {base_url}")
+    print(f"  Concurrency : {args.concurrency}")
+    print(f"  Requests    : {args.requests}")
+
+    try:
+        baseline = get_memory(base_url)
+    except Exception as e:
+        print(f"\n❌ Service tidak bisa dihubungi: {e}")
+        return
+    if not baseline:
+        print("\n❌ /health tidak melaporkan memori (service versi lama?)")
+        return
+
+    images = load_images(args.images)
+    if not images:
+        print(f"\n❌ Tidak ada gambar di {TEST_IMAGE_DIR}")
+        return
+    print(f"  Gambar      : {len(images)} ({sum(map(len, images)) / len(images) / 1024:.0f} KB/gambar, "
+          f"tiap request unik, tanpa cache)")
+    print(f"\n[INFO] Baseline RSS: {baseline['rss_mb']} MB")
+
+    statuses = {}
+    cached = [0]
+    latencies = []
+    lock = threading.Lock()
+
+    def send(i):
+        start = time.perf_counter()
+        try:
+            status, response = post_json(f"{base_url}/detect", make_payload(images[i % len(images)], i))
+        except Exception:
+            status, response = 'error', {}
+        with lock:
+            statuses[status] = statuses.get(status, 0) + 1
+            cached[0] += bool(response.get('cached'))
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    sampler = MemorySampler(base_url, SAMPLE_INTERVAL)
+    sampler.start()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        list(pool.map(send, range(args.requests)))
+    elapsed = time.perf_counter() - start
+    sampler.stop_event.set()
+    sampler.join()
+
+    after = get_memory(base_url)
+    samples = sampler.samples
+    steady = statistics.median(samples[len(samples) // 2:]) if samples else after['rss_mb']
+
+    print("\n" + "="*70)
+    print("HASIL")
+    print("="*70)
+    print(f"  Throughput  : {args.requests / elapsed:.1f} req/s ({elapsed:.1f} s)")
+    print(f"  Latency     : p50 {statistics.median(latencies):.0f} ms | max {max(latencies):.0f} ms")
+    print(f"  Status      : {dict(sorted(statuses.items(), key=str))} | cache hit: {cached[0]}")
+    print(f"\n  RSS baseline: {baseline['rss_mb']} MB")
+    print(f"  RSS steady  : {steady} MB (median paruh akhir, {len(samples)} sampel)")
+    print(f"  RSS peak    : {after.get('peak_rss_mb')} MB")
+    print(f"  RSS akhir   : {after['rss_mb']} MB")
+    for name in ('ingest_pool', 'input_pool'):
+        if name in after:
+            print(f"  {name:12s}: {after[name]}")
+
+    if args.oversize:
+        print(f"\n[INFO] Mengirim body {MAX_UPLOAD_MB + 1} MB...")
+        body = b'{"image": "' + b'A' * int((MAX_UPLOAD_MB + 1) * 1024 * 1024) + b'"}'
+        try:
+            status, response = post_json(f"{base_url}/detect", body)
+        except Exception as e:
+            # Server boleh menutup koneksi setelah 413 sebelum body selesai terkirim
+            status, response = None, {'error': str(e)}
+        rss = get_memory(base_url)['rss_mb']
+        if status == 413:
+            print(f"  ✅ Ditolak 413: {response.get('error')} | RSS {rss} MB")
+        elif status is None:
+            print(f"  ⚠️ Koneksi ditutup server sebelum body terkirim ({response['error']}) | RSS {rss} MB")
+        else:
+            print(f"  ❌ Status {status}, seharusnya 413 | RSS {rss} MB")
+
+if __name__ == "__main__":
+    load_test()
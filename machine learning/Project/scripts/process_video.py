@@ -0,0 +1,232 @@
+"""
+Script: Proses File Video Offline (rekaman time-lapse baglog)
+
+Decode threaded dengan frame striding, inferensi batch, dan encode video
+teranotasi paralel di proses terpisah. Output utama berupa time series
+jumlah per kelas per frame (CSV/Parquet).
+
+Contoh:
+    python scripts/process_video.py rekaman/rak1.mp4 --stride 10 --batch 8
+    python scripts/process_video.py rekaman/rak1.mp4 --output hasil/rak1.parquet --video hasil/rak1_annotated.mp4
+"""
+
+import argparse
+import multiprocessing as mp
+import queue
+import signal
+import sys
+import threading
+import time
+from pathlib import Path
+
+import cv2
+
+# Agar modul di root project bisa di-import
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config import CLASS_NAMES, IMG_SIZE, MODEL_PATH
+from detect_jamur_pc import load_model, infer_batch, draw_detections, draw_info_panel, count_detections
+
+# ============================================================
+# KONFIGURASI DEFAULT
+# ============================================================
+OUTPUT_DIR = "output/video_analysis"
+DEFAULT_STRIDE = 5
+DEFAULT_BATCH = 8
+PROGRESS_EVERY = 100  # frame yang diproses
+ENCODER_TIMEOUT = 30  # detik menunggu encoder selesai sebelum terminate
+
+# ============================================================
+
+def decode_frames(video_path, stride, out_queue, stop_event):
+    """
+    Thread decoder: grab() untuk frame yang dilewati (tanpa decode penuh),
+    read() hanya untuk setiap frame ke-stride
+    """
+    cap = cv2.VideoCapture(str(video_path))
+    index = 0
+    try:
+        while not stop_event.is_set():
+            if index % stride:
+                if not cap.grab():
+                    break
+                index += 1
+                continue
+            ret, frame = cap.read()
+            if not ret:
+                break
+            out_queue.put((index, frame))
+            index += 1
+    finally:
+        cap.release()
+        out_queue.put(None)
+
+def encode_video(output_path, fps, frame_queue):
+    """
+    Proses encoder: draw anotasi dan tulis video (berjalan di proses terpisah)
+
+    Ctrl+C diabaikan di sini; parent yang memutuskan kapan berhenti (sentinel
+    None), jadi writer selalu sempat di-release dan file video tetap valid.
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    writer = None
+    while True:
+        item = frame_queue.get()
+        if item is None:
+            break
+        frame, detections = item
+        frame = draw_detections(frame, detections)
+        frame = draw_info_panel(frame, detections)
+        if writer is None:
+            h, w = frame.shape[:2]
+            writer = cv2.VideoWriter(str(output_path), cv2.VideoWriter_fourcc(*'mp4v'), fps, (w, h))
+        writer.write(frame)
+    if writer is not None:
+        writer.release()
+
+def save_series(rows, output_path):
+    """Simpan time series ke CSV atau Parquet (sesuai ekstensi)"""
+    import pandas as pd
+
+    columns = ['frame', 'time_s'] + CLASS_NAMES + ['total']
+    df = pd.DataFrame(rows, columns=columns)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    if output_path.suffix == '.parquet':
+        try:
+            df.to_parquet(output_path, index=False)
+            return output_path
+        except ImportError:
+            output_path = output_path.with_suffix('.csv')
+            print("⚠️  pyarrow/fastparquet tidak terinstall, simpan sebagai CSV")
+    df.to_csv(output_path, index=False)
+    return output_path
+
+def process_video(args):
+    print("="*70)
+    print("PROSES VIDEO OFFLINE")
+    print("="*70)
+
+    video_path = Path(args.video_path)
+    if not video_path.exists():
+        print(f"❌ Video tidak ditemukan: {video_path}")
+        return
+
+    cap = cv2.VideoCapture(str(video_path))
+    fps = cap.get(cv2.CAP_PROP_FPS) or 25.0
+    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    cap.release()
+
+    output_path = Path(args.output) if args.output else Path(OUTPUT_DIR) / f"{video_path.stem}_counts.csv"
+
+    print(f"\n[CONFIG]")
+    print(f"  Video    : {video_path} ({total_frames} frame, {fps:.1f} FPS)")
+    print(f"  Stride   : {args.stride} (proses ~{total_frames // args.stride} frame)")
+    print(f"  Batch    : {args.batch}")
+    print(f"  Image    : {args.img}")
+    print(f"  Output   : {output_path}")
+    print(f"  Video out: {args.video or '-'}")
+
+    model = load_model(args.weights)
+    if model is None:
+        return
+
+    # Decoder thread
+    frame_queue = queue.Queue(maxsize=args.batch * 4)
+    stop_event = threading.Event()
+    decoder = threading.Thread(target=decode_frames,
+                               args=(video_path, args.stride, frame_queue, stop_event), daemon=True)
+    decoder.start()
+
+    # Encoder process (opsional)
+    encoder = None
+    encode_queue = None
+    if args.video:
+        Path(args.video).parent.mkdir(parents=True, exist_ok=True)
+        encode_queue = mp.Queue(maxsize=32)
+        encoder = mp.Process(target=encode_video, args=(args.video, fps / args.stride, encode_queue))
+        encoder.start()
+
+    rows = []
+    processed = 0
+    infer_time = 0.0
+    start = time.perf_counter()
+    finished = False
+
+    try:
+        while not finished:
+            batch = []
+            while len(batch) < args.batch:
+                item = frame_queue.get()
+                if item is None:
+                    finished = True
+                    break
+                batch.append(item)
+            if not batch:
+                break
+
+            t0 = time.perf_counter()
+            results = infer_batch(model, [frame for _, frame in batch], size=args.img)
+            infer_time += time.perf_counter() - t0
+
+            for (index, frame), detections in zip(batch, results):
+                counts = count_detections(detections)
+                rows.append([index, round(index / fps, 3)] +
+                            [counts[name] for name in CLASS_NAMES] + [len(detections)])
+                if encode_queue is not None:
+                    encode_queue.put((frame, detections))
+
+            prev = processed
+            processed += len(batch)
+            if processed // PROGRESS_EVERY != prev // PROGRESS_EVERY:
+                elapsed = time.perf_counter() - start
+                print(f"  {processed} frame diproses | {processed / elapsed:.1f} frame/s")
+
+    except KeyboardInterrupt:
+        print("\n⚠️  Dihentikan, menyimpan hasil sementara...")
+        stop_event.set()
+    finally:
+        if encode_queue is not None:
+            try:
+                encode_queue.put(None, timeout=ENCODER_TIMEOUT)
+                encoder.join(ENCODER_TIMEOUT)
+            except queue.Full:
+                pass
+            if encoder.is_alive():
+                print("⚠️  Encoder tidak merespons, dihentikan paksa (video bisa terpotong)")
+                encoder.terminate()
+                encoder.join()
+
+    elapsed = time.perf_counter() - start
+    saved_path = save_series(rows, output_path)
+
+    print("\n" + "="*70)
+    print("✅ PROSES VIDEO SELESAI!")
+    print("="*70)
+    print(f"  Frame diproses  : {processed}")
+    print(f"  Waktu total     : {elapsed:.1f} s")
+    if elapsed > 0:
+        print(f"  Throughput      : {processed / elapsed:.1f} frame/s diproses "
+              f"({processed * args.stride / fps / elapsed:.1f} detik video per detik)")
+    if processed:
+        print(f"  Inferensi       : {infer_time / processed * 1000:.1f} ms/frame")
+    print(f"  Time series     : {saved_path}")
+    if args.video:
+        print(f"  Video anotasi   : {args.video}")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Proses file video offline dengan deteksi jamur")
+    parser.add_argument("video_path", help="Path file video")
+    parser.add_argument("--stride", type=int, default=DEFAULT_STRIDE, help="Proses setiap N frame")
+    parser.add_argument("--batch", type=int, default=DEFAULT_BATCH, help="Ukuran batch inferensi")
+    parser.add_argument("--img", type=int, default=IMG_SIZE, help="Ukuran input model")
+    parser.add_argument("--weights", default=MODEL_PATH, help="Path model .pt")
+    parser.add_argument("--output", help="File time series (.csv atau .parquet)")
+    parser.add_argument("--video", help="Simpan video teranotasi ke path ini (opsional)")
+    args = parser.parse_args()
+    args.stride = max(1, args.stride)
+    args.batch = max(1, args.batch)
+    return args
+
+if __name__ == "__main__":
+    process_video(parse_args())
@@ -0,0 +1,144 @@
+"""
+Script Sweep: Cari kombinasi model/ukuran/hyperparameter terbaik untuk CPU
+
+Trial training pendek (budget epoch + early stopping) dijalankan paralel,
+hasilnya di-cache per hash konfigurasi. Setelah training, latency inferensi CPU
+tiap trial diukur di mesin ini dan trial diurutkan berdasarkan
+mAP@0.5:0.95 per 100 ms latency.
+
+Contoh:
+    python scripts/sweep_models.py                                  # grid default
+    python scripts/sweep_models.py --models yolov5n yolov5s --imgs 320 416 640
+    python scripts/sweep_models.py --param lr0=0.01,0.005 --param mosaic=1.0,0.5 --random 6
+    python scripts/sweep_models.py --max-latency 400                # hanya model <= 400 ms
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Agar modul di root project bisa di-import
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import torch
+
+from config import DATASET_DIR, DATASET_SPLITS, LABEL_INDEX_PATH
+from dataset_index import LabelIndex
+from image_cache import list_split_images
+from sweep_runner import (grid_trials, random_trials, data_fingerprint, run_sweep,
+                          attach_latency, rank_trials, write_leaderboard, describe)
+
+# ============================================================
+# KONFIGURASI SWEEP
+# ============================================================
+DATA_YAML = "dataset/data.yaml"
+SWEEP_DIR = "runs/sweep"
+BASE_HYP = "yolov5/data/hyps/hyp.scratch-low.yaml"
+
+MODELS = ["yolov5n", "yolov5s"]
+IMG_SIZES = [320, 416, 640]
+EPOCHS = 40                         # Budget pendek per trial
+PATIENCE = 10
+
+LATENCY_RUNS = 30
+
+# ============================================================
+
+def parse_param(text):
+    """'lr0=0.01,0.005' -> ('lr0', [0.01, 0.005]); 'lr0=0.001:0.01' -> ('lr0', (0.001, 0.01))"""
+    name, _, values = text.partition("=")
+    if ":" in values:
+        low, high = values.split(":")
+        return name, (float(low), float(high))
+    return name, [float(v) for v in values.split(",")]
+
+def load_latency_image():
+    """Satu gambar validasi untuk pengukuran latency (atau None = gambar acak)"""
+    import cv2
+
+    for split in ("valid", "test"):
+        images = list_split_images(DATASET_DIR, split)
+        if images:
+            return cv2.imread(str(images[0]))
+    return None
+
+def sweep():
+    parser = argparse.ArgumentParser(description="Sweep model/ukuran/hyperparameter YOLOv5 untuk CPU")
+    parser.add_argument("--models", nargs="+", default=MODELS, help="Ukuran model")
+    parser.add_argument("--imgs", nargs="+", type=int, default=IMG_SIZES, help="Ukuran gambar")
+    parser.add_argument("--param", action="append", default=[], type=parse_param,
+                        help="Hyperparameter YOLOv5: nama=v1,v2 (list) atau nama=low:high (random)")
+    parser.add_argument("--random", type=int, default=0, help="Random search N trial (default: grid)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed random search")
+    parser.add_argument("--epochs", type=int, default=EPOCHS, help="Budget epoch per trial")
+    parser.add_argument("--patience", type=int, default=PATIENCE, help="Early stopping per trial")
+    parser.add_argument("--threads", type=int, default=None, help="Thread per trial (default: min(4, core))")
+    parser.add_argument("--parallel", type=int, default=None, help="Maksimal trial paralel")
+    parser.add_argument("--serve-threads", type=int, default=torch.get_num_threads(),
+                        help="Thread torch saat mengukur latency (samakan dengan serving)")
+    parser.add_argument("--max-latency", type=float, default=None, help="Abaikan trial dengan p50 > ms ini")
+    parser.add_argument("--dir", default=SWEEP_DIR, help="Folder sweep")
+    args = parser.parse_args()
+
+    print("="*70)
+    print("SWEEP: Model / Ukuran / Hyperparameter")
+    print("="*70)
+
+    if not Path("yolov5").exists() or not Path(DATA_YAML).exists():
+        print("❌ yolov5/ atau dataset/data.yaml belum ada")
+        print("\nJalankan: python scripts/setup_yolov5.py && python scripts/1_download_dataset.py")
+        return
+    params = dict(args.param)
+    if params and not Path(BASE_HYP).exists():
+        print(f"❌ File hyp dasar tidak ditemukan: {BASE_HYP}")
+        return
+
+    space = {'model': args.models, 'img': args.imgs, **params}
+    has_range = any(isinstance(v, tuple) for v in space.values())
+    if args.random or has_range:
+        trials = random_trials(space, args.random or 8, args.seed)
+    else:
+        trials = grid_trials(space)
+    budget = {'epochs': args.epochs, 'patience': args.patience}
+
+    label_index, _ = LabelIndex.build(DATASET_DIR, DATASET_SPLITS, index_path=LABEL_INDEX_PATH)
+    data_hash = data_fingerprint(label_index)
+
+    print(f"\n[CONFIG]")
+    print(f"  Search   : {'random' if args.random or has_range else 'grid'} ({len(trials)} trial)")
+    for name, values in space.items():
+        print(f"  {name:9s}: {values}")
+    print(f"  Budget   : {args.epochs} epoch (patience {args.patience})")
+    print(f"  Dataset  : {data_hash}")
+    print(f"  Output   : {args.dir}\n")
+
+    try:
+        results = run_sweep(trials, args.dir, DATA_YAML, budget, BASE_HYP, data_hash,
+                            threads_per_trial=args.threads, max_parallel=args.parallel)
+    except KeyboardInterrupt:
+        print("\n⚠️ Sweep dihentikan (trial yang terputus di-resume saat dijalankan ulang)")
+        return
+
+    print(f"\n[LATENCY] {args.serve_threads} thread, {LATENCY_RUNS} run per trial")
+    results = attach_latency(results, args.dir, args.serve_threads, LATENCY_RUNS, image=load_latency_image())
+
+    ranked = rank_trials(results, args.max_latency)
+    print("\n" + "="*70)
+    print("LEADERBOARD (mAP50-95 per 100 ms latency)")
+    print("="*70)
+    print(f"  {'#':>2s}  {'key':12s}{'mAP50':>7s}{'mAP50-95':>10s}{'p50 ms':>9s}{'score':>8s}  trial")
+    for i, r in enumerate(ranked, 1):
+        map50 = f"{r['map50']:.3f}" if r['map50'] is not None else "-"
+        print(f"  {i:>2d}  {r['key']:12s}{map50:>7s}{r['map50_95']:>10.3f}{r['latency']['p50']:>9.1f}"
+              f"{r['score']:>8.3f}  {describe(r['trial'])}")
+
+    if not ranked:
+        print("  (belum ada trial dengan hasil & latency)")
+        return
+    path = write_leaderboard(ranked, args.dir)
+    print(f"\nLeaderboard: {path}")
+    print(f"Terbaik: {ranked[0]['weights']}")
+    print(f"\nNext: salin weights terbaik ke weights/best.pt, lalu python scripts/4_test_model.py")
+
+if __name__ == "__main__":
+    sweep()
@@ -0,0 +1,318 @@
+"""
+Sweep model size, ukuran gambar, dan hyperparameter YOLOv5
+
+- Grid atau random search atas search space (dict nama -> list nilai)
+- Trial dijalankan paralel di process pool yang membagi core & RAM
+  (thread torch per trial dibatasi agar trial tidak saling berebut core)
+- Tiap trial diberi key hash dari konfigurasi + budget + isi dataset; trial yang
+  sudah selesai tidak dijalankan lagi, trial yang terputus di-resume
+- Latency inferensi CPU diukur serial setelah training (mesin tidak sibuk),
+  lalu trial diurutkan berdasarkan akurasi per latency
+"""
+
+import hashlib
+import itertools
+import json
+import os
+import platform
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from training_launcher import TrainingLauncher, detect_resources
+
+# Key yang bukan hyperparameter YOLOv5 (--hyp)
+TRIAL_KEYS = ('model', 'img')
+METRIC = "metrics/mAP_0.5:0.95"
+THREAD_ENV = ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS')
+
+
+# ============================================================
+# SEARCH SPACE
+# ============================================================
+
+def grid_trials(space):
+    """Semua kombinasi search space"""
+    names = sorted(space)
+    return [dict(zip(names, values)) for values in itertools.product(*(space[n] for n in names))]
+
+
+def random_trials(space, count, seed=0):
+    """
+    Sampel acak tanpa duplikat dari search space
+
+    Nilai list dipilih acak; tuple (low, high) float diambil uniform.
+    """
+    rng = random.Random(seed)
+    names = sorted(space)
+    total = 1
+    for n in names:
+        total *= len(space[n]) if isinstance(space[n], list) else float('inf')
+    trials, seen = [], set()
+    while len(trials) < min(count, total):
+        trial = {}
+        for n in names:
+            values = space[n]
+            trial[n] = rng.choice(values) if isinstance(values, list) else round(rng.uniform(*values), 5)
+        key = json.dumps(trial, sort_keys=True)
+        if key not in seen:
+            seen.add(key)
+            trials.append(trial)
+    return trials
+
+
+def data_fingerprint(label_index):
+    """Hash isi dataset dari LabelIndex (split + hash label per file)"""
+    digest = hashlib.blake2b(digest_size=8)
+    files = label_index.files
+    for split, stem, label_hash in zip(files['split'], files['stem'], files['label_hash']):
+        digest.update(f"{split}:{stem}:{label_hash}\n".encode())
+    return digest.hexdigest()
+
+
+def trial_key(trial, budget, data_hash):
+    """Key cache trial: hash konfigurasi + budget training + dataset"""
+    payload = json.dumps({'trial': trial, 'budget': budget, 'data': data_hash}, sort_keys=True)
+    return hashlib.blake2b(payload.encode(), digest_size=6).hexdigest()
+
+
+def write_hyp(base_hyp, overrides, path):
+    """File hyp YOLOv5: base + override dari trial"""
+    import yaml  # type: ignore
+
+    with open(base_hyp) as f:
+        hyp = yaml.safe_load(f)
+    unknown = set(overrides) - set(hyp)
+    if unknown:
+        raise ValueError(f"Hyperparameter tidak dikenal YOLOv5: {sorted(unknown)}")
+    hyp.update(overrides)
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w') as f:
+        yaml.safe_dump(hyp, f, sort_keys=False)
+    return path
+
+
+# ============================================================
+# TRIAL (dijalankan di process pool)
+# ============================================================
+
+def run_trial(trial, key, sweep_dir, data_yaml, budget, base_hyp, resources, threads):
+    """
+    Training satu trial dengan budget pendek
+
+    Returns:
+        Dict hasil trial (juga disimpan ke trials/{key}.json jika selesai)
+    """
+    sweep_dir = Path(sweep_dir)
+    env = dict(os.environ, **{name: str(threads) for name in THREAD_ENV})
+    hyp = {k: v for k, v in trial.items() if k not in TRIAL_KEYS}
+    hyp_path = write_hyp(base_hyp, hyp, sweep_dir / "hyps" / f"{key}.yaml") if hyp else None
+
+    launcher = TrainingLauncher(data_yaml, model_size=trial['model'], img_size=trial['img'],
+                                epochs=budget['epochs'], project_dir=str(sweep_dir / "runs"), name=key,
+                                patience=budget['patience'], metric=METRIC, hyp=hyp_path,
+                                resources=resources, env=env, quiet=True,
+                                output_log=sweep_dir / "runs" / key / "train.log")
+    start = time.time()
+    summary = launcher.run(resume=True)
+    result = {
+        'key': key,
+        'trial': trial,
+        'budget': budget,
+        'status': summary['status'],
+        'map50_95': summary.get('best_metrics', {}).get('metrics/mAP_0.5:0.95', summary.get('best')),
+        'map50': summary.get('best_metrics', {}).get('metrics/mAP_0.5'),
+        'best_epoch': summary.get('best_epoch'),
+        'epochs_run': summary.get('epochs_run'),
+        'train_seconds': round(time.time() - start, 1),
+        'images_per_s': round(summary.get('images_per_s', 0.0), 2),
+        'weights': summary.get('weights'),
+        'plan': {k: launcher.plan[k] for k in ('batch', 'workers', 'cache')},
+    }
+    if summary['status'] in ('finished', 'stopped_early'):
+        save_result(sweep_dir, result)
+    return result
+
+
+def result_path(sweep_dir, key):
+    return Path(sweep_dir) / "trials" / f"{key}.json"
+
+
+def save_result(sweep_dir, result):
+    path = result_path(sweep_dir, result['key'])
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix('.tmp')
+    tmp.write_text(json.dumps(result, indent=2))
+    os.replace(tmp, path)
+
+
+def load_result(sweep_dir, key):
+    path = result_path(sweep_dir, key)
+    if not path.exists():
+        return None
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return None
+
+
+# ============================================================
+# SWEEP
+# ============================================================
+
+def plan_parallelism(threads_per_trial=None, max_parallel=None, resources=None):
+    """
+    Bagi core & RAM mesin untuk trial paralel
+
+    Returns:
+        parallel: Jumlah trial sekaligus
+        threads: Thread torch per trial
+        share: Dict resource per trial (untuk plan_resources)
+    """
+    resources = resources or detect_resources()
+    cores = resources['cores']
+    threads = threads_per_trial or min(4, cores)
+    parallel = max(1, cores // threads)
+    if max_parallel:
+        parallel = min(parallel, max_parallel)
+    share = {
+        'total_ram': resources['total_ram'] // parallel,
+        'available_ram': resources['available_ram'] // parallel,
+        'cores': max(1, cores // parallel),
+    }
+    return parallel, threads, share
+
+
+def run_sweep(trials, sweep_dir, data_yaml, budget, base_hyp, data_hash,
+              threads_per_trial=None, max_parallel=None, log=print):
+    """
+    Jalankan semua trial yang belum ada di cache
+
+    Returns:
+        List hasil trial (cache + baru)
+    """
+    parallel, threads, share = plan_parallelism(threads_per_trial, max_parallel)
+    results, pending = [], []
+    for trial in trials:
+        key = trial_key(trial, budget, data_hash)
+        cached = load_result(sweep_dir, key)
+        if cached is not None:
+            results.append(cached)
+        else:
+            pending.append((trial, key))
+
+    log(f"[SWEEP] {len(trials)} trial | cache {len(results)} | dijalankan {len(pending)} | "
+        f"paralel {parallel} x {threads} thread")
+    if not pending:
+        return results
+
+    with ProcessPoolExecutor(max_workers=parallel) as pool:
+        futures = {pool.submit(run_trial, trial, key, str(sweep_dir), data_yaml, budget,
+                               base_hyp, share, threads): key for trial, key in pending}
+        for future in as_completed(futures):
+            key = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                log(f"  ❌ {key}: {e}")
+                continue
+            results.append(result)
+            log(f"  [{key}] {result['status']} | mAP50-95 {result['map50_95'] or 0:.4f} | "
+                f"{result['epochs_run']} epoch | {result['train_seconds']:.0f} s | {describe(result['trial'])}")
+    return results
+
+
+def describe(trial):
+    return " ".join(f"{k}={v}" for k, v in sorted(trial.items()))
+
+
+# ============================================================
+# LATENCY & RANKING
+# ============================================================
+
+def host_key(threads):
+    """Latency hanya valid untuk mesin & jumlah thread yang sama"""
+    return f"{platform.node()}|{platform.processor() or platform.machine()}|{threads}"
+
+
+def measure_latency(weights, img_size, threads, runs=30, warmup=5, image=None):
+    """
+    Latency inferensi CPU satu gambar (jalur serving dari config.py)
+
+    Returns:
+        Dict mean, p50, p95, min (ms)
+    """
+    import numpy as np  # type: ignore
+    import torch  # type: ignore
+
+    from config import OPTIMIZED_CPU_MODE, CHANNELS_LAST, COMPILE_MODE, COMPILED_CACHE_DIR
+    from fast_inference import benchmark, optimize_model
+
+    torch.set_num_threads(threads)
+    model = torch.hub.load('ultralytics/yolov5', 'custom', path=weights, force_reload=False, verbose=False)
+    if OPTIMIZED_CPU_MODE:
+        model = optimize_model(model, weights_path=weights, img_size=img_size, channels_last=CHANNELS_LAST,
+                               compile_mode=COMPILE_MODE, cache_dir=COMPILED_CACHE_DIR)
+    if image is None:
+        image = np.random.default_rng(0).integers(0, 255, (480, 640, 3), dtype=np.uint8)
+    return benchmark(lambda im: model(im, size=img_size), image, runs, warmup)
+
+
+def attach_latency(results, sweep_dir, threads, runs=30, log=print, image=None):
+    """Ukur latency trial yang belum punya angka untuk host ini (serial, setelah training)"""
+    host = host_key(threads)
+    for result in results:
+        latency = result.get('latency')
+        if latency and latency.get('host') == host:
+            continue
+        weights = result.get('weights')
+        if not weights or not Path(weights).exists():
+            continue
+        try:
+            stats = measure_latency(weights, result['trial']['img'], threads, runs, image=image)
+        except Exception as e:
+            log(f"  ⚠️ Latency {result['key']} gagal: {e}")
+            continue
+        result['latency'] = {'host': host, **{k: round(v, 2) for k, v in stats.items()}}
+        save_result(sweep_dir, result)
+        log(f"  [{result['key']}] p50 {stats['p50']:.1f} ms | {describe(result['trial'])}")
+    return results
+
+
+def rank_trials(results, max_latency_ms=None):
+    """
+    Urutkan trial berdasarkan mAP50-95 per 100 ms latency p50
+
+    Returns:
+        List hasil (dengan field score) dari terbaik
+    """
+    ranked = []
+    for result in results:
+        latency = (result.get('latency') or {}).get('p50')
+        if not latency or result.get('map50_95') is None:
+            continue
+        if max_latency_ms and latency > max_latency_ms:
+            continue
+        ranked.append({**result, 'score': round(result['map50_95'] / (latency / 100.0), 5)})
+    return sorted(ranked, key=lambda r: r['score'], reverse=True)
+
+
+def write_leaderboard(ranked, sweep_dir):
+    """Simpan leaderboard CSV + JSON"""
+    import csv
+
+    sweep_dir = Path(sweep_dir)
+    sweep_dir.mkdir(parents=True, exist_ok=True)
+    keys = sorted({k for r in ranked for k in r['trial']})
+    with open(sweep_dir / "leaderboard.csv", 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['rank', 'key', *keys, 'map50', 'map50_95', 'p50_ms', 'p95_ms', 'score',
+                         'epochs_run', 'train_seconds', 'weights'])
+        for i, r in enumerate(ranked, 1):
+            writer.writerow([i, r['key'], *(r['trial'].get(k) for k in keys), r['map50'], r['map50_95'],
+                             r['latency']['p50'], r['latency']['p95'], r['score'],
+                             r['epochs_run'], r['train_seconds'], r['weights']])
+    (sweep_dir / "leaderboard.json").write_text(json.dumps(ranked, indent=2))
+    return sweep_dir / "leaderboard.csv"
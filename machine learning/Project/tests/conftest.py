@@ -0,0 +1,13 @@
+"""
+Konfigurasi pytest: modul di root project bisa di-import dari folder tests
+
+Jalankan dari folder Project:
+    python -m pytest tests -q
+
+Test untuk modul yang butuh torch/flask otomatis di-skip jika paket belum terinstall.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
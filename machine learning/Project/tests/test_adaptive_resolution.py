@@ -0,0 +1,76 @@
+"""Test pemilihan resolusi adaptif (antrian, latency, normalisasi)"""
+
+import time
+
+import pytest
+
+from adaptive_resolution import AdaptiveResolution
+
+
+def record(res, latency_ms, size):
+    """Catat satu request selesai dengan latency tertentu pada ukuran size"""
+    res.end(time.perf_counter() - latency_ms / 1000, size)
+
+
+def test_ladder_is_capped_at_base_size():
+    res = AdaptiveResolution(base_size=512, ladder=(320, 640, 512, 416, 512))
+    assert res.ladder == [512, 416, 320]
+    assert res.base_size == 512
+
+
+def test_idle_service_uses_base_size():
+    res = AdaptiveResolution()
+    assert res.choose(queue_depth=1) == 640
+
+
+@pytest.mark.parametrize("depth, expected", [(1, 640), (2, 640), (3, 512), (5, 416), (7, 320), (50, 320)])
+def test_queue_depth_steps_down_ladder(depth, expected):
+    res = AdaptiveResolution(queue_step=2)
+    assert res.choose(queue_depth=depth) == expected
+
+
+def test_slow_latency_steps_down_until_under_target():
+    res = AdaptiveResolution(latency_target_ms=1000)
+    for _ in range(5):
+        record(res, 2000, 640)
+    # 2000 ms @640 -> ~1280 @512 -> ~845 @416
+    assert res.choose(queue_depth=1) == 416
+
+
+def test_latency_is_normalized_to_base_size():
+    res = AdaptiveResolution(latency_target_ms=1000)
+    for _ in range(5):
+        record(res, 500, 320)       # setara ~2000 ms @640
+    # Beban tidak "hilang" hanya karena resolusi sudah diturunkan
+    assert res.choose(queue_depth=1) == 416
+    assert res.mean_latency_ms() == pytest.approx(500, rel=0.05)
+
+
+def test_disabled_always_uses_base_size():
+    res = AdaptiveResolution(enabled=False)
+    record(res, 10000, 640)
+    assert res.choose(queue_depth=20) == 640
+
+
+def test_begin_end_tracks_in_flight_and_counts_sizes():
+    res = AdaptiveResolution(queue_step=1)
+    start, depth = res.begin()
+    _, depth2 = res.begin()
+    assert (depth, depth2) == (1, 2)
+    assert res.choose() == 512          # 2 in-flight, queue_step 1
+
+    res.end(start)
+    res.end(start)
+    stats = res.stats()
+    assert stats['in_flight'] == 0
+    assert stats['size_counts'][512] == 1
+    assert stats['latency_p50_ms_at_base'] is None      # end() tanpa size tidak dicatat
+
+
+def test_preview_matches_choose_without_counting():
+    res = AdaptiveResolution(queue_step=1)
+    res.begin()
+    assert res.preview() == 512         # request baru akan jadi in-flight ke-2
+    assert res.stats()['size_counts'] == {640: 0, 512: 0, 416: 0, 320: 0}
+    _, depth = res.begin()
+    assert res.choose(depth) == 512
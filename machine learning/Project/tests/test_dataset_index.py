@@ -0,0 +1,153 @@
+"""Test index label: parsing, flag masalah, rebuild incremental, statistik"""
+
+import os
+
+import numpy as np  # type: ignore
+import pytest
+
+from dataset_index import (ISSUE_BAD_CLASS, ISSUE_BAD_LINE, ISSUE_DUPLICATE_BOX, ISSUE_EMPTY_LABEL,
+                           ISSUE_MISSING_IMAGE, ISSUE_MISSING_LABEL, ISSUE_OUT_OF_BOUNDS,
+                           LabelIndex, parse_label_file)
+
+CLASS_NAMES = ['Primordia', 'Muda', 'Matang']
+SPLITS = ['train', 'valid']
+
+
+def write_image(path, width=64, height=48):
+    from PIL import Image  # type: ignore
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    Image.new('RGB', (width, height)).save(path)
+
+
+def write_label(path, text, mtime_ns=None):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    """Dataset kecil: 3 gambar train, 1 gambar valid"""
+    for split, stem, text in [('train', 'a', "0 0.5 0.5 0.2 0.2\n1 0.3 0.3 0.1 0.1\n"),
+                              ('train', 'b', "2 0.5 0.5 0.5 0.5\n"),
+                              ('train', 'c', ""),
+                              ('valid', 'd', "1 0.4 0.4 0.2 0.3\n")]:
+        write_image(tmp_path / split / "images" / f"{stem}.jpg")
+        write_label(tmp_path / split / "labels" / f"{stem}.txt", text, mtime_ns=1_000_000_000)
+    return tmp_path
+
+
+def build(dataset, index_path=None):
+    return LabelIndex.build(dataset, SPLITS, index_path=index_path, workers=0, class_names=CLASS_NAMES)
+
+
+def table(index):
+    """Isi index tanpa kolom mtime (untuk membandingkan build incremental vs penuh)"""
+    f, b = index.files, index.boxes
+    files = [(int(f['split'][r]), str(f['stem'][r]), int(f['width'][r]), int(f['issues'][r]), int(f['n_boxes'][r]))
+             for r in range(len(f['stem']))]
+    return files, index.boxes_for(range(len(b['cls']))), b['file_id'].tolist()
+
+
+# ============================================================
+# PARSING
+# ============================================================
+
+@pytest.mark.parametrize("text, flag", [
+    ("", ISSUE_EMPTY_LABEL),
+    ("0 0.5 0.5 0.2\n", ISSUE_BAD_LINE),
+    ("0 0.5 abc 0.2 0.2\n", ISSUE_BAD_LINE),
+    ("5 0.5 0.5 0.2 0.2\n", ISSUE_BAD_CLASS),
+    ("0 1.2 0.5 0.2 0.2\n", ISSUE_OUT_OF_BOUNDS),
+    ("0 0.5 0.5 0 0.2\n", ISSUE_OUT_OF_BOUNDS),
+    ("0 0.5 0.5 0.2 0.2\n0 0.5 0.5 0.2 0.2\n", ISSUE_DUPLICATE_BOX),
+])
+def test_parse_label_flags(tmp_path, text, flag):
+    path = tmp_path / "x.txt"
+    path.write_text(text)
+    _, issues, _ = parse_label_file(path, len(CLASS_NAMES))
+    assert issues == flag
+
+
+def test_parse_label_boxes(tmp_path):
+    path = tmp_path / "x.txt"
+    path.write_text("1 0.5 0.25 0.2 0.4\n\n2.0 0.1 0.1 0.05 0.05\n")
+    boxes, issues, digest = parse_label_file(path, len(CLASS_NAMES))
+    assert issues == 0
+    assert boxes == [(1, 0.5, 0.25, 0.2, 0.4), (2, 0.1, 0.1, 0.05, 0.05)]
+    assert len(digest) == 16
+
+
+def test_unpaired_files_flagged(dataset):
+    write_image(dataset / "train" / "images" / "no_label.jpg")
+    write_label(dataset / "train" / "labels" / "no_image.txt", "0 0.5 0.5 0.1 0.1\n")
+    index, _ = build(dataset)
+
+    issues = dict(zip(index.files['stem'].tolist(), index.files['issues'].tolist()))
+    assert issues['no_label'] == ISSUE_MISSING_LABEL
+    assert issues['no_image'] == ISSUE_MISSING_IMAGE
+    assert [(split, stem) for split, stem, _ in index.issues()] == [('train', 'no_image')]
+
+
+# ============================================================
+# REBUILD INCREMENTAL
+# ============================================================
+
+def test_rebuild_reuses_unchanged_files(dataset, tmp_path):
+    index_path = tmp_path / "index.npz"
+    first, report = build(dataset, index_path)
+    assert report['parsed'] == 4 and report['reused'] == 0
+
+    second, report = build(dataset, index_path)
+    assert (report['reused'], report['parsed'], report['rehashed']) == (4, 0, 0)
+    assert table(second) == table(first)
+
+
+def test_rebuild_detects_touch_edit_and_removal(dataset, tmp_path):
+    index_path = tmp_path / "index.npz"
+    build(dataset, index_path)
+
+    labels = dataset / "train" / "labels"
+    # a: mtime berubah, isi sama -> cukup hash ulang
+    os.utime(labels / "a.txt", ns=(2_000_000_000, 2_000_000_000))
+    # b: isi berubah dengan ukuran file sama -> parse ulang
+    write_label(labels / "b.txt", "1 0.5 0.5 0.5 0.5\n", mtime_ns=2_000_000_000)
+    # c: dihapus
+    (labels / "c.txt").unlink()
+    (dataset / "train" / "images" / "c.jpg").unlink()
+
+    index, report = build(dataset, index_path)
+    assert (report['reused'], report['rehashed'], report['parsed'], report['removed']) == (1, 1, 1, 1)
+
+    # Hasil incremental identik dengan build penuh tanpa index lama
+    fresh, _ = build(dataset)
+    assert table(index) == table(fresh)
+    assert index.class_balance()['train'] == {'Primordia': 1, 'Muda': 2, 'Matang': 0}
+
+
+def test_class_names_change_invalidates_index(dataset, tmp_path):
+    index_path = tmp_path / "index.npz"
+    build(dataset, index_path)
+    _, report = LabelIndex.build(dataset, SPLITS, index_path=index_path, workers=0,
+                                 class_names=CLASS_NAMES + ['Busuk'])
+    assert report['reused'] == 0 and report['parsed'] == 4
+
+
+# ============================================================
+# STATISTIK
+# ============================================================
+
+def test_split_stats_and_box_sizes(dataset):
+    index, _ = build(dataset)
+
+    stats = index.split_stats()
+    assert stats['train'] == {'images': 3, 'boxes': 3, 'boxes_per_image': 1.0, 'max_boxes': 2,
+                              'background': 1, 'corrupt': 0}
+    assert stats['valid']['boxes'] == 1
+
+    sizes = index.box_sizes()
+    # Matang: 0.5 x 0.5 dari gambar 64x48 -> sqrt(32 * 24) ~ 27.7 px (small)
+    assert sizes['Matang']['count'] == 1 and sizes['Matang']['small'] == 1
+    assert sizes['Matang']['p50'] == pytest.approx(np.sqrt(32 * 24), abs=0.1)
@@ -0,0 +1,102 @@
+"""Test near-duplicate: pHash, multi-index hashing vs brute force, cluster dan de-duplikasi"""
+
+import cv2  # type: ignore
+import numpy as np  # type: ignore
+import pytest
+
+from duplicate_finder import (HashTable, cluster_pairs, dedup_split, find_duplicates,
+                              near_duplicate_pairs, phash, popcount64, source_name)
+
+
+def brute_force_pairs(hashes, max_distance):
+    found = {}
+    for i in range(len(hashes)):
+        for j in range(i + 1, len(hashes)):
+            d = bin(int(hashes[i]) ^ int(hashes[j])).count('1')
+            if d <= max_distance:
+                found[(i, j)] = d
+    return found
+
+
+def planted_hashes(n=300, seed=0):
+    """Hash acak plus salinan dengan 1..12 bit terbalik"""
+    rng = np.random.default_rng(seed)
+    hashes = rng.integers(0, 2 ** 63, n, dtype=np.int64).astype(np.uint64) * np.uint64(2) + \
+        rng.integers(0, 2, n).astype(np.uint64)
+    near = []
+    for k in range(1, 13):
+        bits = rng.choice(64, size=k, replace=False)
+        flip = np.uint64(sum(1 << int(b) for b in bits))
+        near.append(hashes[k] ^ flip)
+    return np.concatenate([hashes, np.array(near, dtype=np.uint64)])
+
+
+@pytest.mark.parametrize("max_distance", [0, 3, 6, 10])
+def test_near_duplicate_pairs_matches_brute_force(max_distance):
+    hashes = planted_hashes()
+    pairs, distances = near_duplicate_pairs(hashes, max_distance)
+
+    found = {(int(i), int(j)): int(d) for (i, j), d in zip(pairs, distances)}
+    assert found == brute_force_pairs(hashes, max_distance)
+    assert (pairs[:, 0] < pairs[:, 1]).all()
+
+
+def test_near_duplicate_pairs_exact_copies_and_range():
+    hashes = np.array([5, 5, 5, 9], dtype=np.uint64)
+    pairs, distances = near_duplicate_pairs(hashes, 0)
+    assert pairs.tolist() == [[0, 1], [0, 2], [1, 2]]
+    assert distances.tolist() == [0, 0, 0]
+
+    with pytest.raises(ValueError):
+        near_duplicate_pairs(hashes, 17)
+
+
+def test_popcount64():
+    values = np.array([0, 1, 0xFF, 2 ** 64 - 1, 0x8000000000000001], dtype=np.uint64)
+    assert popcount64(values).tolist() == [0, 1, 8, 64, 2]
+
+
+def test_phash_robust_to_small_changes():
+    rng = np.random.default_rng(0)
+    image = cv2.GaussianBlur(rng.integers(0, 255, (240, 320), dtype=np.uint8), (9, 9), 0)
+    other = cv2.GaussianBlur(rng.integers(0, 255, (240, 320), dtype=np.uint8), (9, 9), 0)
+
+    base = phash(image)
+    resized = phash(cv2.resize(image, (160, 120), interpolation=cv2.INTER_AREA))
+    brighter = phash(cv2.add(image, 10))
+    distance = lambda a, b: bin(int(a) ^ int(b)).count('1')
+
+    assert distance(base, resized) <= 4
+    assert distance(base, brighter) <= 4
+    assert distance(base, phash(other)) > 16
+
+
+def test_cluster_pairs_union_find():
+    clusters = cluster_pairs(7, np.array([[0, 1], [1, 2], [4, 5]]))
+    assert [c.tolist() for c in clusters] == [[0, 1, 2], [4, 5]]
+
+
+def test_source_name():
+    assert source_name("IMG_01_jpg.rf.abc123.jpg") == "IMG_01_jpg"
+    assert source_name("foto.png") == "foto"
+
+
+def test_find_and_dedup_split():
+    names = ['a.jpg', 'b.jpg', 'c.jpg', 'x_jpg.rf.1.jpg', 'd.jpg', 'x_jpg.rf.2.jpg']
+    split = np.array([0, 0, 0, 0, 1, 1], dtype=np.int8)
+    far = 0xFFFF0000FFFF0000
+    hashes = np.array([0, 1, far, 0x0F0F0F0F0F0F0F0F, far | 1, 0xF0F0F0F0F0F0F0F0], dtype=np.uint64)
+    table = HashTable(['train', 'valid'], split, names, hashes, np.ones(6, bool), np.zeros((6, 2), np.int64))
+
+    report = find_duplicates(table, max_distance=1)
+    assert [(c['members'], c['cross_split']) for c in report['clusters']] == \
+        [([0, 1], False), ([2, 4], True)]
+    assert report['source_leaks'] == {'x_jpg': [3, 5]}
+
+    keep, dropped = dedup_split(table, report, 'train')
+    assert keep == [0]              # b duplikat a; c bocor ke valid; x_jpg berasal dari sumber yang sama
+    assert dropped == {'duplicate': 1, 'leak': 2}
+
+    keep, dropped = dedup_split(table, report, 'train', drop_leaks=False)
+    assert keep == [0, 2, 3]
+    assert dropped == {'duplicate': 1}
@@ -0,0 +1,162 @@
+"""Test matching prediksi, AP, confusion matrix dan evaluate() dengan nilai yang diketahui"""
+
+import numpy as np  # type: ignore
+import pytest
+
+from evaluation import (IOU_THRESHOLDS, ap_per_class, compute_ap, confusion_matrix, evaluate,
+                        filter_predictions, ground_truth_from_index, match_predictions, same_image_pairs)
+
+CLASS_NAMES = ['Primordia', 'Muda', 'Matang']
+
+
+def make(image_idx, boxes, cls, conf=None):
+    data = {
+        'image_idx': np.array(image_idx, dtype=np.int32),
+        'boxes': np.array(boxes, dtype=np.float32).reshape(-1, 4),
+        'cls': np.array(cls, dtype=np.int64),
+    }
+    if conf is not None:
+        data['conf'] = np.array(conf, dtype=np.float32)
+    return data
+
+
+# Ground truth: 2 gambar, 3 box
+GTS = make([0, 0, 1], [[0, 0, 10, 10], [20, 20, 30, 30], [0, 0, 10, 10]], [0, 1, 0])
+
+
+# ============================================================
+# MATCHING
+# ============================================================
+
+def test_same_image_pairs_enumerates_all_pairs():
+    pi, gi = same_image_pairs(np.array([0, 1, 1]), np.array([1, 0, 1]), num_images=2)
+    assert sorted(zip(pi.tolist(), gi.tolist())) == [(0, 1), (1, 0), (1, 2), (2, 0), (2, 2)]
+
+
+def test_match_predictions_known_cases():
+    preds = make(
+        [0, 0, 0, 1, 1],
+        [[0, 0, 10, 10],      # TP sempurna
+         [1, 0, 11, 10],      # duplikat (IoU 0.82) -> GT sudah dipakai, FP
+         [20, 20, 30, 31],    # IoU 100/110 = 0.909 -> TP sampai threshold 0.9
+         [0, 0, 10, 10],      # kelas salah -> FP
+         [0, 5, 10, 15]],     # IoU 0.33 -> FP
+        [0, 0, 1, 1, 0])
+    correct = match_predictions(preds, GTS, num_images=2)
+
+    assert correct.shape == (5, len(IOU_THRESHOLDS))
+    assert correct[0].all()
+    assert not correct[1].any()
+    assert correct[2].tolist() == [True] * 9 + [False]
+    assert not correct[3].any() and not correct[4].any()
+
+
+def test_match_predictions_empty_inputs():
+    preds = make([0], [[0, 0, 10, 10]], [0])
+    empty = make([], [], [])
+    assert not match_predictions(preds, empty, 1).any()
+    assert match_predictions(empty, GTS, 2).shape == (0, len(IOU_THRESHOLDS))
+
+
+# ============================================================
+# AP
+# ============================================================
+
+def test_compute_ap_perfect_curve():
+    # Titik recall 1.0 ikut diinterpolasi ke precision 0 (sama seperti YOLOv5): 1 - 0.01 / 2
+    assert compute_ap(np.array([1.0]), np.array([1.0])) == pytest.approx(0.995)
+
+
+def test_compute_ap_step_curve():
+    # Precision 1 sampai recall 0.5, lalu 2/3 sampai recall 1.0 (trapezoid 101 titik)
+    expected = 0.49 + 0.01 * (1 + 2 / 3) / 2 + 0.49 * 2 / 3 + 0.01 * (2 / 3) / 2
+    ap = compute_ap(np.array([0.5, 0.5, 1.0]), np.array([1.0, 0.5, 2 / 3]))
+    assert ap == pytest.approx(expected)
+
+
+def test_ap_per_class_sorts_by_confidence():
+    # Kelas 0: 2 GT; urutan conf: TP, FP, TP -> sama dengan kurva step di atas
+    correct = np.array([[True], [True], [False]])
+    conf = np.array([0.9, 0.5, 0.7])
+    ap = ap_per_class(correct, conf, np.array([0, 0, 0]), np.array([0, 0, 1]), num_classes=2)
+
+    assert ap[0, 0] == pytest.approx(compute_ap(np.array([0.5, 0.5, 1.0]), np.array([1.0, 0.5, 2 / 3])))
+    assert ap[1, 0] == 0.0      # kelas tanpa prediksi
+
+
+# ============================================================
+# CONFUSION MATRIX & EVALUATE
+# ============================================================
+
+def test_confusion_matrix_counts():
+    preds = make([0, 0, 1], [[0, 0, 10, 10], [50, 50, 60, 60], [0, 0, 10, 10]], [0, 2, 1])
+    matrix = np.array(confusion_matrix(preds, GTS, num_images=2, num_classes=3))
+
+    assert matrix[0, 0] == 1        # benar
+    assert matrix[1, 0] == 1        # GT Primordia diprediksi Muda
+    assert matrix[2, 3] == 1        # FP tanpa GT (background)
+    assert matrix[3, 1] == 1        # GT Muda tidak terdeteksi (FN)
+    assert matrix.sum() == 4
+
+
+def test_evaluate_perfect_predictions():
+    preds = dict(GTS, conf=np.array([0.9, 0.8, 0.7], dtype=np.float32))
+    result = evaluate(preds, GTS, num_images=2, class_names=CLASS_NAMES)
+
+    assert result['precision'] == 1.0 and result['recall'] == 1.0
+    assert result['map50'] == pytest.approx(0.995)
+    assert result['map50_95'] == pytest.approx(0.995)
+    # Matang tidak punya GT -> tidak ikut rata-rata
+    assert result['per_class']['Matang'] == {'n_gt': 0, 'n_pred': 0, 'precision': 0.0,
+                                             'recall': 0.0, 'ap50': 0.0, 'ap50_95': 0.0}
+
+
+def test_evaluate_conf_threshold_only_affects_precision_recall():
+    preds = make([0, 0, 1, 1], [[0, 0, 10, 10], [20, 20, 30, 30], [0, 0, 10, 10], [40, 40, 50, 50]],
+                 [0, 1, 0, 0], conf=[0.9, 0.8, 0.1, 0.05])
+    low = evaluate(preds, GTS, 2, CLASS_NAMES, conf_thres=0.01)
+    high = evaluate(preds, GTS, 2, CLASS_NAMES, conf_thres=0.5)
+
+    assert low['map50'] == high['map50']
+    assert high['per_class']['Primordia']['recall'] == 0.5
+    assert low['per_class']['Primordia']['recall'] == 1.0
+    assert low['per_class']['Primordia']['precision'] == pytest.approx(2 / 3, abs=1e-4)
+
+
+def test_filter_predictions_keeps_meta():
+    preds = make([0, 0], [[0, 0, 1, 1], [0, 0, 2, 2]], [0, 1], conf=[0.2, 0.6])
+    preds['meta'] = {'split': 'test'}
+    kept = filter_predictions(preds, 0.5)
+    assert kept['cls'].tolist() == [1] and kept['meta'] == {'split': 'test'}
+
+
+def test_out_of_range_classes_are_skipped_and_reported():
+    # GT -1 dan 3 (ISSUE_BAD_CLASS di LabelIndex), prediksi kelas 5 dari model lain
+    gts = make([0, 0, 0, 1], [[0, 0, 10, 10], [20, 20, 30, 30], [40, 40, 50, 50], [0, 0, 10, 10]],
+               [0, -1, 3, 0])
+    gts['skipped'] = 2                  # dari ground_truth_from_index
+    preds = make([0, 1, 1], [[0, 0, 10, 10], [0, 0, 10, 10], [60, 60, 70, 70]], [0, 0, 5],
+                 conf=[0.9, 0.8, 0.7])
+
+    result = evaluate(preds, gts, 2, CLASS_NAMES)
+    assert (result['skipped_gt'], result['skipped_pred']) == (4, 1)
+    assert result['per_class']['Primordia']['recall'] == 1.0
+    assert np.array(result['confusion_matrix']).sum() == 2
+
+    matrix = confusion_matrix(preds, gts, num_images=2, num_classes=3)
+    assert matrix[0, 0] == 2 and matrix.sum() == 2
+
+
+def test_ground_truth_from_index_drops_bad_classes(tmp_path):
+    from dataset_index import LabelIndex
+
+    for stem, text in [('a', "0 0.5 0.5 0.2 0.2\n7 0.5 0.5 0.4 0.4\n"), ('b', "2 0.25 0.25 0.5 0.5\n")]:
+        (tmp_path / "test" / "labels").mkdir(parents=True, exist_ok=True)
+        (tmp_path / "test" / "labels" / f"{stem}.txt").write_text(text)
+    index, _ = LabelIndex.build(tmp_path, ['test'], workers=0, class_names=CLASS_NAMES)
+
+    gts = ground_truth_from_index(index, 'test', ['b.jpg', 'a.jpg'], np.array([[100, 200], [50, 100]]))
+    assert gts['skipped'] == 1
+    assert gts['image_idx'].tolist() == [1, 0]
+    assert gts['cls'].tolist() == [0, 2]
+    assert gts['boxes'][1].tolist() == pytest.approx([0, 0, 100, 50])
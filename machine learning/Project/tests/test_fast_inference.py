@@ -0,0 +1,123 @@
+"""Test helper pre/post-processing fast_inference: bentuk input, letterbox, NMS"""
+
+import numpy as np
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("torchvision")
+
+from fast_inference import input_shape, letterbox, nms, non_max_suppression, scale_boxes
+
+
+# ============================================================
+# BENTUK INPUT & LETTERBOX
+# ============================================================
+
+@pytest.mark.parametrize("shape, size, expected", [
+    ((480, 640), 640, (480, 640)),      # 4:3, sudah kelipatan stride
+    ((720, 1280), 640, (384, 640)),     # 16:9 -> 360 dibulatkan ke atas ke 384
+    ((1000, 1000), 416, (416, 416)),
+    ((640, 480), 320, (320, 256)),      # portrait -> 240 dibulatkan ke 256
+])
+def test_input_shape_matches_autoshape(shape, size, expected):
+    assert input_shape(shape, size) == expected
+
+
+def test_letterbox_square_pads_top_and_bottom():
+    image = np.full((480, 640, 3), 200, dtype=np.uint8)
+    canvas, ratio, pad = letterbox(image, 640)
+
+    assert canvas.shape == (640, 640, 3)
+    assert ratio == 1.0
+    assert pad == (0, 80)
+    assert (canvas[:80] == 114).all() and (canvas[560:] == 114).all()
+    assert (canvas[80:560] == 200).all()
+
+
+def test_letterbox_rect_shape_has_no_padding():
+    image = np.full((480, 640, 3), 200, dtype=np.uint8)
+    canvas, ratio, pad = letterbox(image, input_shape(image.shape, 320))
+
+    assert canvas.shape == (256, 320, 3)
+    assert ratio == 0.5
+    assert pad == (0, 8)
+
+
+def test_letterbox_reused_canvas_equals_fresh_canvas():
+    rng = np.random.default_rng(0)
+    image = rng.integers(0, 255, (300, 500, 3), dtype=np.uint8)
+    fresh, _, _ = letterbox(image, (320, 320))
+
+    out = np.full((320, 320, 3), 7, dtype=np.uint8)   # isi sisa gambar sebelumnya
+    reused, ratio, pad = letterbox(image, (320, 320), out=out)
+
+    assert reused is out
+    np.testing.assert_array_equal(reused, fresh)
+
+
+def test_scale_boxes_inverts_letterbox():
+    image = np.zeros((480, 640, 3), dtype=np.uint8)
+    _, ratio, pad = letterbox(image, 320)
+    original = torch.tensor([[100.0, 50.0, 300.0, 400.0, 0.9, 1.0]])
+
+    boxed = original.clone()
+    boxed[:, [0, 2]] = boxed[:, [0, 2]] * ratio + pad[0]
+    boxed[:, [1, 3]] = boxed[:, [1, 3]] * ratio + pad[1]
+
+    restored = scale_boxes(boxed, ratio, pad, image.shape)
+    assert torch.allclose(restored, original, atol=1e-4)
+
+
+# ============================================================
+# NMS
+# ============================================================
+
+def candidates(rows):
+    """Kandidat [x1, y1, x2, y2, conf, cls]"""
+    return torch.tensor(rows, dtype=torch.float32)
+
+
+def test_nms_suppresses_overlap_within_class():
+    dets = nms(candidates([
+        [0, 0, 100, 100, 0.9, 0],
+        [5, 5, 105, 105, 0.8, 0],     # IoU ~0.82 dengan box pertama
+        [200, 200, 260, 260, 0.7, 0],
+    ]), conf_thres=0.25, iou_thres=0.45)
+
+    assert dets[:, 4].tolist() == pytest.approx([0.9, 0.7])
+
+
+def test_nms_keeps_overlap_across_classes():
+    dets = nms(candidates([
+        [0, 0, 100, 100, 0.9, 0],
+        [5, 5, 105, 105, 0.8, 1],
+    ]), conf_thres=0.25, iou_thres=0.45)
+
+    assert sorted(dets[:, 5].tolist()) == [0.0, 1.0]
+
+
+def test_nms_conf_threshold_and_max_det():
+    rows = [[i * 50, 0, i * 50 + 40, 40, 0.3 + i * 0.1, 0] for i in range(5)]
+
+    assert len(nms(candidates(rows), conf_thres=0.45)) == 3
+    top = nms(candidates(rows), conf_thres=0.25, max_det=2)
+    assert top[:, 4].tolist() == pytest.approx([0.7, 0.6])
+
+
+def test_nms_empty_candidates():
+    assert nms(torch.zeros((0, 6)), conf_thres=0.25).shape == (0, 6)
+
+
+def test_non_max_suppression_from_raw_output():
+    # [cx, cy, w, h, obj, cls0, cls1]
+    pred = torch.tensor([
+        [50.0, 50.0, 100.0, 100.0, 0.9, 0.2, 0.8],
+        [52.0, 52.0, 100.0, 100.0, 0.8, 0.3, 0.7],   # duplikat kelas 1
+        [300.0, 300.0, 40.0, 40.0, 0.1, 0.9, 0.1],   # conf 0.09 < threshold
+    ])
+    dets = non_max_suppression(pred, conf_thres=0.25, iou_thres=0.45)
+
+    assert len(dets) == 1
+    assert dets[0, :4].tolist() == pytest.approx([0.0, 0.0, 100.0, 100.0])
+    assert dets[0, 4].item() == pytest.approx(0.72)
+    assert dets[0, 5].item() == 1.0
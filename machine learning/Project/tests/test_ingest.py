@@ -0,0 +1,197 @@
+"""Test ingestion: cari field base64 tanpa parse penuh, decode ke buffer, batas ukuran, pool slot"""
+
+import base64
+import io
+import json
+import threading
+
+import cv2  # type: ignore
+import numpy as np  # type: ignore
+import pytest
+
+from ingest import IngestError, IngestPool, IngestSlot, decode_image, find_json_string, read_into
+
+
+class ReadOnlyStream:
+    """Stream tanpa readinto() (mis. wrapper WSGI tertentu)"""
+
+    def __init__(self, data):
+        self._io = io.BytesIO(data)
+
+    def read(self, n=-1):
+        return self._io.read(n)
+
+
+def body_with_image(image_bytes, prefix='data:image/jpeg;base64,', **fields):
+    return json.dumps(dict(fields, image=prefix + base64.b64encode(image_bytes).decode())).encode()
+
+
+# ============================================================
+# FIND_JSON_STRING
+# ============================================================
+
+@pytest.mark.parametrize("body, expected", [
+    (b'{"image": "QUJD"}', b'QUJD'),
+    (b'{"image" :\n "QUJD", "mode": "summary"}', b'QUJD'),
+    (b'{"caption": "image", "image": "QUJD"}', b'QUJD'),     # "image" sebagai nilai dilewati
+    (b'{"image_key": "abc", "image": "QUJD"}', b'QUJD'),
+    (b'{"image": ""}', b''),
+    (b'{"meta": {"image": "QUJD"}, "image": "WFla"}', b'WFla'),   # key di object dalam dilewati
+    (b'{"tags": ["image", {"image": "QUJD"}], "image": "WFla"}', b'WFla'),
+    (b'{"note": "a \\"image\\": {", "image": "WFla"}', b'WFla'),    # kutip/kurung di dalam string
+    (b'{"path": "C:\\\\", "image": "WFla"}', b'WFla'),           # backslash di akhir string
+])
+def test_find_json_string(body, expected):
+    span = find_json_string(body, len(body), 'image')
+    assert span is not None
+    assert body[span[0]:span[1]] == expected
+
+
+@pytest.mark.parametrize("body", [
+    b'{"image": null}', b'{"image": 12}', b'{"mode": "x"}', b'{"image": "QUJD',
+    b'{"meta": {"image": "QUJD"}}',
+    b'{"image": "QUJD", "image": "WFla"}',      # ambigu: duplikat key
+    b'{"\\u0069mage": "QUJD"}',                  # ambigu: key ber-escape
+])
+def test_find_json_string_missing_or_not_string(body):
+    assert find_json_string(body, len(body), 'image') is None
+
+
+def test_find_json_string_respects_length():
+    buf = bytearray(b'{"mode": "x"}' + b'"image": "stale data from previous request"')
+    assert find_json_string(buf, 13, 'image') is None
+
+
+# ============================================================
+# READ_INTO / READ_JSON / READ_FILE
+# ============================================================
+
+@pytest.mark.parametrize("stream_type", [io.BytesIO, ReadOnlyStream])
+def test_read_into_and_limit(stream_type):
+    buf = bytearray(10)
+    assert read_into(stream_type(b'12345'), buf) == 5
+    assert read_into(stream_type(b'1234567890'), buf) == 10
+    with pytest.raises(IngestError) as exc:
+        read_into(stream_type(b'12345678901'), buf)
+    assert exc.value.status == 413
+
+
+def test_read_json_decodes_image_into_buffer():
+    image = bytes(range(256)) * 40
+    slot = IngestSlot(max_bytes=64 * 1024)
+    data, view = slot.read_json(io.BytesIO(body_with_image(image, mode='summary', conf=0.4)))
+
+    assert data == {'mode': 'summary', 'conf': 0.4, 'image': ''}
+    assert bytes(view) == image
+
+    # Request kedua memakai buffer yang sama; sisa data lama tidak ikut terbaca
+    data, view = slot.read_json(io.BytesIO(body_with_image(b'small', prefix='')))
+    assert bytes(view) == b'small'
+
+
+def test_read_json_escaped_string_falls_back_to_full_parse():
+    encoded = base64.b64encode(b'\xff' * 30).decode()     # berisi '/', di-escape menjadi '\/'
+    body = ('{"image": "%s", "iou": 0.5}' % encoded.replace('/', '\\/')).encode()
+    data, view = IngestSlot(4096).read_json(io.BytesIO(body))
+    assert data == {'image': '', 'iou': 0.5}
+    assert bytes(view) == b'\xff' * 30
+
+
+def test_read_json_ignores_nested_image_key():
+    image = bytes(range(256))
+    body = json.dumps({'meta': {'image': 'QUJD'}, 'image': base64.b64encode(image).decode()}).encode()
+    data, view = IngestSlot(4096).read_json(io.BytesIO(body))
+    assert data == {'meta': {'image': 'QUJD'}, 'image': ''}
+    assert bytes(view) == image
+
+
+def test_read_json_ambiguous_key_uses_full_parse():
+    # Duplikat key: json.loads memakai nilai terakhir
+    data, view = IngestSlot(4096).read_json(io.BytesIO(b'{"image": "QUJD", "image": "WFla"}'))
+    assert data == {'image': ''} and bytes(view) == b'XYZ'
+
+    data, view = IngestSlot(4096).read_json(io.BytesIO(b'{"meta": {"image": "QUJD"}}'))
+    assert data == {'meta': {'image': 'QUJD'}} and view is None
+
+
+def test_read_json_without_image_field():
+    data, view = IngestSlot(4096).read_json(io.BytesIO(b'{"image_key": "abc"}'))
+    assert data == {'image_key': 'abc'} and view is None
+
+
+@pytest.mark.parametrize("body, message", [
+    (b'{"image": "QUJD", ', 'JSON'),
+    (b'["image"]', 'object'),
+    (b'5', 'object'),
+    (b'{"image": "Q"}', 'Base64'),
+    (b'{"image": "data:image/png;base64,"}', 'required'),
+])
+def test_read_json_errors_are_400(body, message):
+    with pytest.raises(IngestError) as exc:
+        IngestSlot(4096).read_json(io.BytesIO(body))
+    assert exc.value.status == 400
+    assert message in str(exc.value)
+
+
+def test_read_file_uses_full_body_buffer():
+    data = b'x' * 5000
+    slot = IngestSlot(max_bytes=5000)       # lebih besar dari buffer gambar (3/4 max_bytes)
+    assert bytes(slot.read_file(io.BytesIO(data))) == data
+    with pytest.raises(IngestError) as exc:
+        slot.read_file(io.BytesIO(b''))
+    assert exc.value.status == 400
+
+
+# ============================================================
+# DECODE
+# ============================================================
+
+def test_decode_image_and_pixel_limit():
+    image = np.zeros((60, 80, 3), dtype=np.uint8)
+    image[:, 40:] = (0, 0, 255)
+    ok, encoded = cv2.imencode('.png', image)
+    view = memoryview(encoded.tobytes())
+
+    np.testing.assert_array_equal(decode_image(view, max_pixels=80 * 60), image)
+    with pytest.raises(IngestError) as exc:
+        decode_image(view, max_pixels=80 * 60 - 1)
+    assert exc.value.status == 413
+    with pytest.raises(IngestError) as exc:
+        decode_image(memoryview(b'not an image'))
+    assert exc.value.status == 400
+
+
+# ============================================================
+# POOL
+# ============================================================
+
+def test_pool_reuses_slots_lifo():
+    pool = IngestPool(slots=2, max_bytes=1024)
+    with pool.slot() as first:
+        first.read_file(io.BytesIO(b'abc'))
+    with pool.slot() as again:
+        assert again is first
+    stats = pool.stats()
+    assert (stats['in_use'], stats['peak_in_use'], stats['waited']) == (0, 1, 0)
+
+
+def test_pool_waits_then_times_out_with_503():
+    pool = IngestPool(slots=1, max_bytes=1024, wait_seconds=0.05)
+    with pool.slot():
+        with pytest.raises(IngestError) as exc:
+            with pool.slot():
+                pass
+    assert exc.value.status == 503
+    assert (pool.stats()['waited'], pool.stats()['timeouts']) == (1, 1)
+
+
+def test_pool_waiter_gets_released_slot():
+    pool = IngestPool(slots=1, max_bytes=1024, wait_seconds=5.0)
+    got = []
+    with pool.slot() as held:
+        waiter = threading.Thread(target=lambda: got.append(pool.slot().__enter__()))
+        waiter.start()
+        waiter.join(0.05)
+        assert not got
+    waiter.join(5.0)
+    assert got == [held]
@@ -0,0 +1,235 @@
+"""Test router: routing key, pemilihan instance, retry, dan transisi status health"""
+
+import base64
+import io
+import json
+import urllib.error
+
+import pytest
+
+pytest.importorskip("flask")
+
+import ml_router
+from ml_router import Instance, Router, image_key, routing_key
+
+
+def make_router(urls=('http://a', 'http://b', 'http://c'), **kwargs):
+    """Router dengan instance siap, tanpa thread health check"""
+    kwargs.setdefault('ready_wait', 0.0)
+    router = Router([], **kwargs)
+    for url in urls:
+        instance = Instance(url)
+        instance.state = 'ready'
+        router.instances[url] = instance
+    return router
+
+
+def acquire(router, key=None, exclude=()):
+    return router.acquire(key, set(exclude), deadline=0)
+
+
+# ============================================================
+# ROUTING KEY
+# ============================================================
+
+def test_routing_key_json():
+    data = b"\xff\xd8jpeg bytes"
+    encoded = base64.b64encode(data).decode()
+    body = json.dumps({'image': 'data:image/jpeg;base64,' + encoded}).encode()
+
+    assert routing_key(body, 'application/json') == image_key(data)
+    assert routing_key(json.dumps({'image_key': 'abc'}), 'application/json; charset=utf-8') == 'abc'
+    assert routing_key(b'not json', 'application/json') is None
+    assert routing_key(json.dumps({'image': 123}), 'application/json') is None
+
+
+def test_routing_key_multipart():
+    files = {'image': io.BytesIO(b"png bytes")}
+    assert routing_key(b'', 'multipart/form-data', files) == image_key(b"png bytes")
+    assert routing_key(b'', 'multipart/form-data', {}) is None
+
+
+# ============================================================
+# PEMILIHAN INSTANCE
+# ============================================================
+
+def test_select_least_loaded_without_key():
+    router = make_router()
+    router.instances['http://a'].reported_queue = 3
+    router.instances['http://b'].in_flight = 1
+
+    chosen = acquire(router)
+    assert chosen.url == 'http://c'
+    assert (chosen.in_flight, chosen.requests) == (1, 1)
+
+
+def test_select_spreads_ties_by_request_count():
+    router = make_router()
+    urls = []
+    for _ in range(3):
+        instance = acquire(router)
+        urls.append(instance.url)
+        router.release(instance, ok=True)
+    assert sorted(urls) == ['http://a', 'http://b', 'http://c']
+
+
+def test_affinity_keeps_same_image_on_same_instance():
+    router = make_router(affinity_slack=2)
+    first = acquire(router, key='img-1')
+    router.release(first, ok=True)
+    for _ in range(5):
+        again = acquire(router, key='img-1')
+        router.release(again, ok=True)
+        assert again is first
+    assert router.affinity_hits == 6
+
+
+def test_affinity_yields_to_load_beyond_slack():
+    router = make_router(affinity_slack=2)
+    preferred = acquire(router, key='img-1')
+    router.release(preferred, ok=True)
+
+    preferred.reported_queue = 3            # 3 > 0 + slack
+    chosen = acquire(router, key='img-1')
+    assert chosen is not preferred
+
+
+def test_select_skips_draining_down_and_excluded():
+    router = make_router()
+    router.instances['http://a'].draining = True
+    router.instances['http://b'].state = 'down'
+    assert acquire(router).url == 'http://c'
+    assert acquire(router, exclude={'http://c'}) is None
+
+
+def test_drain_remove_when_idle():
+    router = make_router()
+    busy = router.instances['http://a']
+    busy.in_flight = 1
+    assert router.drain('http://a', remove=True) is False
+    assert 'http://a' in router.instances
+
+    router.release(busy, ok=True)
+    assert 'http://a' not in router.instances
+    with pytest.raises(KeyError):
+        router.enable('http://a')
+
+
+# ============================================================
+# HEALTH & FAILURE
+# ============================================================
+
+class FakeResponse(io.BytesIO):
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+def fake_health(monkeypatch, reply):
+    """reply: dict /health atau exception"""
+    def urlopen(url, timeout=None):
+        if isinstance(reply, Exception):
+            raise reply
+        return FakeResponse(json.dumps(reply).encode())
+    monkeypatch.setattr(ml_router.urllib.request, 'urlopen', urlopen)
+
+
+def test_health_transitions(monkeypatch):
+    router = make_router(urls=(), failures_to_down=2)
+    instance = Instance('http://a')
+
+    fake_health(monkeypatch, {'model_loaded': False})
+    router.check(instance)
+    assert instance.state == 'loading'
+
+    fake_health(monkeypatch, {'model_loaded': True, 'load': {'in_flight': 4}})
+    router.check(instance)
+    assert (instance.state, instance.reported_queue) == ('ready', 4)
+
+    fake_health(monkeypatch, urllib.error.URLError('refused'))
+    router.check(instance)
+    assert instance.state == 'ready'            # satu kegagalan belum cukup
+    router.check(instance)
+    assert instance.state == 'down'
+
+    fake_health(monkeypatch, {'model_loaded': True})
+    router.check(instance)
+    assert (instance.state, instance.failures) == ('ready', 0)
+
+
+def test_release_only_unreachable_counts_toward_down():
+    router = make_router(failures_to_down=2)
+    instance = router.instances['http://a']
+
+    for _ in range(3):
+        router.release(instance, ok=False, unreachable=False)
+    assert (instance.state, instance.errors) == ('ready', 3)
+
+    router.release(instance, ok=False)
+    router.release(instance, ok=True, elapsed_ms=100.0)     # sukses me-reset hitungan
+    router.release(instance, ok=False)
+    assert instance.state == 'ready'
+    router.release(instance, ok=False)
+    assert instance.state == 'down'
+
+
+# ============================================================
+# FORWARD & RETRY
+# ============================================================
+
+def fake_send(monkeypatch, router, replies):
+    """replies: url -> (status, body) atau exception"""
+    calls = []
+
+    def send(instance, method, path, body, content_type):
+        calls.append(instance.url)
+        reply = replies[instance.url]
+        if isinstance(reply, Exception):
+            raise reply
+        status, data = reply
+        return status, 'application/json', data
+    monkeypatch.setattr(router, '_send', send)
+    return calls
+
+
+def test_forward_retries_connection_error(monkeypatch):
+    router = make_router(urls=('http://a', 'http://b'), failures_to_down=1)
+    router.instances['http://b'].reported_queue = 1         # 'a' dicoba lebih dulu
+    calls = fake_send(monkeypatch, router, {'http://a': ConnectionRefusedError(),
+                                            'http://b': (200, b'{"ok": true}')})
+
+    status, _, body, url = router.forward('POST', '/detect', b'{}', 'application/json')
+    assert (status, body, url) == (200, b'{"ok": true}', 'http://b')
+    assert calls == ['http://a', 'http://b']
+    assert router.instances['http://a'].state == 'down'
+    assert router.retries == 1
+
+
+def test_forward_503_retried_without_penalty(monkeypatch):
+    router = make_router(urls=('http://a', 'http://b'), failures_to_down=1)
+    fake_send(monkeypatch, router, {'http://a': (503, b'busy'), 'http://b': (503, b'busy')})
+
+    status, _, body, url = router.forward('POST', '/detect', b'{}', 'application/json')
+    assert (status, body) == (503, b'busy')
+    assert url in ('http://a', 'http://b')
+    assert all(i.state == 'ready' for i in router.instances.values())
+
+
+def test_forward_application_500_returned_immediately(monkeypatch):
+    router = make_router(urls=('http://a', 'http://b'), failures_to_down=1)
+    calls = fake_send(monkeypatch, router, {'http://a': (500, b'err'), 'http://b': (500, b'err')})
+
+    status, _, _, _ = router.forward('POST', '/detect', b'{}', 'application/json')
+    assert status == 500
+    assert len(calls) == 1
+    assert all(i.state == 'ready' for i in router.instances.values())
+
+
+def test_forward_without_ready_instance_rejected(monkeypatch):
+    router = make_router(urls=())
+    status, _, body, url = router.forward('POST', '/detect', b'{}', 'application/json')
+    assert (status, url) == (503, None)
+    assert json.loads(body)['success'] is False
+    assert router.rejected == 1
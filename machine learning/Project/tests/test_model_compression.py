@@ -0,0 +1,134 @@
+"""Test channel pruning: jumlah channel, konsistensi shape producer/consumer, output tetap sama"""
+
+import pytest
+
+torch = pytest.importorskip("torch")
+import torch.nn as nn  # type: ignore
+
+from model_compression import keep_count, prunable_groups, prune_group, prune_model
+
+
+# ============================================================
+# MODUL MINI (nama & struktur sama dengan models/common.py YOLOv5)
+# ============================================================
+
+class Conv(nn.Module):
+    def __init__(self, c1, c2, k=1):
+        super().__init__()
+        self.conv = nn.Conv2d(c1, c2, k, 1, k // 2, bias=False)
+        self.bn = nn.BatchNorm2d(c2)
+        self.act = nn.SiLU()
+
+    def forward(self, x):
+        return self.act(self.bn(self.conv(x)))
+
+
+class Bottleneck(nn.Module):
+    def __init__(self, c):
+        super().__init__()
+        self.cv1 = Conv(c, c, 1)
+        self.cv2 = Conv(c, c, 3)
+
+    def forward(self, x):
+        return x + self.cv2(self.cv1(x))
+
+
+class C3(nn.Module):
+    def __init__(self, c1, c2, n=1):
+        super().__init__()
+        c_ = c2 // 2
+        self.cv1 = Conv(c1, c_)
+        self.cv2 = Conv(c1, c_)
+        self.cv3 = Conv(2 * c_, c2)
+        self.m = nn.Sequential(*(Bottleneck(c_) for _ in range(n)))
+
+    def forward(self, x):
+        return self.cv3(torch.cat((self.m(self.cv1(x)), self.cv2(x)), 1))
+
+
+def tiny_model():
+    torch.manual_seed(0)
+    return nn.Sequential(Conv(3, 64, 3), C3(64, 64, n=2), Bottleneck(64))
+
+
+def silence_channels(model, ratio):
+    """
+    Beri gamma/beta 0 pada channel yang akan dibuang prune_model(ratio), dan
+    gamma >= 0.5 pada sisanya: output channel tersebut selalu SiLU(0) = 0,
+    jadi model hasil prune harus memberi output yang sama persis
+    """
+    for producer, _, _ in prunable_groups(model):
+        bn = producer.bn
+        n = bn.num_features
+        drop = torch.randperm(n)[:n - keep_count(n, ratio)]
+        with torch.no_grad():
+            bn.weight.uniform_(0.5, 1.5)
+            bn.bias.uniform_(-0.1, 0.1)
+            bn.running_mean.uniform_(-0.1, 0.1)
+            bn.running_var.uniform_(0.5, 1.5)
+            bn.weight[drop] = 0.0
+            bn.bias[drop] = 0.0
+
+
+# ============================================================
+# TEST
+# ============================================================
+
+@pytest.mark.parametrize("channels, ratio, expected", [
+    (64, 0.3, 48),      # 44.8 dibulatkan ke kelipatan 8
+    (64, 0.0, 64),
+    (16, 0.9, 8),       # tidak di bawah MIN_CHANNELS
+    (12, 0.0, 12),      # tidak melebihi jumlah channel asli
+])
+def test_keep_count(channels, ratio, expected):
+    assert keep_count(channels, ratio) == expected
+
+
+def test_prunable_groups_found():
+    model = tiny_model()
+    groups = prunable_groups(model)
+    # C3.cv2 -> cv3, 2 Bottleneck di dalam C3, 1 Bottleneck di luar
+    assert len(groups) == 4
+    c3 = model[1]
+    assert any(p is c3.cv2 and c is c3.cv3 and off() == 32 for p, c, off in groups)
+
+
+def test_prune_group_keeps_most_important_channels():
+    block = Bottleneck(16)
+    with torch.no_grad():
+        block.cv1.bn.weight.copy_(torch.arange(1, 17, dtype=torch.float32))
+    old_consumer = block.cv2.conv.weight.detach().clone()
+
+    assert prune_group(block.cv1, block.cv2, 0, 8) == 8
+    assert block.cv1.bn.weight.tolist() == list(range(9, 17))
+    assert block.cv1.conv.out_channels == block.cv1.bn.num_features == 8
+    assert torch.equal(block.cv2.conv.weight, old_consumer[:, 8:])
+    assert prune_group(block.cv1, block.cv2, 0, 8) == 0
+
+
+def test_prune_model_shapes_consistent_and_output_unchanged():
+    model = tiny_model()
+    silence_channels(model, 0.25)
+    model.eval()
+    x = torch.randn(2, 3, 32, 32)
+    with torch.no_grad():
+        reference = model(x)
+
+    report = prune_model(model, 0.25)
+    assert not any(m.training for m in model.modules())    # modul pengganti ikut mode eval
+    assert report['groups'] == 4
+    assert report['channels_removed'] == 8 + 8 + 8 + 16
+    assert report['params_after'] < report['params_before']
+
+    c3 = model[1]
+    assert c3.cv2.conv.out_channels == c3.cv2.bn.num_features == 24
+    assert c3.cv3.conv.in_channels == c3.m[-1].cv2.conv.out_channels + c3.cv2.conv.out_channels == 56
+    for block in (*c3.m, model[2]):
+        assert block.cv1.conv.out_channels == block.cv1.bn.num_features == block.cv2.conv.in_channels
+        assert block.cv2.conv.out_channels == block.cv1.conv.in_channels     # residual tidak disentuh
+
+    with torch.no_grad():
+        assert torch.allclose(model(x), reference, atol=1e-5)
+
+    model.train()
+    assert model(x).shape == reference.shape
@@ -0,0 +1,118 @@
+"""Test cache prediksi mentah: LRU berbatas byte dan re-threshold tanpa forward pass"""
+
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("torchvision")
+
+from prediction_cache import RawPrediction, RawPredictionCache, image_key
+
+# Gambar asli 480x640 di-letterbox ke 320x320: ratio 0.5, pad atas 40
+LETTERBOX_INFO = (0.5, (0, 40), (480, 640))
+
+
+def entry(rows=10):
+    """RawPrediction dengan `rows` kandidat (rows * 24 byte)"""
+    return RawPrediction(torch.zeros((rows, 6)), LETTERBOX_INFO, 320, 0.01)
+
+
+def test_image_key_is_content_hash():
+    assert image_key(b"abc") == image_key(bytearray(b"abc"))
+    assert image_key(b"abc") != image_key(b"abd")
+    assert len(image_key(b"abc")) == 24
+
+
+# ============================================================
+# LRU
+# ============================================================
+
+def test_lru_evicts_least_recently_used_by_bytes():
+    cache = RawPredictionCache(max_bytes=600)       # muat 2 entry @ 240 byte
+    a, b, c = entry(), entry(), entry()
+    cache.put('a', a)
+    cache.put('b', b)
+    assert cache.get('a') is a                      # 'a' jadi paling baru dipakai
+    cache.put('c', c)
+
+    assert cache.get('b') is None
+    assert cache.get('a') is a and cache.get('c') is c
+    stats = cache.stats()
+    assert (stats['entries'], stats['bytes'], stats['evictions']) == (2, 480, 1)
+    assert (stats['hits'], stats['misses']) == (3, 1)
+    assert stats['hit_rate'] == 0.75
+
+
+def test_entry_from_smaller_size_is_miss_for_larger_request():
+    cache = RawPredictionCache()
+    degraded = RawPrediction(torch.zeros((10, 6)), LETTERBOX_INFO, 320, 0.01)
+    cache.put('a', degraded)
+
+    assert cache.get('a', min_size=320) is degraded
+    assert cache.get('a', min_size=640) is None     # service tidak sibuk lagi: forward ulang
+    full = RawPrediction(torch.zeros((10, 6)), LETTERBOX_INFO, 640, 0.01)
+    cache.put('a', full)
+    assert cache.get('a', min_size=320) is full     # entry resolusi penuh melayani semua ukuran
+    assert cache.stats()['entries'] == 1
+
+
+def test_put_same_key_replaces_entry_bytes():
+    cache = RawPredictionCache(max_bytes=1000)
+    cache.put('a', entry(10))
+    cache.put('a', entry(20))
+    assert cache.stats()['bytes'] == 480
+    assert cache.stats()['entries'] == 1
+
+
+def test_oversized_entry_and_disabled_cache_not_stored():
+    cache = RawPredictionCache(max_bytes=100)
+    cache.put('big', entry(10))
+    assert cache.stats()['entries'] == 0
+
+    disabled = RawPredictionCache(enabled=False)
+    disabled.put('a', entry())
+    assert disabled.get('a') is None
+    assert disabled.stats()['misses'] == 0
+
+
+def test_clear_resets_bytes():
+    cache = RawPredictionCache()
+    cache.put('a', entry())
+    cache.clear()
+    assert cache.get('a') is None
+    assert cache.stats()['bytes'] == 0
+
+
+# ============================================================
+# DETECTIONS
+# ============================================================
+
+CANDIDATES = torch.tensor([
+    [0.0, 40.0, 100.0, 140.0, 0.90, 0.0],
+    [5.0, 45.0, 105.0, 145.0, 0.60, 0.0],       # tumpang tindih (IoU ~0.82) dengan box pertama
+    [200.0, 100.0, 260.0, 160.0, 0.30, 1.0],
+    [300.0, 200.0, 320.0, 220.0, 0.005, 2.0],   # di bawah min_conf
+])
+
+
+def test_detections_rethreshold_without_forward():
+    raw = RawPrediction(CANDIDATES.clone(), LETTERBOX_INFO, 320, min_conf=0.01)
+
+    default = raw.detections(conf=0.25, iou=0.45, max_det=100)
+    assert default[:, 4].tolist() == pytest.approx([0.9, 0.3])
+    # Kembali ke koordinat gambar asli: (x - pad) / ratio
+    assert default[0, :4].tolist() == pytest.approx([0.0, 0.0, 200.0, 200.0])
+
+    assert len(raw.detections(conf=0.5, iou=0.45, max_det=100)) == 1
+    assert len(raw.detections(conf=0.25, iou=0.9, max_det=100)) == 3
+    assert len(raw.detections(conf=0.25, iou=0.9, max_det=2)) == 2
+    # conf di bawah min_conf dinaikkan ke min_conf: kandidat 0.005 tidak pernah muncul
+    assert len(raw.detections(conf=0.0, iou=0.9, max_det=100)) == 3
+    # Kandidat asli tidak ikut berubah oleh scale_boxes
+    assert torch.equal(raw.candidates, CANDIDATES)
+
+
+def test_cache_detections_records_nms_time():
+    cache = RawPredictionCache()
+    raw = RawPrediction(CANDIDATES.clone(), LETTERBOX_INFO, 320, min_conf=0.01)
+    cache.detections(raw, 0.25, 0.45, 100)
+    assert cache.stats()['avg_nms_ms'] is not None
@@ -0,0 +1,67 @@
+"""Test quality gate: foto tajam lolos, buram/gelap/terang/kosong ditolak"""
+
+import cv2  # type: ignore
+import numpy as np  # type: ignore
+import pytest
+
+from quality_gate import QualityGate, RETAKE_MESSAGES, assess_image_quality
+
+
+def textured_image(h=480, w=640, seed=0):
+    """Gambar sintetis dengan banyak objek (pengganti foto baglog yang fokus)"""
+    rng = np.random.default_rng(seed)
+    image = np.full((h, w, 3), 110, dtype=np.uint8)
+    for _ in range(60):
+        center = (int(rng.integers(0, w)), int(rng.integers(0, h)))
+        color = tuple(int(c) for c in rng.integers(40, 200, 3))
+        cv2.circle(image, center, int(rng.integers(8, 40)), color, -1)
+    return image
+
+
+def test_sharp_image_passes():
+    result = assess_image_quality(textured_image())
+    assert result['passed']
+    assert result['reasons'] == []
+
+
+def test_blurry_image_rejected():
+    result = assess_image_quality(cv2.GaussianBlur(textured_image(), (15, 15), 0))
+    assert result['reasons'] == ['blurry']
+
+
+def test_blank_image_has_no_content():
+    result = assess_image_quality(np.full((480, 640, 3), 128, dtype=np.uint8))
+    assert result['reasons'] == ['no_content']
+
+
+@pytest.mark.parametrize("transform, reason", [
+    (lambda img: (img * 0.12).astype(np.uint8), 'too_dark'),
+    (lambda img: np.clip(img.astype(np.int16) + 150, 0, 255).astype(np.uint8), 'too_bright'),
+])
+def test_exposure_rejected(transform, reason):
+    result = assess_image_quality(transform(textured_image()))
+    assert not result['passed']
+    assert reason in result['reasons']
+
+
+def test_gate_counts_rejections_and_builds_retake_response():
+    gate = QualityGate()
+    assert gate.check(textured_image())['passed']
+    rejected = gate.check(np.zeros((480, 640, 3), dtype=np.uint8))
+    assert not rejected['passed']
+
+    response = gate.retake_response(rejected)
+    assert response['retake'] and not response['success']
+    assert response['messages'] == [RETAKE_MESSAGES[r] for r in rejected['reasons']]
+
+    stats = gate.stats(avg_inference_ms=200.0)
+    assert (stats['checked'], stats['rejected']) == (2, 1)
+    assert stats['rejection_rate'] == 0.5
+    assert stats['reasons']['too_dark'] == 1
+    assert stats['estimated_saved_ms'] == 200.0
+
+
+def test_disabled_gate_skips_check():
+    gate = QualityGate(enabled=False)
+    assert gate.check(np.zeros((10, 10, 3), dtype=np.uint8)) is None
+    assert gate.stats()['checked'] == 0
@@ -0,0 +1,133 @@
+"""Test tracker: IoU, pencocokan track, voting kelas, optical flow"""
+
+import cv2  # type: ignore
+import numpy as np  # type: ignore
+import pytest
+
+from tracker import MushroomTracker, Track, TrackedDetector, box_iou
+
+
+def det(bbox, cls='Muda', conf=0.8):
+    return {'class': cls, 'confidence': conf, 'bbox': bbox}
+
+
+def ids(tracker):
+    return {t.id: tuple(int(v) for v in t.bbox) for t in tracker.tracks}
+
+
+# ============================================================
+# IOU & PENCOCOKAN
+# ============================================================
+
+def test_box_iou_known_values():
+    iou = box_iou([[0, 0, 10, 10]], [[0, 0, 10, 10], [5, 0, 15, 10], [20, 20, 30, 30]])
+    assert iou.shape == (1, 3)
+    assert iou[0].tolist() == pytest.approx([1.0, 1 / 3, 0.0], abs=1e-6)
+
+
+def test_matching_keeps_ids_stable():
+    tracker = MushroomTracker(use_flow=False)
+    tracker.update([det((0, 0, 50, 50)), det((100, 100, 150, 150))])
+    tracker.update([det((104, 102, 154, 152)), det((3, 2, 53, 52))])   # urutan tertukar
+
+    assert ids(tracker) == {1: (3, 2, 53, 52), 2: (104, 102, 154, 152)}
+
+
+def test_greedy_match_prefers_highest_iou():
+    tracker = MushroomTracker(use_flow=False)
+    tracker.update([det((0, 0, 100, 100))])
+    tracker.update([det((40, 0, 140, 100)), det((5, 0, 105, 100))])
+
+    assert ids(tracker)[1] == (5, 0, 105, 100)
+    assert ids(tracker)[2] == (40, 0, 140, 100)     # sisa deteksi jadi track baru
+
+
+def test_centroid_fallback_for_shifted_box():
+    tracker = MushroomTracker(iou_threshold=0.3, use_flow=False)
+    tracker.update([det((0, 0, 40, 40))])
+    # IoU ~0.23 (< threshold), tapi centroid bergeser 25 px < 0.5 * diagonal (~28 px)
+    tracker.update([det((25, 0, 65, 40))])
+
+    assert list(ids(tracker)) == [1]
+
+
+def test_unmatched_track_removed_after_max_missed():
+    tracker = MushroomTracker(max_missed=2, use_flow=False)
+    tracker.update([det((0, 0, 50, 50))])
+    tracker.update([])
+    tracker.update([])
+    assert [t.missed for t in tracker.tracks] == [2]    # masih ditampilkan
+    tracker.update([])
+    assert tracker.tracks == []
+
+
+# ============================================================
+# VOTING KELAS
+# ============================================================
+
+def test_vote_majority_over_window():
+    track = Track(1, det((0, 0, 10, 10), cls='Muda'), vote_window=5)
+    for cls in ('Muda', 'Matang', 'Muda'):
+        track.update(det((0, 0, 10, 10), cls=cls))
+    assert track.cls == 'Muda'                      # salah klasifikasi sesaat diabaikan
+    assert track.class_votes == {'Muda': 3, 'Matang': 1}
+
+
+def test_vote_follows_phase_change_once_window_rolls():
+    track = Track(1, det((0, 0, 10, 10), cls='Muda'), vote_window=4)
+    for _ in range(3):
+        track.update(det((0, 0, 10, 10), cls='Muda'))
+    for _ in range(3):
+        track.update(det((0, 0, 10, 10), cls='Matang'))
+
+    # Window: Muda, Matang, Matang, Matang
+    assert track.cls == 'Matang'
+    assert len(track.recent_classes) == 4
+
+
+def test_vote_tie_goes_to_latest_class():
+    track = Track(1, det((0, 0, 10, 10), cls='Muda'), vote_window=4)
+    track.update(det((0, 0, 10, 10), cls='Matang'))
+    assert track.cls == 'Matang'
+
+
+def test_tracker_passes_vote_window_to_tracks():
+    tracker = MushroomTracker(use_flow=False, vote_window=3)
+    tracker.update([det((0, 0, 50, 50))])
+    assert tracker.tracks[0].recent_classes.maxlen == 3
+
+
+# ============================================================
+# OPTICAL FLOW & TRACKED DETECTOR
+# ============================================================
+
+def textured_frame(shift=0, h=240, w=320):
+    rng = np.random.default_rng(1)
+    frame = cv2.GaussianBlur(rng.integers(0, 255, (h, w), dtype=np.uint8), (5, 5), 0)
+    return np.roll(frame, shift, axis=1)
+
+
+def test_predict_moves_box_with_flow():
+    tracker = MushroomTracker()
+    tracker.update([det((100, 80, 160, 140))])
+    tracker.predict(textured_frame(0))
+    confidence = tracker.predict(textured_frame(4))
+
+    assert confidence > 0.5
+    assert tracker.tracks[0].bbox.tolist() == pytest.approx([104, 80, 164, 140], abs=0.5)
+
+
+def test_tracked_detector_runs_detection_every_n_frames():
+    calls = []
+
+    def detect_fn(frame):
+        calls.append(frame)
+        return [det((100, 80, 160, 140))]
+
+    tracked = TrackedDetector(detect_fn, every_n=3, min_confidence=0.0)
+    frame = cv2.cvtColor(textured_frame(), cv2.COLOR_GRAY2BGR)
+    results = [tracked(frame) for _ in range(7)]
+
+    assert len(calls) == 3                          # frame 1, 4, 7
+    assert tracked.detect_ratio == pytest.approx(3 / 7)
+    assert all(r[0]['track_id'] == 1 for r in results)
@@ -0,0 +1,264 @@
+"""
+Tracker ringan untuk mode deteksi setiap N frame
+
+Di antara frame deteksi, box digeser dengan sparse optical flow
+(Lucas-Kanade) dan dicocokkan ke deteksi baru dengan IoU/centroid,
+sehingga setiap jamur punya ID stabil dan jumlah per kelas tidak berkedip.
+"""
+
+from collections import Counter, deque
+
+import cv2  # type: ignore
+import numpy as np  # type: ignore
+
+LK_PARAMS = dict(winSize=(15, 15), maxLevel=2,
+                 criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 10, 0.03))
+
+# Titik flow per box (GRID x GRID)
+FLOW_GRID = 4
+
+# Batas error forward-backward LK (piksel) agar titik dianggap valid
+MAX_FB_ERROR = 1.0
+
+
+def box_iou(boxes_a, boxes_b):
+    """
+    IoU antar dua set box [x1, y1, x2, y2]
+
+    Returns:
+        ndarray (len(a), len(b))
+    """
+    a = np.asarray(boxes_a, dtype=np.float32).reshape(-1, 4)
+    b = np.asarray(boxes_b, dtype=np.float32).reshape(-1, 4)
+    tl = np.maximum(a[:, None, :2], b[None, :, :2])
+    br = np.minimum(a[:, None, 2:], b[None, :, 2:])
+    inter = np.clip(br - tl, 0, None).prod(2)
+    area_a = (a[:, 2:] - a[:, :2]).clip(0).prod(1)
+    area_b = (b[:, 2:] - b[:, :2]).clip(0).prod(1)
+    return inter / (area_a[:, None] + area_b[None, :] - inter + 1e-9)
+
+
+class Track:
+    """
+    Satu jamur yang sedang di-track
+
+    Args:
+        vote_window: Jumlah deteksi terakhir yang ikut voting kelas
+    """
+
+    def __init__(self, track_id, det, vote_window=10):
+        self.id = track_id
+        self.bbox = np.array(det['bbox'], dtype=np.float32)
+        self.confidence = float(det['confidence'])
+        self.recent_classes = deque([det['class']], maxlen=max(1, int(vote_window)))
+        self.hits = 1
+        self.missed = 0
+        self.flow_confidence = 1.0
+
+    @property
+    def class_votes(self):
+        """Jumlah vote per kelas dalam window"""
+        return Counter(self.recent_classes)
+
+    @property
+    def cls(self):
+        """
+        Kelas hasil voting window (stabil terhadap salah klasifikasi sesaat,
+        tetapi mengikuti perubahan fase); seri dimenangkan kelas terbaru
+        """
+        votes = Counter(reversed(self.recent_classes))
+        return votes.most_common(1)[0][0]
+
+    def update(self, det):
+        self.bbox = np.array(det['bbox'], dtype=np.float32)
+        self.confidence = float(det['confidence'])
+        self.recent_classes.append(det['class'])
+        self.hits += 1
+        self.missed = 0
+
+
+class MushroomTracker:
+    """
+    Tracker IoU/centroid + optical flow
+
+    Args:
+        iou_threshold: IoU minimal untuk mencocokkan deteksi ke track
+        max_missed: Jumlah deteksi berturut-turut tanpa match sebelum track dihapus
+        use_flow: Geser box dengan optical flow di antara deteksi
+        vote_window: Jumlah deteksi terakhir untuk voting kelas per track
+    """
+
+    def __init__(self, iou_threshold=0.3, max_missed=2, use_flow=True, vote_window=10):
+        self.iou_threshold = iou_threshold
+        self.max_missed = max_missed
+        self.use_flow = use_flow
+        self.vote_window = vote_window
+        self.tracks = []
+        self.next_id = 1
+        self.prev_gray = None
+
+    def predict(self, gray):
+        """
+        Geser semua track ke frame `gray` dengan optical flow
+
+        Returns:
+            float: Tracking confidence 0-1 (porsi titik flow yang valid)
+        """
+        if self.prev_gray is None or not self.tracks or not self.use_flow:
+            self.prev_gray = gray
+            return 1.0
+
+        h, w = gray.shape[:2]
+        points, owners = [], []
+        for i, track in enumerate(self.tracks):
+            x1, y1, x2, y2 = track.bbox
+            bw, bh = x2 - x1, y2 - y1
+            xs = np.linspace(x1 + 0.2 * bw, x2 - 0.2 * bw, FLOW_GRID)
+            ys = np.linspace(y1 + 0.2 * bh, y2 - 0.2 * bh, FLOW_GRID)
+            for y in ys:
+                for x in xs:
+                    points.append((x, y))
+                    owners.append(i)
+
+        p0 = np.array(points, dtype=np.float32).reshape(-1, 1, 2)
+        p1, st, _ = cv2.calcOpticalFlowPyrLK(self.prev_gray, gray, p0, None, **LK_PARAMS)
+        p0r, st_back, _ = cv2.calcOpticalFlowPyrLK(gray, self.prev_gray, p1, None, **LK_PARAMS)
+        self.prev_gray = gray
+
+        fb_error = np.linalg.norm((p0 - p0r).reshape(-1, 2), axis=1)
+        good = (st.ravel() == 1) & (st_back.ravel() == 1) & (fb_error < MAX_FB_ERROR)
+        motion = (p1 - p0).reshape(-1, 2)
+        owners = np.array(owners)
+
+        confidences = []
+        for i, track in enumerate(self.tracks):
+            mine = owners == i
+            valid = mine & good
+            track.flow_confidence = float(valid.sum() / max(1, mine.sum()))
+            confidences.append(track.flow_confidence)
+            if valid.any():
+                dx, dy = np.median(motion[valid], axis=0)
+                track.bbox += np.array([dx, dy, dx, dy], dtype=np.float32)
+                track.bbox[[0, 2]] = track.bbox[[0, 2]].clip(0, w)
+                track.bbox[[1, 3]] = track.bbox[[1, 3]].clip(0, h)
+
+        return float(np.mean(confidences))
+
+    def update(self, detections):
+        """
+        Cocokkan deteksi baru ke track (greedy IoU, lalu centroid)
+
+        Args:
+            detections: List deteksi (class, confidence, bbox, ...)
+        """
+        unmatched_tracks = set(range(len(self.tracks)))
+        unmatched_dets = set(range(len(detections)))
+
+        if self.tracks and detections:
+            track_boxes = np.stack([t.bbox for t in self.tracks])
+            det_boxes = np.array([d['bbox'] for d in detections], dtype=np.float32)
+            iou = box_iou(track_boxes, det_boxes)
+
+            # Pass 1: IoU tertinggi lebih dulu
+            for ti, di in zip(*np.unravel_index(np.argsort(-iou, axis=None), iou.shape)):
+                if iou[ti, di] < self.iou_threshold:
+                    break
+                if ti in unmatched_tracks and di in unmatched_dets:
+                    self.tracks[ti].update(detections[di])
+                    unmatched_tracks.discard(ti)
+                    unmatched_dets.discard(di)
+
+            # Pass 2: centroid terdekat (untuk box yang bergeser/berubah ukuran)
+            for ti in sorted(unmatched_tracks):
+                tb = self.tracks[ti].bbox
+                t_center = (tb[:2] + tb[2:]) / 2
+                t_diag = np.linalg.norm(tb[2:] - tb[:2])
+                best, best_dist = None, 0.5 * t_diag
+                for di in unmatched_dets:
+                    db = det_boxes[di]
+                    dist = np.linalg.norm((db[:2] + db[2:]) / 2 - t_center)
+                    if dist < best_dist:
+                        best, best_dist = di, dist
+                if best is not None:
+                    self.tracks[ti].update(detections[best])
+                    unmatched_tracks.discard(ti)
+                    unmatched_dets.discard(best)
+
+        for ti in unmatched_tracks:
+            self.tracks[ti].missed += 1
+        self.tracks = [t for t in self.tracks if t.missed <= self.max_missed]
+
+        for di in sorted(unmatched_dets):
+            self.tracks.append(Track(self.next_id, detections[di], self.vote_window))
+            self.next_id += 1
+
+    def current_detections(self, harvest_estimation=None):
+        """
+        Track aktif dalam format list deteksi (dengan track_id)
+
+        Track yang sesaat tidak terdeteksi (missed <= max_missed) tetap
+        ditampilkan supaya hitungan tidak berkedip.
+        """
+        harvest_estimation = harvest_estimation or {}
+        detections = []
+        for track in self.tracks:
+            x1, y1, x2, y2 = (int(v) for v in track.bbox)
+            cls = track.cls
+            detections.append({
+                'class': cls,
+                'confidence': track.confidence,
+                'bbox': (x1, y1, x2, y2),
+                'harvest_days': harvest_estimation.get(cls, 0),
+                'track_id': track.id
+            })
+        return detections
+
+
+class TrackedDetector:
+    """
+    Jalankan deteksi penuh setiap N frame (atau saat tracking confidence
+    turun), dan tracking ringan di frame lainnya
+
+    Args:
+        detect_fn: Fungsi frame -> list deteksi (forward YOLOv5 penuh)
+        every_n: Interval deteksi penuh (frame)
+        min_confidence: Deteksi ulang jika tracking confidence di bawah ini
+    """
+
+    def __init__(self, detect_fn, every_n=5, min_confidence=0.5, tracker=None,
+                 harvest_estimation=None):
+        self.detect_fn = detect_fn
+        self.every_n = max(1, int(every_n))
+        self.min_confidence = min_confidence
+        self.tracker = tracker or MushroomTracker()
+        self.harvest_estimation = harvest_estimation or {}
+
+        self.frames = 0
+        self.detections_run = 0
+        self.last_detected = False
+        self.tracking_confidence = 1.0
+        self._since_detect = None
+
+    def __call__(self, frame):
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        self.tracking_confidence = self.tracker.predict(gray)
+        self.frames += 1
+
+        need_detect = (self._since_detect is None or
+                       self._since_detect + 1 >= self.every_n or
+                       self.tracking_confidence < self.min_confidence)
+
+        if need_detect:
+            self.tracker.update(self.detect_fn(frame))
+            self.detections_run += 1
+            self._since_detect = 0
+        else:
+            self._since_detect += 1
+        self.last_detected = need_detect
+
+        return self.tracker.current_detections(self.harvest_estimation)
+
+    @property
+    def detect_ratio(self):
+        """Porsi frame yang menjalankan deteksi penuh"""
+        return self.detections_run / self.frames if self.frames else 0.0
@@ -0,0 +1,438 @@
+"""
+Launcher training YOLOv5 yang sadar resource
+
+- Batch size, dataloader workers, dan mode cache gambar dipilih dari RAM & core
+- results.csv di-tail selama training: waktu per epoch, images/s, dan metrik
+  dicatat ke launcher_log.csv di folder run
+- Early stopping saat metrik (default mAP@0.5:0.95) tidak naik selama N epoch
+- Run yang terputus (status 'running' + last.pt ada) otomatis di-resume
+"""
+
+import csv
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+# Perkiraan memori training per gambar di IMG 640 (GB), per ukuran model
+TRAIN_GB_PER_IMAGE = {'yolov5n': 0.25, 'yolov5s': 0.5, 'yolov5m': 1.0, 'yolov5l': 1.8, 'yolov5x': 3.0}
+RESERVE_GB = 1.5          # Sisakan untuk OS + proses lain
+CACHE_RAM_FRACTION = 0.5  # Cache RAM hanya jika muat di porsi RAM tersedia ini
+MAX_BATCH = 64
+MAX_WORKERS = 8
+
+STATE_FILE = "launcher_state.json"
+LOG_FILE = "launcher_log.csv"
+
+
+# ============================================================
+# RESOURCE
+# ============================================================
+
+def detect_resources():
+    """
+    RAM (total & tersedia, byte) dan jumlah core yang boleh dipakai proses ini
+
+    Returns:
+        Dict total_ram, available_ram, cores
+    """
+    try:
+        cores = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cores = os.cpu_count() or 1
+
+    try:
+        import psutil  # type: ignore  (ikut terinstall dari yolov5/requirements.txt)
+        mem = psutil.virtual_memory()
+        return {'total_ram': mem.total, 'available_ram': mem.available, 'cores': cores}
+    except ImportError:
+        pass
+
+    total = available = 0
+    try:
+        with open('/proc/meminfo') as f:
+            info = {line.split(':')[0]: int(line.split()[1]) * 1024 for line in f}
+        total, available = info.get('MemTotal', 0), info.get('MemAvailable', 0)
+    except OSError:
+        pass
+    return {'total_ram': total, 'available_ram': available, 'cores': cores}
+
+
+def plan_resources(model_size, img_size, n_train_images, resources=None):
+    """
+    Pilih batch size, workers, dan mode cache dari resource yang tersedia
+
+    Args:
+        model_size: Nama model (yolov5n, yolov5s, ...)
+        img_size: Ukuran training
+        n_train_images: Jumlah gambar training (untuk estimasi cache)
+
+    Returns:
+        Dict batch, workers, cache ('ram', 'disk', atau None), dan alasan
+    """
+    resources = resources or detect_resources()
+    available_gb = resources['available_ram'] / 1e9
+    scale = (img_size / 640) ** 2
+
+    # Cache gambar (YOLOv5 menyimpan gambar ter-resize uint8)
+    cache_gb = n_train_images * img_size * img_size * 3 / 1e9
+    if available_gb and cache_gb <= available_gb * CACHE_RAM_FRACTION:
+        cache = 'ram'
+    else:
+        cache = 'disk'
+        cache_gb = 0.0
+
+    # Batch: kelipatan 2 terbesar yang muat di sisa RAM
+    per_image_gb = TRAIN_GB_PER_IMAGE.get(model_size, 1.0) * scale
+    budget_gb = max(0.0, available_gb - cache_gb - RESERVE_GB)
+    batch = 2
+    while batch * 2 <= MAX_BATCH and batch * 2 * per_image_gb <= budget_gb:
+        batch *= 2
+
+    # Workers: satu core untuk proses utama (forward/backward)
+    workers = max(0, min(MAX_WORKERS, resources['cores'] - 1, batch))
+
+    return {
+        'batch': batch,
+        'workers': workers,
+        'cache': cache,
+        'reason': (f"RAM tersedia {available_gb:.1f} GB, {resources['cores']} core | "
+                   f"cache {cache} ({n_train_images * img_size * img_size * 3 / 1e9:.2f} GB) | "
+                   f"~{per_image_gb:.2f} GB/gambar")
+    }
+
+
+# ============================================================
+# RESULTS.CSV
+# ============================================================
+
+def read_results(results_csv):
+    """
+    Baca results.csv YOLOv5 (nama kolom di-strip)
+
+    Returns:
+        List dict per epoch (nilai float)
+    """
+    path = Path(results_csv)
+    if not path.exists():
+        return []
+    with open(path, newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return []
+        header = [h.strip() for h in header]
+        rows = []
+        for row in reader:
+            if len(row) != len(header):
+                continue  # baris sedang ditulis
+            try:
+                rows.append({k: float(v) for k, v in zip(header, row)})
+            except ValueError:
+                continue
+    return rows
+
+
+class PlateauStopper:
+    """
+    Early stopping: berhenti jika metrik tidak naik > min_delta selama patience epoch
+    """
+
+    def __init__(self, patience=20, min_delta=0.001):
+        self.patience = patience
+        self.min_delta = min_delta
+        self.best = None
+        self.best_epoch = -1
+
+    def update(self, epoch, value):
+        """Returns: True jika training sebaiknya dihentikan"""
+        if self.best is None or value > self.best + self.min_delta:
+            self.best = value
+            self.best_epoch = epoch
+        return self.patience > 0 and epoch - self.best_epoch >= self.patience
+
+
+# ============================================================
+# LAUNCHER
+# ============================================================
+
+class TrainingLauncher:
+    """
+    Jalankan dan pantau satu run yolov5/train.py
+
+    Args:
+        data_yaml: Path data.yaml
+        model_size: yolov5n / yolov5s / ...
+        img_size: Ukuran training
+        epochs: Epoch maksimal
+        project_dir, name: Folder run (project/name)
+        batch, workers, cache: None = otomatis dari resource
+        patience: Epoch tanpa kenaikan metrik sebelum stop (0 = nonaktif)
+        metric: Kolom results.csv untuk early stopping
+        hyp: Path file hyperparameter YOLOv5 (opsional)
+        extra_args: Argumen tambahan untuk train.py
+        yolov5_dir: Folder clone YOLOv5
+        resources: Porsi resource untuk run ini (default: seluruh mesin, lihat detect_resources)
+        env: Environment subprocess (mis. batas thread per trial sweep)
+        output_log: File untuk output train.py (default: console)
+    """
+
+    def __init__(self, data_yaml, model_size="yolov5n", img_size=640, epochs=200,
+                 project_dir="runs/train", name="jamur_detector", batch=None, workers=None,
+                 cache=None, patience=20, min_delta=0.001, metric="metrics/mAP_0.5:0.95",
+                 hyp=None, extra_args=None, yolov5_dir="yolov5", poll_seconds=5.0,
+                 n_train_images=None, quiet=False, resources=None, env=None, output_log=None):
+        self.data_yaml = str(data_yaml)
+        self.model_size = model_size
+        self.img_size = img_size
+        self.epochs = epochs
+        self.run_dir = Path(project_dir) / name
+        self.project_dir = project_dir
+        self.name = name
+        self.patience = patience
+        self.min_delta = min_delta
+        self.metric = metric
+        self.hyp = hyp
+        self.extra_args = list(extra_args or [])
+        self.yolov5_dir = Path(yolov5_dir)
+        self.poll_seconds = poll_seconds
+        self.quiet = quiet
+        self.env = env
+        self.output_log = Path(output_log) if output_log else None
+
+        self.n_train_images = n_train_images if n_train_images is not None else self._count_train_images()
+        plan = plan_resources(model_size, img_size, self.n_train_images, resources)
+        self.plan = {
+            'batch': batch or plan['batch'],
+            'workers': plan['workers'] if workers is None else workers,
+            'cache': plan['cache'] if cache is None else (cache or None),
+            'reason': plan['reason'],
+        }
+        self._proc = None
+
+    def log(self, message):
+        if not self.quiet:
+            print(message, flush=True)
+
+    def _count_train_images(self):
+        """Jumlah gambar training dari data.yaml (untuk estimasi cache & images/s)"""
+        try:
+            import yaml  # type: ignore
+            with open(self.data_yaml) as f:
+                data = yaml.safe_load(f)
+            root = Path(data.get('path') or Path(self.data_yaml).parent)
+            train = Path(data['train'])
+            train = train if train.is_absolute() else root / train
+            if not train.exists():
+                train = Path(self.data_yaml).parent / data['train']
+            if train.suffix == '.txt':
+                return sum(1 for line in train.read_text().splitlines() if line.strip())
+            return sum(1 for p in train.iterdir() if p.suffix.lower() in ('.jpg', '.jpeg', '.png', '.bmp'))
+        except Exception:
+            return 0
+
+    # ---------------- State ----------------
+
+    @property
+    def last_checkpoint(self):
+        return self.run_dir / "weights" / "last.pt"
+
+    @property
+    def best_checkpoint(self):
+        return self.run_dir / "weights" / "best.pt"
+
+    def read_state(self):
+        path = self.run_dir / STATE_FILE
+        if not path.exists():
+            return {}
+        try:
+            return json.loads(path.read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def write_state(self, **state):
+        self.run_dir.mkdir(parents=True, exist_ok=True)
+        merged = {**self.read_state(), **state, 'updated_at': time.strftime('%Y-%m-%d %H:%M:%S')}
+        (self.run_dir / STATE_FILE).write_text(json.dumps(merged, indent=2))
+
+    def should_resume(self):
+        """Run sebelumnya terputus (bukan selesai/stop awal) dan checkpoint tersedia"""
+        return self.read_state().get('status') == 'running' and self.last_checkpoint.exists()
+
+    # ---------------- Command ----------------
+
+    def build_command(self, resume=False):
+        train_py = str(self.yolov5_dir / "train.py")
+        if resume:
+            return [sys.executable, train_py, "--resume", str(self.last_checkpoint)]
+        cmd = [
+            sys.executable, train_py,
+            "--img", str(self.img_size),
+            "--batch", str(self.plan['batch']),
+            "--epochs", str(self.epochs),
+            "--data", self.data_yaml,
+            "--weights", f"{self.model_size}.pt",
+            "--device", "cpu",
+            "--workers", str(self.plan['workers']),
+            "--project", str(self.project_dir),
+            "--name", self.name,
+            "--exist-ok",
+            # Early stopping dikendalikan launcher (metrik bisa dipilih)
+            "--patience", "0",
+        ]
+        if self.plan['cache']:
+            cmd += ["--cache", self.plan['cache']]
+        if self.hyp:
+            cmd += ["--hyp", str(self.hyp)]
+        return cmd + self.extra_args
+
+    # ---------------- Run ----------------
+
+    def run(self, resume=True):
+        """
+        Jalankan training sampai selesai, stop awal, atau dihentikan user
+
+        Returns:
+            Dict status, best metric, epoch, waktu per epoch, images/s, path weights
+        """
+        resuming = resume and self.should_resume()
+        if not resuming and (self.run_dir / "results.csv").exists():
+            # Run baru dengan nama yang sama: mulai log dari awal
+            (self.run_dir / "results.csv").unlink()
+            (self.run_dir / LOG_FILE).unlink(missing_ok=True)
+
+        cmd = self.build_command(resume=resuming)
+        self.log(f"[PLAN] batch {self.plan['batch']} | workers {self.plan['workers']} | "
+                 f"cache {self.plan['cache']} | {self.plan['reason']}")
+        if resuming:
+            self.log(f"[RESUME] Melanjutkan run terputus: {self.last_checkpoint}")
+        self.log(f"[COMMAND] {' '.join(cmd)}")
+
+        self.write_state(status='running', command=cmd, plan=self.plan, metric=self.metric,
+                         patience=self.patience, started_at=time.strftime('%Y-%m-%d %H:%M:%S'))
+
+        popen_kwargs = {}
+        if os.name == 'nt':
+            popen_kwargs['creationflags'] = subprocess.CREATE_NEW_PROCESS_GROUP
+        if self.env is not None:
+            popen_kwargs['env'] = self.env
+        output = None
+        if self.output_log is not None:
+            self.output_log.parent.mkdir(parents=True, exist_ok=True)
+            output = open(self.output_log, 'a')
+            popen_kwargs.update(stdout=output, stderr=subprocess.STDOUT)
+        try:
+            self._proc = subprocess.Popen(cmd, **popen_kwargs)
+        finally:
+            if output is not None:
+                output.close()  # sudah diwarisi subprocess
+
+        stopper = PlateauStopper(self.patience, self.min_delta)
+        results_csv = self.run_dir / "results.csv"
+        seen = 0
+        last_time = time.time()
+        epoch_times = []
+        status = 'finished'
+
+        # Epoch yang sudah ada (resume): isi ulang state stopper tanpa menghitung waktunya
+        for row in read_results(results_csv):
+            stopper.update(int(row['epoch']), row.get(self.metric, 0.0))
+            seen += 1
+
+        try:
+            while True:
+                finished = self._proc.poll() is not None
+                rows = read_results(results_csv)
+                for row in rows[seen:]:
+                    now = time.time()
+                    epoch = int(row['epoch'])
+                    value = row.get(self.metric, 0.0)
+                    epoch_s = now - last_time
+                    last_time = now
+                    epoch_times.append(epoch_s)
+                    images_per_s = self.n_train_images / epoch_s if epoch_s > 0 else 0.0
+                    stop = stopper.update(epoch, value)
+                    self._log_epoch(epoch, epoch_s, images_per_s, value, stopper.best)
+                    self.log(f"[EPOCH {epoch}] {epoch_s:.0f} s | {images_per_s:.1f} img/s | "
+                             f"{self.metric.split('/')[-1]} {value:.4f} (best {stopper.best:.4f} @ {stopper.best_epoch})")
+                    if stop and not finished:
+                        self.log(f"[EARLY STOP] Tidak ada kenaikan selama {self.patience} epoch")
+                        self._stop_after_checkpoint(now)
+                        status = 'stopped_early'
+                        finished = True
+                        break
+                seen = len(rows)
+                if finished:
+                    break
+                time.sleep(self.poll_seconds)
+        except KeyboardInterrupt:
+            self.log("\n⚠️ Training dihentikan (bisa di-resume dengan menjalankan ulang)")
+            self._terminate()
+            return {'status': 'interrupted'}
+
+        returncode = self._proc.wait()
+        if status == 'finished' and returncode != 0:
+            status = 'failed'
+        if status == 'stopped_early':
+            self._strip_checkpoints()
+        self.write_state(status=status, returncode=returncode, best=stopper.best, best_epoch=stopper.best_epoch)
+
+        best_row = next((r for r in read_results(results_csv) if int(r['epoch']) == stopper.best_epoch), {})
+        return {
+            'status': status,
+            'best': stopper.best,
+            'best_metrics': {k: v for k, v in best_row.items() if k.startswith('metrics/')},
+            'best_epoch': stopper.best_epoch,
+            'epochs_run': seen,
+            'mean_epoch_s': sum(epoch_times) / len(epoch_times) if epoch_times else 0.0,
+            'images_per_s': (self.n_train_images * len(epoch_times) / sum(epoch_times)) if epoch_times else 0.0,
+            'weights': str(self.best_checkpoint),
+        }
+
+    def _log_epoch(self, epoch, epoch_s, images_per_s, value, best):
+        path = self.run_dir / LOG_FILE
+        new = not path.exists()
+        with open(path, 'a', newline='') as f:
+            writer = csv.writer(f)
+            if new:
+                writer.writerow(['epoch', 'epoch_seconds', 'images_per_s', 'metric', 'best', 'time'])
+            writer.writerow([epoch, round(epoch_s, 1), round(images_per_s, 2), round(value, 5),
+                             round(best, 5), time.strftime('%Y-%m-%d %H:%M:%S')])
+
+    def _stop_after_checkpoint(self, row_seen_at, timeout=120):
+        """results.csv ditulis sebelum checkpoint; tunggu last.pt epoch ini tersimpan dulu"""
+        deadline = time.time() + timeout
+        while time.time() < deadline and self._proc.poll() is None:
+            if self.last_checkpoint.exists() and self.last_checkpoint.stat().st_mtime >= row_seen_at - 1:
+                time.sleep(2)  # beri waktu best.pt selesai ditulis
+                break
+            time.sleep(1)
+        self._terminate()
+
+    def _terminate(self):
+        if self._proc is None or self._proc.poll() is not None:
+            return
+        if os.name == 'nt':
+            self._proc.send_signal(signal.CTRL_BREAK_EVENT)
+        else:
+            self._proc.send_signal(signal.SIGINT)
+        try:
+            self._proc.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            self._proc.kill()
+            self._proc.wait()
+
+    def _strip_checkpoints(self):
+        """Buang state optimizer dari checkpoint (seperti akhir training normal YOLOv5)"""
+        for ckpt in (self.last_checkpoint, self.best_checkpoint):
+            if not ckpt.exists():
+                continue
+            code = "import sys; from utils.general import strip_optimizer; strip_optimizer(sys.argv[1])"
+            try:
+                subprocess.run([sys.executable, "-c", code, str(ckpt.resolve())],
+                               cwd=str(self.yolov5_dir), check=True, capture_output=True)
+            except (subprocess.CalledProcessError, OSError) as e:
+                self.log(f"⚠️  Gagal strip optimizer {ckpt.name}: {e}")
@@ -0,0 +1,213 @@
+"""
+Pipeline threaded untuk deteksi webcam: capture -> inferensi -> render
+
+- Capture thread selalu menyimpan HANYA frame terbaru (frame lama dibuang)
+- Inference worker mengambil frame terbaru yang belum diproses
+- Render/display berjalan mengikuti frame rate kamera, memakai hasil deteksi terakhir
+"""
+
+import threading
+import time
+from collections import namedtuple
+
+import cv2  # type: ignore
+
+# Hasil inferensi yang dipublikasikan worker
+InferenceResult = namedtuple('InferenceResult', ['frame_id', 'capture_time', 'detections', 'infer_ms'])
+
+
+class RateMeter:
+    """FPS dengan exponential moving average"""
+
+    def __init__(self, alpha=0.1):
+        self.alpha = alpha
+        self.fps = 0.0
+        self._last = None
+
+    def tick(self, now=None):
+        now = time.perf_counter() if now is None else now
+        if self._last is not None:
+            dt = now - self._last
+            if dt > 0:
+                inst = 1.0 / dt
+                self.fps = inst if self.fps == 0 else (1 - self.alpha) * self.fps + self.alpha * inst
+        self._last = now
+        return self.fps
+
+
+class LatencyMeter:
+    """Latency (ms) dengan exponential moving average"""
+
+    def __init__(self, alpha=0.1):
+        self.alpha = alpha
+        self.ms = 0.0
+        self.count = 0
+
+    def update(self, ms):
+        self.ms = ms if self.count == 0 else (1 - self.alpha) * self.ms + self.alpha * ms
+        self.count += 1
+        return self.ms
+
+
+class LatestFrameCapture:
+    """
+    Capture thread yang hanya menyimpan frame terbaru
+
+    Kamera tidak pernah menunggu inferensi; konsumen yang lambat
+    otomatis melewati frame lama.
+
+    Args:
+        source: Index webcam atau path file video
+        pace_fps: Batasi kecepatan baca (untuk file video agar berjalan real-time)
+        timer: StageTimer opsional, menerima sampel stage 'capture'
+    """
+
+    def __init__(self, source, pace_fps=None, timer=None):
+        self.source = source
+        self.pace_fps = pace_fps
+        self.timer = timer
+        self.cap = cv2.VideoCapture(source)
+        self.fps = RateMeter()
+        self.read_ms = LatencyMeter()
+        self.failed = False
+
+        self._cond = threading.Condition()
+        self._frame = None
+        self._frame_id = 0
+        self._timestamp = 0.0
+        self._running = False
+        self._thread = None
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="capture", daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        interval = 1.0 / self.pace_fps if self.pace_fps else 0.0
+        next_due = time.perf_counter()
+        while self._running:
+            if interval:
+                delay = next_due - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                next_due = max(next_due + interval, time.perf_counter())
+            start = time.perf_counter()
+            ret, frame = self.cap.read()
+            now = time.perf_counter()
+            if not ret:
+                self.failed = True
+                break
+            self.read_ms.update((now - start) * 1000)
+            self.fps.tick(now)
+            if self.timer is not None:
+                self.timer.record('capture', (now - start) * 1000)
+            with self._cond:
+                self._frame = frame
+                self._frame_id += 1
+                self._timestamp = now
+                self._cond.notify_all()
+
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+
+    def read(self):
+        """Returns: (frame_id, frame, capture_time) frame terbaru"""
+        with self._cond:
+            return self._frame_id, self._frame, self._timestamp
+
+    def wait_newer(self, last_id, timeout=1.0):
+        """
+        Tunggu frame yang lebih baru dari last_id
+
+        Returns:
+            (frame_id, frame, capture_time); frame None jika timeout/berhenti
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self._frame_id > last_id or not self._running, timeout)
+            if self._frame_id > last_id:
+                return self._frame_id, self._frame, self._timestamp
+            return last_id, None, 0.0
+
+    @property
+    def running(self):
+        return self._running
+
+    def stop(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+        self.cap.release()
+
+
+class InferenceWorker:
+    """
+    Worker inferensi: selalu memproses frame terbaru dari capture
+
+    Args:
+        capture: LatestFrameCapture
+        infer_fn: fungsi frame -> list deteksi
+    """
+
+    def __init__(self, capture, infer_fn):
+        self.capture = capture
+        self.infer_fn = infer_fn
+        self.fps = RateMeter()
+        self.infer_ms = LatencyMeter()
+        self.error = None
+
+        self._lock = threading.Lock()
+        self._result = None
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="inference", daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        last_id = 0
+        while self._running:
+            frame_id, frame, capture_time = self.capture.wait_newer(last_id, timeout=0.5)
+            if frame is None:
+                if not self.capture.running:
+                    break
+                continue
+            last_id = frame_id
+
+            start = time.perf_counter()
+            try:
+                detections = self.infer_fn(frame)
+            except Exception as e:
+                self.error = e
+                print(f"❌ Inference error: {e}")
+                break
+            elapsed_ms = (time.perf_counter() - start) * 1000
+
+            self.infer_ms.update(elapsed_ms)
+            self.fps.tick()
+            with self._lock:
+                self._result = InferenceResult(frame_id, capture_time, detections, elapsed_ms)
+
+        self._running = False
+
+    def latest(self):
+        """Hasil inferensi terakhir (atau None)"""
+        with self._lock:
+            return self._result
+
+    @property
+    def running(self):
+        return self._running
+
+    def stop(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=5.0)